@@ -0,0 +1,158 @@
+"""
+Benchmark: Vertex RAG call resilience against a fake RAG client.
+
+FakeRagClient stands in for `rag.retrieval_query`: most calls take
+--latency-ms (jittered), --slow-rate of them stall for --slow-ms, and
+--error-rate fail with ServiceUnavailable. Two scenarios:
+
+1. Tail latency: the same call sequence with and without hedging.
+   Reports p50/p95/p99 and the extra calls sent.
+2. Outage: the backend fails every call for a while, then recovers.
+   Reports how many calls reached it while down (the circuit breaker
+   should stop them after RAG_BREAKER_FAILURES) and when it was back.
+
+Usage:
+    python benchmarks/rag_resilience_bench.py [--calls N] [--concurrency N] [--latency-ms MS]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.infrastructure.tools.rag_resilience import (  # noqa: E402
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+)
+
+
+class ServiceUnavailable(ConnectionError):
+    """Stand-in for google.api_core.exceptions.ServiceUnavailable."""
+
+
+class FakeRagClient:
+    """Blocking retrieval_query stand-in with injected latency and errors."""
+
+    def __init__(self, latency_ms: float, slow_ms: float, slow_rate: float, error_rate: float, seed: int = 7):
+        self.latency_ms = latency_ms
+        self.slow_ms = slow_ms
+        self.slow_rate = slow_rate
+        self.error_rate = error_rate
+        self.down = False
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def retrieval_query(self) -> list[dict]:
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+            jitter = self._rng.uniform(0.8, 1.2)
+        if self.down:
+            time.sleep(self.latency_ms / 1000)
+            raise ServiceUnavailable("503 backend unavailable")
+        if roll < self.slow_rate:
+            time.sleep(self.slow_ms * jitter / 1000)
+        else:
+            time.sleep(self.latency_ms * jitter / 1000)
+        if roll > 1 - self.error_rate:
+            raise ServiceUnavailable("503 backend unavailable")
+        return [{"text": "chunk", "relevance_score": 0.8}]
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+async def run_calls(caller: ResilientCaller, client: FakeRagClient, calls: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await caller.call("corpus", client.retrieval_query, timeout=10)
+            except Exception:
+                pass
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*[one() for _ in range(calls)])
+    return latencies
+
+
+async def tail_latency(args) -> None:
+    print(f"Tail latency: {args.calls} calls, {args.latency_ms:g} ms typical, "
+          f"{args.slow_rate:.0%} stall for {args.slow_ms:g} ms, {args.error_rate:.0%} errors")
+    for hedge in (False, True):
+        executor = ThreadPoolExecutor(max_workers=args.concurrency * 2)
+        client = FakeRagClient(args.latency_ms, args.slow_ms, args.slow_rate, args.error_rate)
+        caller = ResilientCaller(executor, hedge_enabled=hedge)
+        # Warm the latency window so hedging starts from a realistic p95
+        await run_calls(caller, client, 50, args.concurrency)
+        client.calls = 0
+        latencies = await run_calls(caller, client, args.calls, args.concurrency)
+        executor.shutdown(wait=True)
+        print(
+            f"  {'hedged  ' if hedge else 'baseline'}  p50 {percentile(latencies, 50):6.0f} ms  "
+            f"p95 {percentile(latencies, 95):6.0f} ms  p99 {percentile(latencies, 99):6.0f} ms  "
+            f"backend calls {client.calls} ({client.calls / args.calls - 1:+.0%})"
+        )
+
+
+async def outage(args) -> None:
+    executor = ThreadPoolExecutor(max_workers=4)
+    client = FakeRagClient(args.latency_ms, args.slow_ms, 0.0, 0.0)
+    caller = ResilientCaller(
+        executor,
+        breaker_factory=lambda: CircuitBreaker(failure_threshold=5, open_seconds=0.5),
+    )
+    print("Outage: backend down for 1.5 s, one call every 20 ms")
+    client.down = True
+    rejected = failed = 0
+    started = time.perf_counter()
+    recovered_at = None
+    while time.perf_counter() - started < 2.5:
+        if client.down and time.perf_counter() - started > 1.5:
+            client.down = False
+            calls_while_down = client.calls
+        try:
+            await caller.call("corpus", client.retrieval_query, timeout=2)
+            if recovered_at is None and not client.down:
+                recovered_at = time.perf_counter() - started
+        except CircuitOpenError:
+            rejected += 1
+        except Exception:
+            failed += 1
+        await asyncio.sleep(0.02)
+    executor.shutdown(wait=True)
+    print(
+        f"  backend calls while down {calls_while_down}, failed {failed}, rejected without calling {rejected}, "
+        f"first success {recovered_at:.2f} s (recovered at 1.50 s)"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--slow-ms", type=float, default=800)
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    await tail_latency(args)
+    await outage(args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+"""
+Benchmark: merged-result ordering, score sort vs hybrid re-ranking.
+
+Builds synthetic multi-corpus result sets in which each corpus reports
+scores on its own scale (as Vertex RAG corpuses with different embedding
+and chunking setups do). The generator favours neither ordering:
+
+- every corpus, the answer's included, gets a random score offset, so the
+  answer's corpus is as likely to score high as low
+- the answer's rank in its own corpus varies (mostly near the top, as
+  from a reasonable retriever, but anywhere down the list)
+- the answer has both query terms only with --answer-both-terms
+  probability (else one, as a paraphrase would); other chunks share one
+  query term (30%) or both (5%)
+
+Reports how often the answer lands in the first positions the LLM sees
+for both orderings, overall and split by whether the answer's corpus had
+the highest offset, and the re-ranking cost.
+
+Usage:
+    python benchmarks/rerank_bench.py [--queries N] [--corpuses N] [--per-corpus N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.infrastructure.tools.reranker import rerank  # noqa: E402
+
+TOPICS = [
+    ("vacaciones", "días", "anuales"), ("reembolso", "gastos", "viaje"), ("trabajo", "remoto", "horario"),
+    ("licencia", "maternidad", "semanas"), ("seguro", "médico", "cobertura"), ("capacitación", "cursos", "presupuesto"),
+    ("evaluación", "desempeño", "anual"), ("uniforme", "vestimenta", "oficina"), ("bono", "productividad", "trimestral"),
+    ("préstamo", "empleados", "tasa"), ("equipo", "laptop", "asignación"), ("seguridad", "contraseñas", "acceso"),
+]
+FILLER = "la empresa establece que el colaborador debe seguir el procedimiento indicado por su jefatura".split()
+
+
+def chunk_text(rng: random.Random, terms: tuple) -> str:
+    words = rng.sample(FILLER, 8) + list(terms)
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def build_case(rng: random.Random, corpuses: int, per_corpus: int, answer_both_terms: float):
+    """
+    One query and the merged results of all corpuses.
+
+    Returns:
+        (query, results, answer, whether the answer's corpus had the highest offset)
+    """
+    answer_topic, *others = rng.sample(TOPICS, len(TOPICS))
+    query = " ".join(answer_topic[:2])
+    answer_corpus = rng.randrange(corpuses)
+    # Mostly near the top of its corpus, occasionally anywhere
+    answer_rank = min(int(rng.expovariate(0.5)) + 1, per_corpus)
+    # Each corpus reports scores on its own scale, drawn the same way for all
+    offsets = [rng.uniform(0.0, 0.3) for _ in range(corpuses)]
+    results, answer = [], None
+    for corpus, offset in enumerate(offsets):
+        scores = sorted((offset + rng.uniform(0.4, 0.6) for _ in range(per_corpus)), reverse=True)
+        for rank, score in enumerate(scores, start=1):
+            is_answer = corpus == answer_corpus and rank == answer_rank
+            if is_answer:
+                topic = answer_topic if rng.random() < answer_both_terms else (
+                    answer_topic[rng.randrange(2)], answer_topic[2]
+                )
+            else:
+                topic = rng.choice(others)
+                draw = rng.random()
+                if draw < 0.05:
+                    # Distractor with both query terms
+                    topic = topic + answer_topic[:2]
+                elif draw < 0.35:
+                    # Distractor sharing one query term
+                    topic = topic + (answer_topic[rng.randrange(2)],)
+            result = {
+                "corpus_id": f"corpus-{corpus}",
+                "corpus_name": f"corpus_{corpus}",
+                "priority": 1 + corpus % 2,
+                "rank": rank,
+                "text": chunk_text(rng, topic),
+                "relevance_score": score,
+            }
+            results.append(result)
+            if is_answer:
+                answer = result
+    return query, results, answer, offsets[answer_corpus] == max(offsets)
+
+
+def score_sort(results: list) -> list:
+    """Ordering used before re-ranking."""
+    return sorted(results, key=lambda x: (-(x.get("relevance_score") or 0.0), x.get("priority", 999)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--corpuses", type=int, default=4)
+    parser.add_argument("--per-corpus", type=int, default=10)
+    parser.add_argument("--answer-both-terms", type=float, default=0.6,
+                        help="Share of answers containing both query terms")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = [build_case(rng, args.corpuses, args.per_corpus, args.answer_both_terms) for _ in range(args.queries)]
+    subsets = (
+        ("all", cases),
+        ("top corpus", [case for case in cases if case[3]]),
+        ("other corpus", [case for case in cases if not case[3]]),
+    )
+
+    rows = []
+    for label, order in (("score sort", lambda q, r: score_sort(r)), ("hybrid rerank", rerank)):
+        for subset, subset_cases in subsets:
+            hits_1 = hits_5 = 0
+            reciprocal = 0.0
+            elapsed = 0.0
+            for query, results, answer, _ in subset_cases:
+                started = time.perf_counter()
+                ranked = order(query, [dict(r) for r in results])
+                elapsed += time.perf_counter() - started
+                position = next(i for i, r in enumerate(ranked, start=1) if r["text"] == answer["text"])
+                hits_1 += position == 1
+                hits_5 += position <= 5
+                reciprocal += 1 / position
+            n = max(len(subset_cases), 1)
+            rows.append((label, subset, len(subset_cases), hits_1 / n, hits_5 / n, reciprocal / n, elapsed / n * 1000))
+
+    candidates = args.corpuses * args.per_corpus
+    print(f"{len(cases)} queries, {args.corpuses} corpuses x {args.per_corpus} results ({candidates} candidates)")
+    print("answer's corpus: 'top corpus' = it had the highest score offset\n")
+    print(f"{'':>15}  {'answers in':>12}  {'n':>5}  {'hit@1':>6}  {'hit@5':>6}  {'MRR':>6}  {'ms/query':>8}")
+    for label, subset, n, hit_1, hit_5, mrr, ms in rows:
+        print(f"{label:>15}  {subset:>12}  {n:5d}  {hit_1:6.2f}  {hit_5:6.2f}  {mrr:6.3f}  {ms:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: SharePoint metadata enrichment against a local Graph stand-in.
+
+Compares the previous flow (site, drives and item requested sequentially
+for every result) with SharePointGraphClient (site/drive resolution cached
+per site, item lookups of concurrent results sent as one $batch). Reports
+Graph round trips and wall time for one search's results.
+
+Usage:
+    python benchmarks/sharepoint_metadata_bench.py [--results N] [--latency-ms MS]
+    python benchmarks/sharepoint_metadata_bench.py --base-url http://localhost:8081/v1.0
+
+Without --base-url an in-process stand-in (httpx.MockTransport) answers
+/sites, /sites/{id}/drives, /drives/{id}/root:/{path} and /$batch, adding
+--latency-ms to every HTTP request. With --base-url the same requests go
+to a Graph stand-in server at that address.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.infrastructure.tools.metadata_fetcher import SourceMetadataFetcher  # noqa: E402
+from src.infrastructure.tools.sharepoint_graph import SharePointGraphClient  # noqa: E402
+
+TENANT = "contoso"
+SITE_PATH = "/sites/rrhh"
+
+
+def standin_transport(latency: float, counter: dict) -> httpx.MockTransport:
+    """In-process Graph stand-in with a fixed per-request latency."""
+
+    def route(method: str, path: str) -> tuple:
+        path = path.split("?")[0]
+        if path.startswith("/v1.0"):
+            path = path[len("/v1.0"):]
+        if method == "GET" and re.fullmatch(r"/sites/[\w.-]+\.sharepoint\.com(:/sites/[\w-]+)?", path):
+            return 200, {"id": "site-rrhh", "displayName": "Recursos Humanos"}
+        if method == "GET" and path == "/sites/site-rrhh/drives":
+            return 200, {"value": [{"id": "drive-docs", "name": "Documents"}]}
+        match = re.fullmatch(r"/drives/drive-docs/root:/(.+)", path)
+        if method == "GET" and match:
+            name = match.group(1).split("/")[-1]
+            if name.startswith("missing"):
+                return 404, {"error": {"code": "itemNotFound", "message": "The resource could not be found."}}
+            return 200, {
+                "name": name,
+                "webUrl": f"https://{TENANT}.sharepoint.com{SITE_PATH}/Shared%20Documents/{name}",
+                "size": 123456,
+                "createdDateTime": "2025-03-01T10:00:00Z",
+                "lastModifiedDateTime": "2026-09-15T08:30:00Z",
+                "createdBy": {"user": {"displayName": "Ana Torres"}},
+                "lastModifiedBy": {"user": {"displayName": "Luis Rojas"}},
+                "file": {"mimeType": "application/pdf"},
+                "eTag": f'"{{{name}}},1"',
+            }
+        return 404, {"error": {"code": "notFound", "message": f"No route for {method} {path}"}}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        counter["requests"] += 1
+        await asyncio.sleep(latency)
+        path = request.url.path
+        if request.method == "POST" and path.endswith("/$batch"):
+            body = json.loads(request.content)
+            responses = []
+            for sub in body["requests"]:
+                status, payload = route(sub["method"], httpx.URL(sub["url"]).path)
+                responses.append({"id": sub["id"], "status": status, "body": payload})
+            return httpx.Response(200, json={"responses": responses})
+        status, payload = route(request.method, path)
+        return httpx.Response(status, json=payload)
+
+    return httpx.MockTransport(handler)
+
+
+def result_urls(count: int) -> list:
+    return [
+        f"https://{TENANT}.sharepoint.com{SITE_PATH}/Shared Documents/Politicas/politica_{i:02d}.pdf"
+        for i in range(count)
+    ]
+
+
+async def legacy_enrichment(urls: list, base_url: str, transport) -> None:
+    """Previous flow: site, drives, item - sequential per result, results in parallel."""
+    async with httpx.AsyncClient(base_url=base_url, transport=transport) as http:
+        async def one(url: str):
+            site = (await http.get(f"/sites/{TENANT}.sharepoint.com:{SITE_PATH}")).json()
+            await http.get(f"/sites/{site['id']}/drives")
+            path = url.split("/Shared Documents/", 1)[1]
+            await http.get(f"/drives/drive-docs/root:/{path}")
+        await asyncio.gather(*[one(url) for url in urls])
+
+
+async def run(results: int, latency_ms: float, base_url: Optional[str]) -> None:
+    counter = {"requests": 0}
+    transport = None if base_url else standin_transport(latency_ms / 1000, counter)
+    base_url = base_url or "https://graph.local/v1.0"
+    urls = result_urls(results)
+
+    async def token() -> str:
+        return "standin-token"
+
+    started = time.perf_counter()
+    await legacy_enrichment(urls, base_url, transport)
+    legacy_ms = (time.perf_counter() - started) * 1000
+    legacy_requests = counter["requests"]
+
+    fetcher = SourceMetadataFetcher()
+    client = SharePointGraphClient(token, base_url=base_url, transport=transport)
+    fetcher.graph_client = client
+
+    rows = [("previous (3 calls/result)", legacy_requests, legacy_ms, results)]
+    for label in ("cached site + $batch (cold)", "cached site + $batch (warm)"):
+        client.requests_sent = 0
+        counter["requests"] = 0
+        started = time.perf_counter()
+        enriched = await asyncio.gather(*[fetcher._get_sharepoint_metadata(url) for url in urls])
+        elapsed = (time.perf_counter() - started) * 1000
+        ok = sum(1 for m in enriched if m.get("metadata_available"))
+        rows.append((label, client.requests_sent, elapsed, ok))
+    await client.close()
+
+    print(f"{results} SharePoint results in one site, {latency_ms:g} ms per Graph request\n")
+    for label, requests, elapsed, ok in rows:
+        print(f"{label:>30}: {requests:3d} Graph requests  {elapsed:8.1f} ms  ({ok} with metadata)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--base-url", help="Graph stand-in server (default: in-process stand-in)")
+    args = parser.parse_args()
+    asyncio.run(run(args.results, args.latency_ms, args.base_url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: incremental ToolCallSanitizer vs the previous per-chunk cleanup.
+
+Replays recorded streams (the chunk sequence the model produced) through
+both implementations and reports throughput and correctness: how many
+streams leak a tool-call artifact and how many differ from cleaning the
+whole message at once.
+
+Usage:
+    python benchmarks/tool_call_sanitizer_bench.py [streams.jsonl] [--repeat N]
+
+streams.jsonl holds one recorded stream per line: {"chunks": ["...", ...]}.
+Without a file, a built-in set of synthetic Spanish answers is used,
+split into 5-60 character chunks like Gemini streaming output.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.tool_call_sanitizer import ToolCallSanitizer  # noqa: E402
+
+ARTIFACT = re.compile(r'\b(?:rag_search|search_\w+)\s+"|```tool_code', re.IGNORECASE)
+
+
+def legacy_clean(text: str) -> str:
+    """The previous ChatService._clean_tool_call_text, applied per chunk."""
+    if not text:
+        return text
+    text = re.sub(r'^[\s]*[a-z_]+\s+"[^"]*"[\s]*$', '', text, flags=re.MULTILINE)
+    text = re.sub(
+        r'```(?:TOOL_CODE|tool|function)?\s*\n[a-z_]+\s+"[^"]*"\s*\n```',
+        '',
+        text,
+        flags=re.IGNORECASE
+    )
+    text = re.sub(r'\b(rag_search|search_\w+)\s+"[^"]*"', '', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+def run_legacy(chunks: List[str]) -> str:
+    return "".join(legacy_clean(chunk) for chunk in chunks)
+
+
+def run_incremental(chunks: List[str]) -> str:
+    sanitizer = ToolCallSanitizer()
+    out = [sanitizer.feed(chunk) for chunk in chunks]
+    out.append(sanitizer.flush())
+    return "".join(out)
+
+
+def synthetic_streams(count: int = 200, seed: int = 7) -> List[List[str]]:
+    """Build answers with and without leaked tool calls, split at random points."""
+    rng = random.Random(seed)
+    paragraphs = [
+        "Según la política de vacaciones vigente, cada colaborador tiene derecho a 30 días calendario por año.",
+        "Los reembolsos deben solicitarse dentro de los 15 días hábiles posteriores al gasto, adjuntando la factura.",
+        "Para el proceso de onboarding, el área de Recursos Humanos coordina la entrega de equipos y accesos.",
+        "- Paso 1: ingresa al portal.\n- Paso 2: completa el formulario.\n- Paso 3: envía la solicitud.",
+        "El contrato establece una cláusula de confidencialidad de 2 años tras la terminación.",
+    ]
+    artifacts = [
+        'rag_search "política de vacaciones"',
+        '```tool_code\nsearch_legal "cláusula de confidencialidad"\n```',
+        'Voy a consultar search_rrhh "onboarding" para confirmar.',
+    ]
+    streams = []
+    for _ in range(count):
+        parts = rng.sample(paragraphs, k=rng.randint(2, 5))
+        if rng.random() < 0.5:
+            parts.insert(rng.randint(0, len(parts)), rng.choice(artifacts))
+        text = "\n\n".join(parts)
+        chunks, i = [], 0
+        while i < len(text):
+            step = rng.randint(5, 60)
+            chunks.append(text[i:i + step])
+            i += step
+        streams.append(chunks)
+    return streams
+
+
+def load_streams(path: Path) -> List[List[str]]:
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line)["chunks"] for line in f if line.strip()]
+
+
+def measure(fn, streams: List[List[str]], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for chunks in streams:
+            fn(chunks)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("streams", nargs="?", type=Path, help="JSONL file of recorded streams")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    streams = load_streams(args.streams) if args.streams else synthetic_streams()
+    total_chunks = sum(len(s) for s in streams)
+    total_chars = sum(len(c) for s in streams for c in s)
+    print(f"{len(streams)} streams, {total_chunks} chunks, {total_chars} chars, repeat={args.repeat}\n")
+
+    for name, fn in (("legacy per-chunk", run_legacy), ("incremental", run_incremental)):
+        elapsed = measure(fn, streams, args.repeat)
+        per_chunk_us = elapsed / (total_chunks * args.repeat) * 1e6
+        leaked = sum(1 for s in streams if ARTIFACT.search(fn(s)))
+        mismatched = sum(1 for s in streams if fn(s) != run_incremental(["".join(s)]))
+        print(
+            f"{name:>17}: {elapsed * 1000:8.1f} ms  {per_chunk_us:6.2f} µs/chunk  "
+            f"leaked artifacts: {leaked:3d}  differs from whole-message cleanup: {mismatched:3d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+-- ============================================
+-- Background Generation Jobs
+-- Status and results of long-running invoke/chat/document
+-- requests executed outside the HTTP request
+-- ============================================
+
+BEGIN;
+
+-- ============================================
+-- 1. GENERATION JOBS TABLE
+-- ============================================
+CREATE TABLE IF NOT EXISTS generation_jobs (
+    job_id VARCHAR(64) PRIMARY KEY,
+    job_type VARCHAR(50) NOT NULL,           -- invoke | chat | document_process
+    user_id VARCHAR(255) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',  -- queued | running | succeeded | failed | timed_out
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,    -- Summary of the original request
+    result JSONB,
+    error TEXT,
+    timeout_seconds DOUBLE PRECISION,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_generation_jobs_user ON generation_jobs(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_generation_jobs_status ON generation_jobs(status)
+    WHERE status IN ('queued', 'running');
+
+COMMIT;
@@ -0,0 +1,21 @@
+-- ============================================
+-- Source Metadata Cache
+-- Second tier of the RAG source-metadata cache (GCS / SharePoint
+-- file metadata shown with search results), shared by all instances
+-- ============================================
+
+BEGIN;
+
+-- ============================================
+-- 1. SOURCE METADATA CACHE TABLE
+-- ============================================
+CREATE TABLE IF NOT EXISTS source_metadata_cache (
+    source_uri TEXT PRIMARY KEY,
+    metadata JSONB NOT NULL DEFAULT '{}'::jsonb,
+    etag TEXT,                               -- GCS etag / SharePoint eTag, used to revalidate
+    fetched_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_source_metadata_cache_fetched ON source_metadata_cache(fetched_at);
+
+COMMIT;
@@ -0,0 +1,45 @@
+-- ============================================
+-- Local Vector Backends
+-- Corpuses searched without Vertex RAG: 'numpy' (memory-mapped
+-- files on disk) and 'pgvector' (chunks stored below)
+-- ============================================
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+-- ============================================
+-- 1. ALLOW THE NEW VECTOR DB TYPES
+-- ============================================
+ALTER TABLE corpuses DROP CONSTRAINT IF EXISTS corpuses_vector_db_type_check;
+ALTER TABLE corpuses ADD CONSTRAINT corpuses_vector_db_type_check
+    CHECK (vector_db_type IN ('vertex_rag', 'qdrant', 'pinecone', 'weaviate', 'pgvector', 'numpy'));
+
+-- ============================================
+-- 2. CHUNKS OF PGVECTOR CORPUSES
+-- ============================================
+CREATE TABLE IF NOT EXISTS corpus_chunks (
+    corpus_id VARCHAR(255) NOT NULL REFERENCES corpuses(corpus_id) ON DELETE CASCADE,
+    chunk_id VARCHAR(255) NOT NULL,
+    text TEXT NOT NULL,
+    source_uri TEXT,
+    metadata JSONB DEFAULT '{}'::jsonb,
+    -- Fixed dimension: text-embedding-005 at 768, L2-normalized. pgvector
+    -- corpuses must keep vector_db_config.dimension at 768; the service
+    -- refuses to start otherwise. Another dimension needs a migration that
+    -- changes this column (and rebuilds the index).
+    embedding vector(768) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (corpus_id, chunk_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_corpus_chunks_source ON corpus_chunks(corpus_id, source_uri);
+
+-- Approximate nearest neighbour search by cosine distance. One index serves
+-- every corpus; searches filter by corpus_id with iterative index scans
+-- (hnsw.iterative_scan, pgvector >= 0.8) so small corpuses still fill top-k.
+CREATE INDEX IF NOT EXISTS idx_corpus_chunks_embedding
+    ON corpus_chunks USING hnsw (embedding vector_cosine_ops);
+
+COMMIT;
@@ -0,0 +1,27 @@
+-- ============================================
+-- Corpus Ingestion
+-- Fingerprints of indexed documents (to re-index only what changed)
+-- and progress of running jobs
+-- ============================================
+
+BEGIN;
+
+-- ============================================
+-- 1. INGESTED DOCUMENTS TABLE
+-- ============================================
+CREATE TABLE IF NOT EXISTS ingested_documents (
+    corpus_id VARCHAR(255) NOT NULL REFERENCES corpuses(corpus_id) ON DELETE CASCADE,
+    source_uri TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,               -- GCS md5 / generation, local file md5
+    chunk_count INTEGER NOT NULL DEFAULT 0,
+    ingested_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (corpus_id, source_uri)
+);
+
+-- ============================================
+-- 2. JOB PROGRESS
+-- ============================================
+ALTER TABLE generation_jobs
+ADD COLUMN IF NOT EXISTS progress JSONB;
+
+COMMIT;
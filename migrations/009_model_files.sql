@@ -0,0 +1,23 @@
+-- ============================================
+-- Model File References
+-- Attachments uploaded once to the model provider's file store
+-- (GCS for Vertex AI, Gemini Files API), keyed by content hash, so later
+-- turns and other sessions reference them by URI instead of inline bytes
+-- ============================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS model_files (
+    store VARCHAR(32) NOT NULL,               -- gcs, gemini, local
+    content_hash TEXT NOT NULL,               -- GCS md5 (base64)
+    file_uri TEXT NOT NULL,
+    mime_type VARCHAR(255) NOT NULL,
+    size_bytes BIGINT NOT NULL DEFAULT 0,
+    expires_at TIMESTAMP WITH TIME ZONE,      -- NULL: kept until deleted
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (store, content_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_model_files_expires_at ON model_files(expires_at);
+
+COMMIT;
@@ -0,0 +1,28 @@
+-- ============================================
+-- Upload Index
+-- Content-addressed index of confirmed uploads: identical documents
+-- uploaded by different users share one canonical object, so they are
+-- stored, downloaded and sent to the model once
+-- ============================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS upload_index (
+    blob_path TEXT PRIMARY KEY,               -- uploads/{user}/{uuid}/{filename}
+    user_id VARCHAR(255) NOT NULL,
+    content_key TEXT NOT NULL,                -- md5 (hex), crc32c (hex), size
+    canonical_blob_path TEXT NOT NULL,        -- blob_path, or content/{content_key} when shared
+    size_bytes BIGINT NOT NULL DEFAULT 0,
+    content_type VARCHAR(255),
+    md5_hash TEXT,                            -- GCS md5 (base64)
+    crc32c TEXT,                              -- GCS crc32c (base64)
+    release_after TIMESTAMP WITH TIME ZONE,   -- own object superseded by the shared one: deleted after this
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_upload_index_content_key ON upload_index(content_key);
+CREATE INDEX IF NOT EXISTS idx_upload_index_canonical ON upload_index(canonical_blob_path);
+CREATE INDEX IF NOT EXISTS idx_upload_index_user ON upload_index(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_upload_index_release ON upload_index(release_after) WHERE release_after IS NOT NULL;
+
+COMMIT;
@@ -1,15 +1,16 @@
 """RESTful Chat API for frontend integration."""
 
 import logging
-import json
-import asyncio
 from fastapi import APIRouter, HTTPException, Depends, Request, Query
-from fastapi.responses import StreamingResponse
 from typing import Optional, List
 from pydantic import BaseModel, Field
 
 from src.middleware.teams_auth import require_auth
+from src.middleware.idempotency import Idempotency, idempotency
 from src.application.di import get_container
+from src.application.api.stream_registry import get_stream_registry
+from src.application.api.job_routes import ModeQuery, submit_job
+from src.domain.models.job_models import JobType
 from src.domain.services.chat_service import ChatService
 from src.domain.models.chat_models import (
     ChatMessageRequest, SessionMessageRequest,
@@ -50,33 +51,6 @@ class StreamChatRequest(BaseModel):
     metadata: Optional[dict] = Field(None, description="Additional context")
 
 
-# =============================================================================
-# SSE Generator
-# =============================================================================
-
-
-async def _sse_generator(events):
-    """
-    Async generator that formats StreamEvents as SSE data.
-
-    SSE Format:
-    - data: {"content": "..."} for content chunks
-    - data: {"session": {...}} for session info
-    - data: [DONE] for completion
-    - data: {"error": {"message": "..."}} for errors
-    """
-    try:
-        async for event in events:
-            yield event.to_sse()
-    except asyncio.CancelledError:
-        # Client disconnected - this is normal, don't log as error
-        logger.info("SSE stream cancelled by client")
-        yield "data: [CANCELLED]\n\n"
-    except Exception as e:
-        logger.error(f"SSE generator error: {e}", exc_info=True)
-        yield f"data: {json.dumps({'error': {'message': str(e)}})}\n\n"
-
-
 # =============================================================================
 # Streaming Endpoint
 # =============================================================================
@@ -85,6 +59,7 @@ async def _sse_generator(events):
 @router.post("/chat/stream")
 async def stream_chat_message(
     request: StreamChatRequest,
+    http_request: Request,
     user: dict = Depends(require_auth),
     chat_service: ChatService = Depends(get_chat_service),
 ):
@@ -95,9 +70,10 @@ async def stream_chat_message(
 
     **Response Format:** Server-Sent Events (SSE)
     - Session info: `data: {"session_id": "...", "agent_id": "..."}`
-    - Content chunks: `data: {"content": "..."}` (token-by-token)
+    - Content chunks: `data: {"content": "..."}` (small tokens are coalesced)
     - Completion: `data: [DONE]`
-    - Errors: `data: {"error": "..."}`
+    - Errors: `data: {"error": {"message": "..."}}`
+    - Heartbeats: `: ping` comment lines while the agent is busy (ignore them)
 
     **Attachments:** Supports PDFs, images, Word docs, Excel, PowerPoint.
     Files are downloaded from GCS and sent to Gemini for multimodal analysis.
@@ -152,9 +128,19 @@ async def stream_chat_message(
     ```
 
     **Cancellation:** Client can abort using AbortController.
+
+    **Resuming:** Every frame carries an SSE `id:` (`{stream_id}:{seq}`). If the
+    connection drops, repeat the same request with a `Last-Event-ID` header set
+    to the last id received: the still-running generation is re-attached and
+    missed frames are replayed. Returns 410 if the stream is no longer buffered.
     """
     try:
         user_id = user["user_id"]
+        registry = get_stream_registry()
+
+        resumed = registry.resume_response(http_request, owner=user_id)
+        if resumed is not None:
+            return resumed
 
         logger.info(f"🌊 Stream request from {user['email']}: {request.prompt[:50]}...")
 
@@ -179,16 +165,11 @@ async def stream_chat_message(
             attachments=attachments,
         )
 
-        return StreamingResponse(
-            _sse_generator(event_stream),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Disable nginx buffering
-            }
-        )
+        stream = registry.start(owner=user_id, events=event_stream)
+        return registry.response(stream, request=http_request)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Stream endpoint error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -202,8 +183,10 @@ async def stream_chat_message(
 @router.post("/chat", response_model=ChatResponse)
 async def send_chat_message(
     request: ChatMessageRequest,
+    mode: str = ModeQuery,
     user: dict = Depends(require_auth),
-    chat_service: ChatService = Depends(get_chat_service)
+    chat_service: ChatService = Depends(get_chat_service),
+    idem: Idempotency = Depends(idempotency),
 ):
     """
     Send a chat message (creates new session if needed).
@@ -216,6 +199,13 @@ async def send_chat_message(
     - agent_name: Agent name (optional, alternative to agent_id)
     - metadata: Additional context (optional)
 
+    **Query Parameters:**
+    - mode: `job` to run in the background and get 202 with a job ID
+
+    **Headers:**
+    - Idempotency-Key: Retries with the same key return the first response
+      instead of running the agent again
+
     **Response:**
     - message: Agent's response with metadata
     - session_id: Session ID for subsequent messages
@@ -226,8 +216,30 @@ async def send_chat_message(
 
     logger.info(f"💬 Chat message from {user['email']}: {request.prompt[:50]}...")
 
-    try:
+    async def run_job() -> dict:
         response = await chat_service.send_message(
+            user_id=user_id,
+            prompt=request.prompt,
+            agent_id=request.agent_id,
+            agent_name=request.agent_name,
+            metadata=request.metadata,
+            timeout=None,
+        )
+        return response.model_dump(mode="json")
+
+    async def handle():
+        if mode == "job":
+            return await submit_job(
+                JobType.CHAT,
+                user_id,
+                run_job,
+                payload={
+                    "agent_id": request.agent_id,
+                    "agent_name": request.agent_name,
+                    "prompt": request.prompt[:200],
+                },
+            )
+        return await chat_service.send_message(
             user_id=user_id,
             prompt=request.prompt,
             agent_id=request.agent_id,
@@ -235,7 +247,11 @@ async def send_chat_message(
             metadata=request.metadata
         )
 
-        logger.info(f"✅ Message sent, session: {response.session_id}")
+    try:
+        response = await idem.run(user_id, handle)
+
+        if isinstance(response, ChatResponse):
+            logger.info(f"✅ Message sent, session: {response.session_id}")
         return response
 
     except HTTPException:
@@ -252,8 +268,10 @@ async def send_chat_message(
 async def send_session_message(
     session_id: str,
     request: SessionMessageRequest,
+    mode: str = ModeQuery,
     user: dict = Depends(require_auth),
-    chat_service: ChatService = Depends(get_chat_service)
+    chat_service: ChatService = Depends(get_chat_service),
+    idem: Idempotency = Depends(idempotency),
 ):
     """
     Send a message to existing session.
@@ -267,6 +285,13 @@ async def send_session_message(
     - prompt: User's message (required)
     - metadata: Additional context (optional)
 
+    **Query Parameters:**
+    - mode: `job` to run in the background and get 202 with a job ID
+
+    **Headers:**
+    - Idempotency-Key: Retries with the same key return the first response
+      instead of running the agent again
+
     **Response:**
     - message: Agent's response
     - session_id: Same session ID
@@ -276,15 +301,33 @@ async def send_session_message(
 
     logger.info(f"💬 Session message from {user['email']} to {session_id}")
 
-    try:
+    async def run_job() -> dict:
         response = await chat_service.send_message(
+            user_id=user_id,
+            prompt=request.prompt,
+            session_id=session_id,
+            metadata=request.metadata,
+            timeout=None,
+        )
+        return response.model_dump(mode="json")
+
+    async def handle():
+        if mode == "job":
+            return await submit_job(
+                JobType.CHAT,
+                user_id,
+                run_job,
+                payload={"session_id": session_id, "prompt": request.prompt[:200]},
+            )
+        return await chat_service.send_message(
             user_id=user_id,
             prompt=request.prompt,
             session_id=session_id,
             metadata=request.metadata
         )
 
-        return response
+    try:
+        return await idem.run(user_id, handle)
 
     except HTTPException:
         raise
@@ -9,48 +9,51 @@ Provides endpoints for:
 
 import os
 import logging
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel, Field
 
 from src.middleware.rbac import require_permission
 from src.domain.models.rbac_models import UserRBAC
 from src.application.di import get_container
-from src.services.storage_service import StorageService
+from src.application.api.sse import sse_response
+from src.domain.models import AgentConfig, StreamEvent
+from src.domain.ports.document_storage import DocumentStorage
 from src.services.document_processor import (
     MultiDocumentProcessor,
     DocumentReference,
     SUPPORTED_MIME_TYPES,
 )
 from src.services.teams_integration import TeamsAgentIntegration
+from src.application.api.job_routes import ModeQuery, submit_job
+from src.domain.models.job_models import JobType
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Initialize services lazily
-_storage_service: Optional[StorageService] = None
 _document_processor: Optional[MultiDocumentProcessor] = None
 
 
-def get_storage_service() -> StorageService:
-    """Get or create storage service singleton."""
-    global _storage_service
-    if _storage_service is None:
-        _storage_service = StorageService()
-    return _storage_service
+def get_document_storage() -> DocumentStorage:
+    """The container's document storage."""
+    return get_container().get_document_storage()
 
 
-def get_document_processor() -> MultiDocumentProcessor:
+async def get_document_processor() -> MultiDocumentProcessor:
     """Get or create document processor singleton."""
     global _document_processor
     if _document_processor is None:
-        storage = get_storage_service()
+        storage = get_document_storage()
         project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
         location = os.getenv("GOOGLE_CLOUD_LOCATION", "us-east4")
         _document_processor = MultiDocumentProcessor(
             storage_service=storage,
             project_id=project_id,
             location=location,
+            model_files=await get_container().get_model_file_cache(),
+            text_extractor=get_container().get_text_extractor(),
+            image_normalizer=get_container().get_image_normalizer(),
         )
     return _document_processor
 
@@ -210,10 +213,10 @@ async def get_signed_download_url(
                 detail="Access denied. You can only access your own documents.",
             )
 
-        storage = get_storage_service()
+        storage = get_document_storage()
 
         # Verify document exists
-        doc_info = storage.verify_upload(blob_path)
+        doc_info = await storage.verify_upload(blob_path)
         if not doc_info or not doc_info.get("exists"):
             raise HTTPException(
                 status_code=404,
@@ -222,7 +225,7 @@ async def get_signed_download_url(
 
         # Generate signed URL (15 minutes expiry)
         expiration_minutes = 15
-        signed_url = storage.generate_presigned_download_url(
+        signed_url = await storage.generate_presigned_download_url(
             blob_path=blob_path,
             expiration_minutes=expiration_minutes,
         )
@@ -277,9 +280,9 @@ async def generate_presigned_url(
                        f"Supported types: {list(SUPPORTED_MIME_TYPES.keys())}"
             )
 
-        storage = get_storage_service()
+        storage = get_document_storage()
 
-        result = storage.generate_presigned_upload_url(
+        result = await storage.generate_presigned_upload_url(
             user_id=user_id,
             filename=request_body.filename,
             content_type=request_body.content_type,
@@ -317,9 +320,9 @@ async def confirm_upload(
     try:
         logger.info(f"✅ Confirming upload: {request_body.document_id}")
 
-        storage = get_storage_service()
+        storage = get_document_storage()
 
-        result = storage.verify_upload(request_body.blob_path)
+        result = await storage.confirm_upload(request_body.blob_path, user.user_id)
 
         if not result or not result.get("exists"):
             return UploadConfirmResponse(
@@ -343,6 +346,7 @@ async def confirm_upload(
 @router.post("/documents/process", response_model=ProcessDocumentsResponse)
 async def process_documents(
     request_body: ProcessDocumentsRequest,
+    mode: str = ModeQuery,
     user: UserRBAC = Depends(require_permission("documents:view")),
 ):
     """
@@ -361,6 +365,9 @@ async def process_documents(
 
     **Supported file types:** PDF, Word, Excel, PowerPoint, images (JPEG, PNG, GIF, WebP),
     text files, CSV, HTML, Markdown.
+
+    **Long analyses:** Use `?mode=job` to run the processing in the background;
+    the response is 202 with a job ID to poll at `/jobs/{job_id}`.
     """
     try:
         user_id = user.user_id
@@ -373,82 +380,161 @@ async def process_documents(
         logger.info(f"📚 Documents: {len(request_body.documents)}")
         logger.info(f"💬 Prompt: {request_body.prompt[:100]}...")
 
-        # Convert to DocumentReference objects
-        doc_refs = [
-            DocumentReference(
-                document_id=doc.document_id,
-                filename=doc.filename,
-                content_type=doc.content_type,
-                blob_path=doc.blob_path,
+        if mode == "job":
+            async def run_job() -> dict:
+                response = await _run_document_processing(user_id, request_body)
+                return response.model_dump()
+
+            return await submit_job(
+                JobType.DOCUMENT_PROCESS,
+                user_id,
+                run_job,
+                payload={
+                    "documents": [doc.blob_path for doc in request_body.documents],
+                    "session_id": request_body.session_id,
+                    "prompt": request_body.prompt[:200],
+                },
             )
-            for doc in request_body.documents
-        ]
-
-        # Get services
-        container = get_container()
-        agent_service = await container.get_agent_service()
-        group_mapping_repo = await container.init_group_mapping_repository()
-
-        # Get the appropriate agent for this user
-        teams_integration = TeamsAgentIntegration(
-            agent_service,
-            group_mapping_repo,
-        )
 
-        # Get user's groups and find the right agent
-        user_groups = await teams_integration.get_user_groups(user_id)
-        if not user_groups:
-            user_groups = ["General-Users"]
+        return await _run_document_processing(user_id, request_body)
 
-        agent_config = await teams_integration.agent_router.get_agent_for_user(user_groups)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("=" * 60)
+        logger.error("❌ DOCUMENT PROCESSING ERROR")
+        logger.error("=" * 60)
+        logger.error(f"Error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Document processing failed: {str(e)}")
 
-        if not agent_config:
-            return ProcessDocumentsResponse(
-                success=False,
-                error="No agent available for your user group",
-            )
 
-        # Process documents with Gemini
-        processor = get_document_processor()
+@router.post("/documents/process/stream")
+async def process_documents_stream(
+    request_body: ProcessDocumentsRequest,
+    http_request: Request,
+    user: UserRBAC = Depends(require_permission("documents:view")),
+):
+    """
+    Process uploaded documents with Gemini, streaming the answer via Server-Sent Events.
 
-        # Build system instruction from agent config
-        system_instruction = agent_config.instruction if agent_config.instruction else None
+    **Authentication:** Requires valid Teams SSO token or OAuth2 JWT.
 
-        result = await processor.process_documents(
-            documents=doc_refs,
+    **Response:** SSE frames, in order:
+    - `data: {"progress": {"stage": "documents_loaded", "documents_processed": N, ...}}`
+    - `data: {"progress": {"stage": "first_token", "elapsed_ms": ...}}`
+    - `data: {"content": "..."}` (repeated)
+    - `data: {"progress": {"stage": "completed", ...}}`
+    - `data: [DONE]` (or `data: {"error": {...}}`)
+    """
+    user_id = user.user_id
+    logger.info(f"📄 Streaming document processing for {user_id}: {len(request_body.documents)} document(s)")
+
+    agent_config = await _resolve_document_agent(user_id)
+    if not agent_config:
+        raise HTTPException(status_code=403, detail="No agent available for your user group")
+
+    processor = await get_document_processor()
+
+    async def events() -> AsyncIterator[StreamEvent]:
+        yield StreamEvent(
+            event_type="session",
+            data={
+                "session_id": request_body.session_id,
+                "agent_name": agent_config.name,
+                "agent_area": agent_config.area_type,
+            },
+        )
+        async for event in processor.stream_documents(
+            documents=_document_refs(request_body),
             user_query=request_body.prompt,
-            system_instruction=system_instruction,
+            system_instruction=agent_config.instruction or None,
+        ):
+            yield event
+
+    return sse_response(events(), request=http_request)
+
+
+def _document_refs(request_body: ProcessDocumentsRequest) -> List[DocumentReference]:
+    """Convert the request's documents to DocumentReference objects."""
+    return [
+        DocumentReference(
+            document_id=doc.document_id,
+            filename=doc.filename,
+            content_type=doc.content_type,
+            blob_path=doc.blob_path,
         )
+        for doc in request_body.documents
+    ]
 
-        if not result.success:
-            return ProcessDocumentsResponse(
-                success=False,
-                error=result.error,
-                documents_processed=result.documents_processed,
-            )
 
-        logger.info("=" * 60)
-        logger.info("✅ DOCUMENT PROCESSING COMPLETE")
-        logger.info("=" * 60)
-        logger.info(f"📚 Processed: {result.documents_processed} document(s)")
-        logger.info(f"📝 Response length: {len(result.response)} chars")
+async def _resolve_document_agent(user_id: str) -> Optional[AgentConfig]:
+    """Pick the agent for the user's groups (None if no agent is available)."""
+    container = get_container()
+    agent_service = await container.get_agent_service()
+    group_mapping_repo = await container.init_group_mapping_repository()
+
+    # Get the appropriate agent for this user
+    teams_integration = TeamsAgentIntegration(
+        agent_service,
+        group_mapping_repo,
+    )
+
+    # Get user's groups and find the right agent
+    user_groups = await teams_integration.get_user_groups(user_id)
+    if not user_groups:
+        user_groups = ["General-Users"]
+
+    return await teams_integration.agent_router.get_agent_for_user(user_groups)
 
+
+async def _run_document_processing(
+    user_id: str,
+    request_body: ProcessDocumentsRequest,
+) -> ProcessDocumentsResponse:
+    """Pick the user's agent and process the documents with Gemini."""
+    doc_refs = _document_refs(request_body)
+
+    agent_config = await _resolve_document_agent(user_id)
+    if not agent_config:
         return ProcessDocumentsResponse(
-            success=True,
-            response=result.response,
+            success=False,
+            error="No agent available for your user group",
+        )
+
+    # Process documents with Gemini
+    processor = await get_document_processor()
+
+    # Build system instruction from agent config
+    system_instruction = agent_config.instruction if agent_config.instruction else None
+
+    result = await processor.process_documents(
+        documents=doc_refs,
+        user_query=request_body.prompt,
+        system_instruction=system_instruction,
+    )
+
+    if not result.success:
+        return ProcessDocumentsResponse(
+            success=False,
+            error=result.error,
             documents_processed=result.documents_processed,
-            agent_name=agent_config.name,
-            agent_area=agent_config.area_type,
-            session_id=request_body.session_id,
-            metadata=result.metadata,
         )
 
-    except Exception as e:
-        logger.error("=" * 60)
-        logger.error("❌ DOCUMENT PROCESSING ERROR")
-        logger.error("=" * 60)
-        logger.error(f"Error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Document processing failed: {str(e)}")
+    logger.info("=" * 60)
+    logger.info("✅ DOCUMENT PROCESSING COMPLETE")
+    logger.info("=" * 60)
+    logger.info(f"📚 Processed: {result.documents_processed} document(s)")
+    logger.info(f"📝 Response length: {len(result.response)} chars")
+
+    return ProcessDocumentsResponse(
+        success=True,
+        response=result.response,
+        documents_processed=result.documents_processed,
+        agent_name=agent_config.name,
+        agent_area=agent_config.area_type,
+        session_id=request_body.session_id,
+        metadata=result.metadata,
+    )
 
 
 @router.delete("/documents/{document_id}")
@@ -474,8 +560,8 @@ async def delete_document(
                 detail="You can only delete your own documents",
             )
 
-        storage = get_storage_service()
-        success = storage.delete_document(blob_path)
+        storage = get_document_storage()
+        success = await storage.delete_document(blob_path)
 
         if success:
             return {"success": True, "message": "Document deleted"}
@@ -502,8 +588,8 @@ async def list_user_documents(
     try:
         user_id = user.user_id
 
-        storage = get_storage_service()
-        documents = storage.list_user_documents(user_id, max_results)
+        storage = get_document_storage()
+        documents = await storage.list_user_documents(user_id, max_results)
 
         return {
             "user_id": user_id,
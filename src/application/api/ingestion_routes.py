@@ -0,0 +1,92 @@
+"""
+Corpus Ingestion API Routes.
+
+`POST /corpuses/{corpus_id}/ingest` queues an ingestion job: documents
+under the given GCS prefixes (and/or individual uploaded files) are
+extracted, chunked and indexed into the corpus, skipping files whose
+fingerprint did not change since the last run. Progress and the final
+summary are read from `GET /jobs/{job_id}` or its SSE stream.
+"""
+
+import logging
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel, Field
+
+from src.middleware.rbac import require_superadmin
+from src.application.di import get_container
+from src.application.api.job_routes import submit_job
+from src.domain.models.job_models import JobType
+from src.domain.models.rbac_models import UserRBAC
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+class IngestionRequest(BaseModel):
+    """Request to ingest documents into a corpus."""
+    prefixes: List[str] = Field(
+        default_factory=list,
+        description="Source prefixes to scan, e.g. gs://bucket/policies/",
+    )
+    uris: List[str] = Field(
+        default_factory=list,
+        description="Individual documents, e.g. gs:// URIs of uploaded files",
+    )
+    delete_missing: bool = Field(
+        False,
+        description="Remove indexed documents under the prefixes that no longer exist",
+    )
+    force: bool = Field(False, description="Re-index documents even if unchanged")
+
+
+@router.post("/corpuses/{corpus_id}/ingest", status_code=202)
+async def ingest_corpus(
+    corpus_id: str,
+    request_body: IngestionRequest,
+    user_rbac: UserRBAC = Depends(require_superadmin()),
+):
+    """
+    Queue an incremental ingestion job for a corpus.
+
+    **Authentication:** Superadmin only
+
+    **Response:** 202 with the job ID. While running, the job's `progress`
+    holds phase, listed, total, processed, indexed, unchanged, failed and
+    chunks; the result is the run summary.
+    """
+    if not request_body.prefixes and not request_body.uris:
+        raise HTTPException(status_code=400, detail="Give at least one prefix or URI")
+
+    container = get_container()
+    corpus_repository = await container.init_corpus_repository()
+    if await corpus_repository.get_corpus_by_id(corpus_id) is None:
+        raise HTTPException(status_code=404, detail="Corpus not found")
+
+    ingestion_service = await container.get_ingestion_service()
+    job_service = await container.get_job_service()
+
+    async def run_job() -> dict:
+        return await ingestion_service.ingest(
+            corpus_id,
+            prefixes=request_body.prefixes,
+            uris=request_body.uris,
+            delete_missing=request_body.delete_missing,
+            force=request_body.force,
+            on_progress=job_service.report_progress,
+        )
+
+    logger.info(f"📥 Ingestion requested for {corpus_id} by {user_rbac.email}")
+    return await submit_job(
+        JobType.CORPUS_INGEST,
+        user_rbac.user_id,
+        run_job,
+        payload={
+            "corpus_id": corpus_id,
+            "prefixes": request_body.prefixes,
+            "uris": request_body.uris[:50],
+            "delete_missing": request_body.delete_missing,
+            "force": request_body.force,
+        },
+    )
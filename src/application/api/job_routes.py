@@ -0,0 +1,151 @@
+"""
+Background Job API Routes.
+
+`/invoke`, `/chat`, `/chat/sessions/{id}` and `/documents/process` accept
+`?mode=job`: the request is queued and answered with 202 and a job ID.
+Clients then poll `GET /jobs/{job_id}` or attach to
+`GET /jobs/{job_id}/stream` (SSE) until the job finishes.
+"""
+
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+from src.middleware.teams_auth import require_auth
+from src.application.di import get_container
+from src.application.api.sse import sse_response
+from src.domain.models import StreamEvent
+from src.domain.models.job_models import JobType
+from src.domain.services.job_service import JobQueueFullError, JobRunner
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+JOBS_PATH = "/api/v1/jobs"
+
+# Shared `mode` query parameter for endpoints that support job mode
+ModeQuery = Query(
+    "sync",
+    pattern="^(sync|job)$",
+    description="'sync' waits for the answer; 'job' queues it and returns 202 with a job ID",
+)
+
+
+# =============================================================================
+# Response Models
+# =============================================================================
+
+
+class JobAcceptedResponse(BaseModel):
+    """Response for a request accepted in job mode."""
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="Initial job status (queued)")
+    status_url: str = Field(..., description="Poll this URL for status and result")
+    stream_url: str = Field(..., description="SSE stream of status changes")
+
+
+class JobResponse(BaseModel):
+    """Job status and, once finished, its result or error."""
+    job_id: str
+    job_type: str
+    status: str
+    result: Optional[dict] = None
+    progress: Optional[dict] = None
+    error: Optional[str] = None
+    timeout_seconds: Optional[float] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+# =============================================================================
+# Helpers for job-mode endpoints
+# =============================================================================
+
+
+async def submit_job(
+    job_type: JobType,
+    user_id: str,
+    runner: JobRunner,
+    payload: Optional[Dict[str, Any]] = None,
+) -> JSONResponse:
+    """
+    Queue a job and build the 202 Accepted response.
+
+    Raises:
+        HTTPException 503: The job queue is full
+    """
+    job_service = await get_container().get_job_service()
+    try:
+        job = await job_service.submit(job_type, user_id, runner, payload=payload)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+    status_url = f"{JOBS_PATH}/{job.job_id}"
+    accepted = JobAcceptedResponse(
+        job_id=job.job_id,
+        status=job.status.value,
+        status_url=status_url,
+        stream_url=f"{status_url}/stream",
+    )
+    return JSONResponse(
+        status_code=202,
+        content=accepted.model_dump(),
+        headers={"Location": status_url},
+    )
+
+
+# =============================================================================
+# Endpoints
+# =============================================================================
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    user: dict = Depends(require_auth),
+):
+    """
+    Get a background job's status and result.
+
+    **Authentication:** Required JWT token (only the job owner can read it)
+
+    **Statuses:** queued, running, succeeded, failed, timed_out.
+    `result` holds the same body the synchronous endpoint would have
+    returned once the job succeeded.
+    """
+    job_service = await get_container().get_job_service()
+    job = await job_service.get_job(job_id, user["user_id"])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job.to_dict())
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(
+    job_id: str,
+    http_request: Request,
+    user: dict = Depends(require_auth),
+):
+    """
+    Attach to a background job via Server-Sent Events.
+
+    **Authentication:** Required JWT token (only the job owner can read it)
+
+    **Response:** `data: {"job": {...}}` on every status or progress change (the final
+    one includes the result or error), then `data: [DONE]`.
+    """
+    user_id = user["user_id"]
+    job_service = await get_container().get_job_service()
+    if await job_service.get_job(job_id, user_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def job_events() -> AsyncIterator[StreamEvent]:
+        async for job in job_service.watch(job_id, user_id):
+            yield StreamEvent(event_type="job", data=job.to_dict())
+        yield StreamEvent(event_type="done", data=None)
+
+    return sse_response(job_events(), request=http_request)
@@ -5,8 +5,12 @@ from pydantic import BaseModel
 from typing import Optional
 
 from src.application.di import get_container
+from src.application.api.job_routes import ModeQuery, submit_job
 from src.middleware.rbac import require_permission
+from src.middleware.idempotency import Idempotency, idempotency
 from src.domain.models.rbac_models import UserRBAC
+from src.domain.models.job_models import JobType
+from src.domain.services.agent_service import AgentService, AGENT_INVOKE_TIMEOUT_SECONDS
 
 
 router = APIRouter()
@@ -47,7 +51,9 @@ async def health_check():
 @router.post("/invoke", response_model=InvokeResponse)
 async def invoke_agent(
     request: InvokeRequest,
-    user: UserRBAC = Depends(require_permission("agents:invoke"))
+    mode: str = ModeQuery,
+    user: UserRBAC = Depends(require_permission("agents:invoke")),
+    idem: Idempotency = Depends(idempotency),
 ):
     """
     Invoke an agent with a prompt.
@@ -55,6 +61,12 @@ async def invoke_agent(
     Sessions are ALWAYS persisted to database for conversation history.
     Either agent_id or agent_name must be provided.
 
+    With `?mode=job` the invocation runs in the background: the response is
+    202 with a job ID to poll at `/jobs/{job_id}` (no 60-second limit).
+
+    Send an `Idempotency-Key` header to make retries safe: a retry with the
+    same key returns the first response instead of invoking the agent again.
+
     **Authorization:** Requires agents:invoke permission
     """
     if not request.agent_id and not request.agent_name:
@@ -66,38 +78,70 @@ async def invoke_agent(
     container = get_container()
     agent_service = await container.get_agent_service()
 
-    try:
-        if request.agent_id:
-            response = await agent_service.invoke_agent(
-                request.agent_id,
-                request.prompt,
-                user_id=request.user_id,
-                session_id=request.session_id
-            )
-            return InvokeResponse(
-                response=response,
-                agent_id=request.agent_id,
-                session_id=request.session_id
-            )
-        else:
-            response = await agent_service.invoke_agent_by_name(
-                request.agent_name,
-                request.prompt,
-                user_id=request.user_id,
-                session_id=request.session_id
-            )
-            return InvokeResponse(
-                response=response,
-                agent_name=request.agent_name,
-                session_id=request.session_id
+    async def run_job() -> dict:
+        response = await _invoke(agent_service, request, timeout=None)
+        return response.model_dump()
+
+    async def handle():
+        if mode == "job":
+            return await submit_job(
+                JobType.INVOKE,
+                user.user_id,
+                run_job,
+                payload={
+                    "agent_id": request.agent_id,
+                    "agent_name": request.agent_name,
+                    "session_id": request.session_id,
+                    "prompt": request.prompt[:200],
+                },
             )
+        return await _invoke(agent_service, request)
+
+    try:
+        return await idem.run(user.user_id, handle)
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error invoking agent: {str(e)}")
 
 
+async def _invoke(
+    agent_service: AgentService,
+    request: InvokeRequest,
+    timeout: Optional[float] = AGENT_INVOKE_TIMEOUT_SECONDS,
+) -> InvokeResponse:
+    """Run the invocation described by `request`."""
+    if request.agent_id:
+        response = await agent_service.invoke_agent(
+            request.agent_id,
+            request.prompt,
+            user_id=request.user_id,
+            session_id=request.session_id,
+            timeout=timeout,
+        )
+        return InvokeResponse(
+            response=response,
+            agent_id=request.agent_id,
+            session_id=request.session_id
+        )
+
+    response = await agent_service.invoke_agent_by_name(
+        request.agent_name,
+        request.prompt,
+        user_id=request.user_id,
+        session_id=request.session_id,
+        timeout=timeout,
+    )
+    return InvokeResponse(
+        response=response,
+        agent_name=request.agent_name,
+        session_id=request.session_id
+    )
+
+
 @router.get("/agents", response_model=list[AgentInfo])
 async def list_agents(
     enabled_only: bool = True,
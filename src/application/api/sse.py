@@ -0,0 +1,249 @@
+"""
+Server-Sent Events writer shared by the chat and AI editor streams.
+
+Turns an async stream of StreamEvents into SSE frames:
+- Coalesces small content chunks by size or time window
+- Encodes with orjson when available (falls back to json)
+- Sends comment heartbeats so proxies keep idle connections open
+- Detects client disconnects and cancels the upstream generator
+"""
+
+import os
+import json
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from src.domain.models import StreamEvent
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Flush buffered content once it reaches this many characters
+SSE_COALESCE_MAX_CHARS = int(os.getenv("SSE_COALESCE_MAX_CHARS", "256"))
+# ...or once the oldest buffered chunk has waited this long
+SSE_COALESCE_WINDOW_SECONDS = int(os.getenv("SSE_COALESCE_WINDOW_MS", "30")) / 1000
+# Send a comment frame after this many idle seconds (Cloud Run / nginx idle timeouts)
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Disable nginx buffering
+}
+
+HEARTBEAT_FRAME = ": ping\n\n"
+DONE_FRAME = "data: [DONE]\n\n"
+CANCELLED_FRAME = "data: [CANCELLED]\n\n"
+
+# Upstream queue bound: keeps a slow client from buffering a whole answer in memory
+_QUEUE_SIZE = 256
+_END = object()
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to compact JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_event(event_type: str, data: Any) -> str:
+    """
+    Encode an event as an SSE data frame.
+
+    Produces the same payloads as StreamEvent.to_sse() without building
+    an intermediate event object.
+    """
+    if event_type == "content":
+        return f"data: {dumps(data)}\n\n"
+    if event_type == "done":
+        return DONE_FRAME
+    if event_type == "cancelled":
+        return CANCELLED_FRAME
+    if event_type in ("diff", "session", "error", "job", "progress"):
+        return f"data: {dumps({event_type: data})}\n\n"
+    return f"data: {dumps(data)}\n\n"
+
+
+def _is_plain_content(event: StreamEvent) -> bool:
+    """True for content events that only carry text and can be merged."""
+    data = event.data
+    return (
+        event.event_type == "content"
+        and isinstance(data, dict)
+        and len(data) == 1
+        and isinstance(data.get("content"), str)
+    )
+
+
+class SSEWriter:
+    """
+    Async iterator of SSE frames for a stream of StreamEvents.
+
+    The upstream generator runs in its own task feeding a bounded queue,
+    so the writer can flush coalesced content and emit heartbeats while
+    the model is busy (e.g. during a slow tool call).
+    """
+
+    def __init__(
+        self,
+        events: AsyncIterator[StreamEvent],
+        request: Optional[Request] = None,
+        max_chars: int = SSE_COALESCE_MAX_CHARS,
+        window_seconds: float = SSE_COALESCE_WINDOW_SECONDS,
+        heartbeat_seconds: Optional[float] = SSE_HEARTBEAT_SECONDS,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            events: Upstream StreamEvent generator
+            request: Incoming request, used to detect client disconnects
+            max_chars: Flush buffered content at this size (0 disables coalescing)
+            window_seconds: Maximum time content may wait in the buffer
+            heartbeat_seconds: Idle time before a heartbeat comment is sent
+                (None disables heartbeats)
+        """
+        self.events = events
+        self.request = request
+        self.max_chars = max_chars
+        self.window_seconds = window_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+
+    def __aiter__(self):
+        return self._frames()
+
+    async def _pump(self, queue: asyncio.Queue) -> None:
+        """Drain the upstream generator into the queue."""
+        try:
+            async for event in self.events:
+                await queue.put(event)
+            await queue.put(_END)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            aclose = getattr(self.events, "aclose", None)
+            if aclose is not None:
+                try:
+                    await aclose()
+                except Exception:
+                    pass
+
+    async def _client_gone(self) -> bool:
+        """Check whether the client closed the connection."""
+        if self.request is None:
+            return False
+        try:
+            return await self.request.is_disconnected()
+        except Exception:
+            return False
+
+    async def _frames(self) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        pump = asyncio.create_task(self._pump(queue))
+
+        buffer: list[str] = []
+        buffered_chars = 0
+        flush_at: Optional[float] = None
+        last_write = loop.time()
+
+        def take_buffer() -> str:
+            nonlocal buffered_chars, flush_at
+            frame = encode_event("content", {"content": "".join(buffer)})
+            buffer.clear()
+            buffered_chars = 0
+            flush_at = None
+            return frame
+
+        try:
+            while True:
+                if not queue.empty():
+                    item = queue.get_nowait()
+                else:
+                    now = loop.time()
+                    deadline = None
+                    if self.heartbeat_seconds is not None:
+                        deadline = last_write + self.heartbeat_seconds
+                    if flush_at is not None:
+                        deadline = flush_at if deadline is None else min(deadline, flush_at)
+                    timeout = None if deadline is None else max(deadline - now, 0)
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        now = loop.time()
+                        if flush_at is not None and now >= flush_at:
+                            yield take_buffer()
+                            last_write = now
+                        elif (
+                            self.heartbeat_seconds is not None
+                            and now >= last_write + self.heartbeat_seconds
+                        ):
+                            if await self._client_gone():
+                                logger.info("SSE client disconnected, cancelling upstream stream")
+                                return
+                            yield HEARTBEAT_FRAME
+                            last_write = now
+                        continue
+
+                if item is _END:
+                    if buffer:
+                        yield take_buffer()
+                    return
+
+                if isinstance(item, Exception):
+                    logger.error(f"SSE upstream error: {item}", exc_info=item)
+                    if buffer:
+                        yield take_buffer()
+                    yield encode_event("error", {"message": str(item)})
+                    return
+
+                if self.max_chars > 0 and _is_plain_content(item):
+                    text = item.data["content"]
+                    buffer.append(text)
+                    buffered_chars += len(text)
+                    if buffered_chars >= self.max_chars:
+                        yield take_buffer()
+                        last_write = loop.time()
+                    elif flush_at is None:
+                        flush_at = loop.time() + self.window_seconds
+                    continue
+
+                if buffer:
+                    yield take_buffer()
+                yield encode_event(item.event_type, item.data)
+                last_write = loop.time()
+
+        except asyncio.CancelledError:
+            # Client disconnected - this is normal, don't log as error
+            logger.info("SSE stream cancelled by client")
+            raise
+        finally:
+            if not pump.done():
+                pump.cancel()
+                try:
+                    await pump
+                except BaseException:
+                    pass
+
+
+def sse_response(
+    events: AsyncIterator[StreamEvent],
+    request: Optional[Request] = None,
+) -> StreamingResponse:
+    """Build a StreamingResponse that serves the events as SSE."""
+    return StreamingResponse(
+        SSEWriter(events, request=request),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
@@ -0,0 +1,398 @@
+"""
+Registry of in-flight SSE streams for Last-Event-ID resumption.
+
+Each stream's generation runs in a background producer task that writes
+coalesced SSE frames into a bounded ring buffer. HTTP responses are
+subscribers reading from that buffer, so a client that drops the
+connection mid-answer can reconnect with `Last-Event-ID` and receive the
+frames it missed while the same generation keeps running.
+
+Event IDs have the form `{stream_id}:{seq}`. Streams are process-local:
+on Cloud Run, reconnects must reach the same instance (session affinity).
+"""
+
+import os
+import uuid
+import asyncio
+import logging
+from collections import deque
+from itertools import islice
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from src.domain.models import StreamEvent
+from src.application.api.sse import (
+    SSEWriter,
+    SSE_HEADERS,
+    SSE_HEARTBEAT_SECONDS,
+    HEARTBEAT_FRAME,
+    encode_event,
+)
+
+logger = logging.getLogger(__name__)
+
+# Frames kept per stream (oldest are dropped first)
+RESUME_BUFFER_FRAMES = int(os.getenv("RESUME_BUFFER_FRAMES", "2000"))
+# Cap on buffered frame bytes across all streams in this process
+RESUME_MAX_TOTAL_BYTES = int(os.getenv("RESUME_MAX_TOTAL_MB", "32")) * 1024 * 1024
+# How long a finished stream stays replayable
+RESUME_RETENTION_SECONDS = float(os.getenv("RESUME_RETENTION_SECONDS", "60"))
+# How long a running stream with no subscribers waits for a reconnect before cancelling
+RESUME_GRACE_SECONDS = float(os.getenv("RESUME_GRACE_SECONDS", "30"))
+
+
+class BufferedStream:
+    """A single in-flight generation and its ring buffer of emitted frames."""
+
+    def __init__(self, stream_id: str, owner: str, max_frames: int):
+        self.stream_id = stream_id
+        self.owner = owner
+        self.frames: deque[Tuple[int, str]] = deque(maxlen=max_frames)
+        self.buffered_bytes = 0
+        self.last_seq = 0
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self.error_frame: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self.cursors: dict[object, int] = {}
+        self._changed = asyncio.Event()
+        self._grace_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def subscribers(self) -> int:
+        """Number of attached subscribers."""
+        return len(self.cursors)
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest frame still buffered."""
+        return self.frames[0][0] if self.frames else self.last_seq + 1
+
+    def append(self, frame: str) -> int:
+        """Append a frame and wake subscribers. Returns bytes released by the ring."""
+        released = 0
+        if len(self.frames) == self.frames.maxlen:
+            released = len(self.frames[0][1])
+        self.last_seq += 1
+        self.frames.append((self.last_seq, frame))
+        self.buffered_bytes += len(frame) - released
+        self._notify()
+        return released
+
+    def release_read(self) -> int:
+        """
+        Drop the frames every attached subscriber has already received.
+
+        Without subscribers nothing is released: a reconnecting client may
+        still need any buffered frame. Returns bytes released.
+        """
+        if not self.cursors:
+            return 0
+        read_up_to = min(self.cursors.values())
+        released = 0
+        while self.frames and self.frames[0][0] <= read_up_to:
+            released += len(self.frames.popleft()[1])
+        self.buffered_bytes -= released
+        return released
+
+    def abort(self, error_frame: str) -> int:
+        """
+        Drop all buffered frames and end the stream for its subscribers with
+        `error_frame`. Returns bytes released.
+        """
+        released = self.buffered_bytes
+        self.frames.clear()
+        self.buffered_bytes = 0
+        self.error_frame = error_frame
+        self._notify()
+        return released
+
+    def frames_after(self, seq: int) -> Optional[list[Tuple[int, str]]]:
+        """
+        Frames with sequence numbers greater than `seq`.
+
+        Returns None if some of those frames were already evicted.
+        """
+        if seq + 1 < self.first_seq:
+            return None
+        return list(islice(self.frames, seq + 1 - self.first_seq, None))
+
+    def finish(self, now: float) -> None:
+        """Mark the generation as finished."""
+        self.done = True
+        self.finished_at = now
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class StreamRegistry:
+    """
+    Process-wide registry of resumable streams.
+
+    Buffers are bounded per stream (frame count) and in total (bytes).
+    When the total cap is exceeded, finished streams nobody is reading are
+    evicted first, then frames every subscriber has already received are
+    released. Frames a subscriber has not read yet are never dropped
+    silently: if the cap still holds, the largest stream is aborted and
+    its subscribers receive a `buffer_overflow` error event.
+    """
+
+    def __init__(
+        self,
+        max_frames_per_stream: int = RESUME_BUFFER_FRAMES,
+        max_total_bytes: int = RESUME_MAX_TOTAL_BYTES,
+        retention_seconds: float = RESUME_RETENTION_SECONDS,
+        grace_seconds: float = RESUME_GRACE_SECONDS,
+        heartbeat_seconds: float = SSE_HEARTBEAT_SECONDS,
+    ):
+        self.max_frames_per_stream = max_frames_per_stream
+        self.max_total_bytes = max_total_bytes
+        self.retention_seconds = retention_seconds
+        self.grace_seconds = grace_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self._streams: dict[str, BufferedStream] = {}
+        self._total_bytes = 0
+
+    # -------------------------------------------------------------------------
+    # Producer side
+    # -------------------------------------------------------------------------
+
+    def start(self, owner: str, events: AsyncIterator[StreamEvent]) -> BufferedStream:
+        """
+        Start a generation in the background and register its buffer.
+
+        Args:
+            owner: User ID allowed to attach to this stream
+            events: Upstream StreamEvent generator
+
+        Returns:
+            The registered BufferedStream
+        """
+        stream = BufferedStream(
+            stream_id=uuid.uuid4().hex,
+            owner=owner,
+            max_frames=self.max_frames_per_stream,
+        )
+        self._streams[stream.stream_id] = stream
+        stream.task = asyncio.create_task(self._produce(stream, events))
+        logger.info(f"📡 Started resumable stream {stream.stream_id[:12]} ({len(self._streams)} active)")
+        return stream
+
+    async def _produce(self, stream: BufferedStream, events: AsyncIterator[StreamEvent]) -> None:
+        """Run the generation, buffering every coalesced frame."""
+        loop = asyncio.get_running_loop()
+        try:
+            async for frame in SSEWriter(events, heartbeat_seconds=None):
+                released = stream.append(frame)
+                self._total_bytes += len(frame) - released
+                if self._total_bytes > self.max_total_bytes:
+                    self._enforce_memory_cap()
+        except asyncio.CancelledError:
+            logger.info(f"Stream {stream.stream_id[:12]} cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Stream {stream.stream_id[:12]} producer error: {e}", exc_info=True)
+            frame = encode_event("error", {"message": str(e)})
+            self._total_bytes += len(frame) - stream.append(frame)
+        finally:
+            stream.finish(loop.time())
+            loop.call_later(self.retention_seconds, self._evict, stream.stream_id)
+
+    def _enforce_memory_cap(self) -> None:
+        """Evict buffered frames until the registry is under its byte cap."""
+        finished = sorted(
+            (s for s in self._streams.values() if s.done and not s.subscribers),
+            key=lambda s: s.finished_at or 0.0,
+        )
+        for stream in finished:
+            if self._total_bytes <= self.max_total_bytes:
+                return
+            self._evict(stream.stream_id)
+
+        for stream in self._streams.values():
+            if self._total_bytes <= self.max_total_bytes:
+                return
+            self._total_bytes -= stream.release_read()
+
+        while self._total_bytes > self.max_total_bytes:
+            largest = max(self._streams.values(), key=lambda s: s.buffered_bytes, default=None)
+            if largest is None or not largest.frames:
+                return
+            logger.warning(
+                f"⚠️ Stream buffers over {self.max_total_bytes} bytes, "
+                f"aborting stream {largest.stream_id[:12]} ({largest.buffered_bytes} bytes unread)"
+            )
+            self._total_bytes -= largest.abort(encode_event("error", {
+                "message": "The response outgrew the server's stream buffer; resend the message",
+                "code": "buffer_overflow",
+            }))
+            if largest.task and not largest.task.done():
+                largest.task.cancel()
+
+    def _evict(self, stream_id: str) -> None:
+        """Remove a stream and release its buffer."""
+        stream = self._streams.pop(stream_id, None)
+        if stream is None:
+            return
+        self._total_bytes -= stream.buffered_bytes
+        stream.frames.clear()
+        stream.buffered_bytes = 0
+        if stream.task and not stream.task.done():
+            stream.task.cancel()
+        logger.debug(f"Evicted stream {stream_id[:12]}")
+
+    # -------------------------------------------------------------------------
+    # Subscriber side
+    # -------------------------------------------------------------------------
+
+    def resolve(self, last_event_id: str, owner: str) -> Tuple[Optional[BufferedStream], int]:
+        """
+        Find the stream referenced by a Last-Event-ID header.
+
+        Returns:
+            (stream, last_seen_seq), or (None, 0) if unknown, expired or not owned
+        """
+        stream_id, _, seq = last_event_id.strip().partition(":")
+        stream = self._streams.get(stream_id)
+        if stream is None or stream.owner != owner:
+            return None, 0
+        try:
+            return stream, max(int(seq), 0)
+        except ValueError:
+            return stream, 0
+
+    async def subscribe(
+        self,
+        stream: BufferedStream,
+        after_seq: int = 0,
+        request: Optional[Request] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield buffered and live frames after `after_seq`, tagged with event IDs.
+
+        Sends heartbeats while the generation is idle. When the last
+        subscriber leaves a running stream, the generation gets a grace
+        period to be re-attached before it is cancelled.
+        """
+        token = object()
+        stream.cursors[token] = after_seq
+        if stream._grace_handle is not None:
+            stream._grace_handle.cancel()
+            stream._grace_handle = None
+
+        cursor = after_seq
+        try:
+            while True:
+                changed = stream._changed
+                if stream.error_frame is not None:
+                    yield stream.error_frame
+                    return
+                frames = stream.frames_after(cursor)
+                if frames is None:
+                    yield encode_event("error", {
+                        "message": "Missed events are no longer available; resend the message",
+                        "code": "replay_unavailable",
+                    })
+                    return
+                for seq, frame in frames:
+                    if stream.error_frame is not None:
+                        break
+                    yield f"id: {stream.stream_id}:{seq}\n{frame}"
+                    cursor = stream.cursors[token] = seq
+                if stream.done and cursor >= stream.last_seq:
+                    return
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    if request is not None and await request.is_disconnected():
+                        return
+                    yield HEARTBEAT_FRAME
+        finally:
+            del stream.cursors[token]
+            if stream.subscribers == 0 and not stream.done and stream.stream_id in self._streams:
+                loop = asyncio.get_running_loop()
+                stream._grace_handle = loop.call_later(
+                    self.grace_seconds, self._cancel_orphan, stream.stream_id
+                )
+
+    def _cancel_orphan(self, stream_id: str) -> None:
+        """Cancel a running stream nobody re-attached to."""
+        stream = self._streams.get(stream_id)
+        if stream and stream.subscribers == 0 and stream.task and not stream.task.done():
+            logger.info(f"No reconnect for stream {stream_id[:12]}, cancelling generation")
+            stream.task.cancel()
+
+    def response(
+        self,
+        stream: BufferedStream,
+        after_seq: int = 0,
+        request: Optional[Request] = None,
+    ) -> StreamingResponse:
+        """Build the SSE response for a subscriber of `stream`."""
+        return StreamingResponse(
+            self.subscribe(stream, after_seq, request),
+            media_type="text/event-stream",
+            headers={**SSE_HEADERS, "X-Stream-Id": stream.stream_id},
+        )
+
+    def resume_response(self, request: Request, owner: str) -> Optional[StreamingResponse]:
+        """
+        Re-attach to an in-flight stream if the request carries Last-Event-ID.
+
+        Returns:
+            The replay response, or None if the request is not a reconnect
+
+        Raises:
+            HTTPException 410: The stream finished long ago, was evicted,
+                or belongs to another user
+        """
+        last_event_id = request.headers.get("last-event-id")
+        if not last_event_id:
+            return None
+
+        stream, after_seq = self.resolve(last_event_id, owner)
+        if stream is None:
+            raise HTTPException(
+                status_code=410,
+                detail="Stream is no longer available. Send the message again without Last-Event-ID.",
+            )
+
+        logger.info(f"🔁 Resuming stream {stream.stream_id[:12]} after event {after_seq}")
+        return self.response(stream, after_seq, request)
+
+    async def close(self) -> None:
+        """Cancel all running generations (application shutdown)."""
+        for stream_id in list(self._streams):
+            self._evict(stream_id)
+
+    def stats(self) -> dict:
+        """Current buffer usage."""
+        return {
+            "streams": len(self._streams),
+            "running": sum(1 for s in self._streams.values() if not s.done),
+            "buffered_bytes": self._total_bytes,
+        }
+
+
+_stream_registry: Optional[StreamRegistry] = None
+
+
+def get_stream_registry() -> StreamRegistry:
+    """Get or create the stream registry singleton."""
+    global _stream_registry
+    if _stream_registry is None:
+        _stream_registry = StreamRegistry()
+    return _stream_registry
+
+
+async def close_stream_registry() -> None:
+    """Cancel in-flight streams and drop the registry."""
+    global _stream_registry
+    if _stream_registry is not None:
+        await _stream_registry.close()
+        _stream_registry = None
@@ -9,25 +9,23 @@ Provides endpoints for:
 """
 
 import os
-import json
 import uuid
 import logging
 from typing import Optional, List
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel, Field
 
 from src.middleware.teams_auth import require_auth
 from src.application.di import get_container
+from src.application.api.stream_registry import get_stream_registry
 from src.domain.models import (
     DocumentContext,
     AttachmentInfo,
     EditorDocument,
-    StreamEvent,
 )
 from src.domain.services.text_editor_service import TextEditorService
-from src.services.storage_service import StorageService
+from src.domain.ports.document_storage import DocumentStorage
 from src.services.diff_generator import DiffGenerator
 
 logger = logging.getLogger(__name__)
@@ -35,7 +33,6 @@ router = APIRouter()
 
 # Lazy service initialization
 _text_editor_service: Optional[TextEditorService] = None
-_storage_service: Optional[StorageService] = None
 
 # Supported upload types for text editor
 SUPPORTED_UPLOAD_TYPES = {
@@ -51,12 +48,9 @@ SUPPORTED_UPLOAD_TYPES = {
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
 
 
-def get_storage_service() -> StorageService:
-    """Get or create storage service singleton."""
-    global _storage_service
-    if _storage_service is None:
-        _storage_service = StorageService()
-    return _storage_service
+def get_document_storage() -> DocumentStorage:
+    """The container's document storage."""
+    return get_container().get_document_storage()
 
 
 async def get_text_editor_service() -> TextEditorService:
@@ -65,11 +59,14 @@ async def get_text_editor_service() -> TextEditorService:
     if _text_editor_service is None:
         container = get_container()
         agent_service = await container.get_agent_service()
-        storage = get_storage_service()
+        storage = get_document_storage()
         _text_editor_service = TextEditorService(
             agent_service=agent_service,
             storage_service=storage,
-            diff_generator=DiffGenerator()
+            diff_generator=DiffGenerator(),
+            model_files=await container.get_model_file_cache(),
+            text_extractor=container.get_text_extractor(),
+            image_normalizer=container.get_image_normalizer(),
         )
     return _text_editor_service
 
@@ -217,23 +214,6 @@ def _request_to_attachment_info(att: AttachmentInfoRequest) -> AttachmentInfo:
     )
 
 
-async def _sse_generator(events):
-    """
-    Async generator that formats StreamEvents as SSE data.
-
-    SSE Format:
-    - data: {"content": "..."} for content chunks
-    - data: {"diff": {...}} for diff suggestions
-    - data: [DONE] for completion
-    """
-    try:
-        async for event in events:
-            yield event.to_sse()
-    except Exception as e:
-        logger.error(f"SSE generator error: {e}")
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
-
-
 # =============================================================================
 # Stream Endpoint (PRIMARY)
 # =============================================================================
@@ -242,6 +222,7 @@ async def _sse_generator(events):
 @router.post("/ai-editor/stream")
 async def stream_ai_editor(
     request: StreamRequest,
+    http_request: Request,
     user: dict = Depends(require_auth),
 ):
     """
@@ -253,6 +234,7 @@ async def stream_ai_editor(
     - Content chunks: `data: {"content": "..."}`
     - Diff suggestions: `data: {"diff": {"id": "...", "type": "...", ...}}`
     - Completion: `data: [DONE]`
+    - Heartbeats: `: ping` comment lines while the agent is busy (ignore them)
 
     **Client Usage:**
     ```javascript
@@ -273,9 +255,20 @@ async def stream_ai_editor(
     ```
 
     **Cancellation:** Client can abort using AbortController.
+
+    **Resuming:** Every frame carries an SSE `id:` (`{stream_id}:{seq}`). If the
+    connection drops, repeat the same request with a `Last-Event-ID` header set
+    to the last id received: the still-running generation is re-attached and
+    missed frames are replayed. Returns 410 if the stream is no longer buffered.
     """
     try:
         user_id = user["user_id"]
+        registry = get_stream_registry()
+
+        resumed = registry.resume_response(http_request, owner=user_id)
+        if resumed is not None:
+            return resumed
+
         logger.info(f"Stream request from user {user_id}: {request.message[:50]}...")
 
         service = await get_text_editor_service()
@@ -293,16 +286,11 @@ async def stream_ai_editor(
             session_id=request.sessionId,
         )
 
-        return StreamingResponse(
-            _sse_generator(event_stream),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Disable nginx buffering
-            }
-        )
+        stream = registry.start(owner=user_id, events=event_stream)
+        return registry.response(stream, request=http_request)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Stream endpoint error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -342,8 +330,8 @@ async def upload_file(
                        f"Supported: {list(SUPPORTED_UPLOAD_TYPES.keys())}"
             )
 
-        storage = get_storage_service()
-        result = storage.generate_presigned_upload_url(
+        storage = get_document_storage()
+        result = await storage.generate_presigned_upload_url(
             user_id=user_id,
             filename=request.filename,
             content_type=request.contentType,
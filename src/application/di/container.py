@@ -8,25 +8,50 @@ from urllib.parse import quote_plus
 
 from google.adk.sessions import DatabaseSessionService
 
+from src.domain.models import VectorDBType
 from src.domain.ports import AgentRepository, CorpusRepository, TextEditorRepository
 from src.domain.ports.group_mapping_repository import GroupMappingRepository
 from src.domain.ports.policy_repository import PolicyRepository
 from src.domain.ports.rbac_repository import RBACRepository
+from src.domain.ports.job_repository import JobRepository
+from src.domain.ports.source_metadata_repository import SourceMetadataRepository
+from src.domain.ports.ingestion_state_repository import IngestionStateRepository
+from src.domain.ports.model_file_repository import ModelFileRepository
+from src.domain.ports.upload_index_repository import UploadIndexRepository
 from src.domain.services import AgentService
 from src.domain.services.policy_service import PolicyService
 from src.domain.services.policy_generation_service import PolicyGenerationService
 from src.domain.services.questionnaire_service import QuestionnaireService
 from src.domain.services.streaming_chat_service import StreamingChatService
+from src.domain.services.job_service import JobService
+from src.domain.services.ingestion_service import IngestionService
 from src.infrastructure.adapters.postgres import (
     PostgresAgentRepository,
     PostgresCorpusRepository,
     PostgresGroupMappingRepository,
+    PostgresIngestionStateRepository,
+    PostgresModelFileRepository,
+    PostgresSourceMetadataRepository,
     PostgresTextEditorRepository,
+    PostgresUploadIndexRepository,
 )
 from src.infrastructure.adapters.postgres.postgres_policy_repository import PostgresPolicyRepository
 from src.infrastructure.adapters.postgres.postgres_rbac_repository import PostgresRBACRepository
+from src.infrastructure.adapters.postgres.postgres_job_repository import PostgresJobRepository
+from src.infrastructure.adapters.memory import (
+    InMemoryIngestionStateRepository,
+    InMemoryJobRepository,
+    InMemoryModelFileRepository,
+    InMemoryUploadIndexRepository,
+)
 from src.infrastructure.tools import ToolRegistry
-from src.services.storage_service import StorageService
+from src.infrastructure.tools.rag_clients import RAGClients
+from src.infrastructure.tools.retrieval_cache import get_retrieval_cache
+from src.infrastructure.tools.metadata_cache import METADATA_CACHE_PERSIST, get_metadata_cache
+from src.domain.ports.document_storage import DocumentStorage
+from src.infrastructure.storage import create_document_storage
+from src.infrastructure.model_files import ModelFileCache, create_model_file_store
+from src.infrastructure.extraction import EXTRACTION_ENABLED, IMAGE_NORMALIZE_ENABLED, ImageNormalizer, TextExtractor
 
 logger = logging.getLogger(__name__)
 
@@ -46,11 +71,12 @@ class Container:
         self._group_mapping_repository: Optional[GroupMappingRepository] = None
         self._text_editor_repository: Optional[TextEditorRepository] = None
         self._tool_registry: Optional[ToolRegistry] = None
+        self._rag_clients: Optional[RAGClients] = None
         self._agent_service: Optional[AgentService] = None
         self._session_service: Optional[DatabaseSessionService] = None
         # Policy system services
         self._policy_repository = None
-        self._storage_service = None
+        self._document_storage: Optional[DocumentStorage] = None
         self._policy_service = None
         self._policy_generation_service = None
         self._questionnaire_service = None
@@ -59,6 +85,23 @@ class Container:
         self._shared_db_pool: Optional[asyncpg.Pool] = None
         # RBAC system
         self._rbac_repository: Optional[RBACRepository] = None
+        # Background jobs
+        self._job_repository: Optional[JobRepository] = None
+        self._job_service: Optional[JobService] = None
+        # RAG source-metadata cache (persistent tier)
+        self._source_metadata_repository: Optional[SourceMetadataRepository] = None
+        # Corpus ingestion
+        self._ingestion_state_repository: Optional[IngestionStateRepository] = None
+        self._ingestion_service: Optional[IngestionService] = None
+        # Upload-once model file references for attachments
+        self._model_file_repository: Optional[ModelFileRepository] = None
+        self._model_file_cache: Optional[ModelFileCache] = None
+        self._model_file_cache_ready = False
+        # Local text extraction for attachments
+        self._text_extractor: Optional[TextExtractor] = None
+        self._image_normalizer: Optional[ImageNormalizer] = None
+        # Content-addressed index of confirmed uploads
+        self._upload_index_repository: Optional[UploadIndexRepository] = None
 
     async def init_repository(self) -> AgentRepository:
         """
@@ -133,6 +176,22 @@ class Container:
 
         return self._rbac_repository
 
+    async def init_source_metadata_repository(self) -> SourceMetadataRepository:
+        """
+        Initialize and return the source-metadata cache repository.
+
+        Uses the shared database pool.
+
+        Returns:
+            SourceMetadataRepository instance
+        """
+        if self._source_metadata_repository is None:
+            pool = await self._get_shared_db_pool()
+            self._source_metadata_repository = PostgresSourceMetadataRepository(pool)
+            logger.info("✅ PostgresSourceMetadataRepository initialized (shared pool)")
+
+        return self._source_metadata_repository
+
     async def get_text_editor_repository(self) -> TextEditorRepository:
         """
         Initialize and return the text editor repository.
@@ -168,11 +227,25 @@ class Container:
             ToolRegistry instance
         """
         if self._tool_registry is None:
-            self._tool_registry = ToolRegistry()
+            self._tool_registry = ToolRegistry(rag_clients=self.get_rag_clients())
             logger.info("✅ ToolRegistry initialized")
 
         return self._tool_registry
 
+    def get_rag_clients(self) -> RAGClients:
+        """
+        Get the clients shared by all RAG tools (Vertex AI, GCS, Graph, query executor).
+
+        Returns:
+            RAGClients instance
+        """
+        if self._rag_clients is None:
+            self._rag_clients = RAGClients(db_pool_provider=self._get_shared_db_pool)
+            self._rag_clients.ensure_vertexai()
+            logger.info("✅ RAGClients initialized")
+
+        return self._rag_clients
+
     def get_session_service(self) -> DatabaseSessionService:
         """
         Get the session service - ALWAYS use DatabaseSessionService for persistence.
@@ -241,6 +314,17 @@ class Container:
             )
             logger.info("✅ AgentService initialized")
 
+            # Cached RAG results are dropped when their corpus changes in the database
+            retrieval_cache = get_retrieval_cache()
+            if retrieval_cache is not None:
+                corpus_repository = await self.init_corpus_repository()
+                retrieval_cache.set_version_source(corpus_repository.get_corpus_versions)
+
+            # New instances start with the source metadata other instances fetched
+            metadata_cache = get_metadata_cache()
+            if metadata_cache is not None and METADATA_CACHE_PERSIST:
+                metadata_cache.set_store(await self.init_source_metadata_repository())
+
         return self._agent_service
 
     # ============================================
@@ -263,18 +347,106 @@ class Container:
 
         return self._policy_repository
 
-    def get_storage_service(self) -> StorageService:
+    def get_document_storage(self) -> DocumentStorage:
+        """
+        Get or create the document storage singleton (STORAGE_BACKEND).
+
+        Confirmed uploads are deduplicated through the upload index, which
+        is initialized on the first confirm or alias lookup.
+
+        Returns:
+            DocumentStorage instance
+        """
+        if self._document_storage is None:
+            self._document_storage = create_document_storage(upload_index=self.init_upload_index_repository)
+            logger.info("✅ DocumentStorage initialized")
+
+        return self._document_storage
+
+    async def init_upload_index_repository(self) -> UploadIndexRepository:
+        """
+        Initialize and return the upload index repository.
+
+        Uses the shared database pool, or an in-memory index when
+        UPLOAD_INDEX=memory (local development with STORAGE_BACKEND=fake).
+
+        Returns:
+            UploadIndexRepository instance
+        """
+        if self._upload_index_repository is None:
+            if os.getenv("UPLOAD_INDEX", "postgres").lower() == "memory":
+                self._upload_index_repository = InMemoryUploadIndexRepository()
+                logger.info("✅ InMemoryUploadIndexRepository initialized")
+            else:
+                pool = await self._get_shared_db_pool()
+                self._upload_index_repository = PostgresUploadIndexRepository(pool)
+                logger.info("✅ PostgresUploadIndexRepository initialized (shared pool)")
+
+        return self._upload_index_repository
+
+    async def init_model_file_repository(self) -> ModelFileRepository:
+        """
+        Initialize and return the model file repository.
+
+        Uses the shared database pool, or an in-memory store when
+        MODEL_FILES_INDEX=memory (local development without a database).
+
+        Returns:
+            ModelFileRepository instance
+        """
+        if self._model_file_repository is None:
+            if os.getenv("MODEL_FILES_INDEX", "postgres").lower() == "memory":
+                self._model_file_repository = InMemoryModelFileRepository()
+                logger.info("✅ InMemoryModelFileRepository initialized")
+            else:
+                pool = await self._get_shared_db_pool()
+                self._model_file_repository = PostgresModelFileRepository(pool)
+                logger.info("✅ PostgresModelFileRepository initialized (shared pool)")
+
+        return self._model_file_repository
+
+    async def get_model_file_cache(self) -> Optional[ModelFileCache]:
+        """
+        Get the upload-once model file references for attachments (MODEL_FILES_BACKEND).
+
+        Returns:
+            ModelFileCache instance, or None when MODEL_FILES_BACKEND=off
+        """
+        if not self._model_file_cache_ready:
+            store = create_model_file_store(self.get_document_storage())
+            if store is not None:
+                repository = await self.init_model_file_repository()
+                self._model_file_cache = ModelFileCache(store, repository)
+                logger.info(f"✅ ModelFileCache initialized (store: {store.name})")
+            self._model_file_cache_ready = True
+
+        return self._model_file_cache
+
+    def get_text_extractor(self) -> Optional[TextExtractor]:
+        """
+        Get the attachment text extractor singleton (process pool started on first use).
+
+        Returns:
+            TextExtractor instance, or None when EXTRACTION_ENABLED=false
+        """
+        if self._text_extractor is None and EXTRACTION_ENABLED:
+            self._text_extractor = TextExtractor()
+            logger.info("✅ TextExtractor initialized")
+
+        return self._text_extractor
+
+    def get_image_normalizer(self) -> Optional[ImageNormalizer]:
         """
-        Get or create storage service singleton.
+        Get the image attachment normalizer singleton.
 
         Returns:
-            StorageService instance
+            ImageNormalizer instance, or None when IMAGE_NORMALIZE_ENABLED=false
         """
-        if self._storage_service is None:
-            self._storage_service = StorageService()
-            logger.info("✅ StorageService initialized")
+        if self._image_normalizer is None and IMAGE_NORMALIZE_ENABLED:
+            self._image_normalizer = ImageNormalizer()
+            logger.info("✅ ImageNormalizer initialized")
 
-        return self._storage_service
+        return self._image_normalizer
 
     async def get_policy_service(self) -> PolicyService:
         """
@@ -285,7 +457,7 @@ class Container:
         """
         if self._policy_service is None:
             repo = await self.init_policy_repository()
-            storage = self.get_storage_service()
+            storage = self.get_document_storage()
             self._policy_service = PolicyService(repo, storage)
             logger.info("✅ PolicyService initialized")
 
@@ -300,7 +472,7 @@ class Container:
         """
         if self._policy_generation_service is None:
             repo = await self.init_policy_repository()
-            storage = self.get_storage_service()
+            storage = self.get_document_storage()
             self._policy_generation_service = PolicyGenerationService(repo, storage)
             logger.info("✅ PolicyGenerationService initialized")
 
@@ -362,17 +534,134 @@ class Container:
             StreamingChatService instance
         """
         if self._streaming_chat_service is None:
-            storage_service = self.get_storage_service()
+            storage_service = self.get_document_storage()
             db_pool = await self._get_shared_db_pool()
 
             self._streaming_chat_service = StreamingChatService(
                 storage_service=storage_service,
                 db_pool=db_pool,
+                model_files=await self.get_model_file_cache(),
+                text_extractor=self.get_text_extractor(),
+                image_normalizer=self.get_image_normalizer(),
             )
             logger.info("✅ StreamingChatService initialized")
 
         return self._streaming_chat_service
 
+    async def init_job_repository(self) -> JobRepository:
+        """
+        Initialize and return the job repository.
+
+        Uses the shared database pool, or an in-memory store when
+        JOB_STORE=memory (local development without a database).
+
+        Returns:
+            JobRepository instance
+        """
+        if self._job_repository is None:
+            if os.getenv("JOB_STORE", "postgres").lower() == "memory":
+                self._job_repository = InMemoryJobRepository()
+                logger.info("✅ InMemoryJobRepository initialized")
+            else:
+                pool = await self._get_shared_db_pool()
+                self._job_repository = PostgresJobRepository(pool)
+                logger.info("✅ PostgresJobRepository initialized (shared pool)")
+
+        return self._job_repository
+
+    async def get_job_service(self) -> JobService:
+        """
+        Get the background job service.
+
+        Returns:
+            JobService instance
+        """
+        if self._job_service is None:
+            repository = await self.init_job_repository()
+            self._job_service = JobService(repository)
+            logger.info("✅ JobService initialized")
+
+        return self._job_service
+
+    # ============================================
+    # CORPUS INGESTION
+    # ============================================
+
+    async def init_ingestion_state_repository(self) -> IngestionStateRepository:
+        """
+        Initialize and return the ingestion state repository.
+
+        Uses the shared database pool, or an in-memory store when
+        INGESTION_STATE_STORE=memory (local development without a database).
+
+        Returns:
+            IngestionStateRepository instance
+        """
+        if self._ingestion_state_repository is None:
+            if os.getenv("INGESTION_STATE_STORE", "postgres").lower() == "memory":
+                self._ingestion_state_repository = InMemoryIngestionStateRepository()
+                logger.info("✅ InMemoryIngestionStateRepository initialized")
+            else:
+                pool = await self._get_shared_db_pool()
+                self._ingestion_state_repository = PostgresIngestionStateRepository(pool)
+                logger.info("✅ PostgresIngestionStateRepository initialized (shared pool)")
+
+        return self._ingestion_state_repository
+
+    async def get_ingestion_service(self) -> IngestionService:
+        """
+        Get the corpus ingestion service.
+
+        file:// sources are only enabled with INGEST_LOCAL_SOURCES=true,
+        since they read the server's filesystem.
+
+        Returns:
+            IngestionService instance
+        """
+        if self._ingestion_service is None:
+            # Imported here: the ingestion stack pulls in numpy and the vector stores
+            from src.infrastructure.ingestion import (
+                GCSDocumentSource,
+                LocalDocumentSource,
+                create_chunk_sink,
+                extract_and_chunk,
+            )
+
+            sources = [GCSDocumentSource()]
+            if os.getenv("INGEST_LOCAL_SOURCES", "false").lower() == "true":
+                sources.append(LocalDocumentSource())
+            rag_clients = self.get_rag_clients()
+            self._ingestion_service = IngestionService(
+                corpus_repository=await self.init_corpus_repository(),
+                state_repository=await self.init_ingestion_state_repository(),
+                sources=sources,
+                sink_factory=lambda corpus: create_chunk_sink(corpus, rag_clients),
+                chunker=extract_and_chunk,
+            )
+            logger.info("✅ IngestionService initialized")
+
+        return self._ingestion_service
+
+    async def check_vector_dimensions(self) -> None:
+        """
+        Fail startup when a pgvector corpus is configured for a different
+        embedding dimension than corpus_chunks.embedding (fixed by migration 007).
+
+        Raises:
+            ValueError: A corpus's dimension does not match the column
+        """
+        corpus_repository = await self.init_corpus_repository()
+        corpuses = [
+            corpus for corpus in await corpus_repository.list_corpuses(enabled_only=False)
+            if corpus.vector_db_type == VectorDBType.PGVECTOR.value
+        ]
+        if not corpuses:
+            return
+        backend = self.get_rag_clients().local_vectors
+        for corpus in corpuses:
+            await backend.check_pg_dimension(corpus)
+        logger.info(f"✅ Embedding dimension checked for {len(corpuses)} pgvector corpus(es)")
+
     async def get_db_pool(self) -> asyncpg.Pool:
         """
         Public method to get the shared database pool.
@@ -399,6 +688,36 @@ class Container:
         if self._session_service:
             logger.info("✅ Session service cleanup (managed by ADK)")
 
+        # Stop job workers before the pool they persist through
+        if self._job_service:
+            await self._job_service.close()
+            logger.info("✅ Job workers stopped")
+
+        if self._ingestion_service:
+            await self._ingestion_service.close()
+            logger.info("✅ Ingestion process pool stopped")
+
+        if self._rag_clients:
+            await self._rag_clients.close()
+            logger.info("✅ RAG clients closed")
+
+        if self._text_extractor:
+            await self._text_extractor.close()
+            logger.info("✅ Text extraction process pool stopped")
+
+        if self._image_normalizer:
+            await self._image_normalizer.close()
+            logger.info("✅ Image normalization workers stopped")
+
+        # Pending uploads write through the document storage and the pool
+        if self._model_file_cache:
+            await self._model_file_cache.close()
+            logger.info("✅ Model file uploads finished")
+
+        if self._document_storage:
+            await self._document_storage.close()
+            logger.info("✅ Document storage closed")
+
         # Close the shared pool LAST since all repositories use it
         if self._shared_db_pool:
             await self._shared_db_pool.close()
@@ -6,6 +6,7 @@ from .agent_config import (
     AgentType,
     AreaType,
     VectorDBType,
+    LOCAL_VECTOR_DB_TYPES,
 )
 from .session_models import (
     Session,
@@ -21,6 +22,19 @@ from .text_editor_models import (
     EditorDocument,
     StreamEvent,
 )
+from .job_models import (
+    GenerationJob,
+    JobStatus,
+    JobType,
+)
+from .source_metadata import CachedSourceMetadata
+from .model_file import ModelFileRef
+from .upload_record import UploadRecord, make_content_key, md5_matches
+from .ingestion_models import (
+    SourceDocument,
+    ChunkedDocument,
+    IngestedDocument,
+)
 
 __all__ = [
     "AgentConfig",
@@ -30,6 +44,7 @@ __all__ = [
     "AgentType",
     "AreaType",
     "VectorDBType",
+    "LOCAL_VECTOR_DB_TYPES",
     "Session",
     "Message",
     "SessionStatus",
@@ -40,4 +55,15 @@ __all__ = [
     "DocumentContext",
     "EditorDocument",
     "StreamEvent",
+    "GenerationJob",
+    "JobStatus",
+    "JobType",
+    "CachedSourceMetadata",
+    "SourceDocument",
+    "ChunkedDocument",
+    "IngestedDocument",
+    "ModelFileRef",
+    "UploadRecord",
+    "make_content_key",
+    "md5_matches",
 ]
@@ -48,6 +48,12 @@ class VectorDBType(str, Enum):
     QDRANT = "qdrant"
     PINECONE = "pinecone"
     WEAVIATE = "weaviate"
+    PGVECTOR = "pgvector"
+    NUMPY = "numpy"
+
+
+# Corpus types whose vectors we store ourselves (searched without Vertex RAG)
+LOCAL_VECTOR_DB_TYPES = (VectorDBType.NUMPY.value, VectorDBType.PGVECTOR.value)
 
 
 @dataclass(frozen=True)
@@ -68,6 +74,17 @@ class ModelConfig:
             raise ValueError("max_tokens must be positive")
 
 
+def corpus_version(document_count: int, import_version: Any = None) -> str:
+    """
+    Content version token of a corpus.
+
+    Changes when documents are added or removed (document_count) or the
+    corpus is re-imported (metadata.import_version), so cached retrieval
+    results keyed by it go stale with the corpus.
+    """
+    return f"{document_count or 0}:{import_version or 0}"
+
+
 @dataclass(frozen=True)
 class CorpusConfig:
     """Configuration for a RAG corpus."""
@@ -96,6 +113,11 @@ class CorpusConfig:
         if self.chunk_overlap < 0:
             raise ValueError("chunk_overlap cannot be negative")
 
+    @property
+    def version(self) -> str:
+        """Content version token (see corpus_version)."""
+        return corpus_version(self.document_count, self.metadata.get("import_version"))
+
 
 @dataclass(frozen=True)
 class ToolConfig:
@@ -0,0 +1,52 @@
+"""Domain models for corpus ingestion."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class SourceDocument:
+    """
+    A document available for ingestion.
+
+    Attributes:
+        uri: Source URI (gs://bucket/path, file:///path)
+        fingerprint: Changes whenever the content changes (md5 or generation)
+        size: Size in bytes
+        content_type: MIME type, if known
+    """
+    uri: str
+    fingerprint: str
+    size: int = 0
+    content_type: Optional[str] = None
+
+    @property
+    def file_name(self) -> str:
+        return self.uri.rstrip("/").split("/")[-1]
+
+
+@dataclass
+class ChunkedDocument:
+    """A source document split into chunk texts, ready to be indexed."""
+    source: SourceDocument
+    chunks: list[str] = field(default_factory=list)
+
+
+@dataclass
+class IngestedDocument:
+    """
+    Ingestion state of one document in one corpus.
+
+    Attributes:
+        corpus_id: Corpus the document was indexed into
+        source_uri: Source URI
+        fingerprint: Fingerprint of the content that was indexed
+        chunk_count: Number of chunks indexed
+        ingested_at: When it was indexed
+    """
+    corpus_id: str
+    source_uri: str
+    fingerprint: str
+    chunk_count: int = 0
+    ingested_at: Optional[datetime] = None
@@ -0,0 +1,76 @@
+"""Domain models for background generation jobs."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Dict, Any
+from enum import Enum
+
+
+class JobType(str, Enum):
+    """Kinds of work that can run as a background job."""
+    INVOKE = "invoke"
+    CHAT = "chat"
+    DOCUMENT_PROCESS = "document_process"
+    CORPUS_INGEST = "corpus_ingest"
+
+
+class JobStatus(str, Enum):
+    """Job lifecycle states."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    TIMED_OUT = "timed_out"
+
+    @property
+    def is_terminal(self) -> bool:
+        """True once the job will not change anymore."""
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.TIMED_OUT)
+
+
+@dataclass
+class GenerationJob:
+    """
+    A generation request accepted by the API and executed in the background.
+
+    Attributes:
+        job_id: Unique job identifier
+        job_type: Kind of work (invoke, chat, document processing)
+        user_id: Owner of the job (only they can read it)
+        status: Current lifecycle state
+        payload: Summary of the original request (for auditing/debugging)
+        result: JSON-serializable result once succeeded
+        progress: Progress reported by the job while it runs (job-specific)
+        error: Error message once failed or timed out
+        timeout_seconds: Time limit for the job's execution
+        created_at: When the job was accepted
+        started_at: When a worker picked it up
+        finished_at: When it reached a terminal state
+    """
+    job_id: str
+    job_type: JobType
+    user_id: str
+    status: JobStatus = JobStatus.QUEUED
+    payload: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    progress: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    timeout_seconds: Optional[float] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for API responses."""
+        return {
+            "job_id": self.job_id,
+            "job_type": self.job_type.value,
+            "status": self.status.value,
+            "result": self.result,
+            "progress": self.progress,
+            "error": self.error,
+            "timeout_seconds": self.timeout_seconds,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,35 @@
+"""Domain models for attachments uploaded to the model provider's file store."""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+
+@dataclass
+class ModelFileRef:
+    """
+    A document uploaded once to a model file store, referenced by URI in prompts.
+
+    Attributes:
+        store: File store that holds it ("gcs", "gemini", "local")
+        content_hash: Hash of the content (GCS md5, base64) - the lookup key
+        file_uri: URI to reference in a file_data part
+        mime_type: MIME type it was uploaded with
+        size_bytes: Size in bytes
+        expires_at: When the store deletes it (None: kept)
+        created_at: When it was uploaded
+    """
+    store: str
+    content_hash: str
+    file_uri: str
+    mime_type: str
+    size_bytes: int = 0
+    expires_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    def usable_for(self, seconds: float) -> bool:
+        """True if the file will not expire within `seconds`."""
+        if self.expires_at is None:
+            return True
+        remaining = (self.expires_at - datetime.now(timezone.utc)).total_seconds()
+        return remaining > seconds
@@ -0,0 +1,22 @@
+"""Domain models for cached RAG source metadata."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+
+@dataclass
+class CachedSourceMetadata:
+    """
+    Metadata of a RAG source document (GCS object, SharePoint file) as last fetched.
+
+    Attributes:
+        source_uri: URI returned by the RAG engine (cache key)
+        metadata: Metadata dict as returned by SourceMetadataFetcher
+        etag: Validator of the source (GCS etag / SharePoint eTag) used to revalidate
+        fetched_at: When the metadata was last fetched or confirmed unchanged
+    """
+    source_uri: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    etag: Optional[str] = None
+    fetched_at: Optional[datetime] = None
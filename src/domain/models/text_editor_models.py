@@ -138,7 +138,7 @@ class StreamEvent:
     Used internally to structure events before
     serialization to SSE format.
     """
-    event_type: str  # "content", "diff", "error", "done", "cancelled"
+    event_type: str  # "content", "diff", "error", "done", "cancelled", "job", "progress"
     data: Any
 
     def to_sse(self) -> str:
@@ -157,5 +157,9 @@ class StreamEvent:
             return "data: [CANCELLED]\n\n"
         elif self.event_type == "error":
             return f"data: {json.dumps({'error': self.data})}\n\n"
+        elif self.event_type == "job":
+            return f"data: {json.dumps({'job': self.data})}\n\n"
+        elif self.event_type == "progress":
+            return f"data: {json.dumps({'progress': self.data})}\n\n"
         else:
             return f"data: {json.dumps(self.data)}\n\n"
@@ -0,0 +1,98 @@
+"""Domain models for the content-addressed index of uploaded documents."""
+
+import base64
+import binascii
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+def make_content_key(md5_hash: Optional[str], crc32c: Optional[str], size_bytes: Optional[int]) -> Optional[str]:
+    """
+    Content key of an object: "{md5 hex}-{crc32c hex}-{size}".
+
+    Both checksums and the size must match for two objects to be treated
+    as the same content (the crc32c part is omitted when not reported).
+
+    Args:
+        md5_hash: GCS md5 (base64)
+        crc32c: GCS crc32c (base64)
+        size_bytes: Size in bytes
+
+    Returns:
+        The key, or None without an md5 (e.g. composite objects)
+    """
+    if not md5_hash:
+        return None
+    try:
+        parts = [base64.b64decode(md5_hash).hex()]
+        if crc32c:
+            parts.append(base64.b64decode(crc32c).hex())
+    except (binascii.Error, ValueError):
+        return None
+    parts.append(str(size_bytes or 0))
+    return "-".join(parts)
+
+
+def md5_matches(md5_hash: Optional[str], data: bytes) -> bool:
+    """
+    Whether bytes have the given GCS md5.
+
+    Objects can be overwritten between a metadata read and a download, so
+    bytes stored or shared under a key derived from the metadata are
+    checked against it first.
+
+    Args:
+        md5_hash: GCS md5 (base64)
+        data: Downloaded bytes
+
+    Returns:
+        False without an md5
+    """
+    if not md5_hash:
+        return False
+    return base64.b64encode(hashlib.md5(data).digest()).decode() == md5_hash
+
+
+@dataclass
+class UploadRecord:
+    """
+    A confirmed upload and the object that holds its bytes.
+
+    Uploads with the same content share one canonical object: the first
+    upload keeps its own object until a second copy arrives, then both
+    point to a content-addressed object. Their own objects are released:
+    kept until release_after (past upload and signed-URL expiry), then
+    deleted by a sweep.
+
+    Attributes:
+        blob_path: Path the user uploaded to (and refers to the document by)
+        user_id: Uploading user
+        content_key: md5, crc32c and size of the content - the dedup key
+        canonical_blob_path: Object holding the bytes (blob_path itself
+            while the content has a single upload)
+        size_bytes: Size in bytes
+        content_type: MIME type
+        md5_hash: GCS md5 (base64)
+        crc32c: GCS crc32c (base64), when reported
+        release_after: When the upload's own object, superseded by the
+            shared one, is deleted (None once deleted, or while it holds
+            the content)
+        created_at: When the upload was confirmed
+    """
+    blob_path: str
+    user_id: str
+    content_key: str
+    canonical_blob_path: str
+    size_bytes: int = 0
+    content_type: Optional[str] = None
+    md5_hash: Optional[str] = None
+    crc32c: Optional[str] = None
+    release_after: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    @property
+    def is_alias(self) -> bool:
+        """True if the bytes live in another object (this path's own object is released)."""
+        return self.canonical_blob_path != self.blob_path
@@ -2,5 +2,16 @@ from .agent_repository import AgentRepository
 from .corpus_repository import CorpusRepository
 from .text_editor_repository import TextEditorRepository
 from .policy_repository import PolicyRepository
+from .job_repository import JobRepository
+from .source_metadata_repository import SourceMetadataRepository
+from .ingestion_state_repository import IngestionStateRepository
+from .document_source import DocumentSource
+from .chunk_sink import ChunkSink
+from .document_storage import DocumentStorage
+from .model_file_repository import ModelFileRepository
+from .model_file_store import ModelFileStore
+from .upload_index_repository import UploadIndexRepository
 
-__all__ = ["AgentRepository", "CorpusRepository", "TextEditorRepository", "PolicyRepository"]
+__all__ = ["AgentRepository", "CorpusRepository", "TextEditorRepository", "PolicyRepository", "JobRepository", "SourceMetadataRepository",
+           "IngestionStateRepository", "DocumentSource", "ChunkSink", "DocumentStorage",
+           "ModelFileRepository", "ModelFileStore", "UploadIndexRepository"]
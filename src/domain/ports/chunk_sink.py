@@ -0,0 +1,35 @@
+"""Port (interface) for the vector index a corpus is ingested into."""
+
+from abc import ABC, abstractmethod
+from src.domain.models import CorpusConfig
+from src.domain.models.ingestion_models import ChunkedDocument
+
+
+class ChunkSink(ABC):
+    """
+    Port (interface) for writing documents into a corpus's index.
+
+    Sinks that index chunks themselves (numpy, pgvector) receive chunk
+    texts; sinks that chunk on their own (Vertex RAG import) receive
+    documents with no chunks and only use their URIs.
+    """
+
+    # Whether apply() needs the documents extracted and chunked
+    needs_chunks: bool = True
+
+    @abstractmethod
+    async def apply(
+        self,
+        corpus: CorpusConfig,
+        upserts: list[ChunkedDocument],
+        deletions: list[str],
+    ) -> None:
+        """
+        Replace the indexed content of changed documents and drop removed ones.
+
+        Args:
+            corpus: Target corpus
+            upserts: New or changed documents (previous chunks are replaced)
+            deletions: Source URIs to remove from the index
+        """
+        pass
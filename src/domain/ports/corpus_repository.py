@@ -123,3 +123,33 @@ class CorpusRepository(ABC):
             True if unassigned successfully
         """
         pass
+
+    @abstractmethod
+    async def get_corpus_versions(self, corpus_ids: list[str]) -> dict[str, str]:
+        """
+        Get the current content version of several corpuses.
+
+        Versions change when document_count or metadata.import_version
+        change (see corpus_version); caches of retrieval results compare
+        them to detect stale entries.
+
+        Args:
+            corpus_ids: Corpus identifiers
+
+        Returns:
+            Mapping of corpus_id to version token (missing corpuses are omitted)
+        """
+        pass
+
+    @abstractmethod
+    async def bump_import_version(self, corpus_id: str) -> Optional[str]:
+        """
+        Increment a corpus's metadata.import_version after a (re-)import.
+
+        Args:
+            corpus_id: The unique identifier of the corpus
+
+        Returns:
+            The new version token, or None if the corpus does not exist
+        """
+        pass
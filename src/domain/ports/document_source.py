@@ -0,0 +1,66 @@
+"""Port (interface) for document stores that corpuses are ingested from."""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+from src.domain.models.ingestion_models import SourceDocument
+
+
+class DocumentSource(ABC):
+    """
+    Port (interface) for listing and reading source documents.
+
+    Implementations: Google Cloud Storage, and a local directory used for
+    development and tests.
+    """
+
+    @abstractmethod
+    def handles(self, uri: str) -> bool:
+        """
+        Whether this source serves a URI or prefix.
+
+        Args:
+            uri: Document URI or prefix
+
+        Returns:
+            True if the URI's scheme belongs to this source
+        """
+        pass
+
+    @abstractmethod
+    async def list_documents(self, prefix: str) -> list[SourceDocument]:
+        """
+        List the documents under a prefix.
+
+        Args:
+            prefix: URI prefix (e.g. gs://bucket/policies/)
+
+        Returns:
+            Documents with their fingerprints (content is not read)
+        """
+        pass
+
+    @abstractmethod
+    async def get_document(self, uri: str) -> Optional[SourceDocument]:
+        """
+        Describe a single document.
+
+        Args:
+            uri: Document URI
+
+        Returns:
+            The document, or None if it does not exist
+        """
+        pass
+
+    @abstractmethod
+    async def read(self, uri: str) -> bytes:
+        """
+        Read a document's content.
+
+        Args:
+            uri: Document URI
+
+        Returns:
+            The raw bytes
+        """
+        pass
@@ -0,0 +1,156 @@
+"""Port (interface) for storing uploaded documents and generated artifacts."""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+
+class DocumentStorage(ABC):
+    """
+    Port (interface) for the document bucket, safe to call from async code.
+
+    Implementations: Google Cloud Storage over pooled async HTTP (with a
+    fake GCS for development and tests), and the blocking StorageService
+    run on a bounded thread pool.
+    """
+
+    bucket_name: str
+
+    @abstractmethod
+    async def generate_presigned_upload_url(
+        self,
+        user_id: str,
+        filename: str,
+        content_type: str,
+        expiration_minutes: int = 15,
+    ) -> Dict[str, Any]:
+        """
+        Create a URL the client uploads a new document to.
+
+        Args:
+            user_id: User identifier for organizing uploads
+            filename: Original filename
+            content_type: MIME type of the file
+            expiration_minutes: URL expiration time in minutes
+
+        Returns:
+            document_id, upload_url, filename, content_type, gcs_uri,
+            blob_path and expires_in_seconds
+        """
+        pass
+
+    @abstractmethod
+    async def generate_presigned_download_url(self, blob_path: str, expiration_minutes: int = 60) -> str:
+        """
+        Create a URL a client downloads a document from.
+
+        Args:
+            blob_path: Path to the blob in the bucket
+            expiration_minutes: URL expiration time in minutes
+
+        Returns:
+            Signed download URL
+        """
+        pass
+
+    @abstractmethod
+    async def get_document_bytes(self, blob_path: str) -> bytes:
+        """
+        Download a document.
+
+        Args:
+            blob_path: Path to the blob in the bucket
+
+        Returns:
+            Document content as bytes
+        """
+        pass
+
+    @abstractmethod
+    async def verify_upload(self, blob_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Check that a document exists.
+
+        Args:
+            blob_path: Path to the blob in the bucket
+
+        Returns:
+            exists, size_bytes, content_type, created, md5_hash, crc32c
+            and generation; None if the document does not exist
+        """
+        pass
+
+    @abstractmethod
+    async def upload_bytes(self, blob_path: str, data: bytes, content_type: str) -> None:
+        """
+        Store a document (e.g. a generated artifact), replacing any previous one.
+
+        Args:
+            blob_path: Path to the blob in the bucket
+            data: Content
+            content_type: MIME type
+        """
+        pass
+
+    @abstractmethod
+    async def delete_document(self, blob_path: str) -> bool:
+        """
+        Delete a document.
+
+        Args:
+            blob_path: Path to the blob in the bucket
+
+        Returns:
+            True if deleted successfully
+        """
+        pass
+
+    @abstractmethod
+    async def list_user_documents(self, user_id: str, max_results: int = 100) -> List[Dict[str, Any]]:
+        """
+        List a user's uploaded documents.
+
+        Args:
+            user_id: User identifier
+            max_results: Maximum number of results
+
+        Returns:
+            blob_path, size_bytes, content_type and created of each document
+        """
+        pass
+
+    async def confirm_upload(self, blob_path: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Check that a client upload completed and index it.
+
+        The default only verifies the upload; deduplicating storage also
+        maps it to the object holding the same content.
+
+        Args:
+            blob_path: Path the client uploaded to
+            user_id: Uploading user
+
+        Returns:
+            verify_upload's metadata (whether the content was already stored
+            is never reported); None if the document does not exist
+        """
+        return await self.verify_upload(blob_path)
+
+    async def copy_document(self, source_blob_path: str, destination_blob_path: str) -> None:
+        """
+        Copy a document within the bucket, replacing any object at the destination.
+
+        The default downloads and uploads the bytes; GCS backends copy server-side.
+
+        Args:
+            source_blob_path: Path of the existing document
+            destination_blob_path: Path of the copy
+        """
+        info = await self.verify_upload(source_blob_path)
+        if info is None:
+            raise FileNotFoundError(f"Document not found at {source_blob_path}")
+        data = await self.get_document_bytes(source_blob_path)
+        await self.upload_bytes(destination_blob_path, data, info.get("content_type") or "application/octet-stream")
+
+    async def close(self) -> None:
+        """Release connections and threads."""
+        pass
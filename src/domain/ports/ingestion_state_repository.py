@@ -0,0 +1,50 @@
+"""Repository port (interface) for corpus ingestion state."""
+
+from abc import ABC, abstractmethod
+from src.domain.models.ingestion_models import IngestedDocument
+
+
+class IngestionStateRepository(ABC):
+    """
+    Port (interface) for what has been indexed into each corpus.
+
+    Ingestion compares these fingerprints with the source's to skip
+    documents that did not change.
+    """
+
+    @abstractmethod
+    async def get_documents(self, corpus_id: str) -> dict[str, IngestedDocument]:
+        """
+        Retrieve the indexed documents of a corpus.
+
+        Args:
+            corpus_id: The corpus
+
+        Returns:
+            Mapping of source_uri to ingestion state
+        """
+        pass
+
+    @abstractmethod
+    async def save_documents(self, documents: list[IngestedDocument]) -> None:
+        """
+        Insert or replace the ingestion state of documents.
+
+        Args:
+            documents: The documents that were indexed
+        """
+        pass
+
+    @abstractmethod
+    async def delete_documents(self, corpus_id: str, source_uris: list[str]) -> int:
+        """
+        Remove documents from a corpus's ingestion state.
+
+        Args:
+            corpus_id: The corpus
+            source_uris: Documents removed from the index
+
+        Returns:
+            Number of documents removed
+        """
+        pass
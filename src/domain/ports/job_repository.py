@@ -0,0 +1,54 @@
+"""Repository port (interface) for background generation jobs."""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+from src.domain.models.job_models import GenerationJob
+
+
+class JobRepository(ABC):
+    """
+    Port (interface) for job persistence.
+
+    Jobs are executed in-process; the repository is the source of truth
+    clients poll, so status survives the request that created the job
+    and is visible from any instance.
+    """
+
+    @abstractmethod
+    async def create_job(self, job: GenerationJob) -> GenerationJob:
+        """
+        Persist a newly accepted job.
+
+        Args:
+            job: The job to create (status QUEUED)
+
+        Returns:
+            The stored job with created_at set
+        """
+        pass
+
+    @abstractmethod
+    async def update_job(self, job: GenerationJob) -> GenerationJob:
+        """
+        Persist the job's status, result, error and timestamps.
+
+        Args:
+            job: The job with updated fields
+
+        Returns:
+            The stored job
+        """
+        pass
+
+    @abstractmethod
+    async def get_job(self, job_id: str) -> Optional[GenerationJob]:
+        """
+        Retrieve a job by ID.
+
+        Args:
+            job_id: The unique identifier of the job
+
+        Returns:
+            GenerationJob if found, None otherwise
+        """
+        pass
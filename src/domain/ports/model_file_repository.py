@@ -0,0 +1,51 @@
+"""Repository port (interface) for model file references."""
+
+from abc import ABC, abstractmethod
+from src.domain.models.model_file import ModelFileRef
+
+
+class ModelFileRepository(ABC):
+    """
+    Port (interface) for the content hash -> model file URI mapping.
+
+    Shared by all instances and sessions, so a document is uploaded to the
+    model file store once and referenced by URI afterwards.
+    """
+
+    @abstractmethod
+    async def get_files(self, store: str, content_hashes: list[str]) -> dict[str, ModelFileRef]:
+        """
+        Retrieve the files of several contents.
+
+        Args:
+            store: File store name
+            content_hashes: Content hashes to look up
+
+        Returns:
+            Mapping of content_hash to file (missing contents are omitted)
+        """
+        pass
+
+    @abstractmethod
+    async def save_file(self, file: ModelFileRef) -> None:
+        """
+        Insert or replace the file of a content.
+
+        Args:
+            file: The uploaded file
+        """
+        pass
+
+    @abstractmethod
+    async def delete_file(self, store: str, content_hash: str) -> bool:
+        """
+        Remove the file of a content (e.g. it expired or was rejected).
+
+        Args:
+            store: File store name
+            content_hash: Content hash
+
+        Returns:
+            True if deleted, False if not found
+        """
+        pass
@@ -0,0 +1,34 @@
+"""Port (interface) for the model provider's file store."""
+
+from abc import ABC, abstractmethod
+from src.domain.models.model_file import ModelFileRef
+
+
+class ModelFileStore(ABC):
+    """
+    Port (interface) for uploading documents the model can read by URI.
+
+    Implementations: GCS objects (Vertex AI reads gs:// URIs), the Gemini
+    Files API, and a local stand-in for development and tests.
+    """
+
+    name: str
+
+    @abstractmethod
+    async def upload(self, content_hash: str, data: bytes, mime_type: str) -> ModelFileRef:
+        """
+        Upload a document.
+
+        Args:
+            content_hash: Hash of the content (recorded in the reference)
+            data: Document bytes
+            mime_type: MIME type
+
+        Returns:
+            Reference to the uploaded file
+        """
+        pass
+
+    async def close(self) -> None:
+        """Release connections (optional)."""
+        pass
@@ -0,0 +1,49 @@
+"""Repository port (interface) for the persistent source-metadata cache."""
+
+from abc import ABC, abstractmethod
+from src.domain.models.source_metadata import CachedSourceMetadata
+
+
+class SourceMetadataRepository(ABC):
+    """
+    Port (interface) for the second tier of the source-metadata cache.
+
+    Shared by all instances so a new instance starts with the metadata
+    other instances already fetched.
+    """
+
+    @abstractmethod
+    async def get_entries(self, source_uris: list[str]) -> dict[str, CachedSourceMetadata]:
+        """
+        Retrieve cached metadata for several sources.
+
+        Args:
+            source_uris: Source URIs to look up
+
+        Returns:
+            Mapping of source_uri to entry (missing sources are omitted)
+        """
+        pass
+
+    @abstractmethod
+    async def save_entry(self, entry: CachedSourceMetadata) -> None:
+        """
+        Insert or replace the cached metadata of a source.
+
+        Args:
+            entry: The entry to store
+        """
+        pass
+
+    @abstractmethod
+    async def delete_entry(self, source_uri: str) -> bool:
+        """
+        Remove a source from the cache.
+
+        Args:
+            source_uri: The source URI
+
+        Returns:
+            True if deleted, False if not found
+        """
+        pass
@@ -0,0 +1,119 @@
+"""Repository port (interface) for the content-addressed upload index."""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from src.domain.models.upload_record import UploadRecord
+
+
+class UploadIndexRepository(ABC):
+    """
+    Port (interface) for the uploaded-document index.
+
+    Maps every confirmed upload to the canonical object holding its bytes,
+    so identical uploads are stored, downloaded and sent to the model once.
+    Changes to one content's uploads must be serialized (registering a
+    copy while the last other copy is removed must not lose the bytes).
+    """
+
+    @abstractmethod
+    async def get_uploads(self, blob_paths: List[str]) -> dict[str, UploadRecord]:
+        """
+        Retrieve the records of several uploads.
+
+        Args:
+            blob_paths: Upload paths to look up
+
+        Returns:
+            Mapping of blob_path to record (unindexed paths are omitted)
+        """
+        pass
+
+    @abstractmethod
+    async def list_user_uploads(self, user_id: str, limit: int = 100) -> List[UploadRecord]:
+        """
+        List a user's uploads, newest first.
+
+        Args:
+            user_id: User identifier
+            limit: Maximum number of records
+
+        Returns:
+            The user's records
+        """
+        pass
+
+    @abstractmethod
+    async def register_upload(self, record: UploadRecord) -> Tuple[UploadRecord, int]:
+        """
+        Index an upload (replacing any previous record of its path).
+
+        If other uploads of the content already share a content-addressed
+        object, the record points to it and keeps its release_after;
+        otherwise the record is its own canonical object (release_after is
+        cleared). The record's canonical_blob_path is ignored.
+
+        Args:
+            record: The upload
+
+        Returns:
+            (stored record, number of other uploads of the content)
+        """
+        pass
+
+    @abstractmethod
+    async def share_content(self, content_key: str, shared_blob_path: str, release_after: datetime) -> str:
+        """
+        Point every upload of a content to a content-addressed object.
+
+        If the content already has a shared object (a concurrent share won),
+        that one is kept. Uploads that held their own copy are released at
+        release_after.
+
+        Args:
+            content_key: Content key
+            shared_blob_path: Object holding the content (already written)
+            release_after: When the uploads' own objects may be deleted
+
+        Returns:
+            The shared object in effect (shared_blob_path, or the existing one)
+        """
+        pass
+
+    @abstractmethod
+    async def list_releasable(self, before: datetime, limit: int = 500) -> List[UploadRecord]:
+        """
+        List uploads whose own objects are due for deletion.
+
+        Args:
+            before: Records released at or before this time
+            limit: Maximum number of records
+
+        Returns:
+            The records
+        """
+        pass
+
+    @abstractmethod
+    async def mark_released(self, blob_path: str) -> None:
+        """
+        Record that an upload's own object was deleted (clears release_after).
+
+        Args:
+            blob_path: Upload path
+        """
+        pass
+
+    @abstractmethod
+    async def remove_upload(self, blob_path: str) -> Tuple[Optional[UploadRecord], int]:
+        """
+        Remove an upload from the index.
+
+        Args:
+            blob_path: Upload path
+
+        Returns:
+            (removed record or None if not indexed, uploads still using its canonical object)
+        """
+        pass
@@ -1,5 +1,6 @@
 """Agent service for creating and managing ADK agents."""
 
+import os
 from typing import Optional, Any
 from google.adk.agents import Agent, LlmAgent
 from google.adk.runners import Runner
@@ -13,9 +14,14 @@ from collections import defaultdict
 from src.domain.models import AgentConfig
 from src.domain.ports import AgentRepository
 from src.infrastructure.tools import ToolRegistry
+from src.infrastructure.tools.speculative_retrieval import is_speculative, speculate
 
 logger = logging.getLogger(__name__)
 
+# Time limit for a synchronous (request-bound) agent invocation.
+# Background jobs pass timeout=None and rely on the job's own limit.
+AGENT_INVOKE_TIMEOUT_SECONDS = float(os.getenv("AGENT_INVOKE_TIMEOUT_SECONDS", "60"))
+
 
 class SessionLockManager:
     """Manages locks for session access to prevent race conditions."""
@@ -39,6 +45,8 @@ class AgentService:
         self.repository = repository
         self.tool_registry = tool_registry
         self._agent_cache: dict[str, Agent] = {}
+        # Search tools to prefetch per agent, for agents with speculative retrieval
+        self._speculative_searchers: dict[str, list] = {}
         self.persistent_session_service = session_service
         self.lock_manager = SessionLockManager()
 
@@ -97,6 +105,13 @@ class AgentService:
                 corpuses=config.corpuses,
                 agent_service=self
             )
+            if is_speculative(config):
+                self._speculative_searchers[config.agent_id] = [
+                    tool.speculative_searcher for tool in tools
+                    if hasattr(tool, "speculative_searcher")
+                ]
+            else:
+                self._speculative_searchers.pop(config.agent_id, None)
 
             sub_agents = []
             if config.sub_agent_ids:
@@ -141,6 +156,11 @@ class AgentService:
     def clear_cache(self):
         """Clear the agent cache."""
         self._agent_cache.clear()
+        self._speculative_searchers.clear()
+
+    def get_speculative_searchers(self, agent_id: str) -> list:
+        """Search tools to prefetch at the start of an agent's turns (empty if it did not opt in)."""
+        return self._speculative_searchers.get(agent_id, [])
 
     async def invoke_agent(
         self, agent_id: str, prompt: str, **kwargs
@@ -175,9 +195,13 @@ class AgentService:
         """
         Invoke agent using Runner with proper session history loading.
         Sessions are ALWAYS persisted to database using DatabaseSessionService.
+
+        Pass `timeout` (seconds) to override AGENT_INVOKE_TIMEOUT_SECONDS,
+        or timeout=None to run without a limit.
         """
         user_id = kwargs.get("user_id", "default_user")
         session_id = kwargs.get("session_id")
+        timeout = kwargs.get("timeout", AGENT_INVOKE_TIMEOUT_SECONDS)
 
         if not session_id:
             session_id = f"sess_{uuid.uuid4().hex[:12]}"
@@ -249,30 +273,31 @@ class AgentService:
             async def run_with_timeout():
                 nonlocal response_text, function_calls_made
                 
-                async for event in runner.run_async(
-                    user_id=user_id,
-                    session_id=session_id,
-                    new_message=message
-                ):
-                    if hasattr(event, 'content') and event.content:
-                        if hasattr(event.content, 'parts'):
-                            for part in event.content.parts:
-                                if hasattr(part, 'function_call') and part.function_call:
-                                    function_calls_made += 1
-                                    logger.info(f"🔧 Function call: {part.function_call.name}")
-                                
-                                if hasattr(part, 'text') and part.text:
-                                    response_text += part.text
-                    
-                    if hasattr(event, 'text') and event.text:
-                        response_text += event.text
+                async with speculate(prompt, self.get_speculative_searchers(agent_id)):
+                    async for event in runner.run_async(
+                        user_id=user_id,
+                        session_id=session_id,
+                        new_message=message
+                    ):
+                        if hasattr(event, 'content') and event.content:
+                            if hasattr(event.content, 'parts'):
+                                for part in event.content.parts:
+                                    if hasattr(part, 'function_call') and part.function_call:
+                                        function_calls_made += 1
+                                        logger.info(f"🔧 Function call: {part.function_call.name}")
+                                    
+                                    if hasattr(part, 'text') and part.text:
+                                        response_text += part.text
+                        
+                        if hasattr(event, 'text') and event.text:
+                            response_text += event.text
             
-            await asyncio.wait_for(run_with_timeout(), timeout=60.0)
+            await asyncio.wait_for(run_with_timeout(), timeout=timeout)
             
             logger.info(f"✅ Collected response ({len(response_text)} chars, {function_calls_made} function calls)")
             
         except asyncio.TimeoutError:
-            logger.error(f"⏱️ Agent processing timed out after 60 seconds")
+            logger.error(f"⏱️ Agent processing timed out after {timeout:g} seconds")
             raise RuntimeError(
                 "El procesamiento está tomando más tiempo del esperado. "
                 "Por favor, intenta con una consulta más específica o un documento más corto."
@@ -12,26 +12,44 @@ import asyncpg
 from google.adk.runners import Runner
 from google.genai import types
 
-from src.domain.services.agent_service import AgentService
+from src.domain.services.agent_service import AgentService, AGENT_INVOKE_TIMEOUT_SECONDS
 from src.domain.models.chat_models import (
     ChatResponse, MessageResponse, SessionListItem,
     SessionListResponse, SessionDetailResponse
 )
 from src.domain.models.text_editor_models import StreamEvent
-from src.services.storage_service import StorageService
+from src.infrastructure.tools.speculative_retrieval import speculate
+from src.domain.ports.document_storage import DocumentStorage
+from src.infrastructure.extraction import ImageNormalizer, TextExtractor
+from src.infrastructure.model_files import ModelFileCache
+from src.infrastructure.storage.attachment_loader import AttachmentBatch, load_attachments
+from src.services.tool_call_sanitizer import ToolCallSanitizer
 from fastapi import HTTPException
 
 logger = logging.getLogger(__name__)
 
-# Lazy-loaded storage service singleton
-_storage_service: Optional[StorageService] = None
+def _get_document_storage() -> DocumentStorage:
+    """The DI container's document storage (shared HTTP connection pool)."""
+    from src.application.di import get_container
+    return get_container().get_document_storage()
 
-def _get_storage_service() -> StorageService:
-    """Get or create storage service singleton."""
-    global _storage_service
-    if _storage_service is None:
-        _storage_service = StorageService()
-    return _storage_service
+
+async def _get_model_file_cache() -> Optional[ModelFileCache]:
+    """The DI container's model file references (None when disabled)."""
+    from src.application.di import get_container
+    return await get_container().get_model_file_cache()
+
+
+def _get_text_extractor() -> Optional[TextExtractor]:
+    """The DI container's attachment text extractor (None when disabled)."""
+    from src.application.di import get_container
+    return get_container().get_text_extractor()
+
+
+def _get_image_normalizer() -> Optional[ImageNormalizer]:
+    """The DI container's image attachment normalizer (None when disabled)."""
+    from src.application.di import get_container
+    return get_container().get_image_normalizer()
 
 
 class ChatService:
@@ -66,11 +84,15 @@ class ChatService:
         agent_id: Optional[str] = None,
         agent_name: Optional[str] = None,
         session_id: Optional[str] = None,
-        metadata: Optional[dict] = None
+        metadata: Optional[dict] = None,
+        timeout: Optional[float] = AGENT_INVOKE_TIMEOUT_SECONDS,
     ) -> ChatResponse:
         """
         Send a message and get agent response.
         Creates new session if session_id not provided.
+
+        `timeout` limits the agent run in seconds (None = no limit, used by
+        background jobs which enforce their own limit).
         """
         # 1. Determine agent
         resolved_agent_id = await self._resolve_agent(agent_id, agent_name)
@@ -91,7 +113,8 @@ class ChatService:
             prompt=prompt,
             user_id=user_id,
             session_id=session_id,
-            metadata=metadata
+            metadata=metadata,
+            timeout=timeout,
         )
 
         # 4. Get agent info
@@ -159,6 +182,7 @@ class ChatService:
             session_id = f"sess_{uuid.uuid4().hex[:12]}"
             logger.info(f"🆕 Creating new streaming session: {session_id}")
 
+        attachment_batch: Optional[AttachmentBatch] = None
         try:
             # 3. Get the agent
             agent = await self.agent_service.get_agent(resolved_agent_id)
@@ -214,40 +238,36 @@ class ChatService:
             # 6. Build message parts
             parts = []
 
-            # 6.1 Add attachments as multimodal parts (fetch from GCS)
+            # 6.1 Add attachments as multimodal parts: as extracted text when
+            # cheaper, images normalized (downscaled and re-encoded), by model
+            # file URI when already uploaded, else fetched
+            # from GCS concurrently, under the process-wide in-flight byte
+            # budget until the stream ends
             if attachments:
-                storage = _get_storage_service()
-                for attachment in attachments:
-                    blob_path = attachment.get("blob_path")
+                attachment_batch = await load_attachments(
+                    _get_document_storage(),
+                    [attachment.get("blob_path") for attachment in attachments],
+                    model_files=await _get_model_file_cache(),
+                    text_extractor=_get_text_extractor(),
+                    image_normalizer=_get_image_normalizer(),
+                    content_types=[attachment.get("content_type") for attachment in attachments],
+                )
+                for attachment, loaded in zip(attachments, attachment_batch.results):
                     content_type = attachment.get("content_type", "application/octet-stream")
                     filename = attachment.get("filename", "file")
 
-                    if blob_path:
-                        try:
-                            logger.info(f"📎 Fetching attachment from GCS: {filename}")
-                            # Fetch document bytes from GCS (sync method, use thread)
-                            doc_bytes = await asyncio.to_thread(
-                                storage.get_document_bytes,
-                                blob_path
-                            )
-                            # Add as multimodal part for Gemini using inline_data
-                            parts.append(
-                                types.Part(
-                                    inline_data=types.Blob(
-                                        mime_type=content_type,
-                                        data=doc_bytes
-                                    )
-                                )
-                            )
-                            # Add filename label for context
-                            parts.append(types.Part(text=f"\n[Above: {filename}]\n\n"))
-                            logger.info(f"✅ Added attachment: {filename} ({len(doc_bytes)} bytes)")
-                        except Exception as e:
-                            logger.error(f"❌ Failed to fetch attachment {filename}: {e}")
-                            # Add error note to prompt instead
-                            parts.append(types.Part(text=f"\n[Error loading attachment: {filename}]"))
-                    else:
+                    if not loaded.blob_path:
                         logger.warning(f"⚠️ Attachment {filename} has no blob_path")
+                    elif loaded.error is not None:
+                        logger.error(f"❌ Failed to fetch attachment {filename}: {loaded.error}")
+                        # Add error note to prompt instead
+                        parts.append(types.Part(text=f"\n[Error loading attachment: {filename}]"))
+                    else:
+                        # Add as multimodal part for Gemini (file_data or inline_data)
+                        parts.append(loaded.to_part(content_type))
+                        # Add filename label for context
+                        parts.append(types.Part(text=f"\n[Above: {filename}]\n\n"))
+                        logger.info(f"✅ Added attachment: {filename} ({loaded.size_bytes} bytes)")
 
             # 6.2 Add user prompt text
             parts.append(types.Part(text=prompt))
@@ -264,19 +284,30 @@ class ChatService:
                     data={"session_id": session_id, "agent_id": resolved_agent_id}
                 )
 
+                # Tool-call artifacts can span chunks, so clean the stream as a whole
+                sanitizer = ToolCallSanitizer()
+
                 try:
-                    async for event in runner.run_async(
-                        user_id=user_id,
-                        session_id=session_id,
-                        new_message=content_message
-                    ):
-                        # Extract text content from event
-                        chunk_text = self._extract_text_from_event(event)
-                        if chunk_text:
-                            yield StreamEvent(
-                                event_type="content",
-                                data={"content": chunk_text}
-                            )
+                    async with speculate(prompt, self.agent_service.get_speculative_searchers(resolved_agent_id)):
+                        async for event in runner.run_async(
+                            user_id=user_id,
+                            session_id=session_id,
+                            new_message=content_message
+                        ):
+                            # Extract text content from event
+                            chunk_text = sanitizer.feed(self._extract_text_from_event(event))
+                            if chunk_text:
+                                yield StreamEvent(
+                                    event_type="content",
+                                    data={"content": chunk_text}
+                                )
+
+                    chunk_text = sanitizer.flush()
+                    if chunk_text:
+                        yield StreamEvent(
+                            event_type="content",
+                            data={"content": chunk_text}
+                        )
 
                 except asyncio.CancelledError:
                     logger.info(f"Stream cancelled for session {session_id}")
@@ -308,8 +339,16 @@ class ChatService:
                 data={"message": str(e)}
             )
 
+        finally:
+            if attachment_batch is not None:
+                attachment_batch.release()
+
     def _extract_text_from_event(self, event: Any) -> str:
-        """Extract text content from an ADK event, filtering out tool call artifacts."""
+        """
+        Extract text content from an ADK event, skipping function call parts.
+
+        Tool-call artifacts written as text are removed by ToolCallSanitizer.
+        """
         text = ""
 
         # Skip events that are pure function calls/responses
@@ -327,43 +366,8 @@ class ChatService:
         if hasattr(event, "text") and event.text:
             text += event.text
 
-        # Clean up any tool call artifacts that might have leaked through
-        text = self._clean_tool_call_text(text)
-
         return text
 
-    def _clean_tool_call_text(self, text: str) -> str:
-        """
-        Remove tool call syntax and artifacts from text.
-
-        This handles cases where the LLM outputs tool calls as text
-        instead of proper function calls.
-        """
-        import re
-
-        if not text:
-            return text
-
-        # Remove lines that look like tool calls (e.g., rag_search "query")
-        # Pattern: word_with_underscores followed by quoted string
-        text = re.sub(r'^[\s]*[a-z_]+\s+"[^"]*"[\s]*$', '', text, flags=re.MULTILINE)
-
-        # Remove code blocks that contain tool calls
-        text = re.sub(
-            r'```(?:TOOL_CODE|tool|function)?\s*\n[a-z_]+\s+"[^"]*"\s*\n```',
-            '',
-            text,
-            flags=re.IGNORECASE
-        )
-
-        # Remove standalone tool call patterns
-        text = re.sub(r'\b(rag_search|search_\w+)\s+"[^"]*"', '', text)
-
-        # Clean up multiple newlines left behind
-        text = re.sub(r'\n{3,}', '\n\n', text)
-
-        return text.strip()
-
     async def list_sessions(
         self,
         user_id: str,
@@ -0,0 +1,283 @@
+"""
+Corpus ingestion: index documents from GCS prefixes or uploaded files.
+
+Each run lists the requested sources, compares their fingerprints (GCS
+md5 / generation) with what was indexed before, and only reads, chunks
+and indexes new or changed documents. Extraction and chunking run in a
+process pool. The corpus's document_count is updated and its import
+version bumped, which invalidates cached retrieval results.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.domain.models import CorpusConfig
+from src.domain.models.ingestion_models import ChunkedDocument, IngestedDocument, SourceDocument
+from src.domain.ports.chunk_sink import ChunkSink
+from src.domain.ports.corpus_repository import CorpusRepository
+from src.domain.ports.document_source import DocumentSource
+from src.domain.ports.ingestion_state_repository import IngestionStateRepository
+
+logger = logging.getLogger(__name__)
+
+# Processes for text extraction and chunking (0 = a thread, e.g. for tests)
+INGEST_PROCESS_WORKERS = int(os.getenv("INGEST_PROCESS_WORKERS", "2"))
+# Documents downloaded concurrently
+INGEST_READ_CONCURRENCY = int(os.getenv("INGEST_READ_CONCURRENCY", "8"))
+# Documents indexed per sink write (progress is reported per batch)
+INGEST_BATCH_DOCUMENTS = int(os.getenv("INGEST_BATCH_DOCUMENTS", "50"))
+# Larger documents are skipped
+INGEST_MAX_DOCUMENT_MB = float(os.getenv("INGEST_MAX_DOCUMENT_MB", "50"))
+
+# (content, content_type, file_name, chunk_size, chunk_overlap) -> chunk texts
+Chunker = Callable[[bytes, Optional[str], str, int, int], list[str]]
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class IngestionService:
+    """Incremental ingestion of documents into corpuses."""
+
+    def __init__(
+        self,
+        corpus_repository: CorpusRepository,
+        state_repository: IngestionStateRepository,
+        sources: list[DocumentSource],
+        sink_factory: Callable[[CorpusConfig], ChunkSink],
+        chunker: Chunker,
+        process_workers: int = INGEST_PROCESS_WORKERS,
+        read_concurrency: int = INGEST_READ_CONCURRENCY,
+        batch_documents: int = INGEST_BATCH_DOCUMENTS,
+    ):
+        """
+        Initialize the service. The process pool starts on first use.
+
+        Args:
+            corpus_repository: Corpus configuration and counters
+            state_repository: Fingerprints of indexed documents
+            sources: Document stores, chosen by URI scheme
+            sink_factory: Returns the index writer for a corpus
+            chunker: Extracts and chunks one document (must be picklable)
+            process_workers: Processes for the chunker (0 = a thread)
+            read_concurrency: Documents downloaded concurrently
+            batch_documents: Documents per sink write
+        """
+        self.corpus_repository = corpus_repository
+        self.state_repository = state_repository
+        self.sources = sources
+        self.sink_factory = sink_factory
+        self.chunker = chunker
+        self.process_workers = process_workers
+        self.read_concurrency = read_concurrency
+        self.batch_documents = batch_documents
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # One run per corpus at a time
+        self._corpus_locks: dict[str, asyncio.Lock] = {}
+
+    async def ingest(
+        self,
+        corpus_id: str,
+        prefixes: Optional[list[str]] = None,
+        uris: Optional[list[str]] = None,
+        delete_missing: bool = False,
+        force: bool = False,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Index new and changed documents into a corpus.
+
+        Args:
+            corpus_id: Target corpus
+            prefixes: Source prefixes to scan (gs://bucket/path/, file:///dir)
+            uris: Individual documents (e.g. uploaded files)
+            delete_missing: Remove indexed documents under `prefixes` that no longer exist
+            force: Re-index documents even if unchanged
+            on_progress: Awaited with a progress dict after each phase and batch
+
+        Returns:
+            Summary: counts of listed, indexed, unchanged, deleted and failed
+            documents, chunks written and the corpus's new document_count
+
+        Raises:
+            ValueError: Unknown corpus, nothing to ingest, or an unsupported URI
+        """
+        corpus = await self.corpus_repository.get_corpus_by_id(corpus_id)
+        if corpus is None:
+            raise ValueError(f"Corpus not found: {corpus_id}")
+        prefixes, uris = list(prefixes or []), list(uris or [])
+        if not prefixes and not uris:
+            raise ValueError("Nothing to ingest: give at least one prefix or URI")
+
+        lock = self._corpus_locks.setdefault(corpus_id, asyncio.Lock())
+        async with lock:
+            return await self._ingest(corpus, prefixes, uris, delete_missing, force, on_progress)
+
+    async def _ingest(
+        self,
+        corpus: CorpusConfig,
+        prefixes: list[str],
+        uris: list[str],
+        delete_missing: bool,
+        force: bool,
+        on_progress: Optional[ProgressCallback],
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        progress: Dict[str, Any] = {"phase": "listing", "listed": 0, "total": 0, "processed": 0,
+                                    "indexed": 0, "unchanged": 0, "failed": 0, "chunks": 0}
+
+        async def report(**changes) -> None:
+            progress.update(changes)
+            if on_progress is not None:
+                await on_progress(dict(progress))
+
+        await report()
+        listed, failures = await self._list(prefixes, uris)
+        indexed = await self.state_repository.get_documents(corpus.corpus_id)
+
+        changed = [
+            document for document in listed.values()
+            if force or document.uri not in indexed or indexed[document.uri].fingerprint != document.fingerprint
+        ]
+        unchanged = len(listed) - len(changed)
+        deletions = []
+        if delete_missing:
+            deletions = [
+                uri for uri in indexed
+                if uri not in listed and any(uri.startswith(prefix) for prefix in prefixes)
+            ]
+        max_bytes = INGEST_MAX_DOCUMENT_MB * 1024 * 1024
+        for document in [d for d in changed if d.size > max_bytes]:
+            failures.append({"uri": document.uri, "error": f"Larger than {INGEST_MAX_DOCUMENT_MB:g} MB"})
+            changed.remove(document)
+
+        logger.info(
+            f"📚 Ingesting into {corpus.corpus_name}: {len(listed)} listed, {len(changed)} new or changed, "
+            f"{len(deletions)} to delete"
+        )
+        await report(phase="indexing", listed=len(listed), total=len(changed),
+                     unchanged=unchanged, failed=len(failures))
+
+        sink = self.sink_factory(corpus)
+        if deletions:
+            await sink.apply(corpus, [], deletions)
+            await self.state_repository.delete_documents(corpus.corpus_id, deletions)
+
+        semaphore = asyncio.Semaphore(self.read_concurrency)
+        for start in range(0, len(changed), self.batch_documents):
+            batch = changed[start:start + self.batch_documents]
+            results = await asyncio.gather(*[
+                self._prepare(corpus, sink, document, semaphore) for document in batch
+            ])
+            ready = []
+            for document, result in zip(batch, results):
+                if isinstance(result, ChunkedDocument):
+                    ready.append(result)
+                else:
+                    failures.append({"uri": document.uri, "error": result})
+
+            if ready:
+                await sink.apply(corpus, ready, [])
+                now = datetime.now(timezone.utc)
+                await self.state_repository.save_documents([
+                    IngestedDocument(
+                        corpus_id=corpus.corpus_id,
+                        source_uri=chunked.source.uri,
+                        fingerprint=chunked.source.fingerprint,
+                        chunk_count=len(chunked.chunks),
+                        ingested_at=now,
+                    )
+                    for chunked in ready
+                ])
+            await report(
+                processed=progress["processed"] + len(batch),
+                indexed=progress["indexed"] + len(ready),
+                failed=len(failures),
+                chunks=progress["chunks"] + sum(len(chunked.chunks) for chunked in ready),
+            )
+
+        document_count = len(await self.state_repository.get_documents(corpus.corpus_id))
+        if progress["indexed"] or deletions or document_count != corpus.document_count:
+            await self.corpus_repository.save_corpus(replace(corpus, document_count=document_count))
+            await self.corpus_repository.bump_import_version(corpus.corpus_id)
+
+        elapsed = time.perf_counter() - started
+        await report(phase="done")
+        logger.info(
+            f"🏁 Ingestion into {corpus.corpus_name} done in {elapsed:.1f}s: "
+            f"{progress['indexed']} indexed, {progress['unchanged']} unchanged, "
+            f"{len(deletions)} deleted, {len(failures)} failed"
+        )
+        return {
+            "corpus_id": corpus.corpus_id,
+            "listed": len(listed),
+            "indexed": progress["indexed"],
+            "unchanged": progress["unchanged"],
+            "deleted": len(deletions),
+            "failed": failures,
+            "chunks": progress["chunks"],
+            "document_count": document_count,
+            "elapsed_seconds": round(elapsed, 2),
+        }
+
+    async def _list(self, prefixes: list[str], uris: list[str]) -> tuple[dict[str, SourceDocument], list[dict]]:
+        """List prefixes and describe single URIs; returns documents by URI and failures."""
+        listed: dict[str, SourceDocument] = {}
+        failures: list[dict] = []
+        for prefix in prefixes:
+            for document in await self._source_for(prefix).list_documents(prefix):
+                listed[document.uri] = document
+        for uri in uris:
+            document = await self._source_for(uri).get_document(uri)
+            if document is None:
+                failures.append({"uri": uri, "error": "Not found"})
+            else:
+                listed[document.uri] = document
+        return listed, failures
+
+    async def _prepare(
+        self,
+        corpus: CorpusConfig,
+        sink: ChunkSink,
+        document: SourceDocument,
+        semaphore: asyncio.Semaphore,
+    ) -> ChunkedDocument | str:
+        """Read and chunk a document; returns the chunked document or an error message."""
+        if not sink.needs_chunks:
+            return ChunkedDocument(source=document)
+        try:
+            async with semaphore:
+                content = await self._source_for(document.uri).read(document.uri)
+            chunks = await self._run_chunker(
+                content, document.content_type, document.file_name, corpus.chunk_size, corpus.chunk_overlap
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Could not ingest {document.uri}: {e}")
+            return f"{type(e).__name__}: {e}"
+        if not chunks:
+            return "No text extracted"
+        return ChunkedDocument(source=document, chunks=chunks)
+
+    async def _run_chunker(self, *args) -> list[str]:
+        if self.process_workers <= 0:
+            return await asyncio.to_thread(self.chunker, *args)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.process_workers)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, self.chunker, *args)
+
+    def _source_for(self, uri: str) -> DocumentSource:
+        for source in self.sources:
+            if source.handles(uri):
+                return source
+        raise ValueError(f"No document source for {uri}")
+
+    async def close(self) -> None:
+        """Shut down the process pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,350 @@
+"""
+Background job execution for long-running generations.
+
+Requests submitted in job mode are persisted through a JobRepository and
+executed by a bounded pool of in-process asyncio workers, each job under
+its own time limit. Clients poll the job or attach to its status stream
+instead of holding the HTTP request open for the whole generation.
+"""
+
+import os
+import uuid
+import asyncio
+import logging
+import contextvars
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from src.domain.models.job_models import GenerationJob, JobStatus, JobType
+from src.domain.ports.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
+
+# Concurrent jobs per process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Accepted-but-not-started jobs per process; submissions beyond this are rejected
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+# Default time limit for a single job
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "600"))
+# How often watchers re-read jobs owned by another instance
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+# Unfinished jobs this long past their deadline are reported as interrupted
+JOB_LOST_GRACE_SECONDS = 60
+
+# Minimum interval between persisted progress updates of one job
+JOB_PROGRESS_SAVE_SECONDS = 1.0
+
+# A job body: runs the generation and returns a JSON-serializable result
+JobRunner = Callable[[], Awaitable[Dict[str, Any]]]
+
+# Job executed by the current task (set by the worker around the runner)
+_current_job: contextvars.ContextVar[Optional[GenerationJob]] = contextvars.ContextVar(
+    "current_job", default=None
+)
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the job queue has no room for another job."""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobService:
+    """
+    Bounded in-process worker pool with persisted job status.
+
+    Job bodies are closures built by the API layer, so any request type
+    can run as a job. Status transitions are written to the repository
+    (the source of truth for polling) and broadcast to local watchers.
+    """
+
+    def __init__(
+        self,
+        repository: JobRepository,
+        max_workers: int = JOB_WORKERS,
+        max_queued: int = JOB_QUEUE_SIZE,
+        default_timeout: float = JOB_TIMEOUT_SECONDS,
+        poll_seconds: float = JOB_POLL_SECONDS,
+    ):
+        """
+        Initialize the service. Workers start on the first submission.
+
+        Args:
+            repository: Job persistence
+            max_workers: Number of jobs executed concurrently
+            max_queued: Maximum jobs waiting for a worker
+            default_timeout: Time limit for jobs submitted without one
+            poll_seconds: Re-read interval for jobs running elsewhere
+        """
+        self.repository = repository
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.default_timeout = default_timeout
+        self.poll_seconds = poll_seconds
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._queued = 0
+        self._running = 0
+        # Jobs accepted by this process that have not finished yet
+        self._local: dict[str, GenerationJob] = {}
+        self._runners: dict[str, JobRunner] = {}
+        self._changed: dict[str, asyncio.Event] = {}
+        self._progress_saved: dict[str, float] = {}
+
+    def start(self) -> None:
+        """Start the worker pool (idempotent)."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.max_workers)
+        ]
+        logger.info(f"✅ Job workers started ({self.max_workers} workers, queue {self.max_queued})")
+
+    async def submit(
+        self,
+        job_type: JobType,
+        user_id: str,
+        runner: JobRunner,
+        payload: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> GenerationJob:
+        """
+        Persist a job and queue it for execution.
+
+        Args:
+            job_type: Kind of work
+            user_id: Owner of the job
+            runner: Coroutine factory that performs the work
+            payload: Request summary stored with the job
+            timeout: Time limit in seconds (defaults to default_timeout)
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFullError: Too many jobs are already waiting
+        """
+        if self._queued >= self.max_queued:
+            raise JobQueueFullError(
+                f"Job queue is full ({self.max_queued} pending jobs), try again later"
+            )
+        self.start()
+
+        # Reserve the slot before awaiting the repository
+        self._queued += 1
+        try:
+            job = await self.repository.create_job(GenerationJob(
+                job_id=f"job_{uuid.uuid4().hex}",
+                job_type=job_type,
+                user_id=user_id,
+                payload=payload or {},
+                timeout_seconds=timeout or self.default_timeout,
+                created_at=_now(),
+            ))
+        except Exception:
+            self._queued -= 1
+            raise
+
+        self._local[job.job_id] = job
+        self._runners[job.job_id] = runner
+        self._changed[job.job_id] = asyncio.Event()
+        self._queue.put_nowait(job.job_id)
+        logger.info(f"📥 Queued {job_type.value} job {job.job_id} for {user_id} ({self._queued} waiting)")
+        return job
+
+    async def get_job(self, job_id: str, user_id: str) -> Optional[GenerationJob]:
+        """
+        Get a job owned by `user_id`.
+
+        Returns:
+            The job, or None if it does not exist or belongs to someone else
+        """
+        job = self._local.get(job_id) or await self.repository.get_job(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        if job_id not in self._local and not job.status.is_terminal:
+            job = await self._check_lost(job)
+        return job
+
+    async def watch(self, job_id: str, user_id: str) -> AsyncIterator[GenerationJob]:
+        """
+        Yield the job now and after every status or progress change until it finishes.
+
+        Local jobs are pushed as they change; jobs accepted by another
+        instance are re-read every poll_seconds.
+        """
+        last_state = None
+        while True:
+            changed = self._changed.get(job_id)
+            job = await self.get_job(job_id, user_id)
+            if job is None:
+                return
+            state = (job.status, job.progress)
+            if state != last_state:
+                last_state = state
+                yield job
+            if job.status.is_terminal:
+                return
+            try:
+                if changed is not None:
+                    await asyncio.wait_for(changed.wait(), timeout=self.poll_seconds)
+                else:
+                    await asyncio.sleep(self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def report_progress(self, progress: Dict[str, Any]) -> None:
+        """
+        Record the progress of the job running in the current task.
+
+        Local watchers see every update; the repository is written at most
+        every JOB_PROGRESS_SAVE_SECONDS. Does nothing outside a job.
+
+        Args:
+            progress: JSON-serializable progress (replaces the previous one)
+        """
+        job = _current_job.get()
+        if job is None:
+            return
+        job.progress = dict(progress)
+
+        loop = asyncio.get_running_loop()
+        if loop.time() - self._progress_saved.get(job.job_id, 0.0) >= JOB_PROGRESS_SAVE_SECONDS:
+            self._progress_saved[job.job_id] = loop.time()
+            await self._save(job)
+        else:
+            self._notify(job.job_id)
+
+    # -------------------------------------------------------------------------
+    # Workers
+    # -------------------------------------------------------------------------
+
+    async def _worker(self, index: int) -> None:
+        """Execute queued jobs one at a time."""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Job worker {index} error on {job_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        """Run a single job under its time limit and record the outcome."""
+        job = self._local[job_id]
+        runner = self._runners.pop(job_id)
+        self._queued -= 1
+        self._running += 1
+
+        job.status = JobStatus.RUNNING
+        job.started_at = _now()
+        await self._save(job)
+        logger.info(f"▶️ Running {job.job_type.value} job {job_id} (limit {job.timeout_seconds:g}s)")
+
+        token = _current_job.set(job)
+        try:
+            job.result = await asyncio.wait_for(runner(), timeout=job.timeout_seconds)
+            job.status = JobStatus.SUCCEEDED
+        except asyncio.TimeoutError:
+            job.status = JobStatus.TIMED_OUT
+            job.error = f"Job exceeded its time limit of {job.timeout_seconds:g} seconds"
+        except asyncio.CancelledError:
+            job.status = JobStatus.FAILED
+            job.error = "Job was cancelled because the service is shutting down"
+            await self._finish(job)
+            raise
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            # HTTPException carries its message in `detail`
+            job.error = str(getattr(e, "detail", None) or e)
+            logger.error(f"❌ Job {job_id} failed: {job.error}")
+        finally:
+            _current_job.reset(token)
+        await self._finish(job)
+
+        elapsed = (job.finished_at - job.started_at).total_seconds()
+        logger.info(f"🏁 Job {job_id} {job.status.value} in {elapsed:.1f}s")
+
+    async def _finish(self, job: GenerationJob) -> None:
+        """Record a terminal state and release local bookkeeping."""
+        self._running -= 1
+        job.finished_at = _now()
+        await self._save(job)
+        self._local.pop(job.job_id, None)
+        self._progress_saved.pop(job.job_id, None)
+        event = self._changed.pop(job.job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _save(self, job: GenerationJob) -> None:
+        """Persist a job and wake its watchers."""
+        try:
+            await self.repository.update_job(job)
+        except Exception as e:
+            # Keep running: local watchers still see the in-memory state
+            logger.error(f"⚠️ Could not persist job {job.job_id}: {e}")
+        self._notify(job.job_id)
+
+    def _notify(self, job_id: str) -> None:
+        """Wake the watchers of a local job."""
+        event = self._changed.get(job_id)
+        if event is not None:
+            event.set()
+            self._changed[job_id] = asyncio.Event()
+
+    async def _check_lost(self, job: GenerationJob) -> GenerationJob:
+        """
+        Mark a job as failed if it outlived its deadline without finishing.
+
+        This happens when the instance running it stopped (deploy, crash).
+        """
+        started = job.started_at or job.created_at
+        if started is None or job.timeout_seconds is None:
+            return job
+        deadline = started + timedelta(seconds=job.timeout_seconds + JOB_LOST_GRACE_SECONDS)
+        if _now() < deadline:
+            return job
+
+        job.status = JobStatus.FAILED
+        job.error = "Job was interrupted before finishing, please submit it again"
+        job.finished_at = _now()
+        logger.warning(f"⚠️ Job {job.job_id} never finished, marking as interrupted")
+        await self._save(job)
+        return job
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    async def close(self) -> None:
+        """Stop the workers and fail jobs that never started."""
+        for task in self._workers:
+            task.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for job_id in list(self._runners):
+            job = self._local[job_id]
+            self._runners.pop(job_id)
+            self._running += 1  # balanced by _finish
+            job.status = JobStatus.FAILED
+            job.error = "Service shut down before the job started, please submit it again"
+            await self._finish(job)
+        self._queued = 0
+
+    def stats(self) -> dict:
+        """Current pool usage."""
+        return {
+            "workers": len(self._workers),
+            "running": self._running,
+            "queued": self._queued,
+            "max_queued": self.max_queued,
+        }
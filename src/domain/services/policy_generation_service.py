@@ -14,7 +14,7 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
 from src.domain.ports.policy_repository import PolicyRepository
 from src.domain.models.policy_models import Policy, ContentFormat
-from src.services.storage_service import StorageService
+from src.domain.ports.document_storage import DocumentStorage
 from fastapi import HTTPException
 
 logger = logging.getLogger(__name__)
@@ -26,7 +26,7 @@ class PolicyGenerationService:
     def __init__(
         self,
         repository: PolicyRepository,
-        storage_service: StorageService
+        storage_service: DocumentStorage
     ):
         self.repository = repository
         self.storage = storage_service
@@ -73,19 +73,11 @@ class PolicyGenerationService:
         jpeg_blob_path = f"policies/{policy_id}/policy.jpg"
 
         # Upload PDF
-        pdf_blob = self.storage.bucket.blob(pdf_blob_path)
-        pdf_blob.upload_from_string(
-            pdf_bytes,
-            content_type="application/pdf"
-        )
+        await self.storage.upload_bytes(pdf_blob_path, pdf_bytes, "application/pdf")
         logger.info(f"PDF uploaded: {pdf_blob_path}")
 
         # Upload JPEG
-        jpeg_blob = self.storage.bucket.blob(jpeg_blob_path)
-        jpeg_blob.upload_from_string(
-            jpeg_bytes,
-            content_type="image/jpeg"
-        )
+        await self.storage.upload_bytes(jpeg_blob_path, jpeg_bytes, "image/jpeg")
         logger.info(f"JPEG uploaded: {jpeg_blob_path}")
 
         # Update policy with artifact paths
@@ -304,7 +296,7 @@ class PolicyGenerationService:
             )
 
         # Generate presigned URL
-        download_url = self.storage.generate_presigned_download_url(
+        download_url = await self.storage.generate_presigned_download_url(
             blob_path=blob_path,
             expiration_minutes=expiration_minutes
         )
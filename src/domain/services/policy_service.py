@@ -9,7 +9,7 @@ from src.domain.models.policy_models import (
     Policy, PolicyDocument, PolicyVersion, PolicyAccess,
     PolicyStatus, AccessLevel
 )
-from src.services.storage_service import StorageService
+from src.domain.ports.document_storage import DocumentStorage
 from fastapi import HTTPException
 
 logger = logging.getLogger(__name__)
@@ -21,7 +21,7 @@ class PolicyService:
     def __init__(
         self,
         repository: PolicyRepository,
-        storage_service: StorageService
+        storage_service: DocumentStorage
     ):
         self.repository = repository
         self.storage = storage_service
@@ -88,7 +88,7 @@ class PolicyService:
             raise HTTPException(status_code=403, detail="Access denied")
 
         # Generate presigned URL with policy-specific path
-        upload_info = self.storage.generate_presigned_upload_url(
+        upload_info = await self.storage.generate_presigned_upload_url(
             user_id=user_id,
             filename=filename,
             content_type=content_type,
@@ -130,7 +130,7 @@ class PolicyService:
             Created policy document
         """
         # Verify document exists in GCS
-        verification = self.storage.verify_upload(blob_path)
+        verification = await self.storage.verify_upload(blob_path)
         if not verification or not verification.get("exists"):
             raise HTTPException(
                 status_code=400,
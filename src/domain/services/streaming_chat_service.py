@@ -17,7 +17,10 @@ from google import genai
 from google.genai import types
 
 from src.domain.models.text_editor_models import StreamEvent
-from src.services.storage_service import StorageService
+from src.domain.ports.document_storage import DocumentStorage
+from src.infrastructure.extraction import ImageNormalizer, TextExtractor
+from src.infrastructure.model_files import ModelFileCache
+from src.infrastructure.storage.attachment_loader import AttachmentBatch, LoadedAttachment, load_attachments
 
 logger = logging.getLogger(__name__)
 
@@ -57,11 +60,14 @@ class StreamingChatService:
 
     def __init__(
         self,
-        storage_service: StorageService,
+        storage_service: DocumentStorage,
         db_pool: asyncpg.Pool,
         project_id: Optional[str] = None,
         location: str = "us-east4",
         model_name: str = "gemini-2.0-flash",
+        model_files: Optional[ModelFileCache] = None,
+        text_extractor: Optional[TextExtractor] = None,
+        image_normalizer: Optional[ImageNormalizer] = None,
     ):
         """
         Initialize the streaming chat service.
@@ -72,8 +78,14 @@ class StreamingChatService:
             project_id: GCP project ID
             location: GCP region for Vertex AI
             model_name: Gemini model to use for streaming
+            model_files: Upload-once file references for attachments (None: always inline)
+            text_extractor: Local text extraction for attachments (None: always binary)
+            image_normalizer: Image downscaling/re-encoding for attachments (None: as uploaded)
         """
         self.storage_service = storage_service
+        self.model_files = model_files
+        self.text_extractor = text_extractor
+        self.image_normalizer = image_normalizer
         self.db_pool = db_pool
         self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
         self.location = location
@@ -119,6 +131,7 @@ class StreamingChatService:
             session_id = f"sess_{uuid.uuid4().hex[:12]}"
             logger.info(f"Created new session: {session_id}")
 
+        attachment_batch: Optional[AttachmentBatch] = None
         try:
             # Emit session info first
             yield StreamEvent(
@@ -126,6 +139,11 @@ class StreamingChatService:
                 data={"session_id": session_id, "agent_id": agent_id}
             )
 
+            # Download attachments concurrently; their bytes count against the
+            # process-wide in-flight budget until the stream ends
+            if attachments:
+                attachment_batch = await self._load_attachments(attachments)
+
             # Build multimodal content
             contents = await self._build_content(
                 user_id=user_id,
@@ -133,6 +151,7 @@ class StreamingChatService:
                 prompt=prompt,
                 agent_instruction=agent_instruction,
                 attachments=attachments,
+                attachment_batch=attachment_batch,
             )
 
             # Stream the response using Gemini's native streaming
@@ -190,6 +209,10 @@ class StreamingChatService:
                 data={"message": str(e)}
             )
 
+        finally:
+            if attachment_batch is not None:
+                attachment_batch.release()
+
     async def _build_content(
         self,
         user_id: str,
@@ -197,6 +220,7 @@ class StreamingChatService:
         prompt: str,
         agent_instruction: Optional[str] = None,
         attachments: Optional[List[Dict[str, Any]]] = None,
+        attachment_batch: Optional[AttachmentBatch] = None,
     ) -> List[types.Content]:
         """
         Build multimodal content for Gemini request.
@@ -207,6 +231,7 @@ class StreamingChatService:
             prompt: User's current message
             agent_instruction: System instruction for agent personality
             attachments: List of attachments to process
+            attachment_batch: Their downloaded bytes (from _load_attachments)
 
         Returns:
             List of Content objects for Gemini
@@ -232,10 +257,10 @@ class StreamingChatService:
         user_parts = []
 
         # Process attachments
-        if attachments:
-            for attachment in attachments:
+        if attachments and attachment_batch is not None:
+            for attachment, loaded in zip(attachments, attachment_batch.results):
                 try:
-                    attachment_parts = await self._process_attachment(attachment)
+                    attachment_parts = self._process_attachment(attachment, loaded)
                     user_parts.extend(attachment_parts)
                 except Exception as e:
                     logger.error(f"Failed to process attachment {attachment.get('filename')}: {e}")
@@ -252,15 +277,49 @@ class StreamingChatService:
 
         return contents
 
-    async def _process_attachment(
+    async def _load_attachments(
         self,
-        attachment: Dict[str, Any]
+        attachments: List[Dict[str, Any]]
+    ) -> AttachmentBatch:
+        """
+        Download supported attachments concurrently under the in-flight byte budget.
+
+        Unsupported types are not downloaded; sizes are checked from object
+        metadata before downloading.
+
+        Args:
+            attachments: List of attachment dicts with id, filename, content_type, blob_path
+
+        Returns:
+            AttachmentBatch (released by stream_message)
+        """
+        blob_paths = [
+            attachment.get("blob_path")
+            if attachment.get("content_type", "application/octet-stream") in SUPPORTED_ATTACHMENT_TYPES
+            else None
+            for attachment in attachments
+        ]
+        return await load_attachments(
+            self.storage_service,
+            blob_paths,
+            max_bytes=MAX_ATTACHMENT_SIZE,
+            model_files=self.model_files,
+            text_extractor=self.text_extractor,
+            image_normalizer=self.image_normalizer,
+            content_types=[attachment.get("content_type") for attachment in attachments],
+        )
+
+    def _process_attachment(
+        self,
+        attachment: Dict[str, Any],
+        loaded: LoadedAttachment
     ) -> List[types.Part]:
         """
         Process a single attachment and return Gemini Parts.
 
         Args:
             attachment: Dict with id, filename, content_type, blob_path
+            loaded: Its downloaded bytes, extracted text or file reference (or the load error)
 
         Returns:
             List of Part objects for the attachment
@@ -279,37 +338,30 @@ class StreamingChatService:
                 f"Supported types: {list(SUPPORTED_ATTACHMENT_TYPES.keys())}"
             )
 
-        # Download file from GCS (run in thread as it's synchronous)
-        logger.info(f"Downloading attachment: {filename} from {blob_path}")
-
-        doc_bytes = await asyncio.to_thread(
-            self.storage_service.get_document_bytes,
-            blob_path
-        )
-
-        # Check file size
-        if len(doc_bytes) > MAX_ATTACHMENT_SIZE:
-            raise ValueError(
-                f"Attachment {filename} exceeds maximum size "
-                f"({len(doc_bytes)} > {MAX_ATTACHMENT_SIZE} bytes)"
-            )
+        # Missing object, too large (checked from metadata) or download failure
+        if loaded.error is not None:
+            raise loaded.error
 
-        logger.info(f"Downloaded {len(doc_bytes)} bytes for {filename}")
+        if loaded.text is not None:
+            delivery = f", extracted text {len(loaded.text)} chars)"
+        elif loaded.file_uri:
+            delivery = f", file {loaded.file_uri})"
+        elif loaded.normalized:
+            delivery = f", normalized to {loaded.content_type} {len(loaded.data)} bytes)"
+        else:
+            delivery = ", inline)"
+        logger.info(f"Attached {filename} ({loaded.size_bytes} bytes{delivery}")
 
         parts = []
 
-        # Add the file as inline data
-        parts.append(types.Part(
-            inline_data=types.Blob(
-                mime_type=content_type,
-                data=doc_bytes
-            )
-        ))
+        # Add the extracted text, the file by model file URI, or inline data
+        parts.append(loaded.to_part(content_type))
 
         # Add filename label for context
         type_label = SUPPORTED_ATTACHMENT_TYPES.get(content_type, "Document")
+        as_text = " (extracted text)" if loaded.text is not None else ""
         parts.append(types.Part(
-            text=f"\n[Attached {type_label}: {filename}]\n"
+            text=f"\n[Attached {type_label}{as_text}: {filename}]\n"
         ))
 
         return parts
@@ -3,7 +3,7 @@
 import uuid
 import logging
 import asyncio
-from typing import AsyncGenerator, Optional, List, Any
+from typing import AsyncGenerator, Optional, List, Any, Tuple
 
 from google.adk.agents import Agent
 from google.adk.runners import Runner
@@ -17,7 +17,10 @@ from src.domain.models import (
     StreamEvent,
 )
 from src.domain.services.agent_service import AgentService
-from src.services.storage_service import StorageService
+from src.domain.ports.document_storage import DocumentStorage
+from src.infrastructure.extraction import ImageNormalizer, TextExtractor
+from src.infrastructure.model_files import ModelFileCache
+from src.infrastructure.storage.attachment_loader import AttachmentBatch, load_attachments
 from src.services.diff_generator import DiffGenerator
 
 logger = logging.getLogger(__name__)
@@ -65,8 +68,11 @@ class TextEditorService:
     def __init__(
         self,
         agent_service: AgentService,
-        storage_service: Optional[StorageService] = None,
+        storage_service: Optional[DocumentStorage] = None,
         diff_generator: Optional[DiffGenerator] = None,
+        model_files: Optional[ModelFileCache] = None,
+        text_extractor: Optional[TextExtractor] = None,
+        image_normalizer: Optional[ImageNormalizer] = None,
     ):
         """
         Initialize the text editor service.
@@ -75,10 +81,16 @@ class TextEditorService:
             agent_service: The agent service for ADK integration
             storage_service: Optional storage service for fetching attachments
             diff_generator: Optional diff generator for parsing AI output
+            model_files: Optional upload-once file references for attachments
+            text_extractor: Optional local text extraction for attachments
+            image_normalizer: Optional image downscaling/re-encoding for attachments
         """
         self.agent_service = agent_service
         self.storage_service = storage_service
         self.diff_generator = diff_generator or DiffGenerator()
+        self.model_files = model_files
+        self.text_extractor = text_extractor
+        self.image_normalizer = image_normalizer
 
     async def stream_response(
         self,
@@ -113,6 +125,7 @@ class TextEditorService:
         if not session_id:
             session_id = f"editor_{uuid.uuid4().hex[:12]}"
 
+        attachment_batch: Optional[AttachmentBatch] = None
         try:
             # Get the text editor agent
             agent = await self._get_text_editor_agent(agent_id)
@@ -148,7 +161,7 @@ class TextEditorService:
 
             # Add attachment content if available
             if attachments and self.storage_service:
-                attachment_parts = await self._load_attachments(attachments)
+                attachment_parts, attachment_batch = await self._load_attachments(attachments)
                 parts.extend(attachment_parts)
 
             # Create message
@@ -238,6 +251,10 @@ class TextEditorService:
                 data={"message": str(e)}
             )
 
+        finally:
+            if attachment_batch is not None:
+                attachment_batch.release()
+
     async def get_non_streaming_response(
         self,
         message: str,
@@ -343,33 +360,35 @@ class TextEditorService:
     async def _load_attachments(
         self,
         attachments: List[AttachmentInfo]
-    ) -> List[types.Part]:
-        """Load attachment content and create message parts."""
+    ) -> Tuple[List[types.Part], AttachmentBatch]:
+        """
+        Load attachment content (concurrently, under the in-flight byte budget)
+        and create message parts. The caller releases the batch.
+        """
         parts = []
 
-        for attachment in attachments:
-            try:
-                if attachment.blob_path and self.storage_service:
-                    # Fetch from GCS
-                    content = await asyncio.to_thread(
-                        self.storage_service.get_document_bytes,
-                        attachment.blob_path
-                    )
-                    if content:
-                        parts.append(types.Part(
-                            inline_data=types.Blob(
-                                mime_type=attachment.mime_type,
-                                data=content
-                            )
-                        ))
-                        parts.append(types.Part(
-                            text=f"\n[Attachment: {attachment.name}]\n"
-                        ))
-                        logger.info(f"Loaded attachment: {attachment.name}")
-            except Exception as e:
-                logger.warning(f"Failed to load attachment {attachment.name}: {e}")
-
-        return parts
+        # Fetch from GCS
+        batch = await load_attachments(
+            self.storage_service,
+            [attachment.blob_path for attachment in attachments],
+            model_files=self.model_files,
+            text_extractor=self.text_extractor,
+            image_normalizer=self.image_normalizer,
+            content_types=[attachment.mime_type for attachment in attachments],
+        )
+        for attachment, loaded in zip(attachments, batch.results):
+            if not attachment.blob_path:
+                continue
+            if loaded.error is not None:
+                logger.warning(f"Failed to load attachment {attachment.name}: {loaded.error}")
+            elif loaded.data or loaded.file_uri or loaded.text is not None:
+                parts.append(loaded.to_part(attachment.mime_type))
+                parts.append(types.Part(
+                    text=f"\n[Attachment: {attachment.name}]\n"
+                ))
+                logger.info(f"Loaded attachment: {attachment.name}")
+
+        return parts, batch
 
     def _extract_text_from_event(self, event: Any) -> str:
         """Extract text content from an ADK event."""
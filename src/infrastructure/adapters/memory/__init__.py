@@ -0,0 +1,7 @@
+from .in_memory_job_repository import InMemoryJobRepository
+from .in_memory_ingestion_state_repository import InMemoryIngestionStateRepository
+from .in_memory_model_file_repository import InMemoryModelFileRepository
+from .in_memory_upload_index_repository import InMemoryUploadIndexRepository
+
+__all__ = ["InMemoryJobRepository", "InMemoryIngestionStateRepository", "InMemoryModelFileRepository",
+           "InMemoryUploadIndexRepository"]
@@ -0,0 +1,36 @@
+"""In-memory adapter implementation of IngestionStateRepository port."""
+
+from dataclasses import replace
+from datetime import datetime, timezone
+
+from src.domain.models.ingestion_models import IngestedDocument
+from src.domain.ports.ingestion_state_repository import IngestionStateRepository
+
+
+class InMemoryIngestionStateRepository(IngestionStateRepository):
+    """
+    Process-local IngestionStateRepository.
+
+    Used for local development and tests: ingestion runs end to end
+    without a database. State is lost when the process exits, so the
+    next run re-indexes everything.
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._documents: dict[str, dict[str, IngestedDocument]] = {}
+
+    async def get_documents(self, corpus_id: str) -> dict[str, IngestedDocument]:
+        """Get copies of a corpus's documents."""
+        return {uri: replace(doc) for uri, doc in self._documents.get(corpus_id, {}).items()}
+
+    async def save_documents(self, documents: list[IngestedDocument]) -> None:
+        """Store copies of documents."""
+        for doc in documents:
+            stored = replace(doc, ingested_at=doc.ingested_at or datetime.now(timezone.utc))
+            self._documents.setdefault(doc.corpus_id, {})[doc.source_uri] = stored
+
+    async def delete_documents(self, corpus_id: str, source_uris: list[str]) -> int:
+        """Delete documents of a corpus."""
+        documents = self._documents.get(corpus_id, {})
+        return sum(documents.pop(uri, None) is not None for uri in source_uris)
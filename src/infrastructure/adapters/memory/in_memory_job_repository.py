@@ -0,0 +1,37 @@
+"""In-memory adapter implementation of JobRepository port."""
+
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.domain.models.job_models import GenerationJob
+from src.domain.ports.job_repository import JobRepository
+
+
+class InMemoryJobRepository(JobRepository):
+    """
+    Process-local JobRepository.
+
+    Used for local development and tests: the job queue runs end to end
+    without a database. Jobs are lost when the process exits.
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._jobs: dict[str, GenerationJob] = {}
+
+    async def create_job(self, job: GenerationJob) -> GenerationJob:
+        """Store a new job."""
+        stored = replace(job, created_at=job.created_at or datetime.now(timezone.utc))
+        self._jobs[stored.job_id] = stored
+        return replace(stored)
+
+    async def update_job(self, job: GenerationJob) -> GenerationJob:
+        """Replace the stored copy of a job."""
+        self._jobs[job.job_id] = replace(job)
+        return replace(job)
+
+    async def get_job(self, job_id: str) -> Optional[GenerationJob]:
+        """Get a copy of a job by ID."""
+        job = self._jobs.get(job_id)
+        return replace(job) if job else None
@@ -0,0 +1,38 @@
+"""In-memory adapter implementation of ModelFileRepository port."""
+
+from dataclasses import replace
+from datetime import datetime, timezone
+
+from src.domain.models.model_file import ModelFileRef
+from src.domain.ports.model_file_repository import ModelFileRepository
+
+
+class InMemoryModelFileRepository(ModelFileRepository):
+    """
+    Process-local ModelFileRepository.
+
+    Used for local development and tests. References are lost when the
+    process exits, so documents are uploaded again after a restart.
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._files: dict[tuple[str, str], ModelFileRef] = {}
+
+    async def get_files(self, store: str, content_hashes: list[str]) -> dict[str, ModelFileRef]:
+        """Get copies of the files of several contents."""
+        return {
+            content_hash: replace(self._files[(store, content_hash)])
+            for content_hash in content_hashes
+            if (store, content_hash) in self._files
+        }
+
+    async def save_file(self, file: ModelFileRef) -> None:
+        """Store a copy of a file."""
+        self._files[(file.store, file.content_hash)] = replace(
+            file, created_at=file.created_at or datetime.now(timezone.utc)
+        )
+
+    async def delete_file(self, store: str, content_hash: str) -> bool:
+        """Delete a file."""
+        return self._files.pop((store, content_hash), None) is not None
@@ -0,0 +1,89 @@
+"""In-memory adapter implementation of UploadIndexRepository port."""
+
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from src.domain.models.upload_record import UploadRecord
+from src.domain.ports.upload_index_repository import UploadIndexRepository
+
+
+class InMemoryUploadIndexRepository(UploadIndexRepository):
+    """
+    Process-local UploadIndexRepository.
+
+    Used for local development and tests. The index is lost when the
+    process exits, so it must not be combined with a persistent bucket:
+    aliases whose own objects were swept would no longer resolve.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._records: dict[str, UploadRecord] = {}
+        self._lock = asyncio.Lock()
+
+    async def get_uploads(self, blob_paths: List[str]) -> dict[str, UploadRecord]:
+        """Get copies of several records."""
+        return {path: replace(self._records[path]) for path in blob_paths if path in self._records}
+
+    async def list_user_uploads(self, user_id: str, limit: int = 100) -> List[UploadRecord]:
+        """List copies of a user's records, newest first."""
+        records = [record for record in self._records.values() if record.user_id == user_id]
+        records.sort(key=lambda record: record.created_at, reverse=True)
+        return [replace(record) for record in records[:limit]]
+
+    async def register_upload(self, record: UploadRecord) -> Tuple[UploadRecord, int]:
+        """Store a copy of a record, pointing to the content's shared object if any."""
+        async with self._lock:
+            others = [
+                existing for existing in self._records.values()
+                if existing.content_key == record.content_key and existing.blob_path != record.blob_path
+            ]
+            shared = next((existing.canonical_blob_path for existing in others if existing.is_alias), None)
+            stored = replace(
+                record,
+                canonical_blob_path=shared or record.blob_path,
+                release_after=record.release_after if shared else None,
+                created_at=record.created_at or datetime.now(timezone.utc),
+            )
+            self._records[record.blob_path] = stored
+            return replace(stored), len(others)
+
+    async def share_content(self, content_key: str, shared_blob_path: str, release_after: datetime) -> str:
+        """Point a content's records to the shared object (or the one already in effect)."""
+        async with self._lock:
+            records = [record for record in self._records.values() if record.content_key == content_key]
+            shared = next((record.canonical_blob_path for record in records if record.is_alias), shared_blob_path)
+            for record in records:
+                if not record.is_alias:
+                    record.canonical_blob_path = shared
+                    record.release_after = release_after
+            return shared
+
+    async def list_releasable(self, before: datetime, limit: int = 500) -> List[UploadRecord]:
+        """List copies of the records due for deletion of their own objects."""
+        records = [
+            record for record in self._records.values()
+            if record.release_after is not None and record.release_after <= before
+        ]
+        records.sort(key=lambda record: record.release_after)
+        return [replace(record) for record in records[:limit]]
+
+    async def mark_released(self, blob_path: str) -> None:
+        """Clear a record's release_after."""
+        record = self._records.get(blob_path)
+        if record is not None:
+            record.release_after = None
+
+    async def remove_upload(self, blob_path: str) -> Tuple[Optional[UploadRecord], int]:
+        """Delete a record and count the records still using its object."""
+        async with self._lock:
+            record = self._records.pop(blob_path, None)
+            if record is None:
+                return None, 0
+            remaining = sum(
+                1 for existing in self._records.values()
+                if existing.canonical_blob_path == record.canonical_blob_path
+            )
+            return record, remaining
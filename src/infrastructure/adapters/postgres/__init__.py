@@ -3,6 +3,11 @@ from .postgres_corpus_repository import PostgresCorpusRepository
 from .postgres_group_mapping_repository import PostgresGroupMappingRepository
 from .postgres_text_editor_repository import PostgresTextEditorRepository
 from .postgres_policy_repository import PostgresPolicyRepository
+from .postgres_job_repository import PostgresJobRepository
+from .postgres_source_metadata_repository import PostgresSourceMetadataRepository
+from .postgres_ingestion_state_repository import PostgresIngestionStateRepository
+from .postgres_model_file_repository import PostgresModelFileRepository
+from .postgres_upload_index_repository import PostgresUploadIndexRepository
 
 __all__ = [
     "PostgresAgentRepository",
@@ -10,4 +15,9 @@ __all__ = [
     "PostgresGroupMappingRepository",
     "PostgresTextEditorRepository",
     "PostgresPolicyRepository",
+    "PostgresJobRepository",
+    "PostgresSourceMetadataRepository",
+    "PostgresIngestionStateRepository",
+    "PostgresModelFileRepository",
+    "PostgresUploadIndexRepository",
 ]
@@ -5,6 +5,7 @@ from typing import Optional
 from asyncpg import Pool
 
 from src.domain.models import CorpusConfig
+from src.domain.models.agent_config import corpus_version
 from src.domain.ports import CorpusRepository
 
 
@@ -216,6 +217,46 @@ class PostgresCorpusRepository(CorpusRepository):
             result = await conn.execute(query, agent_id, corpus_id)
             return result == "DELETE 1"
 
+    async def get_corpus_versions(self, corpus_ids: list[str]) -> dict[str, str]:
+        """Get content version tokens for several corpuses in one query."""
+        if not corpus_ids:
+            return {}
+
+        query = """
+            SELECT corpus_id, document_count, metadata->>'import_version' AS import_version
+            FROM corpuses
+            WHERE corpus_id = ANY($1::varchar[])
+        """
+
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, list(corpus_ids))
+
+        return {
+            row["corpus_id"]: corpus_version(row["document_count"], row["import_version"])
+            for row in rows
+        }
+
+    async def bump_import_version(self, corpus_id: str) -> Optional[str]:
+        """Increment metadata.import_version atomically."""
+        query = """
+            UPDATE corpuses SET
+                metadata = jsonb_set(
+                    COALESCE(metadata, '{}'::jsonb),
+                    '{import_version}',
+                    to_jsonb(COALESCE((metadata->>'import_version')::int, 0) + 1)
+                ),
+                updated_at = NOW()
+            WHERE corpus_id = $1
+            RETURNING document_count, metadata->>'import_version' AS import_version
+        """
+
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(query, corpus_id)
+
+        if row is None:
+            return None
+        return corpus_version(row["document_count"], row["import_version"])
+
     def _row_to_corpus_config(self, row) -> CorpusConfig:
         """Convert a database row to CorpusConfig."""
         vector_db_config = row["vector_db_config"]
@@ -0,0 +1,74 @@
+"""PostgreSQL adapter implementation of IngestionStateRepository port."""
+
+from asyncpg import Pool, Record
+
+from src.domain.models.ingestion_models import IngestedDocument
+from src.domain.ports.ingestion_state_repository import IngestionStateRepository
+
+
+class PostgresIngestionStateRepository(IngestionStateRepository):
+    """
+    PostgreSQL implementation of the IngestionStateRepository port.
+
+    Stores state in the `ingested_documents` table (migration 008).
+    """
+
+    def __init__(self, pool: Pool):
+        """
+        Initialize the PostgreSQL ingestion-state repository.
+
+        Args:
+            pool: AsyncPG connection pool
+        """
+        self.pool = pool
+
+    async def get_documents(self, corpus_id: str) -> dict[str, IngestedDocument]:
+        """Get all indexed documents of a corpus."""
+        query = """
+            SELECT corpus_id, source_uri, fingerprint, chunk_count, ingested_at
+            FROM ingested_documents
+            WHERE corpus_id = $1
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, corpus_id)
+
+        return {row["source_uri"]: self._row_to_document(row) for row in rows}
+
+    async def save_documents(self, documents: list[IngestedDocument]) -> None:
+        """Upsert documents in one round trip."""
+        if not documents:
+            return
+
+        query = """
+            INSERT INTO ingested_documents (corpus_id, source_uri, fingerprint, chunk_count, ingested_at)
+            VALUES ($1, $2, $3, $4, COALESCE($5, NOW()))
+            ON CONFLICT (corpus_id, source_uri) DO UPDATE SET
+                fingerprint = EXCLUDED.fingerprint,
+                chunk_count = EXCLUDED.chunk_count,
+                ingested_at = EXCLUDED.ingested_at
+        """
+        async with self.pool.acquire() as conn:
+            await conn.executemany(query, [
+                (doc.corpus_id, doc.source_uri, doc.fingerprint, doc.chunk_count, doc.ingested_at)
+                for doc in documents
+            ])
+
+    async def delete_documents(self, corpus_id: str, source_uris: list[str]) -> int:
+        """Delete documents of a corpus."""
+        if not source_uris:
+            return 0
+
+        query = "DELETE FROM ingested_documents WHERE corpus_id = $1 AND source_uri = ANY($2::text[])"
+        async with self.pool.acquire() as conn:
+            result = await conn.execute(query, corpus_id, list(source_uris))
+        return int(result.split()[-1])
+
+    def _row_to_document(self, row: Record) -> IngestedDocument:
+        """Convert a database row to an IngestedDocument."""
+        return IngestedDocument(
+            corpus_id=row["corpus_id"],
+            source_uri=row["source_uri"],
+            fingerprint=row["fingerprint"],
+            chunk_count=row["chunk_count"],
+            ingested_at=row["ingested_at"],
+        )
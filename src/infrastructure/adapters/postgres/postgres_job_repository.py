@@ -0,0 +1,106 @@
+"""PostgreSQL adapter implementation of JobRepository port."""
+
+import json
+from typing import Optional
+from asyncpg import Pool, Record
+
+from src.domain.models.job_models import GenerationJob, JobStatus, JobType
+from src.domain.ports.job_repository import JobRepository
+
+
+class PostgresJobRepository(JobRepository):
+    """
+    PostgreSQL implementation of the JobRepository port.
+
+    Stores jobs in the `generation_jobs` table (migration 005).
+    """
+
+    def __init__(self, pool: Pool):
+        """
+        Initialize the PostgreSQL job repository.
+
+        Args:
+            pool: AsyncPG connection pool
+        """
+        self.pool = pool
+
+    async def create_job(self, job: GenerationJob) -> GenerationJob:
+        """Insert a new job."""
+        query = """
+            INSERT INTO generation_jobs (
+                job_id, job_type, user_id, status, payload, timeout_seconds
+            )
+            VALUES ($1, $2, $3, $4, $5, $6)
+            RETURNING *
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(
+                query,
+                job.job_id,
+                job.job_type.value,
+                job.user_id,
+                job.status.value,
+                json.dumps(job.payload or {}),
+                job.timeout_seconds,
+            )
+            return self._row_to_job(row)
+
+    async def update_job(self, job: GenerationJob) -> GenerationJob:
+        """Update status, result, progress, error and timestamps."""
+        query = """
+            UPDATE generation_jobs
+            SET status = $2,
+                result = $3,
+                error = $4,
+                started_at = $5,
+                finished_at = $6,
+                progress = $7
+            WHERE job_id = $1
+            RETURNING *
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(
+                query,
+                job.job_id,
+                job.status.value,
+                json.dumps(job.result) if job.result is not None else None,
+                job.error,
+                job.started_at,
+                job.finished_at,
+                json.dumps(job.progress) if job.progress is not None else None,
+            )
+            return self._row_to_job(row) if row else job
+
+    async def get_job(self, job_id: str) -> Optional[GenerationJob]:
+        """Get a job by ID."""
+        query = "SELECT * FROM generation_jobs WHERE job_id = $1"
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(query, job_id)
+            return self._row_to_job(row) if row else None
+
+    def _row_to_job(self, row: Record) -> GenerationJob:
+        """Convert a database row to a GenerationJob."""
+        payload = row["payload"]
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        result = row["result"]
+        if isinstance(result, str):
+            result = json.loads(result)
+        progress = row.get("progress")
+        if isinstance(progress, str):
+            progress = json.loads(progress)
+
+        return GenerationJob(
+            job_id=row["job_id"],
+            job_type=JobType(row["job_type"]),
+            user_id=row["user_id"],
+            status=JobStatus(row["status"]),
+            payload=payload or {},
+            result=result,
+            progress=progress,
+            error=row["error"],
+            timeout_seconds=row["timeout_seconds"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+        )
@@ -0,0 +1,81 @@
+"""PostgreSQL adapter implementation of ModelFileRepository port."""
+
+from asyncpg import Pool, Record
+
+from src.domain.models.model_file import ModelFileRef
+from src.domain.ports.model_file_repository import ModelFileRepository
+
+
+class PostgresModelFileRepository(ModelFileRepository):
+    """
+    PostgreSQL implementation of the ModelFileRepository port.
+
+    Stores references in the `model_files` table (migration 009).
+    """
+
+    def __init__(self, pool: Pool):
+        """
+        Initialize the PostgreSQL model-file repository.
+
+        Args:
+            pool: AsyncPG connection pool
+        """
+        self.pool = pool
+
+    async def get_files(self, store: str, content_hashes: list[str]) -> dict[str, ModelFileRef]:
+        """Get the files of several contents in one query."""
+        if not content_hashes:
+            return {}
+
+        query = """
+            SELECT store, content_hash, file_uri, mime_type, size_bytes, expires_at, created_at
+            FROM model_files
+            WHERE store = $1 AND content_hash = ANY($2::text[])
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, store, list(content_hashes))
+
+        return {row["content_hash"]: self._row_to_file(row) for row in rows}
+
+    async def save_file(self, file: ModelFileRef) -> None:
+        """Upsert a file."""
+        query = """
+            INSERT INTO model_files (store, content_hash, file_uri, mime_type, size_bytes, expires_at, created_at)
+            VALUES ($1, $2, $3, $4, $5, $6, COALESCE($7, NOW()))
+            ON CONFLICT (store, content_hash) DO UPDATE SET
+                file_uri = EXCLUDED.file_uri,
+                mime_type = EXCLUDED.mime_type,
+                size_bytes = EXCLUDED.size_bytes,
+                expires_at = EXCLUDED.expires_at,
+                created_at = EXCLUDED.created_at
+        """
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                query,
+                file.store,
+                file.content_hash,
+                file.file_uri,
+                file.mime_type,
+                file.size_bytes,
+                file.expires_at,
+                file.created_at,
+            )
+
+    async def delete_file(self, store: str, content_hash: str) -> bool:
+        """Delete a file."""
+        query = "DELETE FROM model_files WHERE store = $1 AND content_hash = $2"
+        async with self.pool.acquire() as conn:
+            result = await conn.execute(query, store, content_hash)
+            return result == "DELETE 1"
+
+    def _row_to_file(self, row: Record) -> ModelFileRef:
+        """Convert a database row to a ModelFileRef."""
+        return ModelFileRef(
+            store=row["store"],
+            content_hash=row["content_hash"],
+            file_uri=row["file_uri"],
+            mime_type=row["mime_type"],
+            size_bytes=row["size_bytes"],
+            expires_at=row["expires_at"],
+            created_at=row["created_at"],
+        )
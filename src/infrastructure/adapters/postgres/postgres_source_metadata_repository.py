@@ -0,0 +1,78 @@
+"""PostgreSQL adapter implementation of SourceMetadataRepository port."""
+
+import json
+from asyncpg import Pool, Record
+
+from src.domain.models.source_metadata import CachedSourceMetadata
+from src.domain.ports.source_metadata_repository import SourceMetadataRepository
+
+
+class PostgresSourceMetadataRepository(SourceMetadataRepository):
+    """
+    PostgreSQL implementation of the SourceMetadataRepository port.
+
+    Stores entries in the `source_metadata_cache` table (migration 006).
+    """
+
+    def __init__(self, pool: Pool):
+        """
+        Initialize the PostgreSQL source-metadata repository.
+
+        Args:
+            pool: AsyncPG connection pool
+        """
+        self.pool = pool
+
+    async def get_entries(self, source_uris: list[str]) -> dict[str, CachedSourceMetadata]:
+        """Get entries for several sources in one query."""
+        if not source_uris:
+            return {}
+
+        query = """
+            SELECT source_uri, metadata, etag, fetched_at
+            FROM source_metadata_cache
+            WHERE source_uri = ANY($1::text[])
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, list(source_uris))
+
+        return {row["source_uri"]: self._row_to_entry(row) for row in rows}
+
+    async def save_entry(self, entry: CachedSourceMetadata) -> None:
+        """Upsert an entry."""
+        query = """
+            INSERT INTO source_metadata_cache (source_uri, metadata, etag, fetched_at)
+            VALUES ($1, $2, $3, $4)
+            ON CONFLICT (source_uri) DO UPDATE SET
+                metadata = EXCLUDED.metadata,
+                etag = EXCLUDED.etag,
+                fetched_at = EXCLUDED.fetched_at
+        """
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                query,
+                entry.source_uri,
+                json.dumps(entry.metadata),
+                entry.etag,
+                entry.fetched_at,
+            )
+
+    async def delete_entry(self, source_uri: str) -> bool:
+        """Delete an entry."""
+        query = "DELETE FROM source_metadata_cache WHERE source_uri = $1"
+        async with self.pool.acquire() as conn:
+            result = await conn.execute(query, source_uri)
+            return result == "DELETE 1"
+
+    def _row_to_entry(self, row: Record) -> CachedSourceMetadata:
+        """Convert a database row to a CachedSourceMetadata."""
+        metadata = row["metadata"]
+        if isinstance(metadata, str):
+            metadata = json.loads(metadata)
+
+        return CachedSourceMetadata(
+            source_uri=row["source_uri"],
+            metadata=metadata or {},
+            etag=row["etag"],
+            fetched_at=row["fetched_at"],
+        )
@@ -0,0 +1,188 @@
+"""PostgreSQL adapter implementation of UploadIndexRepository port."""
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from asyncpg import Connection, Pool, Record
+
+from src.domain.models.upload_record import UploadRecord
+from src.domain.ports.upload_index_repository import UploadIndexRepository
+
+_COLUMNS = (
+    "blob_path, user_id, content_key, canonical_blob_path, size_bytes, content_type, md5_hash, crc32c, "
+    "release_after, created_at"
+)
+
+
+class PostgresUploadIndexRepository(UploadIndexRepository):
+    """
+    PostgreSQL implementation of the UploadIndexRepository port.
+
+    Stores records in the `upload_index` table (migration 010). Changes to
+    one content take a transaction-scoped advisory lock on its key, so
+    concurrent confirms and deletes of the same document are serialized.
+    """
+
+    def __init__(self, pool: Pool):
+        """
+        Initialize the PostgreSQL upload index repository.
+
+        Args:
+            pool: AsyncPG connection pool
+        """
+        self.pool = pool
+
+    async def get_uploads(self, blob_paths: List[str]) -> dict[str, UploadRecord]:
+        """Get several records in one query."""
+        if not blob_paths:
+            return {}
+
+        query = f"SELECT {_COLUMNS} FROM upload_index WHERE blob_path = ANY($1::text[])"
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, list(blob_paths))
+
+        return {row["blob_path"]: self._row_to_record(row) for row in rows}
+
+    async def list_user_uploads(self, user_id: str, limit: int = 100) -> List[UploadRecord]:
+        """List a user's records, newest first."""
+        query = f"""
+            SELECT {_COLUMNS} FROM upload_index
+            WHERE user_id = $1
+            ORDER BY created_at DESC
+            LIMIT $2
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, user_id, limit)
+
+        return [self._row_to_record(row) for row in rows]
+
+    async def register_upload(self, record: UploadRecord) -> Tuple[UploadRecord, int]:
+        """Upsert a record, pointing to the content's shared object if any."""
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await self._lock_content(conn, record.content_key)
+                others = await conn.fetch(
+                    """
+                    SELECT blob_path, canonical_blob_path FROM upload_index
+                    WHERE content_key = $1 AND blob_path <> $2
+                    """,
+                    record.content_key,
+                    record.blob_path,
+                )
+                shared = next(
+                    (row["canonical_blob_path"] for row in others if row["canonical_blob_path"] != row["blob_path"]),
+                    None,
+                )
+                row = await conn.fetchrow(
+                    f"""
+                    INSERT INTO upload_index ({_COLUMNS})
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, COALESCE($10, NOW()))
+                    ON CONFLICT (blob_path) DO UPDATE SET
+                        user_id = EXCLUDED.user_id,
+                        content_key = EXCLUDED.content_key,
+                        canonical_blob_path = EXCLUDED.canonical_blob_path,
+                        size_bytes = EXCLUDED.size_bytes,
+                        content_type = EXCLUDED.content_type,
+                        md5_hash = EXCLUDED.md5_hash,
+                        crc32c = EXCLUDED.crc32c,
+                        release_after = EXCLUDED.release_after
+                    RETURNING {_COLUMNS}
+                    """,
+                    record.blob_path,
+                    record.user_id,
+                    record.content_key,
+                    shared or record.blob_path,
+                    record.size_bytes,
+                    record.content_type,
+                    record.md5_hash,
+                    record.crc32c,
+                    record.release_after if shared else None,
+                    record.created_at,
+                )
+
+        return self._row_to_record(row), len(others)
+
+    async def share_content(self, content_key: str, shared_blob_path: str, release_after: datetime) -> str:
+        """Point a content's records to the shared object (or the one already in effect)."""
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await self._lock_content(conn, content_key)
+                existing = await conn.fetchval(
+                    """
+                    SELECT canonical_blob_path FROM upload_index
+                    WHERE content_key = $1 AND canonical_blob_path <> blob_path
+                    LIMIT 1
+                    """,
+                    content_key,
+                )
+                shared = existing or shared_blob_path
+                await conn.execute(
+                    """
+                    UPDATE upload_index SET canonical_blob_path = $2, release_after = $3
+                    WHERE content_key = $1 AND canonical_blob_path = blob_path
+                    """,
+                    content_key,
+                    shared,
+                    release_after,
+                )
+
+        return shared
+
+    async def list_releasable(self, before: datetime, limit: int = 500) -> List[UploadRecord]:
+        """List the records due for deletion of their own objects."""
+        query = f"""
+            SELECT {_COLUMNS} FROM upload_index
+            WHERE release_after IS NOT NULL AND release_after <= $1
+            ORDER BY release_after
+            LIMIT $2
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, before, limit)
+
+        return [self._row_to_record(row) for row in rows]
+
+    async def mark_released(self, blob_path: str) -> None:
+        """Clear a record's release_after."""
+        async with self.pool.acquire() as conn:
+            await conn.execute("UPDATE upload_index SET release_after = NULL WHERE blob_path = $1", blob_path)
+
+    async def remove_upload(self, blob_path: str) -> Tuple[Optional[UploadRecord], int]:
+        """Delete a record and count the records still using its object."""
+        async with self.pool.acquire() as conn:
+            key = await conn.fetchval("SELECT content_key FROM upload_index WHERE blob_path = $1", blob_path)
+            if key is None:
+                return None, 0
+            async with conn.transaction():
+                await self._lock_content(conn, key)
+                row = await conn.fetchrow(
+                    f"DELETE FROM upload_index WHERE blob_path = $1 RETURNING {_COLUMNS}",
+                    blob_path,
+                )
+                if row is None:
+                    return None, 0
+                remaining = await conn.fetchval(
+                    "SELECT COUNT(*) FROM upload_index WHERE canonical_blob_path = $1",
+                    row["canonical_blob_path"],
+                )
+
+        return self._row_to_record(row), remaining
+
+    @staticmethod
+    async def _lock_content(conn: Connection, content_key: str) -> None:
+        """Serialize changes to one content until the transaction ends."""
+        await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", content_key)
+
+    def _row_to_record(self, row: Record) -> UploadRecord:
+        """Convert a database row to an UploadRecord."""
+        return UploadRecord(
+            blob_path=row["blob_path"],
+            user_id=row["user_id"],
+            content_key=row["content_key"],
+            canonical_blob_path=row["canonical_blob_path"],
+            size_bytes=row["size_bytes"],
+            content_type=row["content_type"],
+            md5_hash=row["md5_hash"],
+            crc32c=row["crc32c"],
+            release_after=row["release_after"],
+            created_at=row["created_at"],
+        )
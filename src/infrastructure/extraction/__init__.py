@@ -0,0 +1,17 @@
+from .converters import CONVERTIBLE_TYPES, ConversionError, convert_document
+from .image_normalizer import IMAGE_NORMALIZE_ENABLED, ImageNormalizer, NormalizedImage, normalize_image
+from .text_extractor import EXTRACTION_ENABLED, TextExtractor, estimate_binary_tokens, estimate_text_tokens
+
+__all__ = [
+    "CONVERTIBLE_TYPES",
+    "ConversionError",
+    "EXTRACTION_ENABLED",
+    "IMAGE_NORMALIZE_ENABLED",
+    "ImageNormalizer",
+    "NormalizedImage",
+    "TextExtractor",
+    "convert_document",
+    "estimate_binary_tokens",
+    "estimate_text_tokens",
+    "normalize_image",
+]
@@ -0,0 +1,109 @@
+"""
+Process-local cache of per-content results, keyed by content hash.
+
+TextExtractor (text-or-binary decisions) and ImageNormalizer (normalized
+images) both cache what they computed for a content under its hash (the
+GCS md5). ContentCache is that cache: an LRU bounded by the size of the
+cached values, with one computation per content in flight and hit/miss
+counters under the owner's metrics prefix.
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+from src.infrastructure.metrics import get_metrics
+
+T = TypeVar("T")
+
+
+class ContentCache(Generic[T]):
+    """LRU of computed results per content hash, bounded by their size."""
+
+    def __init__(self, metrics_prefix: str, max_size: int, size_of: Callable[[T], int]):
+        """
+        Initialize the cache.
+
+        Args:
+            metrics_prefix: Prefix of the cache_hits/cache_misses counters
+            max_size: Bound, in size_of units
+            size_of: Size of a cached value (results larger than max_size are not cached)
+        """
+        self.max_size = max_size
+        self.size_of = size_of
+        self._entries: "OrderedDict[str, T]" = OrderedDict()
+        self._used = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        metrics = get_metrics()
+        self._hits = metrics.counter(f"{metrics_prefix}.cache_hits")
+        self._misses = metrics.counter(f"{metrics_prefix}.cache_misses")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, content_hash: Optional[str]) -> Tuple[bool, Optional[T]]:
+        """
+        Cached result, not counted as a hit (e.g. to skip a download).
+
+        Returns:
+            (found, result)
+        """
+        if not content_hash or content_hash not in self._entries:
+            return False, None
+        self._entries.move_to_end(content_hash)
+        return True, self._entries[content_hash]
+
+    def get(self, content_hash: Optional[str]) -> Tuple[bool, Optional[T]]:
+        """Like peek(), but a found result counts as a hit."""
+        found, result = self.peek(content_hash)
+        if found:
+            self._hits.inc()
+        return found, result
+
+    async def get_or_compute(self, content_hash: Optional[str], compute: Callable[[], Awaitable[T]]) -> T:
+        """
+        Cached result, else compute and cache it.
+
+        Concurrent calls for the same content share one computation; without
+        a content hash the result is computed and not cached. Exceptions
+        from compute propagate and are not cached.
+        """
+        found, result = self.get(content_hash)
+        if found:
+            return result
+        if not content_hash:
+            return await compute()
+
+        task = self._inflight.get(content_hash)
+        if task is None:
+            self._misses.inc()
+            task = asyncio.create_task(compute())
+            self._inflight[content_hash] = task
+            task.add_done_callback(lambda _: self._inflight.pop(content_hash, None))
+            task.add_done_callback(lambda done: self._remember(content_hash, done))
+        return await asyncio.shield(task)
+
+    def _remember(self, content_hash: str, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        size = self.size_of(result)
+        if size > self.max_size:
+            return
+        if content_hash in self._entries:
+            self._used -= self.size_of(self._entries.pop(content_hash))
+        self._entries[content_hash] = result
+        self._used += size
+        while self._used > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._used -= self.size_of(evicted)
+
+    def stats(self) -> dict:
+        """Hit ratio and use, for the owner's /metrics collector."""
+        lookups = self._hits.value + self._misses.value
+        return {
+            "hit_ratio": round(self._hits.value / lookups, 3) if lookups else 0.0,
+            "cache_entries": len(self._entries),
+            "cache_mb": round(self._used / (1024 * 1024), 1),
+        }
@@ -0,0 +1,306 @@
+"""
+Document to text/markdown converters.
+
+`convert_document` is a plain top-level function so it can run in a
+process pool: parsing is CPU-bound and would otherwise hold the event
+loop's GIL. Everything runs locally with the standard library; PDFs need
+PyPDF2 (optional, imported lazily) and are left binary without it.
+
+This is the only document parser in the tree: attachment extraction,
+corpus ingestion and TeamsDocumentService all call convert_document.
+"""
+
+import io
+import csv
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_TYPE = "text/csv"
+HTML_TYPE = "text/html"
+
+# Types with a converter
+CONVERTIBLE_TYPES = (PDF_TYPE, DOCX_TYPE, XLSX_TYPE, CSV_TYPE, HTML_TYPE)
+# Office formats the model cannot read as binary
+OFFICE_TYPES = (DOCX_TYPE, XLSX_TYPE)
+
+# Largest uncompressed XML part read from an Office file (zip bomb guard)
+_MAX_XML_BYTES = 64 * 1024 * 1024
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_S = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_R = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_HEADING_STYLE = re.compile(r"^(?:heading|título|titulo)\s*(\d)$", re.IGNORECASE)
+_CELL_REF = re.compile(r"^([A-Z]+)")
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_BLANK_LINES = re.compile(r"\n\s*\n\s*\n+")
+_SPACES = re.compile(r"[ \t]+")
+
+
+class ConversionError(ValueError):
+    """The document could not be parsed."""
+
+
+def convert_document(data: bytes, content_type: str, max_chars: int) -> Tuple[Optional[str], int]:
+    """
+    Convert a document to text or markdown (process-pool entry point).
+
+    Args:
+        data: Document bytes
+        content_type: MIME type
+        max_chars: Longer output is truncated
+
+    Returns:
+        (text, page count): text is None when the type has no converter
+        (or PyPDF2 is missing for PDFs); the page count is 0 except for PDFs
+
+    Raises:
+        ConversionError: The document is malformed
+    """
+    pages = 0
+    try:
+        if content_type == DOCX_TYPE:
+            text = _docx_to_markdown(data)
+        elif content_type == XLSX_TYPE:
+            text = _xlsx_to_markdown(data)
+        elif content_type == CSV_TYPE:
+            text = _compact_csv(data.decode("utf-8", errors="replace"))
+        elif content_type == HTML_TYPE:
+            text = _html_to_text(data.decode("utf-8", errors="replace"))
+        elif content_type == PDF_TYPE:
+            result = _pdf_to_text(data)
+            if result is None:
+                return None, 0
+            text, pages = result
+        else:
+            return None, 0
+    except (zipfile.BadZipFile, ET.ParseError, KeyError, IndexError, csv.Error) as e:
+        raise ConversionError(f"Could not parse {content_type} document: {e}") from e
+
+    text = _CONTROL.sub("", text).replace("\r\n", "\n")
+    text = _BLANK_LINES.sub("\n\n", text).strip()
+    if len(text) > max_chars:
+        text = text[:max_chars] + "\n\n[... Content truncated due to length ...]"
+    return text, pages
+
+
+# -----------------------------------------------------------------------------
+# Office Open XML
+# -----------------------------------------------------------------------------
+
+def _read_xml(archive: zipfile.ZipFile, name: str) -> Optional[ET.Element]:
+    try:
+        info = archive.getinfo(name)
+    except KeyError:
+        return None
+    if info.file_size > _MAX_XML_BYTES:
+        raise ConversionError(f"{name} is too large to convert ({info.file_size} bytes)")
+    return ET.fromstring(archive.read(info))
+
+
+def _markdown_table(rows: List[List[str]]) -> str:
+    width = max(len(row) for row in rows)
+    lines = []
+    for index, row in enumerate(rows):
+        cells = [cell.replace("|", "\\|").replace("\n", " ") for cell in row] + [""] * (width - len(row))
+        lines.append("| " + " | ".join(cells) + " |")
+        if index == 0:
+            lines.append("|" + "---|" * width)
+    return "\n".join(lines)
+
+
+def _docx_paragraph_text(paragraph: ET.Element) -> str:
+    pieces = []
+    for node in paragraph.iter():
+        if node.tag == f"{_W}t":
+            pieces.append(node.text or "")
+        elif node.tag == f"{_W}tab":
+            pieces.append("\t")
+        elif node.tag in (f"{_W}br", f"{_W}cr"):
+            pieces.append("\n")
+    return "".join(pieces).strip()
+
+
+def _docx_paragraph(paragraph: ET.Element) -> str:
+    text = _docx_paragraph_text(paragraph)
+    if not text:
+        return ""
+    properties = paragraph.find(f"{_W}pPr")
+    if properties is not None:
+        style = properties.find(f"{_W}pStyle")
+        style_name = style.get(f"{_W}val", "") if style is not None else ""
+        if style_name.lower() == "title":
+            return f"# {text}"
+        heading = _HEADING_STYLE.match(style_name)
+        if heading:
+            return f"{'#' * min(int(heading.group(1)) + 1, 6)} {text}"
+        if properties.find(f"{_W}numPr") is not None:
+            return f"- {text}"
+    return text
+
+
+def _docx_to_markdown(data: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        root = _read_xml(archive, "word/document.xml")
+    if root is None:
+        raise ConversionError("word/document.xml is missing")
+    body = root.find(f"{_W}body")
+    blocks = []
+    for element in body if body is not None else []:
+        if element.tag == f"{_W}p":
+            blocks.append(_docx_paragraph(element))
+        elif element.tag == f"{_W}tbl":
+            rows = [
+                [" ".join(filter(None, (_docx_paragraph_text(p) for p in cell.iter(f"{_W}p")))) for cell in row.findall(f"{_W}tc")]
+                for row in element.findall(f"{_W}tr")
+            ]
+            rows = [row for row in rows if any(row)]
+            if rows:
+                blocks.append(_markdown_table(rows))
+    return "\n\n".join(block for block in blocks if block)
+
+
+def _column_index(cell_ref: str) -> int:
+    match = _CELL_REF.match(cell_ref)
+    index = 0
+    for letter in match.group(1) if match else "":
+        index = index * 26 + (ord(letter) - ord("A") + 1)
+    return index - 1
+
+
+def _xlsx_cell_value(cell: ET.Element, shared_strings: List[str]) -> str:
+    cell_type = cell.get("t")
+    if cell_type == "inlineStr":
+        return "".join(node.text or "" for node in cell.iter(f"{_S}t"))
+    value = cell.find(f"{_S}v")
+    if value is None or value.text is None:
+        return ""
+    if cell_type == "s":
+        return shared_strings[int(value.text)]
+    if cell_type == "b":
+        return "TRUE" if value.text == "1" else "FALSE"
+    return value.text
+
+
+def _xlsx_to_markdown(data: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        workbook = _read_xml(archive, "xl/workbook.xml")
+        if workbook is None:
+            raise ConversionError("xl/workbook.xml is missing")
+        relationships = _read_xml(archive, "xl/_rels/workbook.xml.rels")
+        targets = {
+            rel.get("Id"): rel.get("Target", "")
+            for rel in (relationships.findall(f"{_PACKAGE_R}Relationship") if relationships is not None else [])
+        }
+        strings_root = _read_xml(archive, "xl/sharedStrings.xml")
+        shared_strings = [
+            "".join(node.text or "" for node in item.iter(f"{_S}t"))
+            for item in (strings_root.findall(f"{_S}si") if strings_root is not None else [])
+        ]
+
+        blocks = []
+        sheets = workbook.find(f"{_S}sheets")
+        for sheet in sheets if sheets is not None else []:
+            target = targets.get(sheet.get(f"{_R}id"), "")
+            path = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+            root = _read_xml(archive, path) if target else None
+            if root is None:
+                continue
+            rows = []
+            for row in root.iter(f"{_S}row"):
+                values: List[str] = []
+                for cell in row.findall(f"{_S}c"):
+                    column = _column_index(cell.get("r", "")) if cell.get("r") else len(values)
+                    values.extend([""] * (column - len(values)))
+                    values.append(_xlsx_cell_value(cell, shared_strings).strip())
+                while values and not values[-1]:
+                    values.pop()
+                if values:
+                    rows.append(values)
+            if rows:
+                blocks.append(f"## {sheet.get('name', 'Sheet')}\n\n{_markdown_table(rows)}")
+    return "\n\n".join(blocks)
+
+
+# -----------------------------------------------------------------------------
+# Text formats
+# -----------------------------------------------------------------------------
+
+def _compact_csv(text: str) -> str:
+    """Drop empty rows and trailing empty cells (common in spreadsheet exports)."""
+    try:
+        dialect = csv.Sniffer().sniff(text[:8192], delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    output = io.StringIO()
+    writer = csv.writer(output, delimiter=dialect.delimiter, lineterminator="\n")
+    for row in csv.reader(io.StringIO(text), dialect):
+        row = [cell.strip() for cell in row]
+        while row and not row[-1]:
+            row.pop()
+        if row:
+            writer.writerow(row)
+    return output.getvalue()
+
+
+class _HTMLText(HTMLParser):
+    """Visible text of an HTML page with headings, list items and line breaks kept."""
+
+    _SKIP = {"script", "style", "noscript", "template", "svg"}
+    _BLOCK = {"p", "div", "section", "article", "header", "footer", "br", "tr", "table", "ul", "ol", "li",
+              "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pieces: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip_depth += 1
+        elif tag in self._BLOCK:
+            self.pieces.append("\n")
+            if tag[0] == "h" and tag[1:].isdigit():
+                self.pieces.append("#" * int(tag[1:]) + " ")
+            elif tag == "li":
+                self.pieces.append("- ")
+        elif tag in ("td", "th"):
+            self.pieces.append(" | ")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in self._BLOCK:
+            self.pieces.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.pieces.append(_SPACES.sub(" ", data))
+
+
+def _html_to_text(text: str) -> str:
+    parser = _HTMLText()
+    parser.feed(text)
+    parser.close()
+    lines = (line.strip() for line in "".join(parser.pieces).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _pdf_to_text(data: bytes) -> Optional[Tuple[str, int]]:
+    try:
+        import PyPDF2
+    except ImportError:
+        return None
+    try:
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        pages = [page.extract_text() or "" for page in reader.pages]
+    except Exception as e:
+        raise ConversionError(f"Could not parse PDF: {e}") from e
+    return "\n\n".join(pages), len(pages)
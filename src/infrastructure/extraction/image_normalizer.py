@@ -0,0 +1,200 @@
+"""
+Image attachment normalization before model submission.
+
+Phone photos and scans arrive as multi-megabyte JPEG/PNG files, far larger
+than the model needs: Gemini bills an image by 768px tiles, so pixels
+beyond IMAGE_MAX_DIMENSION add latency and tokens. ImageNormalizer, with
+Pillow on a small thread pool (decoding, resizing and encoding release the
+GIL, and threads avoid copying the bytes to another process):
+
+1. Applies the EXIF orientation, then drops all metadata (EXIF, GPS, ICC)
+2. Downscales so the longer side is at most IMAGE_MAX_DIMENSION (JPEGs are
+   decoded directly at a reduced scale)
+3. Re-encodes opaque images as JPEG and images with transparency as WebP
+
+The result is used only when smaller than the original. It is cached per
+content hash (the GCS md5), so later turns skip both the work and the
+download. Animated images and small images already within the limit are
+left as they are.
+"""
+
+import os
+import io
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from src.infrastructure.metrics import get_metrics
+from .content_cache import ContentCache
+
+logger = logging.getLogger(__name__)
+
+IMAGE_NORMALIZE_ENABLED = os.getenv("IMAGE_NORMALIZE_ENABLED", "true").lower() == "true"
+# Longer side of normalized images, in pixels
+IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", "1536"))
+# Re-encoding quality (JPEG and WebP)
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+# Images within the dimension limit and below this size are left as they are
+IMAGE_NORMALIZE_MIN_KB = float(os.getenv("IMAGE_NORMALIZE_MIN_KB", "200"))
+# Worker threads for normalization
+IMAGE_NORMALIZE_WORKERS = int(os.getenv("IMAGE_NORMALIZE_WORKERS", "2"))
+# Cached normalized images (process-local)
+IMAGE_CACHE_MB = float(os.getenv("IMAGE_CACHE_MB", "64"))
+
+NORMALIZABLE_TYPES = ("image/jpeg", "image/png", "image/webp", "image/gif")
+
+# Cached "keep the original" decisions count as this many bytes
+_DECISION_BYTES = 64
+
+
+@dataclass
+class NormalizedImage:
+    """Re-encoded image bytes and their MIME type."""
+    data: bytes
+    mime_type: str
+
+
+def normalize_image(
+    data: bytes,
+    max_dimension: int,
+    quality: int,
+    min_bytes: int,
+) -> Optional[NormalizedImage]:
+    """
+    Downscale, strip and re-encode an image.
+
+    Returns:
+        NormalizedImage, or None when the original should be sent as is
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        if getattr(image, "n_frames", 1) > 1:
+            return None
+        if max(image.size) <= max_dimension and len(data) <= min_bytes:
+            return None
+
+        # Decode JPEGs at the smallest DCT scale still above the target
+        if image.format == "JPEG":
+            image.draft("RGB", (max_dimension, max_dimension))
+        image.load()
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+        output = io.BytesIO()
+        # Saved without exif/icc_profile/info: metadata is dropped
+        if has_alpha:
+            image.convert("RGBA").save(output, format="WEBP", quality=quality, method=4)
+            mime_type = "image/webp"
+        else:
+            image.convert("RGB").save(output, format="JPEG", quality=quality, optimize=True)
+            mime_type = "image/jpeg"
+
+    normalized = output.getvalue()
+    if len(normalized) >= len(data):
+        return None
+    return NormalizedImage(data=normalized, mime_type=mime_type)
+
+
+class ImageNormalizer:
+    """Normalizes image attachments on a thread pool and caches the results."""
+
+    def __init__(
+        self,
+        max_dimension: int = IMAGE_MAX_DIMENSION,
+        quality: int = IMAGE_QUALITY,
+        min_bytes: int = int(IMAGE_NORMALIZE_MIN_KB * 1024),
+        workers: int = IMAGE_NORMALIZE_WORKERS,
+        cache_bytes: int = int(IMAGE_CACHE_MB * 1024 * 1024),
+    ):
+        """
+        Initialize the normalizer.
+
+        Args:
+            max_dimension: Longer side of normalized images
+            quality: JPEG/WebP quality
+            min_bytes: Smaller images within the dimension limit are left as they are
+            workers: Worker threads
+            cache_bytes: Cache bound
+        """
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.min_bytes = min_bytes
+        self.cache_bytes = cache_bytes
+        self._executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="image-normalize")
+        # content hash -> normalized image (None: send the original), bounded by bytes
+        self._cache: ContentCache[Optional[NormalizedImage]] = ContentCache(
+            "image_normalize", cache_bytes, lambda image: len(image.data) if image is not None else _DECISION_BYTES
+        )
+
+        metrics = get_metrics()
+        self._normalized = metrics.counter("image_normalize.normalized")
+        self._kept = metrics.counter("image_normalize.kept_original")
+        self._failures = metrics.counter("image_normalize.failures")
+        self._bytes_saved = metrics.counter("image_normalize.bytes_saved")
+        metrics.register_collector("image_normalize", self.stats)
+
+    @staticmethod
+    def handles(content_type: Optional[str]) -> bool:
+        """Whether the type is normalized."""
+        return content_type in NORMALIZABLE_TYPES
+
+    def cached(self, content_hash: Optional[str]) -> Tuple[bool, Optional[NormalizedImage]]:
+        """
+        Cached result for a content, e.g. to skip its download.
+
+        Not counted as a cache hit: normalize() counts the lookup.
+
+        Returns:
+            (found, image): image is None when the original is sent
+        """
+        return self._cache.peek(content_hash)
+
+    async def normalize(
+        self, content_hash: Optional[str], data: Optional[bytes], content_type: str
+    ) -> Optional[NormalizedImage]:
+        """
+        Normalized image to send instead of the original, or None to send the original.
+
+        data may be None when the content's image is cached (it was not
+        downloaded). Failures (e.g. undecodable images) fall back to the
+        original; they never raise.
+        """
+        if not self.handles(content_type):
+            return None
+        if data is None:
+            return self._cache.get(content_hash)[1]
+        return await self._cache.get_or_compute(content_hash, lambda: self._normalize(data, content_type))
+
+    async def _normalize(self, data: bytes, content_type: str) -> Optional[NormalizedImage]:
+        try:
+            image = await asyncio.get_running_loop().run_in_executor(
+                self._executor, normalize_image, data, self.max_dimension, self.quality, self.min_bytes
+            )
+        except Exception as e:
+            self._failures.inc()
+            logger.warning(f"⚠️ Image normalization failed for {content_type} (sending original): {type(e).__name__}: {e}")
+            return None
+        if image is None:
+            self._kept.inc()
+            return None
+        self._normalized.inc()
+        self._bytes_saved.inc(len(data) - len(image.data))
+        logger.info(f"🖼️ Normalized {content_type} image: {len(data)} -> {len(image.data)} bytes ({image.mime_type})")
+        return image
+
+    def stats(self) -> dict:
+        """Results and cache use, for /metrics."""
+        return {
+            **self._cache.stats(),
+            "normalized": self._normalized.value,
+            "kept_original": self._kept.value,
+            "saved_mb": round(self._bytes_saved.value / (1024 * 1024), 1),
+        }
+
+    async def close(self) -> None:
+        """Shut down the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,182 @@
+"""
+Local text extraction for attachments, with cached results.
+
+Office files, CSV and HTML (and PDFs whose pages are mostly text) are
+often much cheaper for the model as extracted text than as raw bytes.
+TextExtractor converts them on a process pool (see converters) and sends
+the text only when its estimated tokens are not above the binary's:
+
+- DOCX/XLSX: always text (the model does not read them as binary)
+- CSV/HTML: text when no larger than the raw bytes (markup and empty cells
+  are dropped)
+- PDF: text when every page averages EXTRACTION_PDF_MIN_CHARS_PER_PAGE
+  characters (scanned or figure-heavy PDFs stay binary) and the text costs
+  fewer tokens than EXTRACTION_PDF_PAGE_TOKENS per page
+
+The decision (text, or None for binary) is cached per content hash (the
+GCS md5), so later turns skip both the conversion and, for text, the
+download.
+"""
+
+import os
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from src.infrastructure.metrics import get_metrics
+from .content_cache import ContentCache
+from .converters import CONVERTIBLE_TYPES, OFFICE_TYPES, PDF_TYPE, convert_document
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_ENABLED = os.getenv("EXTRACTION_ENABLED", "true").lower() == "true"
+# Worker processes for conversions (0 = a thread, for environments without fork)
+EXTRACTION_PROCESS_WORKERS = int(os.getenv("EXTRACTION_PROCESS_WORKERS", "2"))
+# Conversions slower than this fall back to binary
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "20"))
+# Longer extracted text is truncated
+EXTRACTION_MAX_CHARS = int(os.getenv("EXTRACTION_MAX_CHARS", "1000000"))
+# Cached extracted text (process-local)
+EXTRACTION_CACHE_MB = float(os.getenv("EXTRACTION_CACHE_MB", "64"))
+# PDFs with fewer extracted characters per page are scanned or visual: keep binary
+EXTRACTION_PDF_MIN_CHARS_PER_PAGE = int(os.getenv("EXTRACTION_PDF_MIN_CHARS_PER_PAGE", "400"))
+# Model tokens per PDF page sent as binary
+EXTRACTION_PDF_PAGE_TOKENS = int(os.getenv("EXTRACTION_PDF_PAGE_TOKENS", "258"))
+
+# ~4 characters per token of text
+_CHARS_PER_TOKEN = 4
+# Cached "send binary" decisions count as this many characters
+_DECISION_CHARS = 64
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Approximate model tokens of text."""
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def estimate_binary_tokens(content_type: str, size_bytes: int, pages: int = 0) -> Optional[int]:
+    """Approximate model tokens of a document sent as bytes (None: the model cannot read it)."""
+    if content_type in OFFICE_TYPES:
+        return None
+    if content_type == PDF_TYPE:
+        return max(pages, 1) * EXTRACTION_PDF_PAGE_TOKENS
+    return size_bytes // _CHARS_PER_TOKEN + 1
+
+
+class TextExtractor:
+    """Converts attachments to text on a process pool and caches the text-or-binary decision."""
+
+    def __init__(
+        self,
+        process_workers: int = EXTRACTION_PROCESS_WORKERS,
+        timeout_seconds: float = EXTRACTION_TIMEOUT_SECONDS,
+        max_chars: int = EXTRACTION_MAX_CHARS,
+        cache_chars: int = int(EXTRACTION_CACHE_MB * 1024 * 1024),
+    ):
+        """
+        Initialize the extractor (the pool starts on first use).
+
+        Args:
+            process_workers: Worker processes (0 runs conversions on a thread)
+            timeout_seconds: Slower conversions fall back to binary
+            max_chars: Longer extracted text is truncated
+            cache_chars: Cache bound, in characters of text
+        """
+        self.process_workers = process_workers
+        self.timeout_seconds = timeout_seconds
+        self.max_chars = max_chars
+        self.cache_chars = cache_chars
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # content hash -> text (None: send binary), bounded by characters
+        self._cache: ContentCache[Optional[str]] = ContentCache(
+            "extraction", cache_chars, lambda text: len(text) if text is not None else _DECISION_CHARS
+        )
+
+        metrics = get_metrics()
+        self._text_chosen = metrics.counter("extraction.text_chosen")
+        self._binary_chosen = metrics.counter("extraction.binary_chosen")
+        self._failures = metrics.counter("extraction.failures")
+        self._tokens_saved = metrics.counter("extraction.tokens_saved")
+        metrics.register_collector("extraction", self.stats)
+
+    @staticmethod
+    def handles(content_type: Optional[str]) -> bool:
+        """Whether the type has a converter."""
+        return content_type in CONVERTIBLE_TYPES
+
+    def cached(self, content_hash: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Cached decision for a content, e.g. to skip its download.
+
+        Not counted as a cache hit: extract() counts the lookup.
+
+        Returns:
+            (found, text): text is None when the content is sent as binary
+        """
+        return self._cache.peek(content_hash)
+
+    async def extract(self, content_hash: Optional[str], data: Optional[bytes], content_type: str) -> Optional[str]:
+        """
+        Text to send instead of the document's bytes, or None to send the bytes.
+
+        data may be None when the content's text is cached (it was not
+        downloaded). Conversion failures and timeouts fall back to binary;
+        they never raise.
+        """
+        if not self.handles(content_type):
+            return None
+        if data is None:
+            return self._cache.get(content_hash)[1]
+        return await self._cache.get_or_compute(content_hash, lambda: self._convert(data, content_type))
+
+    async def _convert(self, data: bytes, content_type: str) -> Optional[str]:
+        try:
+            if self.process_workers <= 0:
+                call = asyncio.to_thread(convert_document, data, content_type, self.max_chars)
+            else:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.process_workers)
+                call = asyncio.get_running_loop().run_in_executor(
+                    self._pool, convert_document, data, content_type, self.max_chars
+                )
+            text, pages = await asyncio.wait_for(call, self.timeout_seconds)
+        except Exception as e:
+            # TimeoutError included: the worker finishes on its own
+            self._failures.inc()
+            logger.warning(f"⚠️ Text extraction failed for {content_type} (sending binary): {type(e).__name__}: {e}")
+            return None
+        return self._choose(content_type, len(data), text, pages)
+
+    def _choose(self, content_type: str, size_bytes: int, text: Optional[str], pages: int) -> Optional[str]:
+        if not text:
+            self._binary_chosen.inc()
+            return None
+        if content_type == PDF_TYPE and len(text) < EXTRACTION_PDF_MIN_CHARS_PER_PAGE * max(pages, 1):
+            self._binary_chosen.inc()
+            return None
+        text_tokens = estimate_text_tokens(text)
+        binary_tokens = estimate_binary_tokens(content_type, size_bytes, pages)
+        if binary_tokens is not None and text_tokens > binary_tokens:
+            self._binary_chosen.inc()
+            return None
+        self._text_chosen.inc()
+        if binary_tokens is not None:
+            self._tokens_saved.inc(binary_tokens - text_tokens)
+        logger.info(f"📝 Extracted {content_type} as text (~{text_tokens} tokens, binary ~{binary_tokens})")
+        return text
+
+    def stats(self) -> dict:
+        """Decisions and cache use, for /metrics."""
+        return {
+            **self._cache.stats(),
+            "text_chosen": self._text_chosen.value,
+            "binary_chosen": self._binary_chosen.value,
+            "failures": self._failures.value,
+        }
+
+    async def close(self) -> None:
+        """Shut down the process pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,11 @@
+from .chunking import extract_and_chunk, UnsupportedDocumentError
+from .sources import GCSDocumentSource, LocalDocumentSource
+from .sinks import create_chunk_sink
+
+__all__ = [
+    "extract_and_chunk",
+    "UnsupportedDocumentError",
+    "GCSDocumentSource",
+    "LocalDocumentSource",
+    "create_chunk_sink",
+]
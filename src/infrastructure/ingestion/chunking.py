@@ -0,0 +1,106 @@
+"""
+Text extraction and chunking for corpus ingestion.
+
+`extract_and_chunk` is a plain top-level function so it can run in a
+process pool: PDF/DOCX parsing and chunking are CPU-bound and would
+otherwise hold the event loop's GIL. Documents other than plain text are
+parsed by the shared converters in src.infrastructure.extraction.
+"""
+
+import re
+import sys
+from typing import Optional
+
+from src.infrastructure.extraction.converters import (
+    CONVERTIBLE_TYPES,
+    DOCX_TYPE,
+    HTML_TYPE,
+    PDF_TYPE,
+    XLSX_TYPE,
+    convert_document,
+)
+
+# Content types read as text directly
+TEXT_TYPES = ("text/plain", "text/markdown", "text/csv")
+
+EXTENSION_TYPES = {
+    ".txt": "text/plain",
+    ".md": "text/markdown",
+    ".csv": "text/csv",
+    ".html": HTML_TYPE,
+    ".htm": HTML_TYPE,
+    ".pdf": PDF_TYPE,
+    ".docx": DOCX_TYPE,
+    ".xlsx": XLSX_TYPE,
+}
+
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_BLANK_LINES = re.compile(r"\n\s*\n\s*\n+")
+_WORD = re.compile(r"\S+")
+
+
+class UnsupportedDocumentError(ValueError):
+    """The document's type cannot be extracted."""
+
+
+def guess_content_type(file_name: str, content_type: Optional[str] = None) -> Optional[str]:
+    """Content type from the source, else from the file extension."""
+    if content_type and content_type != "application/octet-stream":
+        return content_type.split(";")[0].strip()
+    suffix = file_name[file_name.rfind("."):].lower() if "." in file_name else ""
+    return EXTENSION_TYPES.get(suffix)
+
+
+def extract_text(content: bytes, content_type: Optional[str], file_name: str) -> str:
+    """
+    Extract plain text from a document.
+
+    Raises:
+        UnsupportedDocumentError: The type is not supported (or PyPDF2 is
+            missing for PDFs)
+        ConversionError: The document is malformed
+    """
+    content_type = guess_content_type(file_name, content_type)
+
+    if content_type in TEXT_TYPES:
+        text = content.decode("utf-8", errors="replace")
+        text = _CONTROL.sub("", text).replace("\r\n", "\n")
+        return _BLANK_LINES.sub("\n\n", text).strip()
+
+    if content_type not in CONVERTIBLE_TYPES:
+        raise UnsupportedDocumentError(f"Unsupported content type {content_type!r} for {file_name}")
+    text, _ = convert_document(content, content_type, sys.maxsize)
+    if text is None:
+        raise UnsupportedDocumentError(f"PyPDF2 is not installed; cannot extract {file_name}")
+    return text
+
+
+def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
+    """
+    Split text into overlapping windows of words.
+
+    chunk_size and chunk_overlap are counted in words (close to tokens
+    for Spanish and English). Line breaks inside a chunk are kept.
+    """
+    spans = [match.span() for match in _WORD.finditer(text)]
+    if not spans:
+        return []
+    step = max(chunk_size - min(chunk_overlap, chunk_size - 1), 1)
+    chunks = []
+    for start in range(0, len(spans), step):
+        window = spans[start:start + chunk_size]
+        chunks.append(text[window[0][0]:window[-1][1]])
+        if start + chunk_size >= len(spans):
+            break
+    return chunks
+
+
+def extract_and_chunk(
+    content: bytes,
+    content_type: Optional[str],
+    file_name: str,
+    chunk_size: int,
+    chunk_overlap: int,
+) -> list[str]:
+    """Extract a document's text and split it into chunks (process-pool entry point)."""
+    return chunk_text(extract_text(content, content_type, file_name), chunk_size, chunk_overlap)
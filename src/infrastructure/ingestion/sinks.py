@@ -0,0 +1,182 @@
+"""
+Chunk sinks: where ingested documents are indexed.
+
+- NumpyChunkSink / PgVectorChunkSink embed chunk texts with the corpus's
+  embedder (the same one LocalVectorBackend embeds queries with) and
+  replace the changed sources' rows.
+- VertexRagChunkSink imports changed GCS files into the Vertex RAG corpus,
+  which chunks and embeds them itself.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Any
+
+import numpy as np
+
+from src.domain.models import CorpusConfig
+from src.domain.models.ingestion_models import ChunkedDocument
+from src.domain.ports.chunk_sink import ChunkSink
+from src.infrastructure.tools.rag_clients import RAGClients
+from src.infrastructure.vector.local_backend import (
+    LOCAL_VECTOR_ANN_MIN_VECTORS,
+    LocalVectorBackend,
+    numpy_corpus_path,
+)
+from src.infrastructure.vector.numpy_store import MANIFEST_FILE, NumpyVectorStore
+
+logger = logging.getLogger(__name__)
+
+# Vertex RAG import accepts at most 25 GCS paths per request
+VERTEX_IMPORT_BATCH_SIZE = 25
+
+
+def chunk_records(document: ChunkedDocument) -> list[dict[str, Any]]:
+    """Chunk rows for a document; ids are stable for the same source and position."""
+    prefix = hashlib.sha1(document.source.uri.encode()).hexdigest()[:16]
+    return [
+        {
+            "chunk_id": f"{prefix}-{index:05d}",
+            "text": text,
+            "source_uri": document.source.uri,
+            "metadata": {"chunk_index": index, "fingerprint": document.source.fingerprint},
+        }
+        for index, text in enumerate(document.chunks)
+    ]
+
+
+class NumpyChunkSink(ChunkSink):
+    """Rewrites a numpy corpus directory with the changed sources replaced."""
+
+    # Serializes writers of the same directory within the process
+    _locks: dict[str, threading.Lock] = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, backend: LocalVectorBackend):
+        self.backend = backend
+
+    async def apply(self, corpus: CorpusConfig, upserts: list[ChunkedDocument], deletions: list[str]) -> None:
+        if not upserts and not deletions:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.backend.executor, self._apply, corpus, upserts, deletions)
+
+    def _apply(self, corpus: CorpusConfig, upserts: list[ChunkedDocument], deletions: list[str]) -> None:
+        path = numpy_corpus_path(corpus)
+        embedder = self.backend.get_embedder(corpus)
+        records = [record for document in upserts for record in chunk_records(document)]
+        embeddings = embedder.embed_documents([record["text"] for record in records])
+
+        with self._lock_for(str(path)):
+            replaced = {document.source.uri for document in upserts} | set(deletions)
+            if (path / MANIFEST_FILE).exists():
+                existing = NumpyVectorStore.open(path)
+                keep = [i for i, chunk in enumerate(existing.chunks) if chunk.get("source_uri") not in replaced]
+                chunks = [existing.chunks[i] for i in keep] + records
+                vectors = np.concatenate([np.asarray(existing.vectors[keep]), embeddings]) if keep else embeddings
+            else:
+                chunks, vectors = records, embeddings
+            if not chunks:
+                vectors = np.zeros((0, embedder.dimension), dtype=np.float32)
+
+            NumpyVectorStore.write(path, vectors, chunks, embedder.name)
+            if LOCAL_VECTOR_ANN_MIN_VECTORS and len(chunks) >= LOCAL_VECTOR_ANN_MIN_VECTORS:
+                NumpyVectorStore.open(path).build_ivf()
+
+    @classmethod
+    def _lock_for(cls, path: str) -> threading.Lock:
+        with cls._locks_guard:
+            return cls._locks.setdefault(path, threading.Lock())
+
+
+class PgVectorChunkSink(ChunkSink):
+    """Replaces the changed sources' rows in corpus_chunks."""
+
+    def __init__(self, backend: LocalVectorBackend):
+        self.backend = backend
+
+    async def apply(self, corpus: CorpusConfig, upserts: list[ChunkedDocument], deletions: list[str]) -> None:
+        store = await self.backend.check_pg_dimension(corpus)
+        for uri in deletions:
+            await store.delete_source(corpus.corpus_id, uri)
+
+        embedder = self.backend.get_embedder(corpus)
+        loop = asyncio.get_running_loop()
+        for document in upserts:
+            records = chunk_records(document)
+            embeddings = await loop.run_in_executor(
+                self.backend.executor, embedder.embed_documents, [record["text"] for record in records]
+            )
+            # Drop chunks beyond the new count (the document got shorter)
+            await store.delete_source(corpus.corpus_id, document.source.uri)
+            if records:
+                await store.upsert_chunks(corpus.corpus_id, records, embeddings)
+
+
+class VertexRagChunkSink(ChunkSink):
+    """Imports changed GCS files into a Vertex RAG corpus."""
+
+    needs_chunks = False
+
+    def __init__(self, clients: RAGClients):
+        self.clients = clients
+
+    async def apply(self, corpus: CorpusConfig, upserts: list[ChunkedDocument], deletions: list[str]) -> None:
+        if not self.clients.ensure_vertexai():
+            raise RuntimeError("Vertex AI is not initialized (GOOGLE_CLOUD_PROJECT not set?)")
+        paths = [document.source.uri for document in upserts if document.source.uri.startswith("gs://")]
+        loop = asyncio.get_running_loop()
+        if deletions:
+            await loop.run_in_executor(self.clients.executor, self._delete_files, corpus, set(deletions))
+        for start in range(0, len(paths), VERTEX_IMPORT_BATCH_SIZE):
+            await loop.run_in_executor(
+                self.clients.executor, self._import_files, corpus, paths[start:start + VERTEX_IMPORT_BATCH_SIZE]
+            )
+
+    @staticmethod
+    def _import_files(corpus: CorpusConfig, paths: list[str]) -> None:
+        from vertexai.preview import rag
+
+        response = rag.import_files(
+            corpus.vertex_corpus_name,
+            paths,
+            transformation_config=rag.TransformationConfig(
+                chunking_config=rag.ChunkingConfig(
+                    chunk_size=corpus.chunk_size,
+                    chunk_overlap=corpus.chunk_overlap,
+                ),
+            ),
+        )
+        logger.info(
+            f"📥 Imported {getattr(response, 'imported_rag_files_count', len(paths))} files "
+            f"into {corpus.corpus_name}"
+        )
+
+    @staticmethod
+    def _delete_files(corpus: CorpusConfig, uris: set[str]) -> None:
+        from vertexai.preview import rag
+
+        # RagFile does not expose its source URI; imported files are named after it
+        names = {uri.rstrip("/").split("/")[-1] for uri in uris}
+        for rag_file in rag.list_files(corpus.vertex_corpus_name):
+            if rag_file.display_name in names:
+                rag.delete_file(rag_file.name)
+                logger.info(f"🗑️ Deleted {rag_file.display_name} from {corpus.corpus_name}")
+
+
+def create_chunk_sink(corpus: CorpusConfig, clients: RAGClients) -> ChunkSink:
+    """
+    The sink for a corpus's vector_db_type.
+
+    Raises:
+        ValueError: The type has no ingestion support
+    """
+    if corpus.vector_db_type == "numpy":
+        return NumpyChunkSink(clients.local_vectors)
+    if corpus.vector_db_type == "pgvector":
+        return PgVectorChunkSink(clients.local_vectors)
+    if corpus.vector_db_type == "vertex_rag":
+        return VertexRagChunkSink(clients)
+    raise ValueError(f"Ingestion into '{corpus.vector_db_type}' corpuses is not supported")
@@ -0,0 +1,127 @@
+"""
+In-process counters and gauges for caches and pools.
+
+Components register named counters/gauges, or a collector callable that
+returns a stats dict, and `GET /metrics` (superadmins only) returns a
+snapshot of all of them. Values are per instance and reset on restart.
+
+Usage:
+    from src.infrastructure.metrics import get_metrics
+
+    hits = get_metrics().counter("rag_cache.hits")
+    hits.inc()
+    get_metrics().register_collector("rag_cache", cache.stats)
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Counter:
+    """Monotonic counter (thread-safe: RAG queries run on worker threads)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Gauge:
+    """Current value with its high-water mark."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._value = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+            self._max = max(self._max, value)
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+            self._max = max(self._max, self._value)
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+
+class MetricsRegistry:
+    """Named counters, gauges and stats collectors."""
+
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+        self._gauges: Dict[str, Gauge] = {}
+        self._collectors: Dict[str, Callable[[], dict]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str) -> Counter:
+        """Get or create a counter."""
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter(name)
+            return self._counters[name]
+
+    def gauge(self, name: str) -> Gauge:
+        """Get or create a gauge."""
+        with self._lock:
+            if name not in self._gauges:
+                self._gauges[name] = Gauge(name)
+            return self._gauges[name]
+
+    def register_collector(self, name: str, collector: Callable[[], dict]) -> None:
+        """Register a callable whose stats dict is included in snapshots (replaces any previous one)."""
+        self._collectors[name] = collector
+
+    def snapshot(self) -> dict:
+        """Current values of all metrics."""
+        collected = {}
+        for name, collector in list(self._collectors.items()):
+            try:
+                collected[name] = collector()
+            except Exception as e:
+                logger.error(f"❌ Metrics collector {name} failed: {e}")
+                collected[name] = {"error": str(e)}
+
+        return {
+            "counters": {name: c.value for name, c in sorted(self._counters.items())},
+            "gauges": {
+                name: {"value": g.value, "max": g.max}
+                for name, g in sorted(self._gauges.items())
+            },
+            "collectors": collected,
+        }
+
+
+_metrics: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get or create the metrics registry singleton."""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+    return _metrics
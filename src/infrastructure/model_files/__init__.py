@@ -0,0 +1,50 @@
+"""
+Model file stores, chosen with MODEL_FILES_BACKEND:
+
+- "gcs" (default): content-addressed objects in the documents bucket,
+  referenced by gs:// URI (Vertex AI)
+- "gemini": Gemini Files API (Developer API models only; files expire after 48h)
+- "local": in-memory stand-in (development and tests; the model cannot read it)
+- "off": attachments are always sent inline
+"""
+
+import os
+from typing import Optional
+
+from src.domain.ports.document_storage import DocumentStorage
+from src.domain.ports.model_file_store import ModelFileStore
+from .gcs_file_store import GCSModelFileStore
+from .local_file_store import LocalModelFileStore
+from .model_file_cache import ModelFileCache
+
+# "gcs", "gemini", "local" or "off"
+MODEL_FILES_BACKEND = os.getenv("MODEL_FILES_BACKEND", "gcs").lower()
+
+
+def create_model_file_store(storage: DocumentStorage, backend: str = MODEL_FILES_BACKEND) -> Optional[ModelFileStore]:
+    """
+    Create the configured ModelFileStore (None when disabled).
+
+    Raises:
+        ValueError: Unknown backend
+    """
+    if backend == "off":
+        return None
+    if backend == "gcs":
+        return GCSModelFileStore(storage)
+    if backend == "gemini":
+        # Imported here: only this backend needs a Developer API client
+        from .gemini_file_store import GeminiFileStore
+        return GeminiFileStore()
+    if backend == "local":
+        return LocalModelFileStore()
+    raise ValueError(f"Unknown MODEL_FILES_BACKEND '{backend}' (use gcs, gemini, local or off)")
+
+
+__all__ = [
+    "GCSModelFileStore",
+    "LocalModelFileStore",
+    "ModelFileCache",
+    "create_model_file_store",
+    "MODEL_FILES_BACKEND",
+]
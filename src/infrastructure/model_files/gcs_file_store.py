@@ -0,0 +1,50 @@
+"""
+Model file store on GCS, for Vertex AI.
+
+Vertex AI reads file_data parts straight from gs:// URIs, so "uploading
+to the model" means writing the document once under a content-addressed
+name in the documents bucket. The Vertex AI service agent needs read
+access to the bucket. Objects do not expire (add a bucket lifecycle rule
+on the prefix to bound them).
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timezone
+
+from src.domain.models.model_file import ModelFileRef
+from src.domain.ports.document_storage import DocumentStorage
+from src.domain.ports.model_file_store import ModelFileStore
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILES_PREFIX = "model-files/"
+
+
+class GCSModelFileStore(ModelFileStore):
+    """Documents as content-addressed objects in the documents bucket."""
+
+    name = "gcs"
+
+    def __init__(self, storage: DocumentStorage, prefix: str = MODEL_FILES_PREFIX):
+        """
+        Initialize the store.
+
+        Args:
+            storage: Document storage of the bucket to write to
+            prefix: Object name prefix
+        """
+        self.storage = storage
+        self.prefix = prefix
+
+    async def upload(self, content_hash: str, data: bytes, mime_type: str) -> ModelFileRef:
+        blob_path = f"{self.prefix}{hashlib.sha256(data).hexdigest()}"
+        await self.storage.upload_bytes(blob_path, data, mime_type)
+        return ModelFileRef(
+            store=self.name,
+            content_hash=content_hash,
+            file_uri=f"gs://{self.storage.bucket_name}/{blob_path}",
+            mime_type=mime_type,
+            size_bytes=len(data),
+            created_at=datetime.now(timezone.utc),
+        )
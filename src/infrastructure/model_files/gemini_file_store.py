@@ -0,0 +1,64 @@
+"""
+Model file store on the Gemini Files API (Gemini Developer API only).
+
+Files are kept for 48 hours. Their URIs can only be referenced by models
+called through the Developer API (GOOGLE_API_KEY), not through Vertex AI.
+"""
+
+import io
+import os
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from google import genai
+from google.genai import types
+
+from src.domain.models.model_file import ModelFileRef
+from src.domain.ports.model_file_store import ModelFileStore
+
+logger = logging.getLogger(__name__)
+
+# Longest wait for an uploaded file to finish processing
+GEMINI_FILE_PROCESSING_TIMEOUT_SECONDS = float(os.getenv("GEMINI_FILE_PROCESSING_TIMEOUT_SECONDS", "120"))
+
+
+class GeminiFileStore(ModelFileStore):
+    """Documents uploaded with client.files.upload."""
+
+    name = "gemini"
+
+    def __init__(self, client: genai.Client = None):
+        """
+        Initialize the store.
+
+        Args:
+            client: Developer API client (defaults to one using GOOGLE_API_KEY)
+        """
+        self.client = client or genai.Client(vertexai=False, api_key=os.getenv("GOOGLE_API_KEY"))
+
+    async def upload(self, content_hash: str, data: bytes, mime_type: str) -> ModelFileRef:
+        file = await self.client.aio.files.upload(
+            file=io.BytesIO(data),
+            config=types.UploadFileConfig(mime_type=mime_type, display_name=content_hash),
+        )
+
+        # Large PDFs and videos are processed before they can be referenced
+        deadline = asyncio.get_running_loop().time() + GEMINI_FILE_PROCESSING_TIMEOUT_SECONDS
+        while file.state == types.FileState.PROCESSING:
+            if asyncio.get_running_loop().time() > deadline:
+                raise TimeoutError(f"Gemini file {file.name} still processing")
+            await asyncio.sleep(1)
+            file = await self.client.aio.files.get(name=file.name)
+        if file.state == types.FileState.FAILED:
+            raise RuntimeError(f"Gemini file {file.name} failed processing: {file.error}")
+
+        return ModelFileRef(
+            store=self.name,
+            content_hash=content_hash,
+            file_uri=file.uri,
+            mime_type=mime_type,
+            size_bytes=len(data),
+            expires_at=file.expiration_time,
+            created_at=file.create_time or datetime.now(timezone.utc),
+        )
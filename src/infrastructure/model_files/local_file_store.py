@@ -0,0 +1,46 @@
+"""
+Local stand-in for a model file store, for development and tests.
+
+Keeps uploads in memory under local-files:// URIs and counts them, so the
+upload-once flow can be exercised without a model provider. A real model
+cannot read these URIs.
+"""
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from src.domain.models.model_file import ModelFileRef
+from src.domain.ports.model_file_store import ModelFileStore
+
+
+class LocalModelFileStore(ModelFileStore):
+    """Uploads in memory, optionally expiring like the Gemini Files API."""
+
+    name = "local"
+
+    def __init__(self, ttl_hours: Optional[float] = 48):
+        """
+        Initialize an empty store.
+
+        Args:
+            ttl_hours: Lifetime of uploaded files (None: kept)
+        """
+        self.ttl_hours = ttl_hours
+        self.files: dict[str, bytes] = {}
+        self.uploads = 0
+
+    async def upload(self, content_hash: str, data: bytes, mime_type: str) -> ModelFileRef:
+        self.uploads += 1
+        uri = f"local-files://{hashlib.sha256(data).hexdigest()}"
+        self.files[uri] = data
+        now = datetime.now(timezone.utc)
+        return ModelFileRef(
+            store=self.name,
+            content_hash=content_hash,
+            file_uri=uri,
+            mime_type=mime_type,
+            size_bytes=len(data),
+            expires_at=now + timedelta(hours=self.ttl_hours) if self.ttl_hours is not None else None,
+            created_at=now,
+        )
@@ -0,0 +1,135 @@
+"""
+Upload-once model file references for attachments.
+
+Sending an attachment as inline bytes re-uploads it to the model on every
+turn. ModelFileCache maps a content hash (the GCS md5, read from object
+metadata, so no download is needed to look it up) to a file already in
+the model's file store. Attachments with a usable file are sent as
+file_data parts by URI, in later turns and in other sessions.
+
+Anything else is sent inline: unknown content, files close to expiry,
+small documents (below MODEL_FILES_MIN_KB inline is cheaper) and lookup
+or upload failures. Unknown content is uploaded in the background after
+the turn has its bytes, so the first turn does not wait for the upload.
+"""
+
+import os
+import asyncio
+import logging
+from typing import Dict, List
+
+from src.domain.models.model_file import ModelFileRef
+from src.domain.ports.model_file_repository import ModelFileRepository
+from src.domain.ports.model_file_store import ModelFileStore
+from src.infrastructure.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Smaller attachments are always sent inline
+MODEL_FILES_MIN_KB = float(os.getenv("MODEL_FILES_MIN_KB", "256"))
+# Files expiring sooner than this are re-uploaded instead of referenced
+MODEL_FILES_EXPIRY_MARGIN_MINUTES = float(os.getenv("MODEL_FILES_EXPIRY_MARGIN_MINUTES", "60"))
+# Background uploads at once (each holds the document's bytes); extra ones wait for a later turn
+MODEL_FILES_MAX_PENDING_UPLOADS = int(os.getenv("MODEL_FILES_MAX_PENDING_UPLOADS", "2"))
+
+
+class ModelFileCache:
+    """Content hash -> model file lookups, and background uploads of new content."""
+
+    def __init__(
+        self,
+        store: ModelFileStore,
+        repository: ModelFileRepository,
+        min_bytes: int = int(MODEL_FILES_MIN_KB * 1024),
+        expiry_margin_seconds: float = MODEL_FILES_EXPIRY_MARGIN_MINUTES * 60,
+        max_pending_uploads: int = MODEL_FILES_MAX_PENDING_UPLOADS,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            store: Model file store to upload to
+            repository: Content hash -> file mapping
+            min_bytes: Smaller documents are not uploaded
+            expiry_margin_seconds: Files expiring sooner are not referenced
+            max_pending_uploads: Background uploads at once
+        """
+        self.store = store
+        self.repository = repository
+        self.min_bytes = min_bytes
+        self.expiry_margin_seconds = expiry_margin_seconds
+        self.max_pending_uploads = max_pending_uploads
+        self._pending: Dict[str, asyncio.Task] = {}
+
+        metrics = get_metrics()
+        self._hits = metrics.counter("model_files.hits")
+        self._misses = metrics.counter("model_files.misses")
+        self._bytes_saved = metrics.counter("model_files.bytes_saved")
+        self._uploads = metrics.counter("model_files.uploads")
+        self._upload_failures = metrics.counter("model_files.upload_failures")
+        self._skipped_uploads = metrics.counter("model_files.skipped_uploads")
+        metrics.register_collector("model_files", self.stats)
+
+    async def lookup(self, content_hashes: List[str]) -> Dict[str, ModelFileRef]:
+        """
+        Files that can be referenced for these contents.
+
+        Returns:
+            Mapping of content_hash to file (unknown, expiring and failed lookups are omitted)
+        """
+        unique = list(dict.fromkeys(content_hashes))
+        if not unique:
+            return {}
+        try:
+            files = await self.repository.get_files(self.store.name, unique)
+        except Exception as e:
+            logger.warning(f"⚠️ Model file lookup failed, sending attachments inline: {e}")
+            return {}
+
+        usable = {
+            content_hash: file for content_hash, file in files.items()
+            if file.usable_for(self.expiry_margin_seconds)
+        }
+        self._hits.inc(len(usable))
+        self._misses.inc(len(unique) - len(usable))
+        self._bytes_saved.inc(sum(file.size_bytes for file in usable.values()))
+        return usable
+
+    def upload_in_background(self, content_hash: str, data: bytes, mime_type: str) -> None:
+        """Upload new content so later turns can reference it (no-op for small or pending content)."""
+        if len(data) < self.min_bytes or content_hash in self._pending:
+            return
+        if len(self._pending) >= self.max_pending_uploads:
+            self._skipped_uploads.inc()
+            return
+
+        task = asyncio.create_task(self._upload(content_hash, data, mime_type))
+        self._pending[content_hash] = task
+        task.add_done_callback(lambda _: self._pending.pop(content_hash, None))
+
+    async def _upload(self, content_hash: str, data: bytes, mime_type: str) -> None:
+        try:
+            file = await self.store.upload(content_hash, data, mime_type)
+            await self.repository.save_file(file)
+        except Exception as e:
+            self._upload_failures.inc()
+            logger.warning(f"⚠️ Model file upload failed (non-critical): {e}")
+            return
+        self._uploads.inc()
+        logger.info(f"📤 Uploaded {len(data)} bytes to model file store {self.store.name}: {file.file_uri}")
+
+    def stats(self) -> dict:
+        """Hit ratio and pending uploads, for /metrics."""
+        lookups = self._hits.value + self._misses.value
+        return {
+            "store": self.store.name,
+            "hit_ratio": round(self._hits.value / lookups, 3) if lookups else 0.0,
+            "pending_uploads": len(self._pending),
+            "saved_mb": round(self._bytes_saved.value / (1024 * 1024), 1),
+        }
+
+    async def close(self) -> None:
+        """Let pending uploads finish (briefly), then close the store."""
+        if self._pending:
+            await asyncio.wait(list(self._pending.values()), timeout=10)
+        await self.store.close()
@@ -0,0 +1,79 @@
+"""
+DocumentStorage backends, chosen with STORAGE_BACKEND:
+
+- "http" (default): GCS JSON API over pooled async HTTP; presigned URLs
+  are signed on the thread pool
+- "threads": the blocking StorageService on a bounded thread pool
+- "fake": in-process fake GCS (development and tests; nothing persists)
+
+Confirmed uploads are deduplicated by content when an upload index is
+given (unless UPLOAD_DEDUP_ENABLED=false), and downloads go through the
+attachment cache unless ATTACHMENT_CACHE_ENABLED=false.
+"""
+
+import os
+import logging
+from typing import Awaitable, Callable, Optional
+
+from src.domain.ports.document_storage import DocumentStorage
+from src.domain.ports.upload_index_repository import UploadIndexRepository
+from .attachment_cache import ATTACHMENT_CACHE_ENABLED, AttachmentCache, CachingDocumentStorage
+from .fake_gcs import FakeGCS
+from .gcs_http_storage import STORAGE_EMULATOR_HOST, GCSHttpDocumentStorage
+from .threaded_storage import ThreadedDocumentStorage
+from .upload_dedup import UPLOAD_DEDUP_ENABLED, DeduplicatingDocumentStorage
+
+logger = logging.getLogger(__name__)
+
+# "http", "threads" or "fake"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "http").lower()
+
+
+def create_document_storage(
+    backend: str = STORAGE_BACKEND,
+    cached: bool = ATTACHMENT_CACHE_ENABLED,
+    upload_index: Optional[Callable[[], Awaitable[UploadIndexRepository]]] = None,
+) -> DocumentStorage:
+    """
+    Create the configured DocumentStorage.
+
+    Args:
+        backend: "http", "threads" or "fake"
+        cached: Downloads go through the attachment cache
+        upload_index: Returns the upload index; deduplicates uploads when given
+
+    Raises:
+        ValueError: Unknown backend
+    """
+    if backend == "threads":
+        storage: DocumentStorage = ThreadedDocumentStorage()
+    elif backend == "fake":
+        logger.warning("⚠️ STORAGE_BACKEND=fake: documents are kept in memory only")
+        storage = GCSHttpDocumentStorage(
+            bucket_name=os.getenv("GCS_BUCKET_NAME", "fake-documents"),
+            endpoint="http://fake-gcs",
+            transport=FakeGCS().transport(),
+        )
+    elif backend == "http":
+        signer = None if STORAGE_EMULATOR_HOST else ThreadedDocumentStorage()
+        storage = GCSHttpDocumentStorage(signer=signer)
+    else:
+        raise ValueError(f"Unknown STORAGE_BACKEND '{backend}' (use http, threads or fake)")
+
+    if upload_index is not None and UPLOAD_DEDUP_ENABLED:
+        storage = DeduplicatingDocumentStorage(storage, upload_index)
+    if cached:
+        storage = CachingDocumentStorage(storage, AttachmentCache())
+    return storage
+
+
+__all__ = [
+    "AttachmentCache",
+    "CachingDocumentStorage",
+    "DeduplicatingDocumentStorage",
+    "FakeGCS",
+    "GCSHttpDocumentStorage",
+    "ThreadedDocumentStorage",
+    "create_document_storage",
+    "STORAGE_BACKEND",
+]
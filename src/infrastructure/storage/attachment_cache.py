@@ -0,0 +1,346 @@
+"""
+Cache of downloaded document bytes (chat and editor attachments).
+
+Every turn of a conversation about an attachment needs the attachment's
+bytes again. CachingDocumentStorage answers get_document_bytes from two
+tiers before downloading:
+
+1. Memory: LRU bounded by ATTACHMENT_CACHE_MEMORY_MB.
+2. Disk: files under ATTACHMENT_CACHE_DIR bounded by ATTACHMENT_CACHE_DISK_MB.
+   The default is under /tmp, which is tmpfs on Cloud Run. It holds more
+   than the memory tier, and a restarted worker finds its files again.
+
+Entries are keyed by content (GCS md5, crc32c and size), so the same
+document uploaded at several paths - or by several users - is downloaded
+once; objects without an md5 are keyed by (blob path, GCS generation).
+Metadata is read on every call (a small request on the pooled
+connection), so an overwritten object is never served stale. Metadata a
+caller has just read with verify_upload (e.g. to check the size before
+downloading) is reused instead of read twice. Concurrent misses for the
+same object share one download.
+
+The download is a separate request from the metadata read, and the
+uploader can overwrite the object in between (its signed upload URL is
+still valid). Bytes are therefore only cached when they match the key:
+their md5 is checked against it, and generation keys are checked by
+reading the metadata again. Mismatched bytes go to the caller that
+downloaded its own object and are neither cached nor shared with
+callers of other paths.
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.domain.models.upload_record import make_content_key, md5_matches
+from src.domain.ports.document_storage import DocumentStorage
+from src.infrastructure.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+ATTACHMENT_CACHE_ENABLED = os.getenv("ATTACHMENT_CACHE_ENABLED", "true").lower() == "true"
+# Memory tier bound
+ATTACHMENT_CACHE_MEMORY_MB = float(os.getenv("ATTACHMENT_CACHE_MEMORY_MB", "128"))
+# Disk tier directory (tmpfs on Cloud Run: it counts against instance memory) and bound (0 disables)
+ATTACHMENT_CACHE_DIR = os.getenv("ATTACHMENT_CACHE_DIR", "/tmp/attachment-cache")
+ATTACHMENT_CACHE_DISK_MB = float(os.getenv("ATTACHMENT_CACHE_DISK_MB", "512"))
+# Larger objects skip the memory tier
+ATTACHMENT_CACHE_MAX_ITEM_MB = float(os.getenv("ATTACHMENT_CACHE_MAX_ITEM_MB", "25"))
+
+# Metadata from verify_upload stands in for get_document_bytes' own read within this window
+METADATA_REUSE_SECONDS = 2.0
+_METADATA_REUSE_MAX_ENTRIES = 1000
+
+# (blob path, generation), or ("content", content key)
+CacheKey = tuple[str, str]
+
+
+def _file_name(key: CacheKey) -> str:
+    blob_path, generation = key
+    return f"{hashlib.sha256(blob_path.encode()).hexdigest()[:32]}-{generation}"
+
+
+class AttachmentCache:
+    """Memory LRU plus disk directory, both bounded by bytes."""
+
+    def __init__(
+        self,
+        memory_bytes: int = int(ATTACHMENT_CACHE_MEMORY_MB * 1024 * 1024),
+        disk_dir: Optional[str] = ATTACHMENT_CACHE_DIR,
+        disk_bytes: int = int(ATTACHMENT_CACHE_DISK_MB * 1024 * 1024),
+        max_item_bytes: int = int(ATTACHMENT_CACHE_MAX_ITEM_MB * 1024 * 1024),
+    ):
+        """
+        Initialize the cache; files left in `disk_dir` by a previous process are reused.
+
+        Args:
+            memory_bytes: Memory tier bound
+            disk_dir: Disk tier directory (None disables the tier)
+            disk_bytes: Disk tier bound (0 disables the tier)
+            max_item_bytes: Larger objects are only cached on disk
+        """
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.max_item_bytes = max_item_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir and disk_bytes > 0 else None
+
+        self._memory: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._memory_used = 0
+        # Disk files in LRU order -> size (guarded: disk work runs on threads)
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_used = 0
+        self._disk_lock = threading.Lock()
+        if self.disk_dir is not None:
+            self._scan_disk()
+
+        metrics = get_metrics()
+        self._memory_hits = metrics.counter("attachment_cache.memory_hits")
+        self._disk_hits = metrics.counter("attachment_cache.disk_hits")
+        self._misses = metrics.counter("attachment_cache.misses")
+        self._bytes_saved = metrics.counter("attachment_cache.bytes_saved")
+        metrics.register_collector("attachment_cache", self.stats)
+
+    # -------------------------------------------------------------------------
+    # Lookups
+    # -------------------------------------------------------------------------
+
+    async def get(self, key: CacheKey) -> Optional[bytes]:
+        """Cached bytes from memory, else disk (promoted to memory); None on a miss."""
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self._memory_hits.inc()
+            self._bytes_saved.inc(len(data))
+            return data
+
+        if self.disk_dir is not None:
+            data = await asyncio.to_thread(self._read_file, _file_name(key))
+            if data is not None:
+                self._disk_hits.inc()
+                self._bytes_saved.inc(len(data))
+                self._remember(key, data)
+                return data
+
+        self._misses.inc()
+        return None
+
+    async def put(self, key: CacheKey, data: bytes) -> None:
+        """Store bytes in both tiers."""
+        self._remember(key, data)
+        if self.disk_dir is not None and len(data) <= self.disk_bytes:
+            try:
+                await asyncio.to_thread(self._write_file, _file_name(key), data)
+            except OSError as e:
+                logger.warning(f"⚠️ Attachment cache disk write failed (non-critical): {e}")
+
+    def invalidate(self, blob_path: str) -> None:
+        """Drop every cached generation of an object."""
+        for key in [key for key in self._memory if key[0] == blob_path]:
+            self._memory_used -= len(self._memory.pop(key))
+        if self.disk_dir is not None:
+            prefix = _file_name((blob_path, ""))
+            with self._disk_lock:
+                for name in [name for name in self._files if name.startswith(prefix)]:
+                    self._delete_file(name)
+
+    # -------------------------------------------------------------------------
+    # Memory tier
+    # -------------------------------------------------------------------------
+
+    def _remember(self, key: CacheKey, data: bytes) -> None:
+        if len(data) > self.max_item_bytes or len(data) > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_used -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_used += len(data)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+
+    # -------------------------------------------------------------------------
+    # Disk tier (runs on threads)
+    # -------------------------------------------------------------------------
+
+    def _scan_disk(self) -> None:
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        files = sorted(
+            (path for path in self.disk_dir.iterdir() if path.is_file() and not path.name.endswith(".tmp")),
+            key=lambda path: path.stat().st_mtime,
+        )
+        for path in files:
+            size = path.stat().st_size
+            self._files[path.name] = size
+            self._disk_used += size
+        with self._disk_lock:
+            self._evict_files()
+
+    def _read_file(self, name: str) -> Optional[bytes]:
+        with self._disk_lock:
+            if name not in self._files:
+                return None
+            self._files.move_to_end(name)
+        try:
+            return (self.disk_dir / name).read_bytes()
+        except FileNotFoundError:
+            with self._disk_lock:
+                if name in self._files:
+                    self._disk_used -= self._files.pop(name)
+            return None
+
+    def _write_file(self, name: str, data: bytes) -> None:
+        path = self.disk_dir / name
+        temp = path.with_name(f"{name}.{threading.get_ident()}.tmp")
+        temp.write_bytes(data)
+        os.replace(temp, path)
+        with self._disk_lock:
+            if name in self._files:
+                self._disk_used -= self._files.pop(name)
+            self._files[name] = len(data)
+            self._disk_used += len(data)
+            self._evict_files()
+
+    def _evict_files(self) -> None:
+        while self._disk_used > self.disk_bytes and self._files:
+            self._delete_file(next(iter(self._files)))
+
+    def _delete_file(self, name: str) -> None:
+        self._disk_used -= self._files.pop(name)
+        try:
+            (self.disk_dir / name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        """Hit ratio and tier sizes, for /metrics."""
+        hits = self._memory_hits.value + self._disk_hits.value
+        lookups = hits + self._misses.value
+        return {
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_mb": round(self._memory_used / (1024 * 1024), 1),
+            "disk_entries": len(self._files),
+            "disk_mb": round(self._disk_used / (1024 * 1024), 1),
+            "saved_mb": round(self._bytes_saved.value / (1024 * 1024), 1),
+        }
+
+
+class CachingDocumentStorage(DocumentStorage):
+    """DocumentStorage whose downloads go through an AttachmentCache."""
+
+    def __init__(self, inner: DocumentStorage, cache: AttachmentCache):
+        self.inner = inner
+        self.cache = cache
+        # key -> (blob path being downloaded, download task)
+        self._inflight: Dict[CacheKey, Tuple[str, asyncio.Task]] = {}
+        # blob path -> (read at, verify_upload result)
+        self._recent_info: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._mismatches = get_metrics().counter("attachment_cache.changed_during_download")
+
+    @property
+    def bucket_name(self) -> str:
+        return self.inner.bucket_name
+
+    async def get_document_bytes(self, blob_path: str) -> bytes:
+        recent = self._recent_info.get(blob_path)
+        if recent is not None and time.monotonic() - recent[0] <= METADATA_REUSE_SECONDS:
+            info = recent[1]
+        else:
+            info = await self.inner.verify_upload(blob_path)
+        if info is None:
+            raise FileNotFoundError(f"Document not found at {blob_path}")
+        content_key = make_content_key(info.get("md5_hash"), info.get("crc32c"), info.get("size_bytes"))
+        if content_key:
+            key = ("content", content_key)
+        elif info.get("generation"):
+            key = (blob_path, str(info["generation"]))
+        else:
+            return await self.inner.get_document_bytes(blob_path)
+
+        data = await self.cache.get(key)
+        if data is not None:
+            logger.info(f"⚡ Attachment cache hit for {blob_path} ({len(data)} bytes)")
+            return data
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = (blob_path, asyncio.create_task(self._download(key, blob_path, info)))
+            self._inflight[key] = inflight
+            inflight[1].add_done_callback(lambda _: self._inflight.pop(key, None))
+        downloaded_path, task = inflight
+        data, verified = await asyncio.shield(task)
+        if not verified and downloaded_path != blob_path:
+            # Another path's object changed under the shared key: read this one directly
+            return await self.inner.get_document_bytes(blob_path)
+        return data
+
+    async def _download(self, key: CacheKey, blob_path: str, info: Dict[str, Any]) -> Tuple[bytes, bool]:
+        """Download and cache an object; returns (bytes, whether they match the key)."""
+        data = await self.inner.get_document_bytes(blob_path)
+        if key[0] == "content":
+            verified = len(data) == (info.get("size_bytes") or 0) and md5_matches(info.get("md5_hash"), data)
+        else:
+            latest = await self.inner.verify_upload(blob_path)
+            verified = latest is not None and str(latest.get("generation")) == key[1]
+        if not verified:
+            self._recent_info.pop(blob_path, None)
+            self._mismatches.inc()
+            logger.warning(f"⚠️ {blob_path} changed while downloading; not caching it")
+            return data, False
+        await self.cache.put(key, data)
+        return data, True
+
+    async def generate_presigned_upload_url(
+        self,
+        user_id: str,
+        filename: str,
+        content_type: str,
+        expiration_minutes: int = 15,
+    ) -> Dict[str, Any]:
+        return await self.inner.generate_presigned_upload_url(user_id, filename, content_type, expiration_minutes)
+
+    async def generate_presigned_download_url(self, blob_path: str, expiration_minutes: int = 60) -> str:
+        return await self.inner.generate_presigned_download_url(blob_path, expiration_minutes)
+
+    async def verify_upload(self, blob_path: str) -> Optional[Dict[str, Any]]:
+        info = await self.inner.verify_upload(blob_path)
+        if info is not None:
+            now = time.monotonic()
+            if len(self._recent_info) >= _METADATA_REUSE_MAX_ENTRIES:
+                self._recent_info = {
+                    path: entry for path, entry in self._recent_info.items()
+                    if now - entry[0] <= METADATA_REUSE_SECONDS
+                }
+            self._recent_info[blob_path] = (now, info)
+        return info
+
+    async def confirm_upload(self, blob_path: str, user_id: str) -> Optional[Dict[str, Any]]:
+        self._recent_info.pop(blob_path, None)
+        return await self.inner.confirm_upload(blob_path, user_id)
+
+    async def copy_document(self, source_blob_path: str, destination_blob_path: str) -> None:
+        self.cache.invalidate(destination_blob_path)
+        self._recent_info.pop(destination_blob_path, None)
+        await self.inner.copy_document(source_blob_path, destination_blob_path)
+
+    async def upload_bytes(self, blob_path: str, data: bytes, content_type: str) -> None:
+        self.cache.invalidate(blob_path)
+        self._recent_info.pop(blob_path, None)
+        await self.inner.upload_bytes(blob_path, data, content_type)
+
+    async def delete_document(self, blob_path: str) -> bool:
+        self.cache.invalidate(blob_path)
+        self._recent_info.pop(blob_path, None)
+        return await self.inner.delete_document(blob_path)
+
+    async def list_user_documents(self, user_id: str, max_results: int = 100) -> List[Dict[str, Any]]:
+        return await self.inner.list_user_documents(user_id, max_results)
+
+    async def close(self) -> None:
+        await self.inner.close()
@@ -0,0 +1,402 @@
+"""
+Concurrent attachment downloads under a process-wide byte budget.
+
+Attachments are held in memory as bytes (inline model parts), so a few
+concurrent turns with large PDFs can exhaust a Cloud Run instance. The
+loader reads each object's size from metadata first, rejects oversized
+objects before any download, then reserves the batch's total size from a
+process-wide ByteBudget and downloads the batch concurrently.
+
+The reservation is taken for the whole batch at once (never piecemeal, so
+two turns cannot deadlock holding half a budget each) and is held until
+the caller releases the batch, once the model call that uses the bytes
+is done.
+
+With a ModelFileCache, attachments already in the model's file store are
+not downloaded at all: they are referenced by URI (see model_files). With
+a TextExtractor, documents cheaper as text are sent as extracted text
+(see extraction); with an ImageNormalizer, images are sent downscaled and
+re-encoded, and the batch's reservation shrinks to the normalized size.
+Text or images already prepared for the content are reused without
+downloading.
+
+These shared stores are keyed by the metadata's md5 (content_hash), but
+the bytes are downloaded later and the uploader may have overwritten the
+object in between. Downloaded bytes are checked against the md5. On a
+mismatch content_hash is dropped, so the attachment is still sent but
+nothing shared is written under the old key.
+
+Usage:
+    batch = await load_attachments(storage, [a["blob_path"] for a in attachments])
+    try:
+        for attachment, loaded in zip(attachments, batch.results):
+            parts.append(loaded.to_part(attachment["content_type"]))
+    finally:
+        batch.release()
+"""
+
+import os
+import asyncio
+import logging
+import resource
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Tuple
+
+from google.genai import types
+
+from src.domain.models.upload_record import md5_matches
+from src.domain.ports.document_storage import DocumentStorage
+from src.infrastructure.extraction import ImageNormalizer, TextExtractor
+from src.infrastructure.metrics import get_metrics
+from src.infrastructure.model_files.model_file_cache import ModelFileCache
+
+logger = logging.getLogger(__name__)
+
+# Attachment bytes held in memory at once, across all requests
+ATTACHMENT_INFLIGHT_MB = float(os.getenv("ATTACHMENT_INFLIGHT_MB", "100"))
+# Largest attachment accepted (inline data limit of the model)
+ATTACHMENT_MAX_MB = float(os.getenv("ATTACHMENT_MAX_MB", "20"))
+# Parallel metadata reads/downloads per request
+ATTACHMENT_LOAD_CONCURRENCY = int(os.getenv("ATTACHMENT_LOAD_CONCURRENCY", "4"))
+
+ATTACHMENT_MAX_BYTES = int(ATTACHMENT_MAX_MB * 1024 * 1024)
+
+
+class AttachmentTooLargeError(ValueError):
+    """Object size (from metadata) is over the attachment limit."""
+
+
+# -----------------------------------------------------------------------------
+# Byte budget
+# -----------------------------------------------------------------------------
+
+class ByteBudget:
+    """
+    Semaphore over bytes, granted in FIFO order.
+
+    A request larger than the capacity is clamped to it, so it runs alone
+    instead of waiting forever.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._used = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+
+        metrics = get_metrics()
+        self._inflight = metrics.gauge("attachments.inflight_bytes")
+        self._waits = metrics.counter("attachments.budget_waits")
+
+    @property
+    def used(self) -> int:
+        return self._used
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, size: int) -> int:
+        """
+        Wait until `size` bytes fit in the budget and reserve them.
+
+        Returns:
+            Bytes reserved (pass to release)
+        """
+        size = min(max(size, 0), self.capacity)
+        if not self._waiters and self._used + size <= self.capacity:
+            self._take(size)
+            return size
+
+        self._waits.inc()
+        future = asyncio.get_running_loop().create_future()
+        entry = (size, future)
+        self._waiters.append(entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled
+                self.release(size)
+            else:
+                self._waiters.remove(entry)
+                self._wake()
+            raise
+        return size
+
+    def release(self, size: int) -> None:
+        """Return reserved bytes and wake waiters that now fit."""
+        self._used -= size
+        self._inflight.dec(size)
+        self._wake()
+
+    def _take(self, size: int) -> None:
+        self._used += size
+        self._inflight.inc(size)
+
+    def _wake(self) -> None:
+        while self._waiters:
+            size, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self._used + size > self.capacity:
+                return
+            self._waiters.popleft()
+            self._take(size)
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        """Budget use and the process memory high-water mark, for /metrics."""
+        # ru_maxrss is in KiB on Linux
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {
+            "budget_mb": round(self.capacity / (1024 * 1024), 1),
+            "inflight_mb": round(self._used / (1024 * 1024), 1),
+            "inflight_high_water_mb": round(self._inflight.max / (1024 * 1024), 1),
+            "waiting": self.waiting,
+            "process_rss_high_water_mb": round(peak_rss / 1024, 1),
+        }
+
+
+_budget: Optional[ByteBudget] = None
+
+
+def get_attachment_budget() -> ByteBudget:
+    """Get or create the process-wide attachment byte budget."""
+    global _budget
+    if _budget is None:
+        _budget = ByteBudget(int(ATTACHMENT_INFLIGHT_MB * 1024 * 1024))
+        get_metrics().register_collector("attachments", _budget.stats)
+    return _budget
+
+
+# -----------------------------------------------------------------------------
+# Loading
+# -----------------------------------------------------------------------------
+
+@dataclass
+class LoadedAttachment:
+    """One attachment's bytes, extracted text or model file URI, or why it could not be loaded."""
+    blob_path: Optional[str]
+    data: Optional[bytes] = None
+    file_uri: Optional[str] = None
+    text: Optional[str] = None
+    error: Optional[Exception] = None
+    size_bytes: int = 0
+    # GCS md5 the shared caches key by (None when data does not match it)
+    content_hash: Optional[str] = None
+    content_type: Optional[str] = None
+    # data (or the model file) was re-encoded as content_type (image normalization)
+    normalized: bool = False
+
+    def to_part(self, mime_type: str) -> types.Part:
+        """Extracted text when cheaper, a file_data part when the content is in the model file store, else inline bytes."""
+        if self.text is not None:
+            return types.Part(text=self.text)
+        if self.normalized:
+            mime_type = self.content_type
+        if self.file_uri:
+            return types.Part(file_data=types.FileData(file_uri=self.file_uri, mime_type=mime_type))
+        return types.Part(inline_data=types.Blob(mime_type=mime_type, data=self.data))
+
+
+class AttachmentBatch:
+    """Loaded attachments (in request order) and their budget reservation."""
+
+    def __init__(self, results: List[LoadedAttachment], budget: ByteBudget, reserved: int):
+        self.results = results
+        self._budget = budget
+        self._reserved = reserved
+
+    def shrink(self, size: int) -> None:
+        """Return part of the reservation (bytes no longer held)."""
+        size = min(max(size, 0), self._reserved)
+        if size:
+            self._budget.release(size)
+            self._reserved -= size
+
+    def release(self) -> None:
+        """Return the reservation to the budget (idempotent)."""
+        if self._reserved:
+            self._budget.release(self._reserved)
+            self._reserved = 0
+
+
+async def load_attachments(
+    storage: DocumentStorage,
+    blob_paths: List[Optional[str]],
+    max_bytes: int = ATTACHMENT_MAX_BYTES,
+    budget: Optional[ByteBudget] = None,
+    concurrency: int = ATTACHMENT_LOAD_CONCURRENCY,
+    model_files: Optional[ModelFileCache] = None,
+    text_extractor: Optional[TextExtractor] = None,
+    image_normalizer: Optional[ImageNormalizer] = None,
+    content_types: Optional[List[Optional[str]]] = None,
+) -> AttachmentBatch:
+    """
+    Download attachments concurrently under the byte budget.
+
+    Failures are reported per attachment (missing blob path, missing
+    object, too large, download error); they never fail the batch.
+
+    Args:
+        storage: Document storage
+        blob_paths: Blob path per attachment (None for attachments to skip)
+        max_bytes: Largest object accepted
+        budget: Byte budget (defaults to the process-wide one)
+        concurrency: Parallel metadata reads/downloads
+        model_files: Model file references (None: always inline)
+        text_extractor: Local text extraction (None: always binary)
+        image_normalizer: Image downscaling/re-encoding (None: images as uploaded)
+        content_types: MIME type per attachment (defaults to the object metadata's)
+
+    Returns:
+        AttachmentBatch; the caller must release() it
+    """
+    budget = budget or get_attachment_budget()
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    results = [LoadedAttachment(blob_path=blob_path) for blob_path in blob_paths]
+
+    async def check_size(loaded: LoadedAttachment) -> None:
+        if not loaded.blob_path:
+            loaded.error = ValueError("No blob_path provided for attachment")
+            return
+        try:
+            async with semaphore:
+                info = await storage.verify_upload(loaded.blob_path)
+        except Exception as e:
+            loaded.error = e
+            return
+        if info is None:
+            loaded.error = FileNotFoundError(f"Document not found at {loaded.blob_path}")
+            return
+        loaded.size_bytes = info.get("size_bytes") or 0
+        loaded.content_hash = info.get("md5_hash")
+        loaded.content_type = info.get("content_type")
+        if loaded.size_bytes > max_bytes:
+            loaded.error = AttachmentTooLargeError(
+                f"Attachment exceeds maximum size ({loaded.size_bytes} > {max_bytes} bytes)"
+            )
+            get_metrics().counter("attachments.rejected_too_large").inc()
+
+    async def download(loaded: LoadedAttachment) -> None:
+        try:
+            async with semaphore:
+                data = await storage.get_document_bytes(loaded.blob_path)
+        except Exception as e:
+            loaded.error = e
+            return
+        # The object may have been overwritten since its metadata was read
+        if len(data) > max_bytes:
+            loaded.error = AttachmentTooLargeError(
+                f"Attachment exceeds maximum size ({len(data)} > {max_bytes} bytes)"
+            )
+            return
+        if loaded.content_hash and not await asyncio.to_thread(md5_matches, loaded.content_hash, data):
+            logger.warning(f"⚠️ {loaded.blob_path} changed since its metadata was read; not caching derived content")
+            get_metrics().counter("attachments.changed_during_download").inc()
+            loaded.content_hash = None
+        loaded.data = data
+
+    async def extract(loaded: LoadedAttachment) -> None:
+        text = await text_extractor.extract(loaded.content_hash, loaded.data, loaded.content_type)
+        # Text found in the cache before the download stays even if evicted since
+        if loaded.data is not None:
+            loaded.text = text
+
+    def use_image(loaded: LoadedAttachment, image) -> None:
+        loaded.data = image.data
+        loaded.content_type = image.mime_type
+        loaded.normalized = True
+
+    async def normalize(loaded: LoadedAttachment) -> int:
+        # Images found in the cache before the download are already in use
+        if loaded.normalized:
+            await image_normalizer.normalize(loaded.content_hash, None, loaded.content_type)
+            return 0
+        original = len(loaded.data)
+        image = await image_normalizer.normalize(loaded.content_hash, loaded.data, loaded.content_type)
+        if image is None:
+            return 0
+        use_image(loaded, image)
+        return original - len(image.data)
+
+    await asyncio.gather(*(check_size(loaded) for loaded in results))
+    for loaded, content_type in zip(results, content_types or []):
+        if content_type:
+            loaded.content_type = content_type
+    pending = [loaded for loaded in results if loaded.error is None]
+
+    # Contents already extracted as text need no download at all
+    if text_extractor is not None:
+        for loaded in pending:
+            if text_extractor.handles(loaded.content_type):
+                _, loaded.text = text_extractor.cached(loaded.content_hash)
+        cached_text = [loaded for loaded in pending if loaded.text is not None]
+        pending = [loaded for loaded in pending if loaded.text is None]
+
+    # Images already normalized need no download either
+    if image_normalizer is not None:
+        for loaded in pending:
+            if image_normalizer.handles(loaded.content_type):
+                _, image = image_normalizer.cached(loaded.content_hash)
+                if image is not None:
+                    use_image(loaded, image)
+        cached_images = [loaded for loaded in pending if loaded.normalized]
+        pending = [loaded for loaded in pending if not loaded.normalized]
+
+    # Contents already in the model file store are referenced, not downloaded
+    if model_files is not None:
+        files = await model_files.lookup([loaded.content_hash for loaded in pending if loaded.content_hash])
+        for loaded in pending:
+            if loaded.content_hash in files:
+                ref = files[loaded.content_hash]
+                loaded.file_uri = ref.file_uri
+                # Normalized images were uploaded re-encoded
+                if (ref.mime_type or "").startswith("image/") and ref.mime_type != loaded.content_type:
+                    loaded.content_type = ref.mime_type
+                    loaded.normalized = True
+        pending = [loaded for loaded in pending if loaded.file_uri is None]
+
+    total = sum(loaded.size_bytes for loaded in pending)
+    reserved = await budget.acquire(total)
+    batch = AttachmentBatch(results, budget, reserved)
+    try:
+        await asyncio.gather(*(download(loaded) for loaded in pending))
+        if text_extractor is not None:
+            # Cached texts go through extract too: it counts each cache hit once
+            await asyncio.gather(*(
+                extract(loaded) for loaded in pending
+                if loaded.data is not None and text_extractor.handles(loaded.content_type)
+            ), *(extract(loaded) for loaded in cached_text))
+        if image_normalizer is not None:
+            # Cached images go through normalize too: it counts each cache hit once
+            freed = await asyncio.gather(*(
+                normalize(loaded) for loaded in pending
+                if loaded.data is not None and image_normalizer.handles(loaded.content_type)
+            ), *(normalize(loaded) for loaded in cached_images))
+            # Only the normalized bytes are held from here on
+            batch.shrink(sum(freed))
+    except BaseException:
+        batch.release()
+        raise
+
+    # New contents sent as bytes are uploaded for later turns
+    if model_files is not None:
+        for loaded in pending:
+            if loaded.data is not None and loaded.text is None and loaded.content_hash:
+                model_files.upload_in_background(
+                    loaded.content_hash, loaded.data, loaded.content_type or "application/octet-stream"
+                )
+
+    loaded_count = sum(1 for loaded in results if loaded.data is not None or loaded.text is not None)
+    referenced_count = sum(1 for loaded in results if loaded.file_uri is not None)
+    text_count = sum(1 for loaded in results if loaded.text is not None)
+    normalized_count = sum(1 for loaded in results if loaded.normalized)
+    logger.info(
+        f"📎 Loaded {loaded_count}/{len(results)} attachments, {referenced_count} by file reference, {text_count} as text, "
+        f"{normalized_count} normalized "
+        f"({total} bytes, {budget.used} bytes in flight)"
+    )
+    return batch
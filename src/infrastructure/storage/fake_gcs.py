@@ -0,0 +1,176 @@
+"""
+In-process fake of the GCS JSON API, for development and tests.
+
+Serves the subset GCSHttpDocumentStorage uses - object media and metadata,
+listing with pagination, media uploads, copies (rewriteTo, in one or
+several calls), deletes - plus GET/PUT on /{bucket}/{object}, which the
+emulated presigned URLs point to. Objects live in memory. Plug it in
+with STORAGE_BACKEND=fake or:
+
+    fake = FakeGCS()
+    storage = GCSHttpDocumentStorage("bucket", endpoint="http://fake-gcs", transport=fake.transport())
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import unquote
+
+import httpx
+
+_PAGE_SIZE = 1000
+
+
+@dataclass
+class _FakeObject:
+    data: bytes
+    content_type: str
+    generation: int
+    created: str
+
+
+class FakeGCS:
+    """Objects in memory behind an httpx transport."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        page_size: int = _PAGE_SIZE,
+        rewrite_bytes_per_call: Optional[int] = None,
+    ):
+        """
+        Initialize an empty store.
+
+        Args:
+            latency_ms: Added to every request (simulates the network)
+            page_size: Most objects per listing page
+            rewrite_bytes_per_call: Bytes a rewriteTo call copies before it
+                returns a rewriteToken (None: every copy is done in one call)
+        """
+        self.latency_ms = latency_ms
+        self.page_size = page_size
+        self.rewrite_bytes_per_call = rewrite_bytes_per_call
+        self.objects: dict[tuple[str, str], _FakeObject] = {}
+        self.requests = 0
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def put(self, bucket: str, name: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+        """Store an object directly (test setup)."""
+        self.objects[(bucket, name)] = _FakeObject(
+            data=data,
+            content_type=content_type,
+            generation=time.time_ns(),
+            created=datetime.now(timezone.utc).isoformat(),
+        )
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        path = request.url.raw_path.decode().split("?", 1)[0]
+        params = request.url.params
+        parts = path.strip("/").split("/")
+
+        # /upload/storage/v1/b/{bucket}/o?uploadType=media&name=...
+        if parts[:3] == ["upload", "storage", "v1"] and request.method == "POST":
+            bucket, name = parts[4], params.get("name")
+            self.put(bucket, name, request.content, request.headers.get("content-type", "application/octet-stream"))
+            return httpx.Response(200, json=self._resource(bucket, name))
+
+        # /storage/v1/b/{bucket}/o[/{object}]
+        if parts[:2] == ["storage", "v1"] and len(parts) >= 5:
+            bucket = unquote(parts[3])
+            if len(parts) == 5:
+                return self._list(bucket, params)
+            name = unquote(parts[5])
+            # .../o/{object}/rewriteTo/b/{bucket}/o/{object}
+            if len(parts) == 11 and parts[6] == "rewriteTo" and request.method == "POST":
+                source = self.objects.get((bucket, name))
+                if source is None:
+                    return self._not_found()
+                destination_bucket, destination = unquote(parts[8]), unquote(parts[10])
+                return self._rewrite(source, destination_bucket, destination, params)
+            if request.method == "DELETE":
+                if self.objects.pop((bucket, name), None) is None:
+                    return self._not_found()
+                return httpx.Response(204)
+            obj = self.objects.get((bucket, name))
+            if obj is None:
+                return self._not_found()
+            if params.get("alt") == "media":
+                return httpx.Response(200, content=obj.data, headers={"Content-Type": obj.content_type})
+            return httpx.Response(200, json=self._resource(bucket, name))
+
+        # /{bucket}/{object}: emulated presigned URLs
+        if len(parts) >= 2:
+            bucket, name = unquote(parts[0]), unquote("/".join(parts[1:]))
+            if request.method == "PUT":
+                self.put(bucket, name, request.content, request.headers.get("content-type", "application/octet-stream"))
+                return httpx.Response(200)
+            if request.method == "GET" and (bucket, name) in self.objects:
+                obj = self.objects[(bucket, name)]
+                return httpx.Response(200, content=obj.data, headers={"Content-Type": obj.content_type})
+        return self._not_found()
+
+    def _rewrite(
+        self, source: _FakeObject, bucket: str, name: str, params: httpx.QueryParams
+    ) -> httpx.Response:
+        """Copy an object, in several calls if rewrite_bytes_per_call is set."""
+        size = len(source.data)
+        rewritten = int(params.get("rewriteToken", 0))
+        if self.rewrite_bytes_per_call is not None:
+            rewritten = min(size, rewritten + self.rewrite_bytes_per_call)
+        else:
+            rewritten = size
+        body = {
+            "kind": "storage#rewriteResponse",
+            "totalBytesRewritten": str(rewritten),
+            "objectSize": str(size),
+            "done": rewritten >= size,
+        }
+        if body["done"]:
+            self.put(bucket, name, source.data, source.content_type)
+            body["resource"] = self._resource(bucket, name)
+        else:
+            body["rewriteToken"] = str(rewritten)
+        return httpx.Response(200, json=body)
+
+    def _list(self, bucket: str, params: httpx.QueryParams) -> httpx.Response:
+        prefix = params.get("prefix", "")
+        limit = min(int(params.get("maxResults", self.page_size)), self.page_size)
+        start = int(params.get("pageToken", 0))
+        names = sorted(name for b, name in self.objects if b == bucket and name.startswith(prefix))
+        page = names[start:start + limit]
+        body = {"kind": "storage#objects", "items": [self._resource(bucket, name) for name in page]}
+        if start + limit < len(names):
+            body["nextPageToken"] = str(start + limit)
+        return httpx.Response(200, json=body)
+
+    def _resource(self, bucket: str, name: str) -> dict:
+        obj = self.objects[(bucket, name)]
+        return {
+            "kind": "storage#object",
+            "bucket": bucket,
+            "name": name,
+            "size": str(len(obj.data)),
+            "contentType": obj.content_type,
+            "generation": str(obj.generation),
+            "timeCreated": obj.created,
+            "md5Hash": base64.b64encode(hashlib.md5(obj.data).digest()).decode(),
+        }
+
+    @staticmethod
+    def _not_found(message: Optional[str] = None) -> httpx.Response:
+        return httpx.Response(
+            404,
+            content=json.dumps({"error": {"code": 404, "message": message or "No such object"}}),
+            headers={"Content-Type": "application/json"},
+        )
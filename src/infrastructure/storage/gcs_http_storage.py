@@ -0,0 +1,233 @@
+"""
+DocumentStorage over the GCS JSON API with a pooled async HTTP client.
+
+Downloads, uploads, metadata, listing and deletes go through one
+httpx.AsyncClient, so they never block the event loop and reuse
+keep-alive connections. Presigned URLs need V4 signing (IAM signBlob via
+google-auth), which is delegated to a signer - normally the
+ThreadedDocumentStorage.
+
+Against an emulator (STORAGE_EMULATOR_HOST, e.g. fake-gcs-server, or the
+in-process FakeGCS) requests are unauthenticated and "presigned" URLs are
+plain object URLs on the emulator.
+"""
+
+import os
+import uuid
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+
+from src.domain.ports.document_storage import DocumentStorage
+from src.services.storage_service import upload_blob_path
+
+logger = logging.getLogger(__name__)
+
+GCS_ENDPOINT = "https://storage.googleapis.com"
+# Emulator base URL (e.g. http://localhost:4443 for fake-gcs-server); disables auth and signing
+STORAGE_EMULATOR_HOST = os.getenv("STORAGE_EMULATOR_HOST")
+# Pooled connections to GCS
+STORAGE_HTTP_MAX_CONNECTIONS = int(os.getenv("STORAGE_HTTP_MAX_CONNECTIONS", "32"))
+# Per-request timeout (large downloads included)
+STORAGE_HTTP_TIMEOUT_SECONDS = float(os.getenv("STORAGE_HTTP_TIMEOUT_SECONDS", "60"))
+
+
+class GCSHttpDocumentStorage(DocumentStorage):
+    """GCS JSON API over a shared httpx.AsyncClient."""
+
+    def __init__(
+        self,
+        bucket_name: Optional[str] = None,
+        project_id: Optional[str] = None,
+        signer: Optional[DocumentStorage] = None,
+        endpoint: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_connections: int = STORAGE_HTTP_MAX_CONNECTIONS,
+    ):
+        """
+        Initialize the storage. Credentials are loaded on the first request.
+
+        Args:
+            bucket_name: GCS bucket name (defaults to env var GCS_BUCKET_NAME)
+            project_id: GCP project ID (defaults to env var GOOGLE_CLOUD_PROJECT)
+            signer: Creates presigned URLs (required unless emulated)
+            endpoint: API base URL (defaults to STORAGE_EMULATOR_HOST or GCS)
+            transport: httpx transport (FakeGCS.transport() in tests)
+            max_connections: Pooled connections
+        """
+        self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+        self.bucket_name = bucket_name or os.getenv("GCS_BUCKET_NAME", f"{self.project_id}-documents")
+        self.signer = signer
+        self.endpoint = (endpoint or STORAGE_EMULATOR_HOST or GCS_ENDPOINT).rstrip("/")
+        self.emulated = self.endpoint != GCS_ENDPOINT
+        if not self.emulated and signer is None:
+            raise ValueError("GCSHttpDocumentStorage needs a signer for presigned URLs")
+
+        self.client = httpx.AsyncClient(
+            base_url=self.endpoint,
+            transport=transport,
+            timeout=STORAGE_HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._credentials = None
+        self._credentials_lock = asyncio.Lock()
+
+        logger.info(
+            f"✅ GCS HTTP storage for bucket {self.bucket_name}"
+            + (f" (emulator {self.endpoint})" if self.emulated else "")
+        )
+
+    # -------------------------------------------------------------------------
+    # Requests
+    # -------------------------------------------------------------------------
+
+    async def _headers(self) -> Dict[str, str]:
+        """Bearer token, refreshed on a thread when it expires."""
+        if self.emulated:
+            return {}
+        async with self._credentials_lock:
+            if self._credentials is None:
+                from google.auth import default
+
+                self._credentials, _ = await asyncio.to_thread(
+                    default, scopes=["https://www.googleapis.com/auth/devstorage.read_write"]
+                )
+            if not self._credentials.valid:
+                from google.auth.transport import requests as auth_requests
+
+                await asyncio.to_thread(self._credentials.refresh, auth_requests.Request())
+            return {"Authorization": f"Bearer {self._credentials.token}"}
+
+    def _object_path(self, blob_path: str) -> str:
+        return f"/storage/v1/b/{self.bucket_name}/o/{quote(blob_path, safe='')}"
+
+    def _object_url(self, blob_path: str) -> str:
+        """Direct object URL on the emulator (stands in for presigned URLs)."""
+        return f"{self.endpoint}/{self.bucket_name}/{quote(blob_path)}"
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        headers = {**kwargs.pop("headers", {}), **(await self._headers())}
+        return await self.client.request(method, path, headers=headers, **kwargs)
+
+    # -------------------------------------------------------------------------
+    # DocumentStorage
+    # -------------------------------------------------------------------------
+
+    async def generate_presigned_upload_url(
+        self,
+        user_id: str,
+        filename: str,
+        content_type: str,
+        expiration_minutes: int = 15,
+    ) -> Dict[str, Any]:
+        if not self.emulated:
+            return await self.signer.generate_presigned_upload_url(
+                user_id, filename, content_type, expiration_minutes
+            )
+        document_id = str(uuid.uuid4())
+        blob_path = upload_blob_path(user_id, document_id, filename)
+        return {
+            "document_id": document_id,
+            "upload_url": self._object_url(blob_path),
+            "filename": filename,
+            "content_type": content_type,
+            "gcs_uri": f"gs://{self.bucket_name}/{blob_path}",
+            "blob_path": blob_path,
+            "expires_in_seconds": expiration_minutes * 60,
+        }
+
+    async def generate_presigned_download_url(self, blob_path: str, expiration_minutes: int = 60) -> str:
+        if not self.emulated:
+            return await self.signer.generate_presigned_download_url(blob_path, expiration_minutes)
+        return self._object_url(blob_path)
+
+    async def get_document_bytes(self, blob_path: str) -> bytes:
+        response = await self._request("GET", self._object_path(blob_path), params={"alt": "media"})
+        if response.status_code == 404:
+            raise FileNotFoundError(f"Document not found at {blob_path}")
+        response.raise_for_status()
+        logger.info(f"📥 Downloaded {len(response.content)} bytes from {blob_path}")
+        return response.content
+
+    async def verify_upload(self, blob_path: str) -> Optional[Dict[str, Any]]:
+        response = await self._request("GET", self._object_path(blob_path))
+        if response.status_code == 404:
+            logger.warning(f"⚠️ Document not found at {blob_path}")
+            return None
+        response.raise_for_status()
+        resource = response.json()
+        return {
+            "exists": True,
+            "size_bytes": int(resource.get("size", 0)),
+            "content_type": resource.get("contentType"),
+            "created": resource.get("timeCreated"),
+            "md5_hash": resource.get("md5Hash"),
+            "crc32c": resource.get("crc32c"),
+            "generation": int(resource["generation"]) if resource.get("generation") else None,
+        }
+
+    async def upload_bytes(self, blob_path: str, data: bytes, content_type: str) -> None:
+        response = await self._request(
+            "POST",
+            f"/upload/storage/v1/b/{self.bucket_name}/o",
+            params={"uploadType": "media", "name": blob_path},
+            headers={"Content-Type": content_type},
+            content=data,
+        )
+        response.raise_for_status()
+        logger.info(f"📤 Uploaded {len(data)} bytes to {blob_path}")
+
+    async def copy_document(self, source_blob_path: str, destination_blob_path: str) -> None:
+        # rewriteTo copies in the bucket; large objects take several calls
+        path = f"{self._object_path(source_blob_path)}/rewriteTo/b/{self.bucket_name}/o/{quote(destination_blob_path, safe='')}"
+        params: Dict[str, str] = {}
+        while True:
+            response = await self._request("POST", path, params=params)
+            if response.status_code == 404:
+                raise FileNotFoundError(f"Document not found at {source_blob_path}")
+            response.raise_for_status()
+            result = response.json()
+            if result.get("done"):
+                break
+            params["rewriteToken"] = result["rewriteToken"]
+        logger.info(f"📑 Copied {source_blob_path} to {destination_blob_path}")
+
+    async def delete_document(self, blob_path: str) -> bool:
+        try:
+            response = await self._request("DELETE", self._object_path(blob_path))
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"❌ Failed to delete {blob_path}: {e}")
+            return False
+        logger.info(f"🗑️ Deleted document at {blob_path}")
+        return True
+
+    async def list_user_documents(self, user_id: str, max_results: int = 100) -> List[Dict[str, Any]]:
+        documents: List[Dict[str, Any]] = []
+        params = {"prefix": f"uploads/{user_id}/", "maxResults": max_results}
+        while len(documents) < max_results:
+            response = await self._request("GET", f"/storage/v1/b/{self.bucket_name}/o", params=params)
+            response.raise_for_status()
+            page = response.json()
+            for resource in page.get("items", []):
+                documents.append({
+                    "blob_path": resource["name"],
+                    "size_bytes": int(resource.get("size", 0)),
+                    "content_type": resource.get("contentType"),
+                    "created": resource.get("timeCreated"),
+                })
+            if not page.get("nextPageToken"):
+                break
+            params["pageToken"] = page["nextPageToken"]
+        return documents[:max_results]
+
+    async def close(self) -> None:
+        await self.client.aclose()
+        if self.signer is not None:
+            await self.signer.close()
@@ -0,0 +1,103 @@
+"""
+DocumentStorage that runs the blocking StorageService on its own threads.
+
+The fallback backend (STORAGE_BACKEND=threads), and the signer the HTTP
+backend delegates presigned URLs to: V4 signing with Cloud Run
+credentials calls the IAM signBlob API through google-auth, which blocks.
+The pool is bounded so a burst of downloads cannot take over the
+default executor that other `asyncio.to_thread` work shares.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.domain.ports.document_storage import DocumentStorage
+from src.services.storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+# Threads for blocking GCS calls
+STORAGE_THREAD_WORKERS = int(os.getenv("STORAGE_THREAD_WORKERS", "8"))
+
+
+class ThreadedDocumentStorage(DocumentStorage):
+    """StorageService on a bounded thread pool."""
+
+    def __init__(
+        self,
+        bucket_name: Optional[str] = None,
+        project_id: Optional[str] = None,
+        max_workers: int = STORAGE_THREAD_WORKERS,
+        service_factory: Optional[Callable[[], StorageService]] = None,
+    ):
+        """
+        Initialize the storage. The service is created on first use, on a
+        worker thread (its constructor calls the metadata server).
+
+        Args:
+            bucket_name: GCS bucket name (defaults to env var GCS_BUCKET_NAME)
+            project_id: GCP project ID (defaults to env var GOOGLE_CLOUD_PROJECT)
+            max_workers: Threads for blocking calls
+            service_factory: Creates the StorageService (tests)
+        """
+        self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+        self.bucket_name = bucket_name or os.getenv("GCS_BUCKET_NAME", f"{self.project_id}-documents")
+        self.service_factory = service_factory or (
+            lambda: StorageService(bucket_name=self.bucket_name, project_id=self.project_id)
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage")
+        self._service: Optional[StorageService] = None
+        self._lock = threading.Lock()
+
+    @property
+    def service(self) -> StorageService:
+        """The wrapped service (blocks while it is created)."""
+        with self._lock:
+            if self._service is None:
+                self._service = self.service_factory()
+            return self._service
+
+    async def _run(self, method: str, *args, **kwargs):
+        def call():
+            return getattr(self.service, method)(*args, **kwargs)
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    async def generate_presigned_upload_url(
+        self,
+        user_id: str,
+        filename: str,
+        content_type: str,
+        expiration_minutes: int = 15,
+    ) -> Dict[str, Any]:
+        return await self._run(
+            "generate_presigned_upload_url", user_id, filename, content_type, expiration_minutes
+        )
+
+    async def generate_presigned_download_url(self, blob_path: str, expiration_minutes: int = 60) -> str:
+        return await self._run("generate_presigned_download_url", blob_path, expiration_minutes)
+
+    async def get_document_bytes(self, blob_path: str) -> bytes:
+        return await self._run("get_document_bytes", blob_path)
+
+    async def verify_upload(self, blob_path: str) -> Optional[Dict[str, Any]]:
+        return await self._run("verify_upload", blob_path)
+
+    async def upload_bytes(self, blob_path: str, data: bytes, content_type: str) -> None:
+        await self._run("upload_bytes", blob_path, data, content_type)
+
+    async def copy_document(self, source_blob_path: str, destination_blob_path: str) -> None:
+        await self._run("copy_document", source_blob_path, destination_blob_path)
+
+    async def delete_document(self, blob_path: str) -> bool:
+        return await self._run("delete_document", blob_path)
+
+    async def list_user_documents(self, user_id: str, max_results: int = 100) -> List[Dict[str, Any]]:
+        return await self._run("list_user_documents", user_id, max_results)
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
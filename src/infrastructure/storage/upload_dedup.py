@@ -0,0 +1,443 @@
+"""
+Content-addressed deduplication of uploaded documents.
+
+The same documents (e.g. policy PDFs) are uploaded again and again, each
+to a new uploads/{user_id}/{uuid}/ path. DeduplicatingDocumentStorage
+indexes every confirmed upload by content (GCS md5, crc32c and size) in
+an UploadIndexRepository and keeps one object per content:
+
+1. The first upload of a content stays where it was uploaded.
+2. When a second copy is confirmed, it is copied server-side to a neutral
+   content/{content_key}/{id} object and every upload of the content is
+   pointed to it.
+3. Later copies point to the shared object at once.
+
+Per-user objects are not deleted when they are superseded: they are
+released, and sweep_released() deletes them UPLOAD_DEDUP_RELEASE_DELAY_HOURS
+later, after any presigned upload or download URL issued for them has
+expired. Until then an upload's own object is what it reads as (a client
+overwriting its path sees its new bytes everywhere); the sweep skips
+objects whose content changed since they were confirmed. The sweep runs
+in the background, at most every UPLOAD_DEDUP_SWEEP_INTERVAL_SECONDS.
+
+Uploads keep their paths: reads, signed URLs and listings resolve an
+alias to the shared object (signed URLs never expose another user's
+path), and deleting the last upload of a content deletes its object.
+Downstream caches (downloads, extracted text, normalized images, model
+file references) are keyed by content hash, so a popular document is
+downloaded and sent to the model once.
+
+Once its own object is swept, a deduplicated upload can only be found
+through the index: the index is a hard dependency for reading, deleting
+and overwriting such uploads. Those operations raise when it is
+unreachable (logged as errors and counted in upload_dedup.index_errors,
+which should be alerted on) instead of reporting the document missing.
+Confirming and listing degrade instead: without the index, uploads are
+not deduplicated and listings show stored objects only.
+"""
+
+import os
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.domain.models.upload_record import UploadRecord, make_content_key
+from src.domain.ports.document_storage import DocumentStorage
+from src.domain.ports.upload_index_repository import UploadIndexRepository
+from src.infrastructure.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DEDUP_ENABLED = os.getenv("UPLOAD_DEDUP_ENABLED", "true").lower() == "true"
+# Resolved aliases kept in memory (upload path -> shared object)
+UPLOAD_DEDUP_ALIAS_CACHE_ENTRIES = int(os.getenv("UPLOAD_DEDUP_ALIAS_CACHE_ENTRIES", "10000"))
+# Superseded per-user objects are kept this long (must exceed presigned upload and download URL lifetimes)
+UPLOAD_DEDUP_RELEASE_DELAY_HOURS = float(os.getenv("UPLOAD_DEDUP_RELEASE_DELAY_HOURS", "24"))
+# Minimum time between background sweeps of released objects
+UPLOAD_DEDUP_SWEEP_INTERVAL_SECONDS = float(os.getenv("UPLOAD_DEDUP_SWEEP_INTERVAL_SECONDS", "600"))
+
+UPLOADS_PREFIX = "uploads/"
+SHARED_PREFIX = "content/"
+
+# Released objects handled per sweep
+_SWEEP_BATCH = 500
+
+
+class DeduplicatingDocumentStorage(DocumentStorage):
+    """DocumentStorage that stores each uploaded content once."""
+
+    def __init__(
+        self,
+        inner: DocumentStorage,
+        repository_provider: Callable[[], Awaitable[UploadIndexRepository]],
+        alias_cache_entries: int = UPLOAD_DEDUP_ALIAS_CACHE_ENTRIES,
+        release_delay: timedelta = timedelta(hours=UPLOAD_DEDUP_RELEASE_DELAY_HOURS),
+        sweep_interval_seconds: float = UPLOAD_DEDUP_SWEEP_INTERVAL_SECONDS,
+    ):
+        """
+        Initialize the storage.
+
+        Args:
+            inner: Storage holding the objects
+            repository_provider: Returns the upload index (awaited on first use)
+            alias_cache_entries: Resolved aliases kept in memory
+            release_delay: How long superseded per-user objects are kept
+            sweep_interval_seconds: Minimum time between background sweeps
+        """
+        self.inner = inner
+        self.repository_provider = repository_provider
+        self.alias_cache_entries = alias_cache_entries
+        self.release_delay = release_delay
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._aliases: "OrderedDict[str, UploadRecord]" = OrderedDict()
+        self._sweep_task: Optional[asyncio.Task] = None
+        self._last_sweep: Optional[float] = None
+
+        metrics = get_metrics()
+        self._confirmed = metrics.counter("upload_dedup.confirmed")
+        self._deduplicated = metrics.counter("upload_dedup.deduplicated")
+        self._shared = metrics.counter("upload_dedup.shared")
+        self._swept = metrics.counter("upload_dedup.swept")
+        self._bytes_saved = metrics.counter("upload_dedup.bytes_saved")
+        self._alias_reads = metrics.counter("upload_dedup.alias_reads")
+        self._failures = metrics.counter("upload_dedup.failures")
+        self._index_errors = metrics.counter("upload_dedup.index_errors")
+        metrics.register_collector("upload_dedup", self.stats)
+
+    @property
+    def bucket_name(self) -> str:
+        return self.inner.bucket_name
+
+    # -------------------------------------------------------------------------
+    # Confirm (indexing)
+    # -------------------------------------------------------------------------
+
+    async def confirm_upload(self, blob_path: str, user_id: str) -> Optional[Dict[str, Any]]:
+        if not blob_path.startswith(f"{UPLOADS_PREFIX}{user_id}/"):
+            return await self.inner.confirm_upload(blob_path, user_id)
+        self._schedule_sweep()
+        info = await self.inner.verify_upload(blob_path)
+        if info is None:
+            # Confirmed before and swept: the alias still reads as the document
+            info, _ = await self._read(blob_path, self.inner.verify_upload)
+            return info
+        content_key = make_content_key(info.get("md5_hash"), info.get("crc32c"), info.get("size_bytes"))
+        if content_key is None:
+            return info
+
+        try:
+            repository = await self.repository_provider()
+            record, others = await repository.register_upload(UploadRecord(
+                blob_path=blob_path,
+                user_id=user_id,
+                content_key=content_key,
+                canonical_blob_path=blob_path,
+                size_bytes=info.get("size_bytes") or 0,
+                content_type=info.get("content_type"),
+                md5_hash=info.get("md5_hash"),
+                crc32c=info.get("crc32c"),
+                release_after=self._release_time(),
+            ))
+        except Exception as e:
+            self._failures.inc()
+            logger.warning(f"⚠️ Upload index unavailable, {blob_path} not deduplicated: {type(e).__name__}: {e}")
+            return info
+        self._confirmed.inc()
+
+        if record.is_alias:
+            # The content already has a shared object: this copy is released
+            self._remember(record)
+            self._deduplicated.inc()
+            logger.info(f"♻️ {blob_path} deduplicated to {record.canonical_blob_path}")
+        elif others:
+            await self._share(record, repository)
+
+        # Whether the content was already stored is not reported: it would
+        # reveal other users' uploads
+        return info
+
+    async def _share(self, record: UploadRecord, repository: UploadIndexRepository) -> None:
+        """Move a content with several uploads to a shared object, releasing the per-user objects."""
+        shared_path = f"{SHARED_PREFIX}{record.content_key}/{uuid.uuid4().hex}"
+        try:
+            await self.inner.copy_document(record.blob_path, shared_path)
+        except Exception as e:
+            self._failures.inc()
+            logger.warning(f"⚠️ Could not copy {record.blob_path} to {shared_path} (kept as is): {type(e).__name__}: {e}")
+            return
+        # The upload may have been overwritten since it was confirmed: never share other bytes under the key
+        copied = await self.inner.verify_upload(shared_path)
+        if copied is None or make_content_key(
+            copied.get("md5_hash"), copied.get("crc32c"), copied.get("size_bytes")
+        ) != record.content_key:
+            logger.warning(f"⚠️ {record.blob_path} changed since it was confirmed (kept as is)")
+            await self.inner.delete_document(shared_path)
+            return
+        try:
+            shared = await repository.share_content(record.content_key, shared_path, self._release_time())
+        except Exception as e:
+            self._failures.inc()
+            logger.warning(f"⚠️ Could not share {record.blob_path} (kept as is): {type(e).__name__}: {e}")
+            await self.inner.delete_document(shared_path)
+            return
+
+        if shared != shared_path:
+            # A concurrent confirm shared the content first; nothing points to this copy
+            await self.inner.delete_document(shared_path)
+        self._shared.inc()
+        self._deduplicated.inc()
+        logger.info(f"♻️ {record.blob_path} and its duplicates moved to {shared}")
+
+    def _release_time(self) -> datetime:
+        return datetime.now(timezone.utc) + self.release_delay
+
+    # -------------------------------------------------------------------------
+    # Released objects
+    # -------------------------------------------------------------------------
+
+    def _schedule_sweep(self) -> None:
+        """Start a background sweep unless one is running or ran within the interval."""
+        now = asyncio.get_running_loop().time()
+        if self._sweep_task is not None and not self._sweep_task.done():
+            return
+        if self._last_sweep is not None and now - self._last_sweep < self.sweep_interval_seconds:
+            return
+        self._last_sweep = now
+        self._sweep_task = asyncio.create_task(self.sweep_released())
+
+    async def sweep_released(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete per-user objects released before `now`.
+
+        Objects rewritten since they were confirmed hold other content:
+        they are kept and their upload is removed from the index.
+
+        Returns:
+            Number of objects deleted
+        """
+        try:
+            repository = await self.repository_provider()
+            records = await repository.list_releasable(now or datetime.now(timezone.utc), _SWEEP_BATCH)
+        except Exception as e:
+            self._index_errors.inc()
+            logger.error(f"❌ Upload index unavailable, released objects not swept: {type(e).__name__}: {e}")
+            return 0
+
+        deleted = 0
+        for record in records:
+            try:
+                info = await self.inner.verify_upload(record.blob_path)
+                if info is not None and record.content_key != make_content_key(
+                    info.get("md5_hash"), info.get("crc32c"), info.get("size_bytes")
+                ):
+                    logger.info(f"♻️ {record.blob_path} was rewritten after it was released; detached from the index")
+                    await self._detach(record.blob_path, keep_own_object=True)
+                    continue
+                if info is not None and await self.inner.delete_document(record.blob_path):
+                    deleted += 1
+                    self._bytes_saved.inc(record.size_bytes)
+                await repository.mark_released(record.blob_path)
+                cached = self._aliases.get(record.blob_path)
+                if cached is not None:
+                    cached.release_after = None
+            except Exception as e:
+                self._failures.inc()
+                logger.warning(f"⚠️ Could not sweep {record.blob_path}: {type(e).__name__}: {e}")
+
+        self._swept.inc(deleted)
+        if records:
+            logger.info(f"🧹 Swept {deleted} released upload object(s)")
+        return deleted
+
+    # -------------------------------------------------------------------------
+    # Alias resolution
+    # -------------------------------------------------------------------------
+
+    def _remember(self, record: UploadRecord) -> None:
+        self._aliases[record.blob_path] = record
+        self._aliases.move_to_end(record.blob_path)
+        while len(self._aliases) > self.alias_cache_entries:
+            self._aliases.popitem(last=False)
+
+    async def _lookup(self, blob_path: str) -> Optional[UploadRecord]:
+        """
+        Alias record of an upload from the index (None: not an alias).
+
+        Raises:
+            Exception: The index is unreachable (the upload cannot be resolved)
+        """
+        if not blob_path.startswith(UPLOADS_PREFIX):
+            return None
+        try:
+            repository = await self.repository_provider()
+            record = (await repository.get_uploads([blob_path])).get(blob_path)
+        except Exception as e:
+            self._index_errors.inc()
+            logger.error(f"❌ Upload index unavailable, cannot resolve {blob_path}: {type(e).__name__}: {e}")
+            raise
+        if record is None or not record.is_alias:
+            return None
+        self._remember(record)
+        return record
+
+    async def _read(
+        self,
+        blob_path: str,
+        read: Callable[[str], Awaitable[Any]],
+    ) -> Tuple[Any, Optional[UploadRecord]]:
+        """
+        Read an upload, following its alias.
+
+        An upload's own object is read first while it exists; aliases whose
+        own object was swept go straight to the shared object. A remembered
+        alias that no longer resolves is looked up again once.
+
+        Returns:
+            (read result or None, alias record when the shared object was read)
+        """
+        record = self._aliases.get(blob_path)
+        if record is None or record.release_after is not None:
+            result = await read(blob_path)
+            if result is not None:
+                return result, None
+        if record is not None:
+            self._aliases.move_to_end(blob_path)
+            result = await read(record.canonical_blob_path)
+            if result is not None:
+                self._alias_reads.inc()
+                return result, record
+            self._aliases.pop(blob_path, None)
+
+        record = await self._lookup(blob_path)
+        if record is None:
+            return None, None
+        result = await read(record.canonical_blob_path)
+        if result is not None:
+            self._alias_reads.inc()
+        return result, record
+
+    # -------------------------------------------------------------------------
+    # DocumentStorage
+    # -------------------------------------------------------------------------
+
+    async def verify_upload(self, blob_path: str) -> Optional[Dict[str, Any]]:
+        info, record = await self._read(blob_path, self.inner.verify_upload)
+        if info is not None and record is not None and record.content_type:
+            info = {**info, "content_type": record.content_type}
+        return info
+
+    async def get_document_bytes(self, blob_path: str) -> bytes:
+        async def read(path: str) -> Optional[bytes]:
+            try:
+                return await self.inner.get_document_bytes(path)
+            except FileNotFoundError:
+                return None
+
+        data, _ = await self._read(blob_path, read)
+        if data is None:
+            raise FileNotFoundError(f"Document not found at {blob_path}")
+        return data
+
+    async def generate_presigned_download_url(self, blob_path: str, expiration_minutes: int = 60) -> str:
+        _, record = await self._read(blob_path, self.inner.verify_upload)
+        target = record.canonical_blob_path if record is not None else blob_path
+        return await self.inner.generate_presigned_download_url(target, expiration_minutes)
+
+    async def generate_presigned_upload_url(
+        self,
+        user_id: str,
+        filename: str,
+        content_type: str,
+        expiration_minutes: int = 15,
+    ) -> Dict[str, Any]:
+        return await self.inner.generate_presigned_upload_url(user_id, filename, content_type, expiration_minutes)
+
+    async def upload_bytes(self, blob_path: str, data: bytes, content_type: str) -> None:
+        # Writing over an indexed upload detaches it from its shared object
+        await self._detach(blob_path, keep_own_object=True)
+        await self.inner.upload_bytes(blob_path, data, content_type)
+
+    async def copy_document(self, source_blob_path: str, destination_blob_path: str) -> None:
+        _, record = await self._read(source_blob_path, self.inner.verify_upload)
+        source = record.canonical_blob_path if record is not None else source_blob_path
+        await self._detach(destination_blob_path, keep_own_object=True)
+        await self.inner.copy_document(source, destination_blob_path)
+
+    async def delete_document(self, blob_path: str) -> bool:
+        self._schedule_sweep()
+        record = await self._detach(blob_path)
+        if record is None or not record.is_alias:
+            return await self.inner.delete_document(blob_path)
+        return True
+
+    async def _detach(self, blob_path: str, keep_own_object: bool = False) -> Optional[UploadRecord]:
+        """
+        Remove an upload from the index and delete the objects only it used:
+        its released own object (unless keep_own_object) and, when it was the
+        last upload of the content, the shared object.
+
+        Raises:
+            Exception: The index is unreachable
+        """
+        self._aliases.pop(blob_path, None)
+        if not blob_path.startswith(UPLOADS_PREFIX):
+            return None
+        try:
+            repository = await self.repository_provider()
+            record, remaining = await repository.remove_upload(blob_path)
+        except Exception as e:
+            self._index_errors.inc()
+            logger.error(f"❌ Upload index unavailable, cannot detach {blob_path}: {type(e).__name__}: {e}")
+            raise
+        if record is None or not record.is_alias:
+            return record
+        if record.release_after is not None and not keep_own_object:
+            await self.inner.delete_document(blob_path)
+        if remaining == 0:
+            await self.inner.delete_document(record.canonical_blob_path)
+            logger.info(f"🗑️ Deleted shared object {record.canonical_blob_path} (last upload removed)")
+        return record
+
+    async def list_user_documents(self, user_id: str, max_results: int = 100) -> List[Dict[str, Any]]:
+        documents = await self.inner.list_user_documents(user_id, max_results)
+        try:
+            repository = await self.repository_provider()
+            records = await repository.list_user_uploads(user_id, max_results)
+        except Exception as e:
+            self._failures.inc()
+            logger.warning(f"⚠️ Upload index unavailable, listing stored objects only: {type(e).__name__}: {e}")
+            return documents
+
+        # Swept uploads have no object of their own
+        listed = {document["blob_path"] for document in documents}
+        for record in records:
+            if record.is_alias and record.blob_path not in listed:
+                documents.append({
+                    "blob_path": record.blob_path,
+                    "size_bytes": record.size_bytes,
+                    "content_type": record.content_type,
+                    "created": record.created_at.isoformat() if record.created_at else None,
+                })
+        return documents[:max_results]
+
+    def stats(self) -> dict:
+        """Deduplication counts, for /metrics."""
+        return {
+            "confirmed": self._confirmed.value,
+            "deduplicated": self._deduplicated.value,
+            "shared_objects_created": self._shared.value,
+            "swept": self._swept.value,
+            "saved_mb": round(self._bytes_saved.value / (1024 * 1024), 1),
+            "alias_reads": self._alias_reads.value,
+            "failures": self._failures.value,
+            "index_errors": self._index_errors.value,
+            "cached_aliases": len(self._aliases),
+        }
+
+    async def close(self) -> None:
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+        await self.inner.close()
@@ -0,0 +1,242 @@
+"""
+Two-tier cache of RAG source metadata.
+
+The same handful of documents come back from search after search, and
+each metadata lookup is a GCS `get_blob` or up to three Microsoft Graph
+requests. Metadata is cached per source URI:
+
+- Memory tier: LRU per instance.
+- Persistent tier (optional): a SourceMetadataRepository shared by all
+  instances, so new instances start warm.
+
+Entries younger than METADATA_CACHE_TTL_SECONDS are served without any
+remote call. Older entries are revalidated with their etag (a conditional
+request that usually answers "not modified"). With stale-while-revalidate,
+entries up to METADATA_CACHE_STALE_SECONDS past their TTL are served at
+once and revalidated in the background. Concurrent lookups of the same
+source share one fetch.
+"""
+
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.domain.models.source_metadata import CachedSourceMetadata
+from src.domain.ports.source_metadata_repository import SourceMetadataRepository
+from src.infrastructure.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+METADATA_CACHE_ENABLED = os.getenv("METADATA_CACHE_ENABLED", "true").lower() == "true"
+# Keep entries in Postgres (source_metadata_cache, migration 006) as a shared second tier
+METADATA_CACHE_PERSIST = os.getenv("METADATA_CACHE_PERSIST", "false").lower() == "true"
+# Entries held in memory per instance
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "5000"))
+# Age up to which an entry is served without contacting the source
+METADATA_CACHE_TTL_SECONDS = float(os.getenv("METADATA_CACHE_TTL_SECONDS", "900"))
+# Stale-while-revalidate window after the TTL (0 disables it: stale entries are revalidated inline)
+METADATA_CACHE_STALE_SECONDS = float(os.getenv("METADATA_CACHE_STALE_SECONDS", "86400"))
+
+# Fetches metadata for a source given its cached entry (None if not cached).
+# Returns None when the source confirms the cached entry is unchanged.
+MetadataFetch = Callable[[Optional[CachedSourceMetadata]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MetadataCache:
+    """
+    Source-metadata cache with etag revalidation.
+
+    Only successful lookups (metadata_available) are cached; when a
+    revalidation fails the previous entry keeps being served.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = METADATA_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = METADATA_CACHE_TTL_SECONDS,
+        stale_seconds: float = METADATA_CACHE_STALE_SECONDS,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum entries in memory
+            ttl_seconds: Freshness lifetime of an entry
+            stale_seconds: Stale-while-revalidate window after the TTL
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+
+        self._entries: "OrderedDict[str, CachedSourceMetadata]" = OrderedDict()
+        self._store: Optional[SourceMetadataRepository] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        metrics = get_metrics()
+        self._hits = metrics.counter("metadata_cache.hits")
+        self._stale_hits = metrics.counter("metadata_cache.stale_hits")
+        self._misses = metrics.counter("metadata_cache.misses")
+        self._store_hits = metrics.counter("metadata_cache.store_hits")
+        self._not_modified = metrics.counter("metadata_cache.revalidated_unchanged")
+        self._fetches = metrics.counter("metadata_cache.remote_fetches")
+        metrics.register_collector("metadata_cache", self.stats)
+
+    def set_store(self, store: SourceMetadataRepository) -> None:
+        """Enable the persistent tier."""
+        self._store = store
+
+    async def get_or_fetch(self, source_uri: str, fetch: MetadataFetch) -> Dict[str, Any]:
+        """
+        Get metadata for a source, fetching or revalidating it when needed.
+
+        Args:
+            source_uri: Source URI (cache key)
+            fetch: Fetches fresh metadata, conditionally if given an entry
+
+        Returns:
+            A copy of the metadata dict
+        """
+        entry = await self._lookup(source_uri)
+        if entry is not None:
+            age = (_now() - entry.fetched_at).total_seconds()
+            if age < self.ttl_seconds:
+                self._hits.inc()
+                return dict(entry.metadata)
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._stale_hits.inc()
+                self._refresh(source_uri, entry, fetch)
+                return dict(entry.metadata)
+
+        self._misses.inc()
+        return dict(await asyncio.shield(self._refresh(source_uri, entry, fetch)))
+
+    # -------------------------------------------------------------------------
+    # Tiers
+    # -------------------------------------------------------------------------
+
+    async def _lookup(self, source_uri: str) -> Optional[CachedSourceMetadata]:
+        """Memory tier first, then the persistent tier."""
+        entry = self._entries.get(source_uri)
+        if entry is not None:
+            self._entries.move_to_end(source_uri)
+            return entry
+
+        if self._store is None:
+            return None
+        try:
+            entry = (await self._store.get_entries([source_uri])).get(source_uri)
+        except Exception as e:
+            logger.warning(f"⚠️ Metadata cache store read failed (non-critical): {e}")
+            return None
+        if entry is not None and entry.fetched_at is not None:
+            self._store_hits.inc()
+            self._remember(entry)
+            return entry
+        return None
+
+    def _remember(self, entry: CachedSourceMetadata) -> None:
+        self._entries[entry.source_uri] = entry
+        self._entries.move_to_end(entry.source_uri)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _save(self, entry: CachedSourceMetadata) -> None:
+        self._remember(entry)
+        if self._store is None:
+            return
+        try:
+            await self._store.save_entry(entry)
+        except Exception as e:
+            logger.warning(f"⚠️ Metadata cache store write failed (non-critical): {e}")
+
+    # -------------------------------------------------------------------------
+    # Fetching
+    # -------------------------------------------------------------------------
+
+    def _refresh(
+        self,
+        source_uri: str,
+        entry: Optional[CachedSourceMetadata],
+        fetch: MetadataFetch,
+    ) -> asyncio.Task:
+        """Start (or join) the single fetch of a source."""
+        task = self._inflight.get(source_uri)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(source_uri, entry, fetch))
+            self._inflight[source_uri] = task
+            task.add_done_callback(lambda _: self._inflight.pop(source_uri, None))
+        return task
+
+    async def _fetch(
+        self,
+        source_uri: str,
+        entry: Optional[CachedSourceMetadata],
+        fetch: MetadataFetch,
+    ) -> Dict[str, Any]:
+        """Fetch or revalidate a source and update both tiers."""
+        self._fetches.inc()
+        try:
+            metadata = await fetch(entry)
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"⚠️ Metadata revalidation failed for {source_uri}, serving cached: {e}")
+            return entry.metadata
+
+        if metadata is None and entry is not None:
+            self._not_modified.inc()
+            entry.fetched_at = _now()
+            await self._save(entry)
+            return entry.metadata
+
+        if metadata and metadata.get("metadata_available"):
+            await self._save(CachedSourceMetadata(
+                source_uri=source_uri,
+                metadata=metadata,
+                etag=metadata.get("etag") or metadata.get("e_tag"),
+                fetched_at=_now(),
+            ))
+            return metadata
+
+        # The source could not be read: keep serving the previous entry if there is one
+        return entry.metadata if entry is not None else (metadata or {})
+
+    # -------------------------------------------------------------------------
+    # Stats
+    # -------------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Current usage and hit ratio (stale hits count as hits)."""
+        hits = self._hits.value + self._stale_hits.value
+        lookups = hits + self._misses.value
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "persistent_tier": self._store is not None,
+            "hits": self._hits.value,
+            "stale_hits": self._stale_hits.value,
+            "misses": self._misses.value,
+            "store_hits": self._store_hits.value,
+            "revalidated_unchanged": self._not_modified.value,
+            "remote_fetches": self._fetches.value,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            "in_flight": len(self._inflight),
+        }
+
+
+_metadata_cache: Optional[MetadataCache] = None
+
+
+def get_metadata_cache() -> Optional[MetadataCache]:
+    """Get or create the metadata cache singleton (None when METADATA_CACHE_ENABLED=false)."""
+    global _metadata_cache
+    if _metadata_cache is None and METADATA_CACHE_ENABLED:
+        _metadata_cache = MetadataCache()
+    return _metadata_cache
@@ -1,6 +1,6 @@
 """Metadata fetcher for RAG sources."""
 
-import os
+import asyncio
 import logging
 import re
 from typing import Optional, Dict, Any
@@ -8,10 +8,14 @@ from datetime import datetime
 from urllib.parse import urlparse, unquote
 from dateutil import parser as date_parser
 
+from src.domain.models.source_metadata import CachedSourceMetadata
+from src.infrastructure.tools.metadata_cache import get_metadata_cache
+from src.infrastructure.tools.sharepoint_graph import GraphError, create_sharepoint_graph_client
+
 try:
-    from msgraph.generated.models.o_data_errors.o_data_error import ODataError
+    from google.api_core.exceptions import NotModified
 except ImportError:
-    ODataError = None
+    NotModified = None
 
 logger = logging.getLogger(__name__)
 
@@ -19,48 +23,41 @@ logger = logging.getLogger(__name__)
 class SourceMetadataFetcher:
     """Fetch metadata from various source types (GCS, SharePoint, etc.)."""
     
-    def __init__(self):
-        self.gcs_client = None
-        self.graph_client = None
+    def __init__(self, gcs_client=None, graph_client=None):
+        """
+        Initialize the fetcher.
+        
+        Args:
+            gcs_client: Shared storage.Client (created if not given)
+            graph_client: Shared SharePointGraphClient (created if not given)
+        """
+        self.gcs_client = gcs_client
+        self.graph_client = graph_client
         self._init_clients()
     
     def _init_clients(self):
-        """Initialize API clients."""
-        try:
-            from google.cloud import storage
-            self.gcs_client = storage.Client()
-            logger.info("✅ GCS client initialized")
-        except Exception as e:
-            logger.warning(f"⚠️ GCS client not available: {e}")
+        """Initialize API clients that were not injected."""
+        if self.gcs_client is None:
+            try:
+                from google.cloud import storage
+                self.gcs_client = storage.Client()
+                logger.info("✅ GCS client initialized")
+            except Exception as e:
+                logger.warning(f"⚠️ GCS client not available: {e}")
         
-        try:
-            from msgraph import GraphServiceClient
-            from azure.identity import ClientSecretCredential
-            
-            tenant_id = os.getenv('GRAPH_TENANT_ID')
-            client_id = os.getenv('GRAPH_CLIENT_ID')
-            client_secret = os.getenv('GRAPH_CLIENT_SECRET')
-            
-            if all([tenant_id, client_id, client_secret]):
-                credential = ClientSecretCredential(
-                    tenant_id=tenant_id,
-                    client_id=client_id,
-                    client_secret=client_secret
-                )
-                self.graph_client = GraphServiceClient(
-                    credentials=credential,
-                    scopes=['https://graph.microsoft.com/.default']
-                )
-                logger.info("✅ Microsoft Graph client initialized")
-            else:
-                logger.warning("⚠️ Graph credentials not configured")
-        except Exception as e:
-            logger.warning(f"⚠️ Graph client not available: {e}")
+        if self.graph_client is None:
+            try:
+                self.graph_client = create_sharepoint_graph_client()
+            except Exception as e:
+                logger.warning(f"⚠️ Graph client not available: {e}")
     
     async def get_metadata(self, source_uri: str) -> Dict[str, Any]:
         """
         Get metadata for a source URI.
         
+        GCS and SharePoint metadata is served from the metadata cache and
+        revalidated with the source's etag once the entry expires.
+        
         🛡️ FAULT TOLERANT: Returns minimal metadata if fetch fails.
         """
         if not source_uri:
@@ -69,11 +66,14 @@ class SourceMetadataFetcher:
         try:
             parsed = urlparse(source_uri)
             
-            if parsed.scheme == 'gs':
-                return await self._get_gcs_metadata(source_uri)
-            
-            elif 'sharepoint.com' in source_uri.lower():
-                return await self._get_sharepoint_metadata(source_uri)
+            if parsed.scheme == 'gs' or 'sharepoint.com' in source_uri.lower():
+                cache = get_metadata_cache()
+                if cache is None:
+                    return await self._fetch_remote_metadata(source_uri, None)
+                metadata = await cache.get_or_fetch(
+                    source_uri, lambda entry: self._fetch_remote_metadata(source_uri, entry)
+                )
+                return self._with_current_times(metadata)
             
             elif parsed.scheme in ['http', 'https']:
                 return {
@@ -100,10 +100,35 @@ class SourceMetadataFetcher:
                 'metadata_error': str(e)
             }
 
-    async def _get_gcs_metadata(self, gcs_uri: str) -> Dict[str, Any]:
+    async def _fetch_remote_metadata(
+        self, source_uri: str, entry: Optional[CachedSourceMetadata]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch GCS or SharePoint metadata, conditionally if a cached entry exists.
+        
+        Returns:
+            Fresh metadata, or None if the source is unchanged since `entry`
+        """
+        if urlparse(source_uri).scheme == 'gs':
+            return await self._get_gcs_metadata(source_uri, etag=entry.etag if entry else None)
+        return await self._get_sharepoint_metadata(source_uri, cached=entry.metadata if entry else None)
+
+    def _with_current_times(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Recompute relative times ("3 days ago") of cached metadata."""
+        if metadata.get('metadata_available'):
+            if metadata.get('created'):
+                metadata['created_human'] = self._human_readable_time(metadata['created'])
+            if metadata.get('updated'):
+                metadata['updated_human'] = self._human_readable_time(metadata['updated'])
+        return metadata
+
+    async def _get_gcs_metadata(self, gcs_uri: str, etag: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Fetch metadata from Google Cloud Storage.
         
+        With `etag`, the request is conditional and None is returned if
+        the object has not changed.
+        
         🛡️ FAULT TOLERANT: Returns minimal metadata if fetch fails.
         """
         if not self.gcs_client:
@@ -116,7 +141,10 @@ class SourceMetadataFetcher:
             path = gcs_uri.replace('gs://', '')
             bucket_name, blob_path = path.split('/', 1)
             bucket = self.gcs_client.bucket(bucket_name)
-            blob = await asyncio.to_thread(bucket.get_blob, blob_path)
+            if etag:
+                blob = await asyncio.to_thread(bucket.get_blob, blob_path, if_etag_not_match=etag)
+            else:
+                blob = await asyncio.to_thread(bucket.get_blob, blob_path)
 
             if not blob:
                 raise FileNotFoundError(f"GCS object not found: {gcs_uri}")
@@ -130,7 +158,7 @@ class SourceMetadataFetcher:
                 'created_human': self._human_readable_time(blob.time_created),
                 'updated_human': self._human_readable_time(blob.updated),
                 'md5_hash': blob.md5_hash, 'owner': blob.owner.get('entity') if blob.owner else None,
-                'storage_class': blob.storage_class, 'metadata_available': True
+                'storage_class': blob.storage_class, 'etag': blob.etag, 'metadata_available': True
             }
             
             if blob.metadata:
@@ -140,27 +168,48 @@ class SourceMetadataFetcher:
             return metadata
             
         except Exception as e:
+            if NotModified is not None and isinstance(e, NotModified):
+                logger.info(f"📦 GCS metadata unchanged: {gcs_uri}")
+                return None
             logger.warning(f"⚠️ GCS metadata error (non-critical): {e}")
             return {
                 'source_type': 'gcs', 'uri': gcs_uri, 'file_name': self._extract_filename_from_url(gcs_uri),
                 'metadata_available': False, 'metadata_error': str(e)
             }
 
-    async def _get_sharepoint_metadata(self, sharepoint_url: str) -> Dict[str, Any]:
+    async def _get_sharepoint_metadata(
+        self, sharepoint_url: str, cached: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Fetch metadata from SharePoint via Microsoft Graph.
         
+        The site and drive are resolved once per site (cached by the Graph
+        client) and item lookups of concurrent results share a $batch
+        request. With `cached` metadata, None is returned if the item's
+        eTag has not changed.
+        
         🛡️ FAULT TOLERANT: Returns minimal metadata if fetch fails.
         """
         file_name_fallback = self._extract_filename_from_url(sharepoint_url)
         
-        if not self.graph_client or not ODataError:
+        if not self.graph_client:
             return {
                 'source_type': 'sharepoint', 'url': sharepoint_url, 'file_name': file_name_fallback,
                 'metadata_available': False, 'metadata_error': 'Graph client not available'
             }
         
         try:
+            if cached and cached.get('drive_id') and cached.get('full_path'):
+                # Revalidation: the entry already knows where the item lives
+                item = await self.graph_client.get_item(cached['drive_id'], cached['full_path'])
+                if cached.get('e_tag') and item.get('eTag') == cached['e_tag']:
+                    logger.info(f"✅ SharePoint metadata unchanged: {item.get('name')}")
+                    return None
+                return self._build_sharepoint_metadata(
+                    sharepoint_url, cached['full_path'], item,
+                    cached.get('site_id'), cached.get('site_name'), cached['drive_id'], cached.get('drive_name'),
+                )
+
             logger.info(f"🔍 Parsing SharePoint URL: {sharepoint_url}")
             parsed_data = self._parse_sharepoint_url(sharepoint_url)
             
@@ -170,20 +219,7 @@ class SourceMetadataFetcher:
             tenant, site_path, file_path = parsed_data['tenant'], parsed_data['site_path'], parsed_data['file_path']
             logger.info(f"  Tenant: {tenant}, Site: {site_path}, File path: {file_path}")
             
-            site_result = await self.graph_client.sites.by_site_id(f"{tenant}:{site_path}").get()
-            if not site_result or not site_result.id:
-                raise ValueError("SharePoint site not found")
-
-            site_id = site_result.id
-            logger.info(f"✅ Found site ID: {site_id}")
-
-            drives_result = await self.graph_client.sites.by_site_id(site_id).drives.get()
-            if not drives_result or not drives_result.value:
-                raise ValueError("No document libraries found in site")
-
-            target_drive = next((d for d in drives_result.value if d.name in ['Documents', 'Shared Documents', 'Documentos']), drives_result.value[0])
-            drive_id = target_drive.id
-            logger.info(f"✅ Using drive: {target_drive.name} (ID: {drive_id})")
+            site = await self.graph_client.resolve_site(tenant, site_path)
 
             clean_path = file_path
             for lib_name in ['Shared Documents', 'Documents', 'Documentos', 'Shared%20Documents']:
@@ -192,34 +228,16 @@ class SourceMetadataFetcher:
                     break
             
             logger.info(f"🔎 Looking for file item: {clean_path}")
-            item_result = await self.graph_client.sites.by_site_id(site_id).drives.by_drive_id(drive_id).root.item_with_path(clean_path).get()
-
-            if not item_result:
-                raise FileNotFoundError("File not found at specified path in SharePoint")
+            item = await self.graph_client.get_item(site.drive_id, clean_path)
+            return self._build_sharepoint_metadata(
+                sharepoint_url, clean_path, item, site.site_id, site.site_name, site.drive_id, site.drive_name
+            )
 
-            metadata = {
-                'source_type': 'sharepoint', 'url': sharepoint_url, 'file_name': item_result.name, 'full_path': clean_path,
-                'web_url': item_result.web_url, 'site_name': site_result.display_name, 'site_id': site_id,
-                'drive_name': target_drive.name, 'drive_id': drive_id, 'size': item_result.size,
-                'size_human': self._human_readable_size(item_result.size),
-                'created': item_result.created_date_time.isoformat() if item_result.created_date_time else None,
-                'updated': item_result.last_modified_date_time.isoformat() if item_result.last_modified_date_time else None,
-                'created_human': self._human_readable_time(item_result.created_date_time),
-                'updated_human': self._human_readable_time(item_result.last_modified_date_time),
-                'created_by': item_result.created_by.user.display_name if item_result.created_by and item_result.created_by.user else None,
-                'modified_by': item_result.last_modified_by.user.display_name if item_result.last_modified_by and item_result.last_modified_by.user else None,
-                'content_type': item_result.file.mime_type if item_result.file else None,
-                'e_tag': item_result.e_tag, 'metadata_available': True
-            }
-            logger.info(f"✅ Fetched SharePoint metadata for: {metadata['file_name']}")
-            return metadata
-
-        except ODataError as ode:
-            error_message = str(ode.error.message) if ode.error and ode.error.message else "Unknown ODataError"
-            logger.warning(f"⚠️ SharePoint metadata unavailable (ODataError): {error_message}")
+        except GraphError as ge:
+            logger.warning(f"⚠️ SharePoint metadata unavailable ({ge})")
             return {
                 'source_type': 'sharepoint', 'url': sharepoint_url, 'file_name': file_name_fallback,
-                'metadata_available': False, 'metadata_error': error_message
+                'metadata_available': False, 'metadata_error': ge.message
             }
         except Exception as e:
             logger.error(f"❌ SharePoint metadata fetch failed (non-critical): {e}")
@@ -227,6 +245,45 @@ class SourceMetadataFetcher:
                 'source_type': 'sharepoint', 'url': sharepoint_url, 'file_name': file_name_fallback,
                 'metadata_available': False, 'metadata_error': str(e)
             }
+
+    def _build_sharepoint_metadata(
+        self,
+        sharepoint_url: str,
+        clean_path: str,
+        item: Dict[str, Any],
+        site_id: Optional[str],
+        site_name: Optional[str],
+        drive_id: str,
+        drive_name: Optional[str],
+    ) -> Dict[str, Any]:
+        """Build the metadata dict from a Graph driveItem."""
+        created = self._parse_graph_time(item.get('createdDateTime'))
+        updated = self._parse_graph_time(item.get('lastModifiedDateTime'))
+        created_by = (item.get('createdBy') or {}).get('user') or {}
+        modified_by = (item.get('lastModifiedBy') or {}).get('user') or {}
+
+        metadata = {
+            'source_type': 'sharepoint', 'url': sharepoint_url, 'file_name': item.get('name'), 'full_path': clean_path,
+            'web_url': item.get('webUrl'), 'site_name': site_name, 'site_id': site_id,
+            'drive_name': drive_name, 'drive_id': drive_id, 'size': item.get('size'),
+            'size_human': self._human_readable_size(item.get('size')),
+            'created': created.isoformat() if created else None,
+            'updated': updated.isoformat() if updated else None,
+            'created_human': self._human_readable_time(created),
+            'updated_human': self._human_readable_time(updated),
+            'created_by': created_by.get('displayName'),
+            'modified_by': modified_by.get('displayName'),
+            'content_type': (item.get('file') or {}).get('mimeType'),
+            'e_tag': item.get('eTag'), 'metadata_available': True
+        }
+        logger.info(f"✅ Fetched SharePoint metadata for: {metadata['file_name']}")
+        return metadata
+
+    def _parse_graph_time(self, value: Optional[str]) -> Optional[datetime]:
+        try:
+            return date_parser.parse(value) if value else None
+        except (ValueError, OverflowError):
+            return None
     
     def _parse_sharepoint_url(self, url: str) -> Optional[Dict[str, str]]:
         try:
@@ -0,0 +1,240 @@
+"""
+Shaping of RAG tool responses before they reach the model.
+
+A raw search response repeats the full metadata dict for every hit and
+returns overlapping chunks of the same file as separate results. The
+shaper:
+
+1. Drops near-duplicate chunks (MinHash over word 3-shingles; estimated
+   Jaccard similarity >= RAG_PAYLOAD_DEDUP_THRESHOLD, the better-ranked
+   chunk is kept).
+2. Groups hits by source file, in rank order, and stitches chunks that
+   overlap (chunk_overlap) into one passage.
+3. Keeps only the metadata fields in RAG_PAYLOAD_METADATA_FIELDS.
+4. Trims passages to RAG_PAYLOAD_TOKEN_BUDGET tokens per call.
+"""
+
+import os
+import re
+import hashlib
+import logging
+from typing import Any, Optional
+
+import numpy as np
+
+from src.infrastructure.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+RAG_PAYLOAD_SHAPING_ENABLED = os.getenv("RAG_PAYLOAD_SHAPING_ENABLED", "true").lower() == "true"
+# Approximate tokens of passage text returned per tool call
+RAG_PAYLOAD_TOKEN_BUDGET = int(os.getenv("RAG_PAYLOAD_TOKEN_BUDGET", "2500"))
+# Chunks at least this similar (estimated Jaccard of word 3-shingles) are duplicates
+RAG_PAYLOAD_DEDUP_THRESHOLD = float(os.getenv("RAG_PAYLOAD_DEDUP_THRESHOLD", "0.8"))
+# Metadata fields passed to the model (enough to cite and date a source)
+RAG_PAYLOAD_METADATA_FIELDS = tuple(
+    field.strip()
+    for field in os.getenv("RAG_PAYLOAD_METADATA_FIELDS", "web_url,url,updated,modified_by,site_name").split(",")
+    if field.strip()
+)
+
+# Rough size of a token for Spanish/English text
+CHARS_PER_TOKEN = 4
+# A passage is cut rather than dropped only if at least this many tokens fit
+MIN_PASSAGE_TOKENS = 40
+# Characters of a chunk's start searched for in the previous chunk to detect overlap
+OVERLAP_PROBE_CHARS = 60
+
+MINHASH_PERMUTATIONS = 64
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20251)
+_HASH_A = _rng.integers(1, 1 << 32, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_HASH_B = _rng.integers(0, 1 << 32, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_payload_tokens(value: Any) -> int:
+    """
+    Approximate token count of a value once serialized to JSON.
+
+    Sums the lengths of its strings and keys instead of serializing it
+    (punctuation and quoting are not counted).
+    """
+    return (_payload_chars(value) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_results_tokens(results: list[dict[str, Any]]) -> int:
+    """
+    Approximate token count of raw search results.
+
+    Counts every hit's text; the other fields (mostly the repeated
+    metadata dict) are sized on the first hit and assumed alike for all.
+    """
+    if not results:
+        return 0
+    fields = _payload_chars({key: value for key, value in results[0].items() if key != "text"})
+    chars = sum(len(r.get("text") or "") for r in results) + fields * len(results)
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _payload_chars(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(str(key)) + _payload_chars(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_chars(item) for item in value)
+    if value is None or isinstance(value, bool):
+        return 4
+    return len(str(value))
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature of a text's word 3-shingles."""
+    words = _WORD.findall(text.casefold())
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))}
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little") for s in shingles],
+        dtype=np.uint64,
+    )
+    # (a * x + b) mod p with x, a < 2^32 stays within uint64
+    return ((hashes[:, None] * _HASH_A + _HASH_B) % _MERSENNE_PRIME).min(axis=0)
+
+
+def near_duplicates(texts: list[str], threshold: float = RAG_PAYLOAD_DEDUP_THRESHOLD) -> list[bool]:
+    """
+    Flag texts that nearly duplicate an earlier one.
+
+    Returns:
+        For each text, True if an earlier (better-ranked) text is at least
+        `threshold` similar
+    """
+    if len(texts) < 2:
+        return [False] * len(texts)
+    signatures = np.stack([minhash_signature(text) for text in texts])
+    similarity = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+
+    duplicate = [False] * len(texts)
+    for i in range(len(texts)):
+        if duplicate[i]:
+            continue
+        for j in np.flatnonzero(similarity[i, i + 1:] >= threshold) + i + 1:
+            duplicate[j] = True
+    return duplicate
+
+
+def _stitch(passage: str, text: str) -> Optional[str]:
+    """Join text to passage if one continues the other (overlapping chunks); None otherwise."""
+    for first, second in ((passage, text), (text, passage)):
+        probe = second[:OVERLAP_PROBE_CHARS]
+        start = first.find(probe) if len(probe) == OVERLAP_PROBE_CHARS else -1
+        if start >= 0 and second.startswith(first[start:]):
+            return first + second[len(first) - start:]
+    return None
+
+
+def _trim(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens at a word boundary."""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > 0 else limit].rstrip() + " …"
+
+
+def _compact_metadata(metadata: Optional[dict]) -> dict[str, Any]:
+    if not metadata or not metadata.get("metadata_available", True):
+        return {}
+    return {key: metadata[key] for key in RAG_PAYLOAD_METADATA_FIELDS if metadata.get(key)}
+
+
+def shape_payload(response: dict[str, Any], token_budget: int = RAG_PAYLOAD_TOKEN_BUDGET) -> dict[str, Any]:
+    """
+    Turn a VertexRAGTool.search response into a compact, per-source payload.
+
+    Args:
+        response: Search response (results ranked best first)
+        token_budget: Approximate tokens of passage text to return
+
+    Returns:
+        The response with `results` grouped by source: file_name,
+        source_uri, corpus_name, relevance_score (best hit), passages,
+        metadata (selected fields). Failed corpuses are listed in
+        `failed_corpuses`. `omitted_results` reports what was left out:
+        `duplicates` (near-duplicate hits) and `over_budget` (passages
+        past the token budget).
+    """
+    results = response.get("results") or []
+    hits = [r for r in results if not r.get("status") and r.get("text")]
+    failed = sorted({r["corpus_name"] for r in results if r.get("status") in ("error", "timeout")})
+
+    duplicate = near_duplicates([hit["text"] for hit in hits])
+    sources: dict[str, dict[str, Any]] = {}
+    for hit, is_duplicate in zip(hits, duplicate):
+        if is_duplicate:
+            continue
+        key = hit.get("source_uri") or f"{hit.get('corpus_id')}:{hit.get('rank')}"
+        source = sources.get(key)
+        if source is None:
+            source = sources[key] = {
+                "file_name": hit.get("file_name"),
+                "source_uri": hit.get("source_uri"),
+                "corpus_name": hit.get("corpus_name"),
+                "relevance_score": hit.get("relevance_score"),
+                "passages": [],
+                "metadata": _compact_metadata(hit.get("metadata")),
+            }
+        for index, passage in enumerate(source["passages"]):
+            stitched = _stitch(passage, hit["text"])
+            if stitched is not None:
+                source["passages"][index] = stitched
+                break
+        else:
+            source["passages"].append(hit["text"])
+
+    # Fill the budget in rank order; sources left without passages are dropped
+    remaining = token_budget
+    kept_passages = 0
+    shaped = []
+    for source in sources.values():
+        passages = []
+        for passage in source["passages"]:
+            tokens = estimate_tokens(passage)
+            if tokens <= remaining:
+                passages.append(passage)
+                remaining -= tokens
+            elif remaining >= MIN_PASSAGE_TOKENS:
+                passages.append(_trim(passage, remaining))
+                remaining = 0
+        if passages:
+            kept_passages += len(passages)
+            shaped.append({**source, "passages": passages})
+        if remaining < MIN_PASSAGE_TOKENS:
+            break
+
+    duplicates = sum(duplicate)
+    over_budget = sum(len(source["passages"]) for source in sources.values()) - kept_passages
+
+    payload = {key: value for key, value in response.items() if key != "results"}
+    payload["total_results"] = len(shaped)
+    payload["results"] = shaped
+    if duplicates or over_budget:
+        payload["omitted_results"] = {"duplicates": duplicates, "over_budget": over_budget}
+    if failed:
+        payload["failed_corpuses"] = failed
+
+    metrics = get_metrics()
+    before = estimate_results_tokens(results)
+    after = estimate_payload_tokens(shaped)
+    metrics.counter("rag_payload.tokens_before").inc(before)
+    metrics.counter("rag_payload.tokens_after").inc(after)
+    metrics.counter("rag_payload.duplicates").inc(duplicates)
+    metrics.counter("rag_payload.over_budget").inc(over_budget)
+    logger.info(f"✂️ Shaped RAG payload: {len(hits)} hits -> {len(shaped)} sources, ~{before} -> ~{after} tokens")
+    return payload
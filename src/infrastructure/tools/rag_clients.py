@@ -0,0 +1,143 @@
+"""
+Process-wide clients shared by all RAG tools.
+
+RAG tools are created per corpus and per agent. The expensive parts -
+`vertexai.init`, the GCS client, the Graph client, the metadata fetcher,
+the query executor, the local vector backend and the per-corpus circuit
+breakers - live here once per process. The DI container
+owns the instance and closes it on shutdown.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional
+
+from asyncpg import Pool
+
+import vertexai
+
+from src.infrastructure.tools.metadata_fetcher import SourceMetadataFetcher
+from src.infrastructure.tools.rag_resilience import ResilientCaller
+
+logger = logging.getLogger(__name__)
+
+# Threads dedicated to blocking Vertex RAG calls (separate from the default executor)
+RAG_EXECUTOR_WORKERS = int(os.getenv("RAG_EXECUTOR_WORKERS", "8"))
+
+_vertexai_lock = threading.Lock()
+_vertexai_target: Optional[tuple] = None
+
+
+def init_vertexai(project_id: str, location: str) -> bool:
+    """
+    Run vertexai.init once per process (again only if the target changes).
+
+    Returns:
+        True if Vertex AI is initialized for project_id/location
+    """
+    global _vertexai_target
+    with _vertexai_lock:
+        if _vertexai_target == (project_id, location):
+            return True
+        try:
+            vertexai.init(project=project_id, location=location)
+        except Exception as e:
+            logger.error(f"❌ Vertex AI init failed: {e}")
+            return False
+        _vertexai_target = (project_id, location)
+        logger.info(f"✅ Vertex AI initialized: {project_id} @ {location}")
+        return True
+
+
+class RAGClients:
+    """Shared Vertex, GCS and Graph access plus the corpus query executor."""
+
+    def __init__(
+        self,
+        project_id: Optional[str] = None,
+        location: Optional[str] = None,
+        executor_workers: int = RAG_EXECUTOR_WORKERS,
+        db_pool_provider: Optional[Callable[[], Awaitable[Pool]]] = None,
+    ):
+        """
+        Initialize the shared clients. Each client is created on first use.
+
+        Args:
+            project_id: Google Cloud project (defaults to GOOGLE_CLOUD_PROJECT)
+            location: Vertex AI location (defaults to GOOGLE_CLOUD_LOCATION)
+            executor_workers: Threads for blocking corpus queries
+            db_pool_provider: Returns the shared asyncpg pool (pgvector corpuses)
+        """
+        self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+        self.location = location or os.getenv("GOOGLE_CLOUD_LOCATION", "us-east4")
+        self.executor_workers = executor_workers
+        self.db_pool_provider = db_pool_provider
+
+        self._lock = threading.Lock()
+        self._vertexai_ready = False
+        self._metadata_fetcher: Optional[SourceMetadataFetcher] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local_vectors = None
+        self._resilience: Optional[ResilientCaller] = None
+
+    def ensure_vertexai(self) -> bool:
+        """Initialize Vertex AI if needed; False if the project is unset or init failed."""
+        if not self._vertexai_ready and self.project_id:
+            self._vertexai_ready = init_vertexai(self.project_id, self.location)
+        return self._vertexai_ready
+
+    @property
+    def metadata_fetcher(self) -> SourceMetadataFetcher:
+        """Metadata fetcher with the shared GCS and Graph clients."""
+        with self._lock:
+            if self._metadata_fetcher is None:
+                self._metadata_fetcher = SourceMetadataFetcher()
+                logger.info("✅ Shared SourceMetadataFetcher initialized")
+            return self._metadata_fetcher
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Bounded executor used for corpus queries."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.executor_workers,
+                    thread_name_prefix="rag-query",
+                )
+            return self._executor
+
+    @property
+    def resilience(self) -> ResilientCaller:
+        """Hedging, retries and circuit breakers for Vertex RAG queries (on the executor)."""
+        if self._resilience is None:
+            executor = self.executor
+            with self._lock:
+                if self._resilience is None:
+                    self._resilience = ResilientCaller(executor)
+        return self._resilience
+
+    @property
+    def local_vectors(self):
+        """Backend for numpy / pgvector corpuses (imported on first use: needs numpy)."""
+        if self._local_vectors is None:
+            from src.infrastructure.vector import LocalVectorBackend
+
+            executor = self.executor
+            with self._lock:
+                if self._local_vectors is None:
+                    self._local_vectors = LocalVectorBackend(executor, self.db_pool_provider)
+                    logger.info("✅ Local vector backend initialized")
+        return self._local_vectors
+
+    async def close(self) -> None:
+        """Shut down the executor and close HTTP connection pools."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._resilience = None
+            fetcher, self._metadata_fetcher = self._metadata_fetcher, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if fetcher is not None and fetcher.graph_client is not None:
+            await fetcher.graph_client.close()
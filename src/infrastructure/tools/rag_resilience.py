@@ -0,0 +1,377 @@
+"""
+Resilience for blocking Vertex RAG calls: hedging, retries, circuit breaking.
+
+- Hedging: when a call has not answered after the corpus's recent p95
+  latency, a second identical call is sent and whichever answers first
+  wins. The slower one finishes in the background (threads cannot be
+  interrupted); its result is dropped.
+- Retries: transient failures (unavailable, deadline exceeded, 5xx,
+  throttling) are retried once while time remains.
+- Retry budget: hedges and retries both spend from one process-wide
+  budget that earns RAG_RETRY_BUDGET_RATIO tokens per call (plus a small
+  floor per second), so a degraded backend sees at most ~10% extra load
+  instead of double.
+- Circuit breakers, one per corpus: after RAG_BREAKER_FAILURES consecutive
+  failures the corpus is skipped for RAG_BREAKER_OPEN_SECONDS, then one
+  probe call is let through (half-open); its outcome closes or reopens it.
+
+The guarded call is any blocking callable, so tests and benchmarks can
+substitute a fake RAG client that injects latency and errors
+(benchmarks/rag_resilience_bench.py).
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from src.infrastructure.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Send a hedge request when a call is slower than the recent percentile
+RAG_HEDGE_ENABLED = os.getenv("RAG_HEDGE_ENABLED", "true").lower() == "true"
+# Latency percentile that triggers the hedge
+RAG_HEDGE_PERCENTILE = float(os.getenv("RAG_HEDGE_PERCENTILE", "95"))
+# Never hedge earlier than this (ms)
+RAG_HEDGE_MIN_DELAY_MS = float(os.getenv("RAG_HEDGE_MIN_DELAY_MS", "50"))
+# Latencies needed before a corpus is hedged
+RAG_HEDGE_MIN_SAMPLES = int(os.getenv("RAG_HEDGE_MIN_SAMPLES", "20"))
+# Recent latencies kept per corpus
+RAG_HEDGE_WINDOW = int(os.getenv("RAG_HEDGE_WINDOW", "200"))
+# Retries of a transient failure (each spends from the retry budget)
+RAG_RETRY_ATTEMPTS = int(os.getenv("RAG_RETRY_ATTEMPTS", "1"))
+# Budget tokens earned per call; one hedge or retry spends one
+RAG_RETRY_BUDGET_RATIO = float(os.getenv("RAG_RETRY_BUDGET_RATIO", "0.1"))
+# Tokens earned per second regardless of traffic (lets low-traffic instances retry)
+RAG_RETRY_BUDGET_MIN_PER_SECOND = float(os.getenv("RAG_RETRY_BUDGET_MIN_PER_SECOND", "1"))
+# Consecutive failures that open a corpus's circuit
+RAG_BREAKER_FAILURES = int(os.getenv("RAG_BREAKER_FAILURES", "5"))
+# Seconds an open circuit rejects calls before a probe is let through
+RAG_BREAKER_OPEN_SECONDS = float(os.getenv("RAG_BREAKER_OPEN_SECONDS", "30"))
+
+# Most tokens the budget can hold (bounds a retry burst after a quiet period)
+_BUDGET_MAX_TOKENS = 10.0
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """The corpus's circuit is open; the call was not attempted."""
+
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"Circuit open for {key}, retrying in {retry_after:.0f}s")
+        self.key = key
+        self.retry_after = retry_after
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an error is worth retrying (and counts against the circuit)."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    try:
+        from google.api_core import exceptions as api_exceptions
+    except ImportError:
+        return False
+    return isinstance(error, (
+        api_exceptions.ServiceUnavailable,
+        api_exceptions.DeadlineExceeded,
+        api_exceptions.InternalServerError,
+        api_exceptions.TooManyRequests,
+        api_exceptions.Aborted,
+    ))
+
+
+class LatencyTracker:
+    """Recent successful call latencies of one corpus."""
+
+    def __init__(self, window: int = RAG_HEDGE_WINDOW):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Latency percentile in seconds, or None with too few samples."""
+        if len(self._samples) < RAG_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open probe -> closed or open."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = RAG_BREAKER_FAILURES,
+        open_seconds: float = RAG_BREAKER_OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.clock = clock
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead (in half-open state, only one probe at a time)."""
+        if self.state == self.OPEN:
+            if self.clock() - self._opened_at < self.open_seconds:
+                return False
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through."""
+        return max(0.0, self._opened_at + self.open_seconds - self.clock())
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; True if it opened the circuit."""
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            opened = self.state != self.OPEN
+            self.state = self.OPEN
+            self._opened_at = self.clock()
+            return opened
+        return False
+
+    def release(self) -> None:
+        """End a call whose outcome says nothing about the backend (e.g. a bad request)."""
+        self._probing = False
+
+
+class RetryBudget:
+    """Token bucket shared by hedges and retries."""
+
+    def __init__(
+        self,
+        ratio: float = RAG_RETRY_BUDGET_RATIO,
+        min_per_second: float = RAG_RETRY_BUDGET_MIN_PER_SECOND,
+        max_tokens: float = _BUDGET_MAX_TOKENS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.clock = clock
+
+        self.tokens = max_tokens
+        self._refilled_at = clock()
+
+    def deposit(self) -> None:
+        """Earn tokens for a first attempt."""
+        self._refill()
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Spend a token for a hedge or retry; False if the budget is exhausted."""
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._refilled_at) * self.min_per_second)
+        self._refilled_at = now
+
+
+class ResilientCaller:
+    """Runs blocking calls on an executor with hedging, retries and per-key circuit breakers."""
+
+    def __init__(
+        self,
+        executor: Executor,
+        hedge_enabled: bool = RAG_HEDGE_ENABLED,
+        hedge_percentile: float = RAG_HEDGE_PERCENTILE,
+        retry_attempts: int = RAG_RETRY_ATTEMPTS,
+        budget: Optional[RetryBudget] = None,
+        breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+    ):
+        """
+        Initialize the caller.
+
+        Args:
+            executor: Executor the blocking calls run on
+            hedge_enabled: Send hedge requests for slow calls
+            hedge_percentile: Latency percentile after which to hedge
+            retry_attempts: Retries of transient failures
+            budget: Shared retry budget (a new one if omitted)
+            breaker_factory: Creates the circuit breaker of a new key
+        """
+        self.executor = executor
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.retry_attempts = retry_attempts
+        self.budget = budget or RetryBudget()
+        self.breaker_factory = breaker_factory
+
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, LatencyTracker] = {}
+
+        metrics = get_metrics()
+        self._hedges = metrics.counter("rag_resilience.hedges")
+        self._hedge_wins = metrics.counter("rag_resilience.hedge_wins")
+        self._retries = metrics.counter("rag_resilience.retries")
+        self._budget_exhausted = metrics.counter("rag_resilience.budget_exhausted")
+        self._rejected = metrics.counter("rag_resilience.circuit_rejected")
+        self._opened = metrics.counter("rag_resilience.circuit_opened")
+        metrics.register_collector("rag_resilience", self.stats)
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        if key not in self._breakers:
+            self._breakers[key] = self.breaker_factory()
+        return self._breakers[key]
+
+    def latency(self, key: str) -> LatencyTracker:
+        if key not in self._latencies:
+            self._latencies[key] = LatencyTracker()
+        return self._latencies[key]
+
+    async def call(self, key: str, fn: Callable[[], T], timeout: float) -> T:
+        """
+        Run `fn` for `key` (a corpus) with hedging and retries.
+
+        Args:
+            key: Circuit breaker and latency key
+            fn: Blocking call; raises on failure
+            timeout: Seconds for the whole call, hedges and retries included
+
+        Raises:
+            CircuitOpenError: The key's circuit is open
+            asyncio.TimeoutError: No attempt succeeded in time
+            Exception: The last attempt's error
+        """
+        breaker = self.breaker(key)
+        if not breaker.allow():
+            self._rejected.inc()
+            raise CircuitOpenError(key, breaker.retry_after())
+
+        self.budget.deposit()
+        deadline = asyncio.get_running_loop().time() + timeout
+        try:
+            result = await self._call_with_retries(key, fn, deadline)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            if not is_transient(e):
+                breaker.release()
+            elif breaker.record_failure():
+                self._opened.inc()
+                logger.warning(
+                    f"🔌 Circuit opened for {key} after {breaker.failures} failures "
+                    f"({type(e).__name__}), skipping it for {breaker.open_seconds:g}s"
+                )
+            raise
+
+        if breaker.state != CircuitBreaker.CLOSED:
+            logger.info(f"🔌 Circuit closed for {key}")
+        breaker.record_success()
+        return result
+
+    async def _call_with_retries(self, key: str, fn: Callable[[], T], deadline: float) -> T:
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retry_attempts + 1):
+            try:
+                return await self._hedged(key, fn, deadline)
+            except Exception as e:
+                if attempt == self.retry_attempts or not is_transient(e) or isinstance(e, asyncio.TimeoutError):
+                    raise
+                # Jittered backoff, only if a retry still fits before the deadline
+                backoff = random.uniform(0.05, 0.15) * (attempt + 1)
+                if loop.time() + backoff >= deadline:
+                    raise
+                if not self.budget.withdraw():
+                    self._budget_exhausted.inc()
+                    raise
+                self._retries.inc()
+                logger.info(f"🔁 Retrying {key} after {type(e).__name__}: {e}")
+                await asyncio.sleep(backoff)
+        raise AssertionError("unreachable")
+
+    async def _hedged(self, key: str, fn: Callable[[], T], deadline: float) -> T:
+        """One attempt, plus a hedge if it is slower than the key's recent percentile."""
+        loop = asyncio.get_running_loop()
+        latency = self.latency(key)
+
+        hedge_delay = None
+        if self.hedge_enabled:
+            percentile = latency.percentile(self.hedge_percentile)
+            if percentile is not None:
+                hedge_delay = max(percentile, RAG_HEDGE_MIN_DELAY_MS / 1000)
+
+        started = loop.time()
+        primary = loop.run_in_executor(self.executor, fn)
+        pending = {primary: started}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                wait = remaining
+                if hedge_delay is not None:
+                    wait = min(remaining, max(0.0, started + hedge_delay - loop.time()))
+
+                done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    attempt_started = pending.pop(future)
+                    if future.exception() is None:
+                        latency.record(loop.time() - attempt_started)
+                        if future is not primary:
+                            self._hedge_wins.inc()
+                        return future.result()
+                    error = future.exception()
+
+                if hedge_delay is not None and not done:
+                    # The primary is slower than usual: hedge once
+                    hedge_delay = None
+                    if self.budget.withdraw():
+                        self._hedges.inc()
+                        logger.info(f"🪁 Hedging {key} after {(loop.time() - started) * 1000:.0f} ms")
+                        pending[loop.run_in_executor(self.executor, fn)] = loop.time()
+                    else:
+                        self._budget_exhausted.inc()
+            # Every attempt failed; the retry loop decides what happens next
+            raise error
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        """Circuits that are not closed, and the retry budget, for /metrics."""
+        return {
+            "hedge_enabled": self.hedge_enabled,
+            "budget_tokens": round(self.budget.tokens, 2),
+            "circuits": {
+                key: {"state": breaker.state, "failures": breaker.failures}
+                for key, breaker in self._breakers.items()
+                if breaker.state != CircuitBreaker.CLOSED
+            },
+        }
@@ -1,16 +1,25 @@
 """RAG (Retrieval-Augmented Generation) tool using Vertex AI RAG Engine with metadata fetching."""
 
 import os
+import time
 import logging
-from typing import Any
+from typing import Any, Optional
 import asyncio
-import vertexai
+import functools
 from vertexai.preview import rag
-from src.domain.models import CorpusConfig
-from src.infrastructure.tools.metadata_fetcher import SourceMetadataFetcher
+from src.domain.models import LOCAL_VECTOR_DB_TYPES, CorpusConfig
+from src.infrastructure.tools.rag_clients import RAGClients
+from src.infrastructure.tools.rag_resilience import CircuitOpenError
+from src.infrastructure.tools.payload_shaper import RAG_PAYLOAD_SHAPING_ENABLED, shape_payload
+from src.infrastructure.tools.reranker import RAG_RERANK_ENABLED, rerank
+from src.infrastructure.tools.retrieval_cache import get_retrieval_cache
+from src.infrastructure.tools.speculative_retrieval import take_prefetched
 
 logger = logging.getLogger(__name__)
 
+# Per-corpus time limit; slower corpora are left out of the merged results
+RAG_CORPUS_TIMEOUT_SECONDS = float(os.getenv("RAG_CORPUS_TIMEOUT_SECONDS", "8"))
+
 
 class VertexRAGTool:
     """
@@ -20,27 +29,26 @@ class VertexRAGTool:
     across configured corpuses and retrieve relevant context with full metadata.
     """
 
-    def __init__(self, corpuses: list[CorpusConfig]):
+    def __init__(self, corpuses: list[CorpusConfig], clients: Optional[RAGClients] = None):
         """
         Initialize the RAG tool with corpuses.
 
         Args:
             corpuses: List of corpus configurations to search
+            clients: Shared clients (the container's); a private set is created if omitted
         """
         self.corpuses = corpuses
-        self.project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-        self.location = os.getenv("GOOGLE_CLOUD_LOCATION", "us-east4")
-        self.metadata_fetcher = SourceMetadataFetcher()  
+        self.clients = clients or RAGClients()
+        self.project_id = self.clients.project_id
+        self.location = self.clients.location
 
-        logger.info(f"🧠 RAG Tool initialized: {len(corpuses)} corpuses")
-        logger.info(f"🌍 Project: {self.project_id}, Location: {self.location}")
+        logger.info(f"🧠 RAG Tool initialized: {len(corpuses)} corpuses ({self.project_id} @ {self.location})")
+        self.clients.ensure_vertexai()
 
-        if self.project_id:
-            try:
-                vertexai.init(project=self.project_id, location=self.location)
-                logger.info(f"✅ Vertex AI initialized: {self.project_id} @ {self.location}")
-            except Exception as e:
-                logger.error(f"❌ Vertex AI init failed: {e}")
+    @property
+    def metadata_fetcher(self):
+        """The shared metadata fetcher (created on first enrichment)."""
+        return self.clients.metadata_fetcher
 
     async def search(self, query: str, top_k: int = 5, similarity_threshold: float = 0.5, fetch_metadata: bool = True) -> dict[str, Any]:
         """
@@ -65,55 +73,53 @@ class VertexRAGTool:
                 "results": []
             }
 
-        if not self.project_id:
-            logger.error("❌ GOOGLE_CLOUD_PROJECT not set")
-            return {
-                "status": "error",
-                "message": "GOOGLE_CLOUD_PROJECT environment variable not set",
-                "results": []
-            }
-
-        all_results = []
-
+        active_corpuses = []
         for corpus in self.corpuses:
             if not corpus.enabled:
                 logger.warning(f"⏭️ Skipping disabled corpus: {corpus.corpus_name}")
                 continue
 
-            if not corpus.vertex_corpus_name:
+            if corpus.vector_db_type == "vertex_rag" and not corpus.vertex_corpus_name:
                 logger.warning(f"⏭️ Skipping corpus without vertex_corpus_name: {corpus.corpus_name}")
                 continue
 
-            try:
-                logger.info(f"📚 Querying corpus: {corpus.corpus_name}")
-                
-                results = await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    self._query_corpus,
-                    corpus,
-                    query,
-                    top_k,
-                    similarity_threshold
-                )
+            active_corpuses.append(corpus)
 
-                all_results.extend(results)
-                logger.info(f"✅ Got {len(results)} results from {corpus.corpus_name}")
+        # Local corpuses with an offline embedder work without a Google Cloud project
+        if not self.project_id and any(c.vector_db_type == "vertex_rag" for c in active_corpuses):
+            logger.error("❌ GOOGLE_CLOUD_PROJECT not set")
+            return {
+                "status": "error",
+                "message": "GOOGLE_CLOUD_PROJECT environment variable not set",
+                "results": []
+            }
 
-            except Exception as e:
-                logger.error(f"❌ Error querying corpus {corpus.corpus_name}: {e}", exc_info=True)
-                all_results.append({
-                    "corpus_id": corpus.corpus_id,
-                    "corpus_name": corpus.corpus_name,
-                    "error": str(e),
-                    "status": "error"
-                })
+        # Query all corpuses concurrently: total latency is the slowest corpus, not the sum
+        started = time.perf_counter()
+        per_corpus = await asyncio.gather(*[
+            self._search_corpus(corpus, query, top_k, similarity_threshold)
+            for corpus in active_corpuses
+        ])
+        all_results = [result for results in per_corpus for result in results]
+        failed = [
+            result["corpus_name"] for result in all_results
+            if result.get("status") in ("error", "timeout")
+        ]
+        logger.info(
+            f"⏱️ Fan-out over {len(active_corpuses)} corpuses took "
+            f"{(time.perf_counter() - started) * 1000:.0f} ms"
+            + (f" (partial, failed: {', '.join(failed)})" if failed else "")
+        )
 
-        all_results.sort(
-            key=lambda x: (
-                -x.get("relevance_score", 0.0),
-                x.get("priority", 999)
+        if RAG_RERANK_ENABLED:
+            all_results = rerank(query, all_results)
+        else:
+            all_results.sort(
+                key=lambda x: (
+                    -(x.get("relevance_score") or 0.0),
+                    x.get("priority", 999)
+                )
             )
-        )
 
         limited_results = all_results[:top_k * 2]
 
@@ -130,9 +136,90 @@ class VertexRAGTool:
             "query": query,
             "total_results": len(enriched_results),
             "corpuses_searched": len([c for c in self.corpuses if c.enabled]),
+            "partial": bool(failed),
             "results": enriched_results
         }
 
+    async def _search_corpus(
+        self,
+        corpus: CorpusConfig,
+        query: str,
+        top_k: int,
+        similarity_threshold: float
+    ) -> list[dict[str, Any]]:
+        """
+        Query one corpus under RAG_CORPUS_TIMEOUT_SECONDS: Vertex RAG on the
+        RAG executor (hedged, retried and circuit-broken per corpus, see
+        rag_resilience), numpy / pgvector corpuses on the local vector backend.
+
+        Repeated searches are answered from the retrieval cache. Never
+        raises: failures and timeouts become a single error entry so the
+        other corpuses' results are still returned.
+        """
+        cache = get_retrieval_cache()
+        version = None
+        if cache is not None:
+            # Read the version before querying so results are never tagged newer than they are
+            version = await cache.corpus_version(corpus)
+            cached = cache.get(corpus.corpus_id, version, query, top_k, similarity_threshold)
+            if cached is not None:
+                logger.info(f"⚡ Cache hit for {corpus.corpus_name} ({len(cached)} results)")
+                return cached
+
+        logger.info(f"📚 Querying corpus: {corpus.corpus_name}")
+        started = time.perf_counter()
+
+        if corpus.vector_db_type in LOCAL_VECTOR_DB_TYPES:
+            pending = asyncio.wait_for(
+                self.clients.local_vectors.search(corpus, query, top_k, similarity_threshold),
+                timeout=RAG_CORPUS_TIMEOUT_SECONDS,
+            )
+        else:
+            pending = self.clients.resilience.call(
+                corpus.corpus_id,
+                functools.partial(self._query_corpus, corpus, query, top_k, similarity_threshold),
+                timeout=RAG_CORPUS_TIMEOUT_SECONDS,
+            )
+
+        try:
+            results = await pending
+        except CircuitOpenError as e:
+            logger.warning(f"🔌 Skipping corpus {corpus.corpus_name}: {e}")
+            return [{
+                "corpus_id": corpus.corpus_id,
+                "corpus_name": corpus.corpus_name,
+                "error": str(e),
+                "status": "error"
+            }]
+        except asyncio.TimeoutError:
+            # The worker thread finishes in the background; the executor bound caps them
+            logger.warning(
+                f"⏱️ Corpus {corpus.corpus_name} timed out after {RAG_CORPUS_TIMEOUT_SECONDS:g}s, "
+                f"returning partial results"
+            )
+            return [{
+                "corpus_id": corpus.corpus_id,
+                "corpus_name": corpus.corpus_name,
+                "error": f"Timed out after {RAG_CORPUS_TIMEOUT_SECONDS:g}s",
+                "status": "timeout"
+            }]
+        except Exception as e:
+            logger.error(f"❌ Error querying corpus {corpus.corpus_name}: {e}", exc_info=True)
+            return [{
+                "corpus_id": corpus.corpus_id,
+                "corpus_name": corpus.corpus_name,
+                "error": f"{type(e).__name__}: {str(e)}",
+                "status": "error"
+            }]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"✅ Got {len(results)} results from {corpus.corpus_name} in {elapsed_ms:.0f} ms")
+
+        # Unsupported corpus types come back as entries with a status; only cache real results
+        if cache is not None and not any(result.get("status") for result in results):
+            cache.put(corpus.corpus_id, version, query, top_k, similarity_threshold, results)
+        return results
+
     async def _enrich_with_metadata(self, results: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """
         Enrich results with metadata from source URIs.
@@ -179,6 +266,10 @@ class VertexRAGTool:
 
         Returns:
             List of search results WITH source URIs
+
+        Raises:
+            Exception: The RAG API call failed (the resilience layer decides
+                whether to retry and _search_corpus reports it)
         """
         results = []
 
@@ -257,30 +348,23 @@ class VertexRAGTool:
             logger.error(f"   Error type: {type(e).__name__}")
             logger.error(f"   Error message: {str(e)}")
             logger.error(f"   Corpus resource: {corpus.vertex_corpus_name}")
-            import traceback
-            logger.error(traceback.format_exc())
-            
-            results.append({
-                "corpus_id": corpus.corpus_id,
-                "corpus_name": corpus.corpus_name,
-                "error": f"{type(e).__name__}: {str(e)}",
-                "status": "error"
-            })
+            raise
 
         return results
 
 
-def create_rag_tool(corpus: CorpusConfig):  
+def create_rag_tool(corpus: CorpusConfig, clients: Optional[RAGClients] = None):
     """
     Factory function to create a RAG tool function for a SINGLE corpus.
 
     Args:
         corpus: Single corpus configuration
+        clients: Shared clients (the container's)
 
     Returns:
         An async function that can be used as an ADK tool
     """
-    tool_instance = VertexRAGTool([corpus])
+    tool_instance = VertexRAGTool([corpus], clients=clients)
     
     corpus_name_safe = corpus.display_name.replace(" ", "_").replace("-", "_").lower()
     
@@ -298,15 +382,23 @@ def create_rag_tool(corpus: CorpusConfig):
             top_k: Number of results to return (default: 5)
             
         Returns:
-            Dictionary with search results containing:
-            - text: The relevant document excerpt
+            Dictionary with search results, one per source file, containing:
+            - passages: The relevant document excerpts
             - file_name: Name of the source file
             - source_uri: Full URI to the source file
-            - relevance_score: How relevant this result is (0.0-1.0)
-            - metadata: Complete file metadata
+            - relevance_score: How relevant the best excerpt is (0.0-1.0)
+            - metadata: File details for citing (link, last update)
         """
-        return await tool_instance.search(query, top_k=top_k)
+        # A search for the user's prompt may already be running (speculative agents)
+        response = await take_prefetched(tool_instance, query, top_k)
+        if response is None:
+            response = await tool_instance.search(query, top_k=top_k)
+        if RAG_PAYLOAD_SHAPING_ENABLED and response.get("status") == "success":
+            return shape_payload(response)
+        return response
     
     rag_search.__name__ = f"search_{corpus_name_safe}"
+    # Lets AgentService prefetch this tool's search (see speculative_retrieval)
+    rag_search.speculative_searcher = tool_instance
     
     return rag_search
@@ -0,0 +1,136 @@
+"""
+Hybrid re-ranking of merged RAG results.
+
+Vector scores from different corpuses are not comparable (different
+embeddings, chunking and distance distributions), so sorting the merged
+list by relevance_score favours whichever corpus scores high. The
+re-ranker instead fuses ranks (reciprocal-rank fusion):
+
+    score = w_vec / (k + vector_rank) + w_lex / (k + bm25_rank)
+
+- vector_rank: the chunk's rank within its own corpus
+- bm25_rank: rank by BM25 of the query over the candidate texts
+  (only chunks sharing at least one query term get a lexical rank)
+
+and then multiplies by a corpus-priority boost (1 + boost / priority).
+BM25 is computed over the candidate set only. Texts are tokenized and
+their query-term counts collected in Python, a per-text loop over a few
+dozen candidates. The scoring runs in numpy over the resulting
+(candidates x query terms) term-frequency matrix.
+"""
+
+import os
+import re
+import logging
+import unicodedata
+from collections import Counter
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RAG_RERANK_ENABLED = os.getenv("RAG_RERANK_ENABLED", "true").lower() == "true"
+# RRF constant: larger values flatten the difference between top ranks
+RAG_RERANK_RRF_K = float(os.getenv("RAG_RERANK_RRF_K", "60"))
+RAG_RERANK_VECTOR_WEIGHT = float(os.getenv("RAG_RERANK_VECTOR_WEIGHT", "1.0"))
+RAG_RERANK_LEXICAL_WEIGHT = float(os.getenv("RAG_RERANK_LEXICAL_WEIGHT", "1.0"))
+# Priority-1 corpuses get a (1 + boost) multiplier, priority-2 (1 + boost/2), ...
+RAG_RERANK_PRIORITY_BOOST = float(os.getenv("RAG_RERANK_PRIORITY_BOOST", "0.1"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"\w+")
+# Function words that match almost every chunk (Spanish and English)
+_STOPWORDS = frozenset("""
+    a al algo como con de del el en es esta este la las lo los mas o para pero por que se sin su sus un una y
+    an and are as at be by for from how in is it of on or the this to what when where which who with
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """Accent-folded, case-folded word tokens without stopwords."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return [word for word in _WORD.findall(text) if word not in _STOPWORDS]
+
+
+def bm25_scores(query: str, texts: list[str]) -> np.ndarray:
+    """
+    BM25 score of each text for the query, with statistics from the texts themselves.
+
+    Returns:
+        float array of len(texts)
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms or not texts:
+        return np.zeros(len(texts))
+
+    column = {term: index for index, term in enumerate(terms)}
+    tf = np.zeros((len(texts), len(terms)))
+    lengths = np.empty(len(texts))
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        lengths[row] = len(tokens)
+        for term, count in Counter(tokens).items():
+            if term in column:
+                tf[row, column[term]] = count
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(texts) - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+    return (tf * (BM25_K1 + 1) / (tf + norm[:, None])) @ idf
+
+
+def _ranks(scores: np.ndarray) -> np.ndarray:
+    """1-based rank of each score (highest = 1)."""
+    ranks = np.empty(len(scores))
+    ranks[np.argsort(-scores, kind="stable")] = np.arange(1, len(scores) + 1)
+    return ranks
+
+
+def rerank(query: str, results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Order merged corpus results by fused vector + BM25 rank and corpus priority.
+
+    Each result gets `lexical_score` and `rerank_score`; relevance_score is
+    left as the corpus reported it. Entries with a `status` (errors,
+    timeouts) go last, unchanged.
+
+    Args:
+        query: The search query
+        results: Results from all corpuses
+
+    Returns:
+        The results, best first
+    """
+    candidates = [result for result in results if not result.get("status")]
+    failed = [result for result in results if result.get("status")]
+    if not candidates:
+        return failed
+
+    # Rank within each corpus by the corpus's own score
+    vector_scores = np.array([result.get("relevance_score") or 0.0 for result in candidates])
+    corpus_ids = np.array([str(result.get("corpus_id")) for result in candidates])
+    vector_ranks = np.empty(len(candidates))
+    for corpus_id in np.unique(corpus_ids):
+        members = np.flatnonzero(corpus_ids == corpus_id)
+        vector_ranks[members] = _ranks(vector_scores[members])
+
+    lexical = bm25_scores(query, [result.get("text") or "" for result in candidates])
+    lexical_part = np.where(lexical > 0, RAG_RERANK_LEXICAL_WEIGHT / (RAG_RERANK_RRF_K + _ranks(lexical)), 0.0)
+    fused = RAG_RERANK_VECTOR_WEIGHT / (RAG_RERANK_RRF_K + vector_ranks) + lexical_part
+
+    priorities = np.array([max(result.get("priority") or 1, 1) for result in candidates], dtype=float)
+    fused *= 1 + RAG_RERANK_PRIORITY_BOOST / priorities
+
+    # Ties: higher raw vector score first
+    order = np.lexsort((-vector_scores, -fused))
+    ranked = []
+    for index in order:
+        result = candidates[index]
+        result["lexical_score"] = round(float(lexical[index]), 4)
+        result["rerank_score"] = round(float(fused[index]), 6)
+        ranked.append(result)
+    return ranked + failed
@@ -0,0 +1,308 @@
+"""
+Cache of RAG retrieval results.
+
+Users in the same department ask near-identical questions; repeated
+searches are answered from this cache instead of a Vertex
+`rag.retrieval_query` round trip.
+
+Entries are keyed by (corpus, normalized query, top_k, threshold) and
+tagged with the corpus's content version (document_count and
+metadata.import_version, see corpus_version). Versions are re-read from
+the corpus repository at most every RAG_CACHE_VERSION_CHECK_SECONDS; a
+changed version drops the corpus's entries. The cache is bounded by entry
+count, approximate size and TTL, and is process-local.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from src.domain.models import CorpusConfig
+from src.infrastructure.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+RAG_CACHE_ENABLED = os.getenv("RAG_CACHE_ENABLED", "true").lower() == "true"
+# Maximum cached searches (one per corpus/query/top_k/threshold)
+RAG_CACHE_MAX_ENTRIES = int(os.getenv("RAG_CACHE_MAX_ENTRIES", "2000"))
+# Approximate memory bound for cached results
+RAG_CACHE_MAX_MB = float(os.getenv("RAG_CACHE_MAX_MB", "64"))
+# How long a result is served without asking Vertex again
+RAG_CACHE_TTL_SECONDS = float(os.getenv("RAG_CACHE_TTL_SECONDS", "900"))
+# How often corpus versions are re-read from the database
+RAG_CACHE_VERSION_CHECK_SECONDS = float(os.getenv("RAG_CACHE_VERSION_CHECK_SECONDS", "30"))
+
+# Fixed per-entry/per-result overhead added to the text size estimate
+_ENTRY_OVERHEAD_BYTES = 256
+_RESULT_OVERHEAD_BYTES = 128
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = "¿?¡!.,;: "
+
+# Loads version tokens for a list of corpus IDs (CorpusRepository.get_corpus_versions)
+CorpusVersionSource = Callable[[list[str]], Awaitable[dict[str, str]]]
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for cache lookups.
+
+    Case, Unicode form, repeated whitespace and surrounding punctuation
+    ("¿...?") do not change retrieval, so they do not change the key.
+    Accents are kept: they can change meaning.
+    """
+    query = unicodedata.normalize("NFKC", query).casefold()
+    query = _WHITESPACE.sub(" ", query)
+    return query.strip(_EDGE_PUNCTUATION)
+
+
+def _estimate_size(query: str, results: list[dict[str, Any]]) -> int:
+    """Approximate memory held by an entry (text dominates)."""
+    size = _ENTRY_OVERHEAD_BYTES + len(query)
+    for result in results:
+        size += _RESULT_OVERHEAD_BYTES
+        for value in result.values():
+            if isinstance(value, str):
+                size += len(value)
+    return size
+
+
+@dataclass
+class _Entry:
+    corpus_id: str
+    version: str
+    results: list[dict[str, Any]]
+    size: int
+    expires_at: float
+
+
+class RetrievalCache:
+    """
+    LRU cache of per-corpus retrieval results.
+
+    Results are stored and returned as copies, so callers can enrich
+    the returned dicts (e.g. with metadata) without touching the cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RAG_CACHE_MAX_ENTRIES,
+        max_bytes: int = int(RAG_CACHE_MAX_MB * 1024 * 1024),
+        ttl_seconds: float = RAG_CACHE_TTL_SECONDS,
+        version_check_seconds: float = RAG_CACHE_VERSION_CHECK_SECONDS,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached searches
+            max_bytes: Approximate size bound of cached results
+            ttl_seconds: Lifetime of an entry
+            version_check_seconds: Minimum interval between corpus version reads
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.version_check_seconds = version_check_seconds
+
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._bytes = 0
+
+        self._version_source: Optional[CorpusVersionSource] = None
+        self._versions: dict[str, str] = {}
+        self._checked_at: dict[str, float] = {}
+        self._version_lock = asyncio.Lock()
+
+        metrics = get_metrics()
+        self._hits = metrics.counter("rag_cache.hits")
+        self._misses = metrics.counter("rag_cache.misses")
+        self._evictions = metrics.counter("rag_cache.evictions")
+        self._invalidations = metrics.counter("rag_cache.invalidations")
+        metrics.register_collector("rag_cache", self.stats)
+
+    def set_version_source(self, source: CorpusVersionSource) -> None:
+        """Use the corpus repository to detect corpus changes."""
+        self._version_source = source
+
+    # -------------------------------------------------------------------------
+    # Lookups
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _key(corpus_id: str, query: str, top_k: int, threshold: float) -> tuple:
+        return (corpus_id, normalize_query(query), top_k, round(threshold, 4))
+
+    def get(
+        self,
+        corpus_id: str,
+        version: str,
+        query: str,
+        top_k: int,
+        threshold: float,
+    ) -> Optional[list[dict[str, Any]]]:
+        """
+        Get cached results for a search.
+
+        Returns:
+            A copy of the cached results, or None on a miss
+        """
+        key = self._key(corpus_id, query, top_k, threshold)
+        entry = self._entries.get(key)
+        if entry is not None and (entry.version != version or entry.expires_at <= time.monotonic()):
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            self._misses.inc()
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits.inc()
+        return [dict(result) for result in entry.results]
+
+    def put(
+        self,
+        corpus_id: str,
+        version: str,
+        query: str,
+        top_k: int,
+        threshold: float,
+        results: list[dict[str, Any]],
+    ) -> None:
+        """Store the results of a successful search."""
+        key = self._key(corpus_id, query, top_k, threshold)
+        size = _estimate_size(key[1], results)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(
+            corpus_id=corpus_id,
+            version=version,
+            results=[dict(result) for result in results],
+            size=size,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions.inc()
+
+    def invalidate_corpus(self, corpus_id: str) -> int:
+        """
+        Drop every entry of a corpus.
+
+        Returns:
+            Number of entries removed
+        """
+        keys = [key for key, entry in self._entries.items() if entry.corpus_id == corpus_id]
+        for key in keys:
+            self._remove(key)
+        if keys:
+            self._invalidations.inc(len(keys))
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    # -------------------------------------------------------------------------
+    # Corpus versions
+    # -------------------------------------------------------------------------
+
+    async def corpus_version(self, corpus: CorpusConfig) -> str:
+        """
+        Current content version of a corpus.
+
+        Re-reads versions from the version source when the last read is
+        older than version_check_seconds (one query for all corpuses due),
+        dropping the entries of corpuses whose version changed. Without a
+        source, or if it fails before the first read, the version in the
+        (possibly stale) CorpusConfig is used.
+        """
+        corpus_id = corpus.corpus_id
+        if self._version_source is not None and self._is_due(corpus_id):
+            async with self._version_lock:
+                # Another search may have refreshed while we waited
+                if self._is_due(corpus_id):
+                    await self._refresh_versions(corpus_id)
+        return self._versions.get(corpus_id, corpus.version)
+
+    def _is_due(self, corpus_id: str) -> bool:
+        checked_at = self._checked_at.get(corpus_id)
+        return checked_at is None or time.monotonic() - checked_at >= self.version_check_seconds
+
+    async def _refresh_versions(self, corpus_id: str) -> None:
+        now = time.monotonic()
+        due = {corpus_id} | {
+            cid for cid, checked_at in self._checked_at.items()
+            if now - checked_at >= self.version_check_seconds
+        }
+        try:
+            versions = await self._version_source(sorted(due))
+        except Exception as e:
+            # Keep serving with the last known versions; retry after the interval
+            logger.warning(f"⚠️ Could not read corpus versions: {e}")
+            for cid in due:
+                self._checked_at[cid] = now
+            return
+
+        for cid in due:
+            new_version = versions.get(cid)
+            old_version = self._versions.get(cid)
+            if old_version is not None and new_version != old_version:
+                dropped = self.invalidate_corpus(cid)
+                logger.info(
+                    f"♻️ Corpus {cid} changed ({old_version} -> {new_version}), "
+                    f"dropped {dropped} cached searches"
+                )
+            if new_version is None:
+                self._versions.pop(cid, None)
+            else:
+                self._versions[cid] = new_version
+            self._checked_at[cid] = now
+
+    # -------------------------------------------------------------------------
+    # Stats
+    # -------------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Current usage and hit ratio."""
+        hits, misses = self._hits.value, self._misses.value
+        lookups = hits + misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            "evictions": self._evictions.value,
+            "invalidations": self._invalidations.value,
+        }
+
+
+_retrieval_cache: Optional[RetrievalCache] = None
+
+
+def get_retrieval_cache() -> Optional[RetrievalCache]:
+    """Get or create the retrieval cache singleton (None when RAG_CACHE_ENABLED=false)."""
+    global _retrieval_cache
+    if _retrieval_cache is None and RAG_CACHE_ENABLED:
+        _retrieval_cache = RetrievalCache()
+    return _retrieval_cache
@@ -0,0 +1,313 @@
+"""
+Microsoft Graph client for SharePoint source metadata.
+
+Resolving a SharePoint result used to take three sequential Graph calls
+(site, drives, item) per result. This client:
+
+- Caches site and drive resolution per (tenant, site path) for
+  SHAREPOINT_SITE_CACHE_TTL_SECONDS, so a site is resolved once.
+- Collects item lookups issued together (e.g. all results of one
+  search, enriched concurrently) and sends them as one JSON `$batch`
+  request (up to 20 requests per batch) as soon as they have joined,
+  waiting at most GRAPH_BATCH_WINDOW_MS.
+
+It talks plain REST through httpx; GRAPH_BASE_URL (or the `transport`
+argument) points it at a local Graph stand-in for testing.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+GRAPH_BASE_URL = os.getenv("GRAPH_BASE_URL", "https://graph.microsoft.com/v1.0")
+# Longest time item lookups wait for others to share a $batch request
+GRAPH_BATCH_WINDOW_MS = float(os.getenv("GRAPH_BATCH_WINDOW_MS", "10"))
+# How long a resolved site/drive is reused
+SHAREPOINT_SITE_CACHE_TTL_SECONDS = float(os.getenv("SHAREPOINT_SITE_CACHE_TTL_SECONDS", "3600"))
+GRAPH_TIMEOUT_SECONDS = float(os.getenv("GRAPH_TIMEOUT_SECONDS", "15"))
+
+GRAPH_SCOPE = "https://graph.microsoft.com/.default"
+# Graph accepts at most 20 requests per $batch
+GRAPH_BATCH_MAX_REQUESTS = 20
+# Document libraries preferred when a site has several drives
+PREFERRED_DRIVE_NAMES = ("Documents", "Shared Documents", "Documentos")
+
+# Returns a bearer token for Graph
+TokenProvider = Callable[[], Awaitable[str]]
+
+
+class GraphError(Exception):
+    """A Graph request (or a request inside a $batch) failed."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Graph {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+def credential_token_provider(credential) -> TokenProvider:
+    """
+    Token provider over a synchronous azure-identity credential.
+
+    The token is reused until five minutes before it expires.
+    """
+    token = None
+    lock = asyncio.Lock()
+
+    async def provide() -> str:
+        nonlocal token
+        async with lock:
+            if token is None or token.expires_on - 300 < time.time():
+                token = await asyncio.to_thread(credential.get_token, GRAPH_SCOPE)
+        return token.token
+
+    return provide
+
+
+@dataclass
+class SiteDrive:
+    """A resolved SharePoint site and its document library."""
+    site_id: str
+    site_name: Optional[str]
+    drive_id: str
+    drive_name: Optional[str]
+    expires_at: float = 0.0
+
+
+def _error_message(body: Any) -> str:
+    if isinstance(body, dict) and isinstance(body.get("error"), dict):
+        return body["error"].get("message") or body["error"].get("code") or "Unknown error"
+    return str(body)[:200] if body else "Unknown error"
+
+
+class SharePointGraphClient:
+    """Graph REST client with site/drive resolution cache and item batching."""
+
+    def __init__(
+        self,
+        token_provider: TokenProvider,
+        base_url: str = GRAPH_BASE_URL,
+        batch_window_ms: float = GRAPH_BATCH_WINDOW_MS,
+        site_cache_ttl: float = SHAREPOINT_SITE_CACHE_TTL_SECONDS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize the client. The HTTP connection pool is created on first use.
+
+        Args:
+            token_provider: Supplies bearer tokens
+            base_url: Graph endpoint including the version segment
+            batch_window_ms: Longest time item lookups wait to share a $batch
+            site_cache_ttl: Lifetime of a resolved site/drive
+            transport: Custom httpx transport (tests, local stand-ins)
+        """
+        self.token_provider = token_provider
+        self.base_url = base_url.rstrip("/")
+        self.batch_window = batch_window_ms / 1000
+        self.site_cache_ttl = site_cache_ttl
+        self.transport = transport
+
+        self._http: Optional[httpx.AsyncClient] = None
+        self._sites: Dict[Tuple[str, str], SiteDrive] = {}
+        self._resolving: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_timer: Optional[asyncio.Task] = None
+        self._sending: set = set()
+        self.requests_sent = 0
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    async def resolve_site(self, tenant: str, site_path: str) -> SiteDrive:
+        """
+        Resolve a site and its document library (cached per tenant and site path).
+
+        Raises:
+            GraphError: The site or its drives could not be read
+        """
+        key = (tenant.lower(), site_path.lower())
+        site = self._sites.get(key)
+        if site is not None and site.expires_at > time.monotonic():
+            return site
+
+        task = self._resolving.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._resolve_site(tenant, site_path))
+            self._resolving[key] = task
+            task.add_done_callback(lambda _: self._resolving.pop(key, None))
+        site = await asyncio.shield(task)
+        self._sites[key] = site
+        return site
+
+    async def get_item(self, drive_id: str, item_path: str) -> Dict[str, Any]:
+        """
+        Get a drive item by path, batched with concurrent lookups.
+
+        Raises:
+            GraphError: The item could not be read (e.g. 404)
+        """
+        url = f"/drives/{drive_id}/root:/{quote(item_path.strip('/'), safe='/')}"
+        return await self._batched_get(url)
+
+    async def close(self) -> None:
+        """Close the HTTP connection pool."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    # -------------------------------------------------------------------------
+    # Site resolution
+    # -------------------------------------------------------------------------
+
+    async def _resolve_site(self, tenant: str, site_path: str) -> SiteDrive:
+        host = f"{tenant}.sharepoint.com"
+        site_ref = host if site_path in ("", "/") else f"{host}:{site_path}"
+        site = await self._request("GET", f"/sites/{site_ref}?$select=id,displayName")
+
+        drives = await self._request("GET", f"/sites/{site['id']}/drives?$select=id,name")
+        drives = drives.get("value") or []
+        if not drives:
+            raise GraphError(404, "No document libraries found in site")
+        drive = next((d for d in drives if d.get("name") in PREFERRED_DRIVE_NAMES), drives[0])
+
+        logger.info(f"✅ Resolved SharePoint site {site_ref} -> drive {drive.get('name')}")
+        return SiteDrive(
+            site_id=site["id"],
+            site_name=site.get("displayName"),
+            drive_id=drive["id"],
+            drive_name=drive.get("name"),
+            expires_at=time.monotonic() + self.site_cache_ttl,
+        )
+
+    # -------------------------------------------------------------------------
+    # Batching
+    # -------------------------------------------------------------------------
+
+    async def _batched_get(self, url: str) -> Dict[str, Any]:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((url, future))
+        if len(self._pending) >= GRAPH_BATCH_MAX_REQUESTS:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.ensure_future(self._flush_later())
+        return await future
+
+    async def _flush_later(self) -> None:
+        """
+        Flush once the lookups issued together have joined.
+
+        Concurrent lookups (a gather over one search's results, or waiters
+        of one site resolution) join within a few event loop iterations.
+        The batch is sent as soon as an iteration passes without a new
+        lookup; batch_window only caps the wait while lookups keep coming.
+        """
+        deadline = time.monotonic() + self.batch_window
+        joined = 0
+        while len(self._pending) != joined and time.monotonic() < deadline:
+            joined = len(self._pending)
+            await asyncio.sleep(0)
+        self._flush_timer = None
+        self._flush()
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        task = asyncio.ensure_future(self._send(pending))
+        # Keep a reference until the batch completes
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, pending: List[Tuple[str, asyncio.Future]]) -> None:
+        """Send pending lookups: a plain GET for one, a $batch for several."""
+        try:
+            if len(pending) == 1:
+                url, future = pending[0]
+                result = await self._request("GET", url)
+                if not future.done():
+                    future.set_result(result)
+                return
+
+            batch = await self._request("POST", "/$batch", json={
+                "requests": [
+                    {"id": str(index), "method": "GET", "url": url}
+                    for index, (url, _) in enumerate(pending)
+                ]
+            })
+            logger.info(f"📦 Graph $batch: {len(pending)} item lookups in one request")
+            for response in batch.get("responses") or []:
+                _, future = pending[int(response["id"])]
+                if future.done():
+                    continue
+                status = int(response.get("status", 500))
+                if status < 400:
+                    future.set_result(response.get("body") or {})
+                else:
+                    future.set_exception(GraphError(status, _error_message(response.get("body"))))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(GraphError(500, "Missing response in $batch"))
+
+    # -------------------------------------------------------------------------
+    # HTTP
+    # -------------------------------------------------------------------------
+
+    async def _request(self, method: str, path: str, json: Optional[dict] = None) -> Dict[str, Any]:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=GRAPH_TIMEOUT_SECONDS,
+                transport=self.transport,
+            )
+        token = await self.token_provider()
+        self.requests_sent += 1
+        response = await self._http.request(
+            method, path, json=json, headers={"Authorization": f"Bearer {token}"}
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        if response.status_code >= 400:
+            raise GraphError(response.status_code, _error_message(body))
+        return body
+
+
+def create_sharepoint_graph_client() -> Optional[SharePointGraphClient]:
+    """
+    Create a client from GRAPH_TENANT_ID/GRAPH_CLIENT_ID/GRAPH_CLIENT_SECRET.
+
+    Returns:
+        The client, or None if Graph credentials are not configured
+    """
+    tenant_id = os.getenv("GRAPH_TENANT_ID")
+    client_id = os.getenv("GRAPH_CLIENT_ID")
+    client_secret = os.getenv("GRAPH_CLIENT_SECRET")
+    if not all([tenant_id, client_id, client_secret]):
+        logger.warning("⚠️ Graph credentials not configured")
+        return None
+
+    from azure.identity import ClientSecretCredential
+
+    credential = ClientSecretCredential(
+        tenant_id=tenant_id,
+        client_id=client_id,
+        client_secret=client_secret,
+    )
+    logger.info("✅ SharePoint Graph client initialized")
+    return SharePointGraphClient(credential_token_provider(credential))
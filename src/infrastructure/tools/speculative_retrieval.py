@@ -0,0 +1,199 @@
+"""
+Speculative retrieval for RAG agents.
+
+Most turns of a RAG agent are: model call -> search_* tool call -> second
+model call. For agents that opt in (`"speculative_retrieval": true` in
+their metadata), a turn starts searching each corpus for the raw user
+prompt at the same moment the first model call starts. When the model
+then calls a search tool with a similar query, the tool returns the
+prefetched result (waiting for it if it is still in flight) instead of
+searching again.
+
+A query is similar when most of its words (case- and accent-folded,
+without stopwords) appear in the prompt: models usually search with a
+condensed version of what the user asked.
+
+Usage:
+    async with speculate(prompt, agent_service.get_speculative_searchers(agent_id)):
+        async for event in runner.run_async(...):
+            ...
+"""
+
+import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Optional
+
+from src.domain.models import AgentConfig
+from src.infrastructure.metrics import get_metrics
+from src.infrastructure.tools.reranker import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Kill switch; agents still opt in individually
+RAG_SPECULATIVE_ENABLED = os.getenv("RAG_SPECULATIVE_ENABLED", "true").lower() == "true"
+# Share of the tool query's words that must appear in the prompt to reuse the prefetch
+RAG_SPECULATIVE_MIN_OVERLAP = float(os.getenv("RAG_SPECULATIVE_MIN_OVERLAP", "0.6"))
+# Longer prompts (pasted documents) are not used as search queries
+RAG_SPECULATIVE_MAX_PROMPT_CHARS = int(os.getenv("RAG_SPECULATIVE_MAX_PROMPT_CHARS", "1000"))
+
+# The search tools' default top_k, which the model almost always keeps
+SPECULATIVE_TOP_K = 5
+
+_current_turn: ContextVar[Optional["SpeculationTurn"]] = ContextVar("speculation_turn", default=None)
+
+
+def is_speculative(config: AgentConfig) -> bool:
+    """Whether an agent prefetches retrieval for its prompts."""
+    return RAG_SPECULATIVE_ENABLED and bool(config.corpuses) and bool(
+        (config.metadata or {}).get("speculative_retrieval")
+    )
+
+
+def query_overlap(query: str, prompt_terms: set[str]) -> float:
+    """Share of the query's words that appear in the prompt (0.0-1.0)."""
+    terms = set(tokenize(query))
+    if not terms:
+        return 0.0
+    return len(terms & prompt_terms) / len(terms)
+
+
+class _Prefetch:
+    """A search started for one tool at the start of a turn."""
+
+    def __init__(self, searcher: Any, prompt: str):
+        self.searcher = searcher
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.used = False
+        self.task = asyncio.create_task(searcher.search(prompt, top_k=SPECULATIVE_TOP_K))
+        self.task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self.finished_at = time.perf_counter()
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"⚠️ Speculative search failed: {task.exception()}")
+
+
+class SpeculationTurn:
+    """Prefetched searches of one agent turn, keyed by the tool's searcher."""
+
+    def __init__(self, prompt: str, searchers: list[Any]):
+        self.prompt = prompt
+        self.prompt_terms = set(tokenize(prompt))
+        self._prefetches = {id(searcher): _Prefetch(searcher, prompt) for searcher in searchers}
+
+        metrics = get_metrics()
+        self._hits = metrics.counter("rag_speculation.hits")
+        self._misses = metrics.counter("rag_speculation.misses")
+        self._wasted = metrics.counter("rag_speculation.wasted")
+        self._saved_ms = metrics.counter("rag_speculation.saved_ms")
+        metrics.counter("rag_speculation.started").inc(len(self._prefetches))
+
+    async def take(self, searcher: Any, query: str, top_k: int) -> Optional[dict[str, Any]]:
+        """
+        The prefetched response for a tool call, if it can stand in for one.
+
+        Each prefetch is used at most once; later calls of the same tool
+        search normally.
+
+        Returns:
+            The search response, or None to search normally
+        """
+        prefetch = self._prefetches.get(id(searcher))
+        if prefetch is None or prefetch.used:
+            return None
+
+        overlap = query_overlap(query, self.prompt_terms)
+        if top_k != SPECULATIVE_TOP_K or overlap < RAG_SPECULATIVE_MIN_OVERLAP:
+            self._misses.inc()
+            logger.info(f"🎯 Speculation miss for '{query}' (overlap {overlap:.2f}, top_k={top_k})")
+            return None
+
+        prefetch.used = True
+        requested_at = time.perf_counter()
+        try:
+            response = await asyncio.shield(prefetch.task)
+        except Exception:
+            self._misses.inc()
+            return None
+        if response.get("status") != "success":
+            self._misses.inc()
+            return None
+
+        # A fresh search would have taken as long as the prefetch did, starting now
+        duration = (prefetch.finished_at or time.perf_counter()) - prefetch.started_at
+        saved = min(duration, requested_at - prefetch.started_at)
+        self._hits.inc()
+        self._saved_ms.inc(int(saved * 1000))
+        logger.info(f"🎯 Speculation hit for '{query}' (overlap {overlap:.2f}, saved {saved * 1000:.0f}ms)")
+        return response
+
+    def finish(self) -> None:
+        """Cancel prefetches that are still running; count the unused ones as wasted."""
+        for prefetch in self._prefetches.values():
+            if prefetch.used:
+                continue
+            self._wasted.inc()
+            if not prefetch.task.done():
+                prefetch.task.cancel()
+
+
+@asynccontextmanager
+async def speculate(prompt: str, searchers: list[Any]) -> AsyncIterator[Optional[SpeculationTurn]]:
+    """
+    Prefetch searches for the prompt for the duration of a turn.
+
+    Tool calls made inside the block (including tasks it spawns) see the
+    turn through a context variable. Does nothing without searchers or for
+    prompts that are empty or too long to be a query.
+
+    Args:
+        prompt: The user's message
+        searchers: Objects with `async search(query, top_k)` (VertexRAGTool),
+            one per corpus tool of the agent
+    """
+    if not searchers or not tokenize(prompt) or len(prompt) > RAG_SPECULATIVE_MAX_PROMPT_CHARS:
+        yield None
+        return
+
+    turn = SpeculationTurn(prompt, searchers)
+    token = _current_turn.set(turn)
+    try:
+        yield turn
+    finally:
+        try:
+            _current_turn.reset(token)
+        except ValueError:
+            # Async generators can be closed from another context
+            _current_turn.set(None)
+        turn.finish()
+
+
+async def take_prefetched(searcher: Any, query: str, top_k: int) -> Optional[dict[str, Any]]:
+    """The current turn's prefetched response for a tool call, or None to search normally."""
+    turn = _current_turn.get()
+    if turn is None:
+        return None
+    return await turn.take(searcher, query, top_k)
+
+
+def speculation_stats() -> dict[str, Any]:
+    """Hit rate and time saved, for /metrics."""
+    metrics = get_metrics()
+    started = metrics.counter("rag_speculation.started").value
+    hits = metrics.counter("rag_speculation.hits").value
+    saved_ms = metrics.counter("rag_speculation.saved_ms").value
+    return {
+        "enabled": RAG_SPECULATIVE_ENABLED,
+        "started": started,
+        "hits": hits,
+        "hit_rate": round(hits / started, 3) if started else 0.0,
+        "avg_saved_ms_per_hit": round(saved_ms / hits, 1) if hits else 0.0,
+    }
+
+
+get_metrics().register_collector("rag_speculation", speculation_stats)
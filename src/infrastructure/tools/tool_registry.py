@@ -2,6 +2,7 @@
 
 import importlib
 import inspect
+import json
 import logging
 from typing import Any, Callable, Optional
 from src.domain.models import ToolConfig, CorpusConfig
@@ -17,9 +18,17 @@ class ToolRegistry:
     the database and actual Python functions that can be used by ADK agents.
     """
 
-    def __init__(self):
-        """Initialize the tool registry."""
+    def __init__(self, rag_clients: Any = None):
+        """
+        Initialize the tool registry.
+
+        Args:
+            rag_clients: Shared RAGClients used by every RAG tool
+        """
         self._tools: dict[str, Callable] = {}
+        self._rag_clients = rag_clients
+        # corpus_id -> (config fingerprint, tool); shared by all agents using the corpus
+        self._rag_tools: dict[str, tuple[tuple, Callable]] = {}
         self._register_builtin_tools()
 
     def _register_builtin_tools(self):
@@ -89,7 +98,8 @@ class ToolRegistry:
         Create a RAG tool for a SINGLE corpus.
         
         This method creates one tool per corpus, allowing the agent to 
-        explicitly choose which knowledge base to search.
+        explicitly choose which knowledge base to search. Tools are reused
+        across agents until the corpus configuration changes.
         
         Args:
             corpus: Single corpus configuration
@@ -103,12 +113,18 @@ class ToolRegistry:
             logger.warning(f"⏭️ Skipping disabled corpus: {corpus.corpus_name}")
             return None
         
-        if not corpus.vertex_corpus_name:
+        if corpus.vector_db_type == "vertex_rag" and not corpus.vertex_corpus_name:
             logger.warning(f"⏭️ Skipping corpus without vertex_corpus_name: {corpus.corpus_name}")
             return None
         
+        fingerprint = self._rag_tool_fingerprint(corpus)
+        cached = self._rag_tools.get(corpus.corpus_id)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        
         try:
-            rag_tool = create_rag_tool(corpus)
+            rag_tool = create_rag_tool(corpus, clients=self._rag_clients)
+            self._rag_tools[corpus.corpus_id] = (fingerprint, rag_tool)
             
             tool_name = rag_tool.__name__ if hasattr(rag_tool, '__name__') else f"search_{corpus.corpus_name}"
             logger.info(f"✅ Created RAG tool: {tool_name} for corpus '{corpus.display_name}'")
@@ -119,6 +135,20 @@ class ToolRegistry:
             logger.error(f"❌ Error creating RAG tool for {corpus.corpus_name}: {e}", exc_info=True)
             return None
 
+    @staticmethod
+    def _rag_tool_fingerprint(corpus: CorpusConfig) -> tuple:
+        """Fields a RAG tool captures; a change means the tool is rebuilt."""
+        return (
+            corpus.corpus_name,
+            corpus.display_name,
+            corpus.description,
+            corpus.vertex_corpus_name,
+            corpus.vector_db_type,
+            json.dumps(corpus.vector_db_config or {}, sort_keys=True, default=str),
+            corpus.priority,
+            corpus.version,
+        )
+
     def _create_agent_tool(self, tool_config: ToolConfig, agent_service: Any) -> Optional[Callable]:
         """
         Create an agent tool that delegates to another agent.
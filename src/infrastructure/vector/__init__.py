@@ -0,0 +1,15 @@
+from .embeddings import Embedder, HashingEmbedder, VertexEmbedder, create_embedder
+from .numpy_store import NumpyVectorStore
+from .pgvector_store import PgVectorStore
+from .local_backend import LocalVectorBackend, LOCAL_VECTOR_DB_TYPES
+
+__all__ = [
+    "Embedder",
+    "HashingEmbedder",
+    "VertexEmbedder",
+    "create_embedder",
+    "NumpyVectorStore",
+    "PgVectorStore",
+    "LocalVectorBackend",
+    "LOCAL_VECTOR_DB_TYPES",
+]
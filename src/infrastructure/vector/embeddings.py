@@ -0,0 +1,200 @@
+"""
+Text embedders for local vector corpuses.
+
+Local corpuses (numpy, pgvector) store chunk embeddings themselves, so
+the query has to be embedded with the same model the chunks were:
+
+- VertexEmbedder: Vertex AI text embedding models (text-embedding-005 by
+  default, the same model Vertex RAG corpuses use).
+- HashingEmbedder: deterministic feature hashing of words and word pairs.
+  No network and no model, for offline tests and small keyword-heavy
+  corpuses.
+
+Embeddings are float32 and L2-normalized, so a dot product is the cosine
+similarity.
+"""
+
+import re
+import hashlib
+import logging
+import threading
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import numpy as np
+
+from src.domain.models import CorpusConfig
+
+logger = logging.getLogger(__name__)
+
+# Dimension of text-embedding-005 (and of the pgvector column, migration 007)
+DEFAULT_EMBEDDING_DIMENSION = 768
+# Vertex accepts up to 250 texts per embedding request
+VERTEX_EMBED_BATCH_SIZE = 100
+QUERY_CACHE_SIZE = 1024
+
+_WORD = re.compile(r"\w+")
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    """Normalize rows (or a single vector) to unit length."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class Embedder(ABC):
+    """Embeds queries and documents into the same vector space."""
+
+    name: str
+    dimension: int
+
+    def __init__(self):
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @abstractmethod
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed chunk texts.
+
+        Returns:
+            float32 matrix of shape (len(texts), dimension), rows normalized
+        """
+
+    @abstractmethod
+    def _embed_query(self, text: str) -> np.ndarray:
+        """Embed one query (uncached)."""
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """
+        Embed a search query (recent queries are cached).
+
+        Returns:
+            float32 vector of length dimension, normalized
+        """
+        with self._cache_lock:
+            cached = self._query_cache.get(text)
+            if cached is not None:
+                self._query_cache.move_to_end(text)
+                return cached
+        vector = self._embed_query(text)
+        with self._cache_lock:
+            self._query_cache[text] = vector
+            while len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return vector
+
+
+class HashingEmbedder(Embedder):
+    """
+    Signed feature hashing of accent-folded words and word bigrams.
+
+    Stable across processes (blake2b, not Python's salted hash), so
+    stored embeddings stay valid.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = DEFAULT_EMBEDDING_DIMENSION):
+        super().__init__()
+        self.dimension = dimension
+
+    def _tokens(self, text: str) -> list[str]:
+        text = unicodedata.normalize("NFKD", text.casefold())
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        words = _WORD.findall(text)
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in self._tokens(text):
+            digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dimension] += 1.0 if value >> 63 else -1.0
+        return l2_normalize(vector)
+
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.stack([self._embed(text) for text in texts])
+
+    def _embed_query(self, text: str) -> np.ndarray:
+        return self._embed(text)
+
+
+class VertexEmbedder(Embedder):
+    """Vertex AI text embeddings with retrieval task types."""
+
+    name = "vertex"
+
+    def __init__(self, model_name: str = "text-embedding-005", dimension: int = DEFAULT_EMBEDDING_DIMENSION):
+        super().__init__()
+        self.model_name = model_name
+        self.dimension = dimension
+        self._model = None
+
+    def _get_model(self):
+        if self._model is None:
+            from vertexai.language_models import TextEmbeddingModel
+            self._model = TextEmbeddingModel.from_pretrained(self.model_name)
+            logger.info(f"✅ Embedding model loaded: {self.model_name}")
+        return self._model
+
+    def _embed(self, texts: list[str], task_type: str) -> np.ndarray:
+        from vertexai.language_models import TextEmbeddingInput
+
+        model = self._get_model()
+        vectors = []
+        for start in range(0, len(texts), VERTEX_EMBED_BATCH_SIZE):
+            batch = [TextEmbeddingInput(text, task_type) for text in texts[start:start + VERTEX_EMBED_BATCH_SIZE]]
+            response = model.get_embeddings(batch, output_dimensionality=self.dimension)
+            vectors.extend(embedding.values for embedding in response)
+        if not vectors:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return l2_normalize(np.array(vectors, dtype=np.float32))
+
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        return self._embed(texts, "RETRIEVAL_DOCUMENT")
+
+    def _embed_query(self, text: str) -> np.ndarray:
+        return self._embed([text], "RETRIEVAL_QUERY")[0]
+
+
+def configured_dimension(corpus: CorpusConfig) -> int:
+    """Embedding dimension configured for a corpus (vector_db_config `dimension`)."""
+    return int((corpus.vector_db_config or {}).get("dimension", DEFAULT_EMBEDDING_DIMENSION))
+
+
+def create_embedder(corpus: CorpusConfig) -> Embedder:
+    """
+    Build the embedder configured for a corpus.
+
+    vector_db_config keys: `embedder` ("vertex" | "hashing", default
+    "vertex") and `dimension` (default 768). Vertex uses the corpus's
+    embedding_model.
+
+    Raises:
+        ValueError: Unknown embedder
+    """
+    config = corpus.vector_db_config or {}
+    name = config.get("embedder", "vertex")
+    dimension = configured_dimension(corpus)
+    if name == "hashing":
+        return HashingEmbedder(dimension)
+    if name == "vertex":
+        return VertexEmbedder(corpus.embedding_model, dimension)
+    raise ValueError(f"Unknown embedder '{name}' for corpus {corpus.corpus_name}")
+
+
+def embedder_key(corpus: CorpusConfig) -> tuple:
+    """Identity of a corpus's embedder (corpuses with the same key share one)."""
+    config = corpus.vector_db_config or {}
+    return (
+        config.get("embedder", "vertex"),
+        corpus.embedding_model,
+        configured_dimension(corpus),
+    )
+
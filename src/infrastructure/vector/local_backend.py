@@ -0,0 +1,207 @@
+"""
+Retrieval for corpuses whose vectors we store ourselves.
+
+`vector_db_type` selects the store:
+
+- "numpy": memory-mapped matrix in a corpus directory (vector_db_config
+  `path`, default LOCAL_VECTOR_DIR/<corpus_id>). Exact search by default;
+  corpuses with at least LOCAL_VECTOR_ANN_MIN_VECTORS vectors get an IVF
+  index on first open and are searched over `nprobe` clusters.
+- "pgvector": the `corpus_chunks` table (migration 007), HNSW index. The
+  column's dimension is fixed by the migration; corpuses configured with
+  another `dimension` are rejected (check_pg_dimension).
+
+Results use the same dicts as Vertex RAG results, so merging, caching and
+metadata enrichment in VertexRAGTool work unchanged.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from asyncpg import Pool
+
+from src.domain.models import LOCAL_VECTOR_DB_TYPES, CorpusConfig
+from src.infrastructure.vector.embeddings import Embedder, configured_dimension, create_embedder, embedder_key
+from src.infrastructure.vector.numpy_store import MANIFEST_FILE, NumpyVectorStore
+from src.infrastructure.vector.pgvector_store import PgVectorStore
+
+logger = logging.getLogger(__name__)
+
+# Root directory of numpy corpuses (one subdirectory per corpus_id)
+LOCAL_VECTOR_DIR = os.getenv("LOCAL_VECTOR_DIR", "./data/vectors")
+# Corpuses at least this large get an IVF index (0 disables; always exact search)
+LOCAL_VECTOR_ANN_MIN_VECTORS = int(os.getenv("LOCAL_VECTOR_ANN_MIN_VECTORS", "50000"))
+# IVF clusters scanned per query (more = better recall, slower)
+LOCAL_VECTOR_IVF_NPROBE = int(os.getenv("LOCAL_VECTOR_IVF_NPROBE", "8"))
+
+
+def numpy_corpus_path(corpus: CorpusConfig) -> Path:
+    """Directory of a numpy corpus."""
+    configured = (corpus.vector_db_config or {}).get("path")
+    return Path(configured) if configured else Path(LOCAL_VECTOR_DIR) / corpus.corpus_id
+
+
+class LocalVectorBackend:
+    """Embeds queries and searches numpy / pgvector corpuses."""
+
+    def __init__(self, executor: Executor, db_pool_provider: Optional[Callable[[], Awaitable[Pool]]] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            executor: Executor for embedding and matrix work
+            db_pool_provider: Returns the shared asyncpg pool (needed for pgvector)
+        """
+        self.executor = executor
+        self.db_pool_provider = db_pool_provider
+
+        self._lock = threading.Lock()
+        self._stores: dict[Path, tuple[float, NumpyVectorStore]] = {}
+        self._embedders: dict[tuple, Embedder] = {}
+        self._pg_store: Optional[PgVectorStore] = None
+
+    async def search(
+        self,
+        corpus: CorpusConfig,
+        query: str,
+        top_k: int,
+        similarity_threshold: float,
+    ) -> list[dict[str, Any]]:
+        """
+        Search a local corpus.
+
+        Returns:
+            Results in the RAG result format, best first
+
+        Raises:
+            ValueError: The corpus is not a local type or is misconfigured
+        """
+        loop = asyncio.get_running_loop()
+        if corpus.vector_db_type == "numpy":
+            chunks = await loop.run_in_executor(
+                self.executor, self._search_numpy, corpus, query, top_k, similarity_threshold
+            )
+        elif corpus.vector_db_type == "pgvector":
+            store = await self.check_pg_dimension(corpus)
+            embedding = await loop.run_in_executor(self.executor, self._embed_query, corpus, query)
+            chunks = await store.search(
+                corpus.corpus_id,
+                embedding,
+                top_k,
+                similarity_threshold,
+                ef_search=(corpus.vector_db_config or {}).get("ef_search"),
+            )
+        else:
+            raise ValueError(f"'{corpus.vector_db_type}' is not a local vector DB type")
+
+        return [self._to_result(corpus, rank, chunk) for rank, chunk in enumerate(chunks, start=1)]
+
+    def get_embedder(self, corpus: CorpusConfig) -> Embedder:
+        """The (shared) embedder configured for a corpus."""
+        key = embedder_key(corpus)
+        with self._lock:
+            embedder = self._embedders.get(key)
+            if embedder is None:
+                embedder = self._embedders[key] = create_embedder(corpus)
+            return embedder
+
+    # -------------------------------------------------------------------------
+    # numpy
+    # -------------------------------------------------------------------------
+
+    def _search_numpy(
+        self,
+        corpus: CorpusConfig,
+        query: str,
+        top_k: int,
+        similarity_threshold: float,
+    ) -> list[dict[str, Any]]:
+        store = self._get_numpy_store(corpus)
+        embedder = self.get_embedder(corpus)
+        if store.manifest.get("embedder") not in (None, embedder.name):
+            raise ValueError(
+                f"Corpus {corpus.corpus_name} was embedded with '{store.manifest['embedder']}', "
+                f"configured embedder is '{embedder.name}'"
+            )
+        nprobe = int((corpus.vector_db_config or {}).get("nprobe", LOCAL_VECTOR_IVF_NPROBE))
+        hits = store.search(embedder.embed_query(query), top_k, similarity_threshold, nprobe=nprobe)
+        return [{**hit.chunk, "score": hit.score} for hit in hits]
+
+    def _get_numpy_store(self, corpus: CorpusConfig) -> NumpyVectorStore:
+        """Open a corpus directory, reopening it when its manifest changes."""
+        path = numpy_corpus_path(corpus)
+        mtime = (path / MANIFEST_FILE).stat().st_mtime
+        with self._lock:
+            cached = self._stores.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+            store = NumpyVectorStore.open(path)
+            if not store.has_ivf and LOCAL_VECTOR_ANN_MIN_VECTORS and store.count >= LOCAL_VECTOR_ANN_MIN_VECTORS:
+                store.build_ivf()
+                mtime = (path / MANIFEST_FILE).stat().st_mtime
+            self._stores[path] = (mtime, store)
+            logger.info(
+                f"✅ Opened vector store {path}: {store.count} x {store.dimension}"
+                + (f", IVF {store.manifest['ivf_lists']} lists" if store.has_ivf else ", exact search")
+            )
+            return store
+
+    # -------------------------------------------------------------------------
+    # pgvector
+    # -------------------------------------------------------------------------
+
+    def _embed_query(self, corpus: CorpusConfig, query: str):
+        return self.get_embedder(corpus).embed_query(query)
+
+    async def get_pg_store(self) -> PgVectorStore:
+        """The pgvector store on the shared pool."""
+        if self._pg_store is None:
+            if self.db_pool_provider is None:
+                raise ValueError("pgvector corpuses need a database pool")
+            self._pg_store = PgVectorStore(await self.db_pool_provider())
+        return self._pg_store
+
+    async def check_pg_dimension(self, corpus: CorpusConfig) -> PgVectorStore:
+        """
+        The pgvector store, after checking it holds the corpus's embedding dimension.
+
+        Raises:
+            ValueError: The corpus's configured dimension differs from corpus_chunks.embedding
+        """
+        store = await self.get_pg_store()
+        column = await store.embedding_dimension()
+        dimension = configured_dimension(corpus)
+        if dimension != column:
+            raise ValueError(
+                f"Corpus {corpus.corpus_name} is configured for {dimension}-dimensional embeddings, "
+                f"but corpus_chunks.embedding is vector({column}); change the corpus's `dimension` "
+                f"or migrate the column"
+            )
+        return store
+
+    # -------------------------------------------------------------------------
+    # Results
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _to_result(corpus: CorpusConfig, rank: int, chunk: dict[str, Any]) -> dict[str, Any]:
+        source_uri = chunk.get("source_uri")
+        file_name = None
+        if source_uri:
+            file_name = source_uri.split('/')[-1] if '/' in source_uri else source_uri
+        return {
+            "corpus_id": corpus.corpus_id,
+            "corpus_name": corpus.corpus_name,
+            "priority": corpus.priority,
+            "rank": rank,
+            "text": chunk.get("text", ""),
+            "relevance_score": chunk["score"],
+            "source_uri": source_uri,
+            "file_name": file_name,
+        }
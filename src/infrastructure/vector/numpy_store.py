@@ -0,0 +1,261 @@
+"""
+Memory-mapped NumPy vector store.
+
+A corpus is a directory:
+
+    manifest.json     count, dimension, embedder, ivf_lists
+    vectors.f32       float32 matrix (count x dimension), rows L2-normalized
+    chunks.jsonl      one chunk per line: text, source_uri, metadata...
+    ivf_*.npy         optional inverted-file index (see build_ivf)
+
+The matrix is opened with np.memmap, so only pages that are touched are
+read and several processes share the OS page cache. Exact search is one
+matrix-vector product plus argpartition; corpuses with an IVF index can
+instead scan only the `nprobe` clusters closest to the query.
+"""
+
+import os
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from src.infrastructure.vector.embeddings import l2_normalize
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.f32"
+CHUNKS_FILE = "chunks.jsonl"
+IVF_CENTROIDS_FILE = "ivf_centroids.npy"
+IVF_ORDER_FILE = "ivf_order.npy"
+IVF_OFFSETS_FILE = "ivf_offsets.npy"
+
+# Rows scored per block when assigning vectors to IVF clusters
+_ASSIGN_BLOCK_ROWS = 65536
+
+
+@dataclass
+class VectorHit:
+    """A chunk matched by a vector search."""
+    index: int
+    score: float
+    chunk: dict[str, Any]
+
+
+def _write_atomic(path: Path, write) -> None:
+    """Write through a temporary file and rename, so readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _top_k(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the top_k highest scores, best first."""
+    if top_k >= len(scores):
+        return np.argsort(-scores)
+    candidates = np.argpartition(-scores, top_k)[:top_k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+class NumpyVectorStore:
+    """Read-only view of a corpus directory."""
+
+    def __init__(self, path: Path, manifest: dict, vectors: np.ndarray, chunks: list[dict[str, Any]]):
+        self.path = path
+        self.manifest = manifest
+        self.vectors = vectors
+        self.chunks = chunks
+        self.ivf_centroids: Optional[np.ndarray] = None
+        self.ivf_order: Optional[np.ndarray] = None
+        self.ivf_offsets: Optional[np.ndarray] = None
+
+    @property
+    def count(self) -> int:
+        return self.vectors.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self.vectors.shape[1]
+
+    @property
+    def has_ivf(self) -> bool:
+        return self.ivf_centroids is not None
+
+    # -------------------------------------------------------------------------
+    # Reading and writing
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def open(cls, path: str | Path) -> "NumpyVectorStore":
+        """
+        Open a corpus directory.
+
+        Raises:
+            FileNotFoundError: The directory has no manifest
+            ValueError: The files do not match the manifest
+        """
+        path = Path(path)
+        manifest = json.loads((path / MANIFEST_FILE).read_text(encoding="utf-8"))
+        count, dimension = int(manifest["count"]), int(manifest["dimension"])
+
+        if count:
+            vectors = np.memmap(path / VECTORS_FILE, dtype=np.float32, mode="r", shape=(count, dimension))
+        else:
+            vectors = np.zeros((0, dimension), dtype=np.float32)
+        with open(path / CHUNKS_FILE, encoding="utf-8") as f:
+            chunks = [json.loads(line) for line in f if line.strip()]
+        if len(chunks) != count:
+            raise ValueError(f"{path}: {len(chunks)} chunks but {count} vectors")
+
+        store = cls(path, manifest, vectors, chunks)
+        if manifest.get("ivf_lists") and (path / IVF_CENTROIDS_FILE).exists():
+            store.ivf_centroids = np.load(path / IVF_CENTROIDS_FILE)
+            store.ivf_order = np.load(path / IVF_ORDER_FILE, mmap_mode="r")
+            store.ivf_offsets = np.load(path / IVF_OFFSETS_FILE)
+        return store
+
+    @staticmethod
+    def write(
+        path: str | Path,
+        embeddings: np.ndarray,
+        chunks: list[dict[str, Any]],
+        embedder: str,
+    ) -> None:
+        """
+        Write (replace) a corpus directory. Any IVF index is dropped.
+
+        Args:
+            path: Corpus directory (created if missing)
+            embeddings: Chunk embeddings, one row per chunk
+            chunks: Chunk records (must contain `text`)
+            embedder: Name of the embedder that produced the embeddings
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        embeddings = l2_normalize(np.atleast_2d(embeddings))
+        if embeddings.shape[0] != len(chunks):
+            raise ValueError(f"{embeddings.shape[0]} embeddings for {len(chunks)} chunks")
+
+        _write_atomic(path / VECTORS_FILE, lambda f: f.write(np.ascontiguousarray(embeddings).tobytes()))
+        _write_atomic(path / CHUNKS_FILE, lambda f: f.write("".join(
+            json.dumps(chunk, ensure_ascii=False) + "\n" for chunk in chunks
+        ).encode("utf-8")))
+        for name in (IVF_CENTROIDS_FILE, IVF_ORDER_FILE, IVF_OFFSETS_FILE):
+            (path / name).unlink(missing_ok=True)
+        # The manifest goes last: it is what readers check for changes
+        manifest = {
+            "count": len(chunks),
+            "dimension": int(embeddings.shape[1]),
+            "embedder": embedder,
+            "ivf_lists": 0,
+        }
+        _write_atomic(path / MANIFEST_FILE, lambda f: f.write(json.dumps(manifest).encode("utf-8")))
+        logger.info(f"💾 Wrote {len(chunks)} vectors to {path}")
+
+    # -------------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------------
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        min_score: float = 0.0,
+        nprobe: Optional[int] = None,
+    ) -> list[VectorHit]:
+        """
+        Find the chunks most similar to a normalized query vector.
+
+        Args:
+            query: Query embedding (same embedder and dimension as the store)
+            top_k: Maximum hits
+            min_score: Minimum cosine similarity
+            nprobe: Clusters to scan with the IVF index (None or no index: exact search)
+
+        Returns:
+            Hits, best first
+        """
+        if self.count == 0 or top_k <= 0:
+            return []
+        if query.shape[-1] != self.dimension:
+            raise ValueError(f"Query has dimension {query.shape[-1]}, store has {self.dimension}")
+
+        if nprobe and self.has_ivf:
+            candidates = self._ivf_candidates(query, nprobe)
+            scores = self.vectors[candidates] @ query
+        else:
+            candidates = None
+            scores = self.vectors @ query
+
+        hits = []
+        for position in _top_k(scores, top_k):
+            score = float(scores[position])
+            if score < min_score:
+                break
+            index = int(candidates[position]) if candidates is not None else int(position)
+            hits.append(VectorHit(index=index, score=score, chunk=self.chunks[index]))
+        return hits
+
+    def _ivf_candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Row indices of the nprobe clusters whose centroids are closest to the query."""
+        probe = _top_k(self.ivf_centroids @ query, nprobe)
+        candidates = np.concatenate([
+            self.ivf_order[self.ivf_offsets[c]:self.ivf_offsets[c + 1]] for c in probe
+        ])
+        # Sorted indices read the memory map sequentially
+        candidates.sort()
+        return candidates
+
+    # -------------------------------------------------------------------------
+    # IVF index
+    # -------------------------------------------------------------------------
+
+    def build_ivf(self, n_lists: Optional[int] = None, iterations: int = 10, seed: int = 0) -> None:
+        """
+        Build and save an inverted-file index (spherical k-means over the vectors).
+
+        Args:
+            n_lists: Number of clusters (default: sqrt(count))
+            iterations: k-means iterations
+            seed: Random seed for initialization and sampling
+        """
+        count = self.count
+        n_lists = max(1, min(n_lists or int(np.sqrt(count)), count))
+        rng = np.random.default_rng(seed)
+
+        # Train on a sample; 50 points per cluster is plenty for k-means
+        sample_size = min(count, n_lists * 50)
+        sample = np.asarray(self.vectors[np.sort(rng.choice(count, sample_size, replace=False))])
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(n_lists):
+                members = sample[assignment == cluster]
+                if len(members):
+                    centroids[cluster] = members.sum(axis=0)
+                else:
+                    centroids[cluster] = sample[rng.integers(sample_size)]
+            centroids = l2_normalize(centroids)
+
+        assignment = np.empty(count, dtype=np.int32)
+        for start in range(0, count, _ASSIGN_BLOCK_ROWS):
+            block = np.asarray(self.vectors[start:start + _ASSIGN_BLOCK_ROWS])
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assignment, kind="stable").astype(np.int64)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_lists), out=offsets[1:])
+
+        _write_atomic(self.path / IVF_CENTROIDS_FILE, lambda f: np.save(f, centroids))
+        _write_atomic(self.path / IVF_ORDER_FILE, lambda f: np.save(f, order))
+        _write_atomic(self.path / IVF_OFFSETS_FILE, lambda f: np.save(f, offsets))
+        self.manifest["ivf_lists"] = n_lists
+        _write_atomic(self.path / MANIFEST_FILE, lambda f: f.write(json.dumps(self.manifest).encode("utf-8")))
+
+        self.ivf_centroids, self.ivf_order, self.ivf_offsets = centroids, order, offsets
+        logger.info(f"🗂️ Built IVF index for {self.path}: {n_lists} lists over {count} vectors")
@@ -0,0 +1,184 @@
+"""
+pgvector chunk store.
+
+Chunks of `pgvector` corpuses live in the `corpus_chunks` table
+(migration 007) with an HNSW cosine index, so Postgres does the top-k.
+Embeddings cross the wire as pgvector text literals ('[0.1,0.2,...]'),
+which needs no codec registration on the shared asyncpg pool.
+
+All corpuses share one HNSW index, and the `corpus_id` filter is applied
+to the rows the index scan returns. A plain scan stops after ef_search
+candidates (40 by default), mostly other corpuses' chunks, so a small
+corpus in a large table would get few or no results. Searches therefore
+enable pgvector's iterative index scans (pgvector >= 0.8): the scan
+continues until LIMIT rows pass the filter. `relaxed_order` is the fast
+mode, and its slightly out-of-order rows are re-sorted by score here.
+"""
+
+import os
+import json
+import logging
+from typing import Any, Optional
+
+import numpy as np
+from asyncpg import Pool, Record
+
+logger = logging.getLogger(__name__)
+
+# hnsw.iterative_scan for searches: "relaxed_order", "strict_order", or "off" (pgvector < 0.8)
+PGVECTOR_ITERATIVE_SCAN = os.getenv("PGVECTOR_ITERATIVE_SCAN", "relaxed_order").lower()
+_ITERATIVE_SCAN_MODES = ("relaxed_order", "strict_order", "off")
+
+
+def to_vector_literal(vector: np.ndarray) -> str:
+    """Format an embedding as a pgvector text literal."""
+    return "[" + ",".join(f"{value:.7g}" for value in np.asarray(vector, dtype=np.float32)) + "]"
+
+
+class PgVectorStore:
+    """Chunk storage and similarity search in Postgres."""
+
+    def __init__(self, pool: Pool, iterative_scan: str = PGVECTOR_ITERATIVE_SCAN):
+        """
+        Initialize the store.
+
+        Args:
+            pool: AsyncPG connection pool
+            iterative_scan: hnsw.iterative_scan mode for searches ("off" for pgvector < 0.8)
+        """
+        if iterative_scan not in _ITERATIVE_SCAN_MODES:
+            raise ValueError(f"Unknown hnsw.iterative_scan mode '{iterative_scan}'")
+        self.pool = pool
+        self.iterative_scan = iterative_scan
+        self._dimension: Optional[int] = None
+
+    async def embedding_dimension(self) -> int:
+        """Dimension of corpus_chunks.embedding (fixed by migration 007), read once."""
+        if self._dimension is None:
+            async with self.pool.acquire() as conn:
+                # pgvector stores a vector column's dimension as its type modifier
+                self._dimension = await conn.fetchval(
+                    """
+                    SELECT atttypmod FROM pg_attribute
+                    WHERE attrelid = 'corpus_chunks'::regclass AND attname = 'embedding'
+                    """
+                )
+        return self._dimension
+
+    async def search(
+        self,
+        corpus_id: str,
+        embedding: np.ndarray,
+        top_k: int,
+        min_score: float = 0.0,
+        ef_search: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Find a corpus's chunks closest to a query embedding.
+
+        Args:
+            corpus_id: Corpus to search
+            embedding: Normalized query embedding
+            top_k: Maximum chunks
+            min_score: Minimum cosine similarity
+            ef_search: HNSW candidate list size (None: server default)
+
+        Returns:
+            Chunks (chunk_id, text, source_uri, metadata, score), best first
+        """
+        # ORDER BY the distance expression itself so the HNSW index is used
+        query = """
+            SELECT chunk_id, text, source_uri, metadata,
+                   1 - (embedding <=> $2::vector) AS score
+            FROM corpus_chunks
+            WHERE corpus_id = $1
+            ORDER BY embedding <=> $2::vector
+            LIMIT $3
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                # Keep scanning the shared index until enough rows of this corpus pass the filter
+                if self.iterative_scan != "off":
+                    await conn.execute(f"SET LOCAL hnsw.iterative_scan = {self.iterative_scan}")
+                if ef_search:
+                    await conn.execute(f"SET LOCAL hnsw.ef_search = {int(ef_search)}")
+                rows = await conn.fetch(query, corpus_id, to_vector_literal(embedding), top_k)
+
+        chunks = sorted(map(self._row_to_chunk, rows), key=lambda chunk: chunk["score"], reverse=True)
+        return [chunk for chunk in chunks if chunk["score"] >= min_score]
+
+    async def upsert_chunks(
+        self,
+        corpus_id: str,
+        chunks: list[dict[str, Any]],
+        embeddings: np.ndarray,
+    ) -> int:
+        """
+        Insert or replace chunks.
+
+        Args:
+            corpus_id: Corpus the chunks belong to
+            chunks: Chunk records (chunk_id, text, source_uri, metadata)
+            embeddings: One normalized embedding per chunk
+
+        Returns:
+            Number of chunks written
+        """
+        if len(chunks) != len(embeddings):
+            raise ValueError(f"{len(embeddings)} embeddings for {len(chunks)} chunks")
+
+        query = """
+            INSERT INTO corpus_chunks (corpus_id, chunk_id, text, source_uri, metadata, embedding)
+            VALUES ($1, $2, $3, $4, $5, $6::vector)
+            ON CONFLICT (corpus_id, chunk_id) DO UPDATE SET
+                text = EXCLUDED.text,
+                source_uri = EXCLUDED.source_uri,
+                metadata = EXCLUDED.metadata,
+                embedding = EXCLUDED.embedding,
+                updated_at = NOW()
+        """
+        records = [
+            (
+                corpus_id,
+                chunk["chunk_id"],
+                chunk["text"],
+                chunk.get("source_uri"),
+                json.dumps(chunk.get("metadata") or {}),
+                to_vector_literal(embedding),
+            )
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
+        async with self.pool.acquire() as conn:
+            await conn.executemany(query, records)
+
+        logger.info(f"💾 Upserted {len(records)} chunks into {corpus_id}")
+        return len(records)
+
+    async def delete_source(self, corpus_id: str, source_uri: str) -> int:
+        """Delete a source's chunks. Returns the number deleted."""
+        async with self.pool.acquire() as conn:
+            result = await conn.execute(
+                "DELETE FROM corpus_chunks WHERE corpus_id = $1 AND source_uri = $2",
+                corpus_id,
+                source_uri,
+            )
+        return int(result.split()[-1])
+
+    async def delete_corpus(self, corpus_id: str) -> int:
+        """Delete all chunks of a corpus. Returns the number deleted."""
+        async with self.pool.acquire() as conn:
+            result = await conn.execute("DELETE FROM corpus_chunks WHERE corpus_id = $1", corpus_id)
+        return int(result.split()[-1])
+
+    def _row_to_chunk(self, row: Record) -> dict[str, Any]:
+        """Convert database row to a chunk dict."""
+        metadata = row["metadata"]
+        if isinstance(metadata, str):
+            metadata = json.loads(metadata)
+        return {
+            "chunk_id": row["chunk_id"],
+            "text": row["text"],
+            "source_uri": row["source_uri"],
+            "metadata": metadata or {},
+            "score": float(row["score"]),
+        }
@@ -20,7 +20,7 @@ if not os.getenv("GOOGLE_API_KEY"):
     # For Vertex AI, we don't need API key, but SDK checks for it
     os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "TRUE"
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.application.api import router
@@ -31,7 +31,13 @@ from src.application.api.document_routes import router as document_router
 from src.application.api.text_editor_routes import router as text_editor_router
 from src.application.api.policy_routes import router as policy_router
 from src.application.api.rbac_routes import router as rbac_router
+from src.application.api.job_routes import router as job_router
+from src.application.api.ingestion_routes import router as ingestion_router
+from src.application.api.stream_registry import close_stream_registry
 from src.application.di import get_container, close_container
+from src.infrastructure.metrics import get_metrics
+from src.domain.models.rbac_models import UserRBAC
+from src.middleware.rbac import require_superadmin
 
 
 # Configure logging
@@ -50,6 +56,7 @@ async def lifespan(app: FastAPI):
     try:
         container = get_container()
         await container.init_repository()
+        await container.check_vector_dimensions()
         logger.info("✅ Application started successfully")
         logger.info("📄 File processing: Gemini Native (PDF/DOCX)")
     except Exception as e:
@@ -61,6 +68,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("🛑 Shutting down application...")
     try:
+        await close_stream_registry()
         await close_container()
         logger.info("✅ Application shut down successfully")
     except Exception as e:
@@ -122,6 +130,10 @@ app.include_router(text_editor_router, prefix="/api/v1", tags=["ai-editor"])
 app.include_router(policy_router, prefix="/api/v1", tags=["policies"])
 # RBAC (Role-Based Access Control) routes
 app.include_router(rbac_router, prefix="/api/v1", tags=["rbac"])
+# Background jobs (?mode=job on invoke/chat/document processing)
+app.include_router(job_router, prefix="/api/v1", tags=["jobs"])
+# Corpus ingestion (runs as a background job)
+app.include_router(ingestion_router, prefix="/api/v1", tags=["ingestion"])
 
 
 @app.get("/")
@@ -185,11 +197,32 @@ async def health():
             "rbac_me": "/api/v1/rbac/me",
             "rbac_roles": "/api/v1/rbac/roles",
             "rbac_superadmins": "/api/v1/rbac/superadmins",
-            "rbac_group_mappings": "/api/v1/rbac/group-mappings"
+            "rbac_group_mappings": "/api/v1/rbac/group-mappings",
+
+            # Background jobs
+            "job_status": "/api/v1/jobs/{job_id}",
+            "job_stream": "/api/v1/jobs/{job_id}/stream",
+
+            # Corpus ingestion
+            "corpus_ingest": "/api/v1/corpuses/{corpus_id}/ingest",
+
+            # Cache and pool metrics (superadmins)
+            "metrics": "/metrics"
         }
     }
 
 
+@app.get("/metrics")
+async def metrics(user_rbac: UserRBAC = Depends(require_superadmin())):
+    """
+    Per-instance cache and pool metrics (hit ratios, sizes, counters).
+
+    Superadmins only, like the other admin routes: the snapshot exposes
+    cache, upload deduplication and job internals.
+    """
+    return get_metrics().snapshot()
+
+
 if __name__ == "__main__":
     import uvicorn
 
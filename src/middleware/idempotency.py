@@ -0,0 +1,235 @@
+"""
+Idempotency-Key support for POST endpoints that start agent runs.
+
+Clients (mobile Teams, proxies) retry POSTs. With an `Idempotency-Key`
+header the first request's response is cached for a TTL; retries get the
+cached response, and duplicates that arrive while the first run is still
+in flight wait for it instead of starting another agent run.
+
+Usage:
+    @router.post("/chat")
+    async def send(..., idem: Idempotency = Depends(idempotency)):
+        return await idem.run(user_id, lambda: chat_service.send_message(...))
+
+Keys are scoped per user, method and path, and tied to a fingerprint of
+the request (body + query string): reusing a key with a different request
+is rejected. The store is process-local; retries are expected to reach the
+same instance (Cloud Run session affinity).
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from fastapi import HTTPException, Header, Request, Response
+
+logger = logging.getLogger(__name__)
+
+# How long a completed response is replayed for
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+# Maximum remembered keys per instance (oldest completed ones are dropped first)
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+
+MAX_KEY_LENGTH = 255
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+@dataclass
+class _Entry:
+    """A remembered request: its fingerprint and the (possibly running) handler task."""
+    fingerprint: str
+    task: asyncio.Task
+    expires_at: Optional[float] = None
+
+
+class IdempotencyStore:
+    """
+    In-memory map of idempotency keys to handler tasks.
+
+    Handlers run as tasks detached from the request, so a client that
+    disconnects and retries attaches to the same run. Only successful
+    results are kept; a failed run forgets its key so the retry runs again.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+        max_keys: int = IDEMPOTENCY_MAX_KEYS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+    async def run(
+        self,
+        scope_key: str,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, bool]:
+        """
+        Run `handler` once per key.
+
+        Returns:
+            (result, replayed) - replayed is True if the result came from
+            an earlier or concurrent request with the same key
+
+        Raises:
+            HTTPException 422: The key was used for a different request
+        """
+        self._purge()
+
+        entry = self._entries.get(scope_key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with a different request",
+                )
+            state = "in flight" if not entry.task.done() else "cached"
+            logger.info(f"🔁 Idempotent replay ({state}) for key {scope_key[:12]}")
+            return await asyncio.shield(entry.task), True
+
+        task = asyncio.ensure_future(handler())
+        entry = _Entry(fingerprint=fingerprint, task=task)
+        self._entries[scope_key] = entry
+        task.add_done_callback(lambda t: self._on_done(scope_key, entry, t))
+        self._enforce_size()
+
+        return await asyncio.shield(task), False
+
+    def _on_done(self, scope_key: str, entry: _Entry, task: asyncio.Task) -> None:
+        """Keep successful results for the TTL; forget failed runs."""
+        if task.cancelled() or task.exception() is not None:
+            if self._entries.get(scope_key) is entry:
+                del self._entries[scope_key]
+            return
+        entry.expires_at = asyncio.get_running_loop().time() + self.ttl_seconds
+
+    def _purge(self) -> None:
+        """Drop expired entries."""
+        now = asyncio.get_running_loop().time()
+        expired = [
+            key for key, entry in self._entries.items()
+            if entry.expires_at is not None and entry.expires_at <= now
+        ]
+        for key in expired:
+            del self._entries[key]
+
+    def _enforce_size(self) -> None:
+        """Drop the oldest completed entries beyond max_keys (in-flight ones are kept)."""
+        excess = len(self._entries) - self.max_keys
+        if excess <= 0:
+            return
+        for key in [k for k, e in self._entries.items() if e.task.done()][:excess]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        """Current store usage."""
+        return {
+            "keys": len(self._entries),
+            "in_flight": sum(1 for e in self._entries.values() if not e.task.done()),
+        }
+
+
+_idempotency_store: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Get or create the idempotency store singleton."""
+    global _idempotency_store
+    if _idempotency_store is None:
+        _idempotency_store = IdempotencyStore()
+    return _idempotency_store
+
+
+def _sha256(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class Idempotency:
+    """Per-request idempotency guard returned by the `idempotency` dependency."""
+
+    def __init__(self, request: Request, response: Response, key: Optional[str]):
+        self.request = request
+        self.response = response
+        self.key = key
+
+    async def run(self, user_id: str, handler: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run the endpoint's work, deduplicated by Idempotency-Key.
+
+        Without a key, `handler` simply runs.
+
+        Args:
+            user_id: Authenticated user (keys are scoped per user)
+            handler: Coroutine factory producing the endpoint's response
+
+        Returns:
+            The handler's result, possibly replayed from an earlier request
+        """
+        if not self.key:
+            return await handler()
+
+        scope_key = _sha256(
+            user_id.encode(),
+            self.request.method.encode(),
+            self.request.url.path.encode(),
+            self.key.encode(),
+        )
+        fingerprint = _sha256(
+            self.request.url.query.encode(),
+            await self.request.body(),
+        )
+
+        result, replayed = await get_idempotency_store().run(scope_key, fingerprint, handler)
+        if replayed:
+            if isinstance(result, Response):
+                return _replay_copy(result)
+            self.response.headers[REPLAY_HEADER] = "true"
+        return result
+
+
+def _replay_copy(result: Response) -> Response:
+    """
+    A copy of a remembered response marked as replayed.
+
+    The remembered object is shared by the original request and every
+    replay, so it is never modified.
+    """
+    replay = Response(content=getattr(result, "body", b""), status_code=result.status_code)
+    replay.raw_headers = list(result.raw_headers)
+    replay.headers[REPLAY_HEADER] = "true"
+    return replay
+
+
+async def idempotency(
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        description="Client-generated key; retries with the same key return the first response",
+    ),
+) -> Idempotency:
+    """
+    FastAPI dependency providing the request's idempotency guard.
+
+    Raises:
+        HTTPException 400 if the key is empty or too long
+    """
+    if idempotency_key is not None:
+        idempotency_key = idempotency_key.strip()
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters",
+            )
+    return Idempotency(request, response, idempotency_key)
@@ -0,0 +1,210 @@
+"""
+Planning and caching for map-reduce multi-document analysis.
+
+A single prompt with every document is fastest for a few documents, but
+large batches (or one very large text document) exceed the context window
+or take minutes. The planner estimates each document's tokens from its type
+and size (no model call); when the batch exceeds DOC_PROCESS_TOKEN_BUDGET,
+MultiDocumentProcessor switches to map-reduce:
+
+1. Map: one extraction call per document (text documents larger than
+   DOC_MAP_MAX_TOKENS are split into chunks, one call each), run
+   concurrently with bounded parallelism
+2. Reduce: one call over the partial answers
+
+Partial answers are cached per (content hash, chunk, query, model), so
+follow-up runs over the same documents only map what is new.
+"""
+
+import os
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.infrastructure.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Estimated prompt tokens above which documents are analyzed with map-reduce
+DOC_PROCESS_TOKEN_BUDGET = int(os.getenv("DOC_PROCESS_TOKEN_BUDGET", "400000"))
+# Text documents estimated above this are split into chunks for the map phase
+DOC_MAP_MAX_TOKENS = int(os.getenv("DOC_MAP_MAX_TOKENS", "100000"))
+# Concurrent map calls per request
+DOC_MAP_CONCURRENCY = int(os.getenv("DOC_MAP_CONCURRENCY", "4"))
+# Length limit of each partial answer
+DOC_MAP_MAX_OUTPUT_TOKENS = int(os.getenv("DOC_MAP_MAX_OUTPUT_TOKENS", "2048"))
+# Cached partial answers (process-local)
+DOC_MAP_CACHE_MAX_ENTRIES = int(os.getenv("DOC_MAP_CACHE_MAX_ENTRIES", "2000"))
+DOC_MAP_CACHE_TTL_SECONDS = float(os.getenv("DOC_MAP_CACHE_TTL_SECONDS", "3600"))
+
+# Types whose bytes can be decoded and split into chunks
+TEXT_TYPES = ("text/plain", "text/markdown", "text/csv", "text/html")
+# Gemini bills a fixed 258 tokens per image (and per PDF page)
+IMAGE_TOKENS = 258
+# Approximate bytes per token: ~4 characters per token of text; PDFs at
+# 258 tokens for a typical ~25 KB page; Office files are zipped XML
+_TEXT_BYTES_PER_TOKEN = 4
+_PDF_BYTES_PER_TOKEN = 100
+_OFFICE_BYTES_PER_TOKEN = 2
+# Chunks are cut from text at this many characters per token
+_CHARS_PER_TOKEN = 4
+
+MAP_PROMPT = (
+    "You are reading one part of a larger set of documents. Extract everything in "
+    "this document that is relevant to the question below: facts, figures, quotes "
+    "and section references, with enough context to be used without the document. "
+    "If nothing is relevant, answer exactly: NOTHING RELEVANT.\n\n"
+    "Question: {query}"
+)
+
+REDUCE_HEADER = (
+    "The documents were too large to analyze at once, so each one (or each part) "
+    "was read separately. These are the relevant extracts from each, labeled by "
+    "document. Answer the question using them.\n\n"
+)
+
+
+def estimate_tokens(content_type: str, size_bytes: int) -> int:
+    """Approximate prompt tokens of a document, from its type and size."""
+    if content_type.startswith("image/"):
+        return IMAGE_TOKENS
+    if content_type.startswith("text/"):
+        return max(size_bytes // _TEXT_BYTES_PER_TOKEN, 1)
+    if content_type == "application/pdf":
+        return max(size_bytes // _PDF_BYTES_PER_TOKEN, IMAGE_TOKENS)
+    return max(size_bytes // _OFFICE_BYTES_PER_TOKEN, 1)
+
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """Split text into chunks of about max_tokens, at paragraph (else line) breaks."""
+    max_chars = max(max_tokens * _CHARS_PER_TOKEN, 1)
+    chunks: List[str] = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        pieces = [paragraph]
+        if len(paragraph) > max_chars:
+            # One huge paragraph (e.g. a CSV): fall back to lines, then hard cuts
+            pieces = []
+            for line in paragraph.split("\n"):
+                pieces.extend(line[i:i + max_chars] for i in range(0, max(len(line), 1), max_chars))
+        for piece in pieces:
+            if current and len(current) + len(piece) + 2 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+@dataclass
+class DocumentPlan:
+    """How a batch of documents will be analyzed."""
+    mode: str  # "single" or "map_reduce"
+    estimated_tokens: List[int] = field(default_factory=list)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.estimated_tokens)
+
+
+def plan_documents(
+    content_types: List[str],
+    sizes: List[int],
+    token_budget: int = DOC_PROCESS_TOKEN_BUDGET,
+) -> DocumentPlan:
+    """
+    Choose single-prompt or map-reduce analysis.
+
+    Args:
+        content_types: MIME type per document
+        sizes: Size in bytes per document
+        token_budget: Largest estimated prompt sent as a single call
+
+    Returns:
+        DocumentPlan with the per-document estimates
+    """
+    estimates = [estimate_tokens(content_type, size) for content_type, size in zip(content_types, sizes)]
+    # A single document can only be mapped when it is text large enough to split into chunks
+    splittable = len(estimates) > 1 or (
+        len(estimates) == 1 and content_types[0] in TEXT_TYPES and estimates[0] > DOC_MAP_MAX_TOKENS
+    )
+    mode = "map_reduce" if splittable and sum(estimates) > token_budget else "single"
+    if mode == "map_reduce":
+        logger.info(f"🗺️ Map-reduce plan: ~{sum(estimates)} tokens in {len(estimates)} documents (budget {token_budget})")
+    return DocumentPlan(mode=mode, estimated_tokens=estimates)
+
+
+# -----------------------------------------------------------------------------
+# Partial answer cache
+# -----------------------------------------------------------------------------
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.casefold().split())
+
+
+class PartialAnswerCache:
+    """LRU of map-phase answers keyed by (content hash, chunk, query, model), with TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = DOC_MAP_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = DOC_MAP_CACHE_TTL_SECONDS,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached partial answers
+            ttl_seconds: Lifetime of an entry
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, tuple[float, str]]" = OrderedDict()
+
+        metrics = get_metrics()
+        self._hits = metrics.counter("doc_map_cache.hits")
+        self._misses = metrics.counter("doc_map_cache.misses")
+        metrics.register_collector("doc_map_cache", self.stats)
+
+    @staticmethod
+    def key(content_key: str, chunk: int, query: str, model: str) -> tuple:
+        return (content_key, chunk, _normalize_query(query), model)
+
+    def get(self, key: tuple) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self._misses.inc()
+            return None
+        self._entries.move_to_end(key)
+        self._hits.inc()
+        return entry[1]
+
+    def put(self, key: tuple, answer: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Size and hit ratio, for /metrics."""
+        lookups = self._hits.value + self._misses.value
+        return {
+            "entries": len(self._entries),
+            "hit_ratio": round(self._hits.value / lookups, 3) if lookups else 0.0,
+        }
+
+
+_partial_answer_cache: Optional[PartialAnswerCache] = None
+
+
+def get_partial_answer_cache() -> PartialAnswerCache:
+    """Get or create the partial answer cache singleton."""
+    global _partial_answer_cache
+    if _partial_answer_cache is None:
+        _partial_answer_cache = PartialAnswerCache()
+    return _partial_answer_cache
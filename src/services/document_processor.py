@@ -2,17 +2,36 @@
 Multi-document Gemini processor.
 
 Processes multiple uploaded documents using Gemini's multimodal capabilities
-and returns a unified response based on the user's query.
+and returns a unified response based on the user's query, either at once
+or streamed with progress events. Batches too large for one prompt are
+analyzed with map-reduce (see document_map_reduce).
 """
 
+import time
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, AsyncGenerator
 from dataclasses import dataclass
 
 from google import genai
 from google.genai import types
 
-from src.services.storage_service import StorageService
+from src.domain.models import StreamEvent
+from src.domain.ports.document_storage import DocumentStorage
+from src.infrastructure.extraction import ImageNormalizer, TextExtractor
+from src.infrastructure.model_files import ModelFileCache
+from src.infrastructure.storage.attachment_loader import AttachmentBatch, LoadedAttachment, load_attachments
+from src.services.document_map_reduce import (
+    DOC_MAP_CONCURRENCY,
+    DOC_MAP_MAX_OUTPUT_TOKENS,
+    DOC_MAP_MAX_TOKENS,
+    MAP_PROMPT,
+    REDUCE_HEADER,
+    TEXT_TYPES,
+    get_partial_answer_cache,
+    plan_documents,
+    split_text,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -71,10 +90,13 @@ class MultiDocumentProcessor:
 
     def __init__(
         self,
-        storage_service: StorageService,
+        storage_service: DocumentStorage,
         project_id: str,
         location: str = "us-east4",
         model_name: str = "gemini-2.5-flash",
+        model_files: Optional[ModelFileCache] = None,
+        text_extractor: Optional[TextExtractor] = None,
+        image_normalizer: Optional[ImageNormalizer] = None,
     ):
         """
         Initialize the multi-document processor.
@@ -84,11 +106,18 @@ class MultiDocumentProcessor:
             project_id: GCP project ID
             location: GCP region for Vertex AI
             model_name: Gemini model to use
+            model_files: Upload-once file references for documents (None: always inline)
+            text_extractor: Local text extraction for documents (None: always binary)
+            image_normalizer: Image downscaling/re-encoding for documents (None: as uploaded)
         """
         self.storage_service = storage_service
+        self.model_files = model_files
+        self.text_extractor = text_extractor
+        self.image_normalizer = image_normalizer
         self.project_id = project_id
         self.location = location
         self.model_name = model_name
+        self.partial_answers = get_partial_answer_cache()
 
         self.gemini_client = genai.Client(
             vertexai=True,
@@ -141,6 +170,228 @@ class MultiDocumentProcessor:
         """Get dictionary of supported MIME types and descriptions."""
         return SUPPORTED_MIME_TYPES.copy()
 
+    async def _load_documents(
+        self,
+        documents: List[DocumentReference],
+    ) -> Tuple[List[Tuple[DocumentReference, LoadedAttachment]], List[str], AttachmentBatch]:
+        """
+        Fetch the supported documents concurrently.
+
+        Returns:
+            (loaded documents, failed document notes, attachment batch to release)
+        """
+        # Fetch all supported documents at once (under the in-flight byte budget)
+        batch = await load_attachments(
+            self.storage_service,
+            [doc.blob_path if self.is_supported_type(doc.content_type) else None for doc in documents],
+            model_files=self.model_files,
+            text_extractor=self.text_extractor,
+            image_normalizer=self.image_normalizer,
+            content_types=[doc.content_type for doc in documents],
+        )
+
+        loaded_docs = []
+        failed_docs = []
+
+        for doc, loaded in zip(documents, batch.results):
+            if not self.is_supported_type(doc.content_type):
+                logger.warning(f"⚠️ Unsupported content type: {doc.content_type} for {doc.filename}")
+                failed_docs.append(f"{doc.filename} (unsupported type)")
+                continue
+
+            if loaded.error is not None:
+                logger.error(f"❌ Failed to process {doc.filename}: {loaded.error}")
+                failed_docs.append(f"{doc.filename} ({str(loaded.error)})")
+                continue
+
+            loaded_docs.append((doc, loaded))
+            logger.info(f"✅ Loaded document: {doc.filename} ({loaded.size_bytes} bytes)")
+
+        return loaded_docs, failed_docs, batch
+
+    def _context_header(
+        self,
+        documents: List[DocumentReference],
+        system_instruction: Optional[str],
+    ) -> List[types.Part]:
+        """System context and the list of provided documents."""
+        content_parts = []
+
+        # Add system context if provided
+        if system_instruction:
+            content_parts.append(
+                types.Part(text=f"System Context: {system_instruction}\n\n")
+            )
+
+        # Add document context header
+        doc_list = "\n".join([
+            f"- {doc.filename} ({SUPPORTED_MIME_TYPES.get(doc.content_type, doc.content_type)})"
+            for doc in documents
+        ])
+        content_parts.append(
+            types.Part(text=f"The following {len(documents)} document(s) have been provided for analysis:\n{doc_list}\n\n")
+        )
+        return content_parts
+
+    def _build_contents(
+        self,
+        documents: List[DocumentReference],
+        loaded_docs: List[Tuple[DocumentReference, LoadedAttachment]],
+        user_query: str,
+        system_instruction: Optional[str] = None,
+    ) -> List[types.Part]:
+        """Single prompt with every document."""
+        content_parts = self._context_header(documents, system_instruction)
+
+        for doc, loaded in loaded_docs:
+            # Add document part (file reference or inline_data)
+            content_parts.append(loaded.to_part(doc.content_type))
+
+            # Add filename label for context
+            content_parts.append(
+                types.Part(text=f"\n[Above: {doc.filename}]\n\n")
+            )
+
+        # Add the user's query
+        content_parts.append(
+            types.Part(text=f"\n\nUser Question: {user_query}")
+        )
+
+        return content_parts
+
+    def _map_units(
+        self,
+        loaded_docs: List[Tuple[DocumentReference, LoadedAttachment]],
+        estimated_tokens: List[int],
+    ) -> List[Tuple[DocumentReference, str, int, int, types.Part]]:
+        """
+        Split documents into map units: one per document, or one per chunk of large text documents.
+
+        Returns:
+            (document, content key, chunk index, chunk count, part) per unit
+        """
+        units = []
+        for (doc, loaded), tokens in zip(loaded_docs, estimated_tokens):
+            content_key = loaded.content_hash or f"{doc.blob_path}:{loaded.size_bytes}"
+            if loaded.text is not None:
+                text = loaded.text
+            elif doc.content_type in TEXT_TYPES and loaded.data is not None:
+                text = loaded.data.decode("utf-8", errors="replace")
+            else:
+                text = None
+            if text is not None and tokens > DOC_MAP_MAX_TOKENS:
+                chunks = split_text(text, DOC_MAP_MAX_TOKENS)
+                for index, chunk in enumerate(chunks):
+                    units.append((doc, content_key, index, len(chunks), types.Part(text=chunk)))
+            else:
+                units.append((doc, content_key, 0, 1, loaded.to_part(doc.content_type)))
+        return units
+
+    async def _map_reduce_contents(
+        self,
+        documents: List[DocumentReference],
+        loaded_docs: List[Tuple[DocumentReference, LoadedAttachment]],
+        estimated_tokens: List[int],
+        user_query: str,
+        system_instruction: Optional[str] = None,
+    ) -> Tuple[List[types.Part], Dict[str, Any]]:
+        """
+        Map phase: extract what each document (or chunk) says about the query,
+        concurrently and through the partial answer cache. Returns the reduce
+        prompt built from the extracts and the map statistics.
+        """
+        started = time.perf_counter()
+        units = self._map_units(loaded_docs, estimated_tokens)
+        semaphore = asyncio.Semaphore(max(DOC_MAP_CONCURRENCY, 1))
+        cached = 0
+        failed: List[str] = []
+
+        async def map_unit(doc, content_key, index, count, part) -> Optional[str]:
+            nonlocal cached
+            key = self.partial_answers.key(content_key, index, user_query, self.model_name)
+            answer = self.partial_answers.get(key)
+            if answer is not None:
+                cached += 1
+                return answer
+
+            label = doc.filename + (f" (part {index + 1} of {count})" if count > 1 else "")
+            try:
+                async with semaphore:
+                    response = await self.gemini_client.aio.models.generate_content(
+                        model=self.model_name,
+                        contents=[
+                            part,
+                            types.Part(text=f"\n[Above: {label}]\n\n"),
+                            types.Part(text=MAP_PROMPT.format(query=user_query)),
+                        ],
+                        config=types.GenerateContentConfig(
+                            temperature=0.0,
+                            max_output_tokens=DOC_MAP_MAX_OUTPUT_TOKENS,
+                        ),
+                    )
+            except Exception as e:
+                logger.error(f"❌ Map call failed for {label}: {e}")
+                failed.append(f"{label} ({str(e)})")
+                return None
+
+            answer = self._sanitize_text(response.text)
+            self.partial_answers.put(key, answer)
+            return answer
+
+        logger.info(f"🗺️ Mapping {len(units)} unit(s) from {len(loaded_docs)} document(s)")
+        answers = await asyncio.gather(*(map_unit(*unit) for unit in units))
+
+        if all(answer is None for answer in answers):
+            raise RuntimeError(f"Map phase failed for every document. Errors: {', '.join(failed)}")
+
+        content_parts = self._context_header(documents, system_instruction)
+        extracts = []
+        for (doc, _, index, count, _), answer in zip(units, answers):
+            if answer is None or answer.strip().upper().startswith("NOTHING RELEVANT"):
+                continue
+            label = doc.filename + (f" (part {index + 1} of {count})" if count > 1 else "")
+            extracts.append(f"### {label}\n{answer}")
+        content_parts.append(types.Part(text=REDUCE_HEADER + ("\n\n".join(extracts) or "(no relevant content found)")))
+        content_parts.append(types.Part(text=f"\n\nUser Question: {user_query}"))
+
+        stats = {
+            "map_units": len(units),
+            "map_cached": cached,
+            "map_failed": failed or None,
+            "map_ms": round((time.perf_counter() - started) * 1000),
+        }
+        logger.info(f"✅ Map phase done: {len(units)} unit(s), {cached} cached, {len(failed)} failed")
+        return content_parts, stats
+
+    async def _prepare_contents(
+        self,
+        documents: List[DocumentReference],
+        loaded_docs: List[Tuple[DocumentReference, LoadedAttachment]],
+        user_query: str,
+        system_instruction: Optional[str] = None,
+    ) -> Tuple[List[types.Part], Dict[str, Any]]:
+        """
+        Build the final prompt: every document at once when the estimated
+        tokens fit DOC_PROCESS_TOKEN_BUDGET, else the map-reduce extracts.
+
+        Returns:
+            (content parts, plan metadata)
+        """
+        # Documents sent as extracted text are estimated from the text
+        plan = plan_documents(
+            ["text/plain" if loaded.text is not None else doc.content_type for doc, loaded in loaded_docs],
+            [len(loaded.text) if loaded.text is not None else loaded.size_bytes for _, loaded in loaded_docs],
+        )
+        plan_info: Dict[str, Any] = {"mode": plan.mode, "estimated_tokens": plan.total_tokens}
+        if plan.mode == "single":
+            return self._build_contents(documents, loaded_docs, user_query, system_instruction), plan_info
+
+        content_parts, stats = await self._map_reduce_contents(
+            documents, loaded_docs, plan.estimated_tokens, user_query, system_instruction
+        )
+        plan_info.update(stats)
+        return content_parts, plan_info
+
     async def process_documents(
         self,
         documents: List[DocumentReference],
@@ -168,63 +419,14 @@ class MultiDocumentProcessor:
                 error="No documents provided for processing",
             )
 
+        batch: Optional[AttachmentBatch] = None
         try:
             logger.info(f"📄 Processing {len(documents)} document(s) with query: {user_query[:100]}...")
+            started = time.perf_counter()
 
-            # Build content parts for Gemini
-            content_parts = []
-
-            # Add system context if provided
-            if system_instruction:
-                content_parts.append(
-                    types.Part(text=f"System Context: {system_instruction}\n\n")  # ✅ CORRECT SYNTAX
-                )
-
-            # Add document context header
-            doc_list = "\n".join([
-                f"- {doc.filename} ({SUPPORTED_MIME_TYPES.get(doc.content_type, doc.content_type)})"
-                for doc in documents
-            ])
-            content_parts.append(
-                types.Part(text=f"The following {len(documents)} document(s) have been provided for analysis:\n{doc_list}\n\n")  # ✅ CORRECT SYNTAX
-            )
-
-            # Fetch and add each document
-            processed_count = 0
-            failed_docs = []
-
-            for doc in documents:
-                try:
-                    # Validate content type
-                    if not self.is_supported_type(doc.content_type):
-                        logger.warning(f"⚠️ Unsupported content type: {doc.content_type} for {doc.filename}")
-                        failed_docs.append(f"{doc.filename} (unsupported type)")
-                        continue
-
-                    # Fetch document bytes from GCS
-                    doc_bytes = await self.storage_service.get_document_bytes(doc.blob_path)
-
-                    # Add document part with inline_data
-                    content_parts.append(
-                        types.Part(
-                            inline_data=types.Blob(
-                                mime_type=doc.content_type,
-                                data=doc_bytes
-                            )
-                        )  # ✅ CORRECT SYNTAX FOR BINARY DATA
-                    )
-
-                    # Add filename label for context
-                    content_parts.append(
-                        types.Part(text=f"\n[Above: {doc.filename}]\n\n")  # ✅ CORRECT SYNTAX
-                    )
-
-                    processed_count += 1
-                    logger.info(f"✅ Added document: {doc.filename} ({len(doc_bytes)} bytes)")
-
-                except Exception as doc_error:
-                    logger.error(f"❌ Failed to process {doc.filename}: {doc_error}")
-                    failed_docs.append(f"{doc.filename} ({str(doc_error)})")
+            loaded_docs, failed_docs, batch = await self._load_documents(documents)
+            processed_count = len(loaded_docs)
+            load_ms = round((time.perf_counter() - started) * 1000)
 
             if processed_count == 0:
                 return ProcessingResult(
@@ -233,15 +435,17 @@ class MultiDocumentProcessor:
                     documents_processed=0,
                 )
 
-            # Add the user's query
-            content_parts.append(
-                types.Part(text=f"\n\nUser Question: {user_query}")  # ✅ CORRECT SYNTAX
+            content_parts, plan_info = await self._prepare_contents(
+                documents, loaded_docs, user_query, system_instruction
             )
+            if plan_info["mode"] == "map_reduce":
+                # The reduce prompt holds only the extracts
+                batch.release()
 
-            # Call Gemini
+            # Call Gemini (async client: the event loop keeps serving other requests)
             logger.info(f"🤖 Sending {processed_count} document(s) to Gemini {self.model_name}")
 
-            response = self.gemini_client.models.generate_content(
+            response = await self.gemini_client.aio.models.generate_content(
                 model=self.model_name,
                 contents=content_parts,
                 config=types.GenerateContentConfig(
@@ -263,6 +467,9 @@ class MultiDocumentProcessor:
                     "total_documents": len(documents),
                     "processed_documents": processed_count,
                     "failed_documents": failed_docs if failed_docs else None,
+                    "load_ms": load_ms,
+                    **plan_info,
+                    "total_ms": round((time.perf_counter() - started) * 1000),
                 },
             )
 
@@ -274,6 +481,139 @@ class MultiDocumentProcessor:
                 documents_processed=0,
             )
 
+        finally:
+            if batch is not None:
+                batch.release()
+
+    async def stream_documents(
+        self,
+        documents: List[DocumentReference],
+        user_query: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.3,
+        max_output_tokens: int = 8192,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        """
+        Process multiple documents with Gemini, streaming progress and the answer.
+
+        Yields, in order:
+            progress {"stage": "documents_loaded", ...} once the documents are fetched
+            progress {"stage": "map_completed", ...} after the map phase (map-reduce only)
+            progress {"stage": "first_token", ...} when the model starts answering
+            content chunks
+            progress {"stage": "completed", ...} with the processing metadata
+            done (or error)
+
+        Args:
+            documents: List of document references to process
+            user_query: User's question about the documents
+            system_instruction: Optional system prompt for context
+            temperature: Model temperature (0.0-1.0)
+            max_output_tokens: Maximum response length
+
+        Yields:
+            StreamEvent objects for SSE serialization
+        """
+        if not documents:
+            yield StreamEvent(event_type="error", data={"message": "No documents provided for processing"})
+            return
+
+        batch: Optional[AttachmentBatch] = None
+        try:
+            logger.info(f"📄 Streaming {len(documents)} document(s) with query: {user_query[:100]}...")
+            started = time.perf_counter()
+
+            def elapsed_ms() -> int:
+                return round((time.perf_counter() - started) * 1000)
+
+            loaded_docs, failed_docs, batch = await self._load_documents(documents)
+            processed_count = len(loaded_docs)
+            yield StreamEvent(
+                event_type="progress",
+                data={
+                    "stage": "documents_loaded",
+                    "documents_processed": processed_count,
+                    "total_documents": len(documents),
+                    "failed_documents": failed_docs or None,
+                    "elapsed_ms": elapsed_ms(),
+                },
+            )
+
+            if processed_count == 0:
+                yield StreamEvent(
+                    event_type="error",
+                    data={"message": f"Failed to process any documents. Errors: {', '.join(failed_docs)}"},
+                )
+                return
+
+            content_parts, plan_info = await self._prepare_contents(
+                documents, loaded_docs, user_query, system_instruction
+            )
+            if plan_info["mode"] == "map_reduce":
+                batch.release()
+                yield StreamEvent(
+                    event_type="progress",
+                    data={
+                        "stage": "map_completed",
+                        "map_units": plan_info["map_units"],
+                        "map_cached": plan_info["map_cached"],
+                        "map_failed": plan_info["map_failed"],
+                        "elapsed_ms": elapsed_ms(),
+                    },
+                )
+
+            logger.info(f"🤖 Streaming {processed_count} document(s) through Gemini {self.model_name}")
+
+            stream = await self.gemini_client.aio.models.generate_content_stream(
+                model=self.model_name,
+                contents=content_parts,
+                config=types.GenerateContentConfig(
+                    temperature=temperature,
+                    max_output_tokens=max_output_tokens,
+                ),
+            )
+
+            response_chars = 0
+            first_token_ms = None
+            async for chunk in stream:
+                if not chunk.text:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = elapsed_ms()
+                    yield StreamEvent(
+                        event_type="progress",
+                        data={"stage": "first_token", "elapsed_ms": first_token_ms},
+                    )
+                response_chars += len(chunk.text)
+                yield StreamEvent(event_type="content", data={"content": chunk.text})
+
+            logger.info(f"✅ Gemini streamed {processed_count} document(s), response: {response_chars} chars")
+
+            yield StreamEvent(
+                event_type="progress",
+                data={
+                    "stage": "completed",
+                    "model": self.model_name,
+                    "documents_processed": processed_count,
+                    "mode": plan_info["mode"],
+                    "first_token_ms": first_token_ms,
+                    "elapsed_ms": elapsed_ms(),
+                },
+            )
+            yield StreamEvent(event_type="done", data=None)
+
+        except asyncio.CancelledError:
+            logger.info("Document processing stream cancelled")
+            raise
+
+        except Exception as e:
+            logger.error(f"❌ Document processing stream failed: {e}", exc_info=True)
+            yield StreamEvent(event_type="error", data={"message": str(e)})
+
+        finally:
+            if batch is not None:
+                batch.release()
+
     async def process_single_document(
         self,
         document: DocumentReference,
@@ -1,12 +1,12 @@
 import logging
-import io
+import sys
 from typing import Dict, Any, Optional
 import httpx
-import PyPDF2
-from docx import Document as DocxDocument
 from google import genai
 from google.genai import types
 
+from src.infrastructure.extraction.converters import DOCX_TYPE, PDF_TYPE, convert_document
+
 logger = logging.getLogger(__name__)
 
 
@@ -88,18 +88,11 @@ class TeamsDocumentService:
             raise
     
     async def extract_text_from_pdf(self, file_content: bytes) -> Dict[str, Any]:
-        """Extract text from PDF using PyPDF2."""
+        """Extract text from PDF (see extraction.converters)."""
         try:
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            text_parts = []
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
-            
-            full_text = "\n\n".join(text_parts)
+            full_text, page_count = convert_document(file_content, PDF_TYPE, sys.maxsize)
+            if full_text is None:
+                raise RuntimeError("PyPDF2 is not installed")
             
             full_text = self.sanitize_text(full_text)
             
@@ -108,7 +101,7 @@ class TeamsDocumentService:
             return {
                 "success": True,
                 "text": full_text,
-                "page_count": len(pdf_reader.pages),
+                "page_count": page_count,
                 "char_count": len(full_text),
                 "method": "pypdf2"
             }
@@ -121,13 +114,10 @@ class TeamsDocumentService:
             }
     
     async def extract_text_from_docx(self, file_content: bytes) -> Dict[str, Any]:
-        """Extract text from DOCX."""
+        """Extract text from DOCX (see extraction.converters)."""
         try:
-            docx_file = io.BytesIO(file_content)
-            doc = DocxDocument(docx_file)
-            
-            paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-            full_text = "\n\n".join(paragraphs)
+            full_text, _ = convert_document(file_content, DOCX_TYPE, sys.maxsize)
+            paragraphs = [block for block in full_text.split("\n\n") if block.strip()]
             
             full_text = self.sanitize_text(full_text)
             
@@ -138,7 +128,7 @@ class TeamsDocumentService:
                 "text": full_text,
                 "paragraph_count": len(paragraphs),
                 "char_count": len(full_text),
-                "method": "python-docx"
+                "method": "docx-xml"
             }
             
         except Exception as e:
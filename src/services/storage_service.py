@@ -5,6 +5,10 @@ Provides presigned URL generation for secure client-side uploads
 and document retrieval for processing.
 
 Works with Cloud Run default credentials (no private key needed).
+
+All methods block. Async code uses the DocumentStorage port instead
+(src.infrastructure.storage), which runs this service on a bounded
+thread pool or talks to GCS over pooled async HTTP.
 """
 
 import os
@@ -23,6 +27,16 @@ from google.auth.transport import requests as auth_requests
 logger = logging.getLogger(__name__)
 
 
+def upload_blob_path(user_id: str, document_id: str, filename: str) -> str:
+    """
+    Blob path of an uploaded document.
+
+    Path format: uploads/{user_id}/{document_id}/{filename}
+    """
+    safe_filename = "".join(c if c.isalnum() or c in ".-_" else "_" for c in filename)
+    return f"uploads/{user_id}/{document_id}/{safe_filename}"
+
+
 @dataclass
 class UploadedDocument:
     """Represents an uploaded document."""
@@ -125,8 +139,7 @@ class StorageService:
 
         Path format: uploads/{user_id}/{document_id}/{filename}
         """
-        safe_filename = "".join(c if c.isalnum() or c in ".-_" else "_" for c in filename)
-        return f"uploads/{user_id}/{document_id}/{safe_filename}"
+        return upload_blob_path(user_id, document_id, filename)
 
     def generate_presigned_upload_url(
         self,
@@ -266,8 +279,33 @@ class StorageService:
             "content_type": blob.content_type,
             "created": blob.time_created.isoformat() if blob.time_created else None,
             "md5_hash": blob.md5_hash,
+            "crc32c": blob.crc32c,
+            "generation": blob.generation,
         }
 
+    def upload_bytes(self, blob_path: str, data: bytes, content_type: str) -> None:
+        """
+        Upload content to GCS, replacing any previous object.
+
+        Args:
+            blob_path: Path to the blob in GCS
+            data: Content
+            content_type: MIME type
+        """
+        self.bucket.blob(blob_path).upload_from_string(data, content_type=content_type)
+        logger.info(f"📤 Uploaded {len(data)} bytes to {blob_path}")
+
+    def copy_document(self, source_blob_path: str, destination_blob_path: str) -> None:
+        """
+        Copy a document within the bucket (server-side).
+
+        Args:
+            source_blob_path: Path of the existing blob
+            destination_blob_path: Path of the copy
+        """
+        self.bucket.copy_blob(self.bucket.blob(source_blob_path), self.bucket, destination_blob_path)
+        logger.info(f"📑 Copied {source_blob_path} to {destination_blob_path}")
+
     def delete_document(self, blob_path: str) -> bool:
         """
         Delete a document from GCS.
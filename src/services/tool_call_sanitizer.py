@@ -0,0 +1,238 @@
+"""
+Incremental removal of tool-call artifacts from streamed agent text.
+
+Models sometimes write tool calls as text instead of emitting proper
+function calls, e.g. a line `rag_search "vacaciones"` or a fenced
+```tool_code block around it. The sanitizer removes those artifacts from
+a stream chunk by chunk, holding back only the shortest suffix that could
+still turn into an artifact, so patterns split across chunk boundaries
+are caught and ordinary text is released immediately.
+
+Rules (same as the previous per-chunk cleanup):
+1. A line consisting only of `name "argument"` is removed
+2. A ``` / ```tool_code / ```tool / ```function fence wrapping such a
+   line is removed entirely
+3. Inline `rag_search "..."` / `search_<corpus> "..."` is removed
+4. Runs of 3+ newlines collapse to one blank line; leading and trailing
+   whitespace of the whole message is dropped (whitespace between chunks
+   is kept)
+"""
+
+import re
+from typing import List
+
+
+def _prefix_pattern(word: str) -> str:
+    """Regex matching any non-empty prefix of `word` (e.g. abc -> a(?:b(?:c)?)?)."""
+    pattern = ""
+    for char in reversed(word):
+        pattern = re.escape(char) + (f"(?:{pattern})?" if pattern else "")
+    return pattern
+
+
+_TOOL_NAMES = r"(?:rag_search|search_\w+)"
+
+# Rule 1: whole-line tool call, and prefixes of a line that could still become one
+TOOL_LINE = re.compile(r'[ \t]*[a-z_]+[ \t]+"[^"\n]*"[ \t\r]*')
+TOOL_LINE_PREFIX = re.compile(r'[ \t]*(?:[a-z_]+(?:[ \t]+(?:"[^"\n]*(?:"[ \t\r]*)?)?)?)?')
+
+# Rule 2: fence lines around a tool call
+_FENCE_LANGS = ("TOOL_CODE", "tool", "function")
+FENCE_OPEN = re.compile(r"```(?:TOOL_CODE|tool|function)?[ \t\r]*", re.IGNORECASE)
+FENCE_OPEN_PREFIX = re.compile(
+    r"`{1,2}|```(?:(?:TOOL_CODE|tool|function)?[ \t\r]*|"
+    + "|".join(_prefix_pattern(lang) for lang in _FENCE_LANGS)
+    + ")",
+    re.IGNORECASE,
+)
+FENCE_CLOSE = re.compile(r"```[ \t\r]*")
+BLANK_LINE = re.compile(r"[ \t\r]*")
+
+# Rule 3: inline tool calls, and an unfinished one at the end of the buffer
+INLINE_CALL = re.compile(rf'\b{_TOOL_NAMES}\s+"[^"\n]*"')
+INLINE_CALL_TAIL = re.compile(
+    rf'\b(?:{_TOOL_NAMES}(?:\s+(?:"[^"\n]*)?)?|'
+    + _prefix_pattern("rag_search")
+    + "|"
+    + _prefix_pattern("search_")
+    + r")\Z"
+)
+
+# An unfinished call without a full tool name is at most this long ("rag_searc")
+_MAX_NAME_PREFIX = len("rag_search") - 1
+
+# Rule 4
+NEWLINE_RUN = re.compile(r"\n{3,}")
+
+# Fence states
+_TEXT, _FENCE_OPENED, _FENCE_WITH_CALL = 0, 1, 2
+
+
+class ToolCallSanitizer:
+    """
+    Streaming sanitizer for one agent response.
+
+    Usage:
+        sanitizer = ToolCallSanitizer()
+        for chunk in chunks:
+            text = sanitizer.feed(chunk)
+            if text:
+                send(text)
+        send(sanitizer.flush())
+    """
+
+    def __init__(self):
+        # Text not yet decided on; starts at a line start if _at_line_start
+        self._buf = ""
+        self._at_line_start = True
+        # Lines held while deciding whether a fence wraps a tool call
+        self._fence_state = _TEXT
+        self._fence_lines: List[str] = []
+        # Last sanitized character (word-boundary context for rule 3)
+        self._last_char = "\n"
+        # Whitespace held until non-whitespace text follows
+        self._pending_ws = ""
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk of model output.
+
+        Returns:
+            Sanitized text that is safe to emit now (may be empty)
+        """
+        if not chunk:
+            return ""
+        self._buf += chunk
+        out: List[str] = []
+
+        newline = self._buf.find("\n")
+        while newline != -1:
+            line = self._buf[:newline]
+            self._buf = self._buf[newline + 1:]
+            self._complete_line(line, out, terminated=True)
+            newline = self._buf.find("\n")
+
+        if self._buf and self._fence_state == _TEXT:
+            out.append(self._release_partial())
+
+        return self._emit("".join(out))
+
+    def flush(self) -> str:
+        """
+        End of stream: decide on everything still held back.
+
+        Returns:
+            The remaining sanitized text
+        """
+        out: List[str] = []
+        if self._buf or self._fence_state != _TEXT:
+            line, self._buf = self._buf, ""
+            self._complete_line(line, out, terminated=False)
+        self._release_fence(out)
+        text = self._emit("".join(out))
+        self._pending_ws = ""
+        return text
+
+    # -------------------------------------------------------------------------
+    # Line handling
+    # -------------------------------------------------------------------------
+
+    def _complete_line(self, line: str, out: List[str], terminated: bool) -> None:
+        """Process a finished line (rules 1 and 2)."""
+        end = "\n" if terminated else ""
+        at_line_start = self._at_line_start
+        self._at_line_start = True
+
+        if self._fence_state != _TEXT:
+            if BLANK_LINE.fullmatch(line):
+                self._fence_lines.append(line + end)
+                return
+            if self._fence_state == _FENCE_OPENED and TOOL_LINE.fullmatch(line):
+                self._fence_lines.append(line + end)
+                self._fence_state = _FENCE_WITH_CALL
+                return
+            if self._fence_state == _FENCE_WITH_CALL and FENCE_CLOSE.fullmatch(line):
+                # Drop the whole fenced tool call
+                self._fence_lines = []
+                self._fence_state = _TEXT
+                out.append(self._sanitize_inline(end))
+                return
+            # Not a fenced tool call after all
+            self._release_fence(out)
+
+        if at_line_start and '"' in line and TOOL_LINE.fullmatch(line):
+            out.append(self._sanitize_inline(end))
+        elif at_line_start and terminated and FENCE_OPEN.fullmatch(line):
+            self._fence_lines = [line + end]
+            self._fence_state = _FENCE_OPENED
+        else:
+            out.append(self._sanitize_inline(line + end))
+
+    def _release_fence(self, out: List[str]) -> None:
+        """Emit held fence lines as ordinary text."""
+        if self._fence_state == _TEXT:
+            return
+        lines, self._fence_lines = self._fence_lines, []
+        self._fence_state = _TEXT
+        for held in lines:
+            body = held[:-1] if held.endswith("\n") else held
+            if TOOL_LINE.fullmatch(body):
+                held = held[len(body):]
+            out.append(self._sanitize_inline(held))
+
+    def _release_partial(self) -> str:
+        """Emit the part of the unfinished line that can no longer become an artifact."""
+        if self._at_line_start and (
+            TOOL_LINE_PREFIX.fullmatch(self._buf) or FENCE_OPEN_PREFIX.fullmatch(self._buf)
+        ):
+            return ""
+
+        # A partial call starts at a full tool name or within the last few characters
+        start = len(self._buf) - _MAX_NAME_PREFIX
+        name_at = self._buf.find("search")
+        if name_at != -1:
+            start = min(start, name_at - len("rag_"))
+        tail = INLINE_CALL_TAIL.search(self._last_char + self._buf, max(start, 0) + 1)
+        hold_from = tail.start() - 1 if tail else len(self._buf)
+        if hold_from <= 0:
+            return ""
+
+        released, self._buf = self._buf[:hold_from], self._buf[hold_from:]
+        self._at_line_start = False
+        return self._sanitize_inline(released)
+
+    def _sanitize_inline(self, text: str) -> str:
+        """Apply rule 3 to text that is complete on its left side."""
+        if not text:
+            return text
+        if "search" not in text:
+            self._last_char = text[-1]
+            return text
+        # Search from offset 1 after the previous character so \b sees the real boundary
+        context = self._last_char + text
+        pieces, last = [], 1
+        for match in INLINE_CALL.finditer(context, 1):
+            pieces.append(context[last:match.start()])
+            last = match.end()
+        pieces.append(context[last:])
+        self._last_char = text[-1]
+        return "".join(pieces)
+
+    # -------------------------------------------------------------------------
+    # Whitespace
+    # -------------------------------------------------------------------------
+
+    def _emit(self, text: str) -> str:
+        """Apply rule 4, holding trailing whitespace until more text follows."""
+        if not text:
+            return ""
+        text = self._pending_ws + text
+        body = text.rstrip()
+        self._pending_ws = text[len(body):]
+        if not self._started:
+            body = body.lstrip()
+            self._started = bool(body)
+        if "\n\n\n" in body:
+            body = NEWLINE_RUN.sub("\n\n", body)
+        return body
@@ -0,0 +1,57 @@
+"""
+CachingDocumentStorage against FakeGCS: content-keyed entries never hold
+bytes an uploader wrote after the metadata read.
+
+Run with: python -m pytest tests/test_attachment_cache.py
+"""
+
+import asyncio
+
+from src.infrastructure.storage import AttachmentCache, CachingDocumentStorage, FakeGCS, GCSHttpDocumentStorage
+
+BUCKET = "documents"
+PDF = b"%PDF-1.4 " + b"policy " * 1000
+
+
+def make_storage(fake: FakeGCS) -> CachingDocumentStorage:
+    inner = GCSHttpDocumentStorage(BUCKET, endpoint="http://fake-gcs", transport=fake.transport())
+    return CachingDocumentStorage(inner, AttachmentCache(disk_dir=None))
+
+
+def test_overwrite_between_metadata_and_download_is_not_cached():
+    async def scenario():
+        fake = FakeGCS()
+        storage = make_storage(fake)
+        fake.put(BUCKET, "uploads/mallory/1/a.pdf", PDF, "application/pdf")
+        fake.put(BUCKET, "uploads/alice/2/a.pdf", PDF, "application/pdf")
+
+        # mallory's metadata is read, then the object is rewritten via the signed URL
+        assert (await storage.verify_upload("uploads/mallory/1/a.pdf"))["size_bytes"] == len(PDF)
+        fake.put(BUCKET, "uploads/mallory/1/a.pdf", b"injected", "application/pdf")
+
+        assert await storage.get_document_bytes("uploads/mallory/1/a.pdf") == b"injected"
+        assert await storage.get_document_bytes("uploads/alice/2/a.pdf") == PDF
+        assert storage.cache.stats()["memory_entries"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_reader_of_another_path_gets_its_own_bytes():
+    async def scenario():
+        fake = FakeGCS(latency_ms=20)
+        storage = make_storage(fake)
+        fake.put(BUCKET, "uploads/mallory/1/a.pdf", PDF, "application/pdf")
+        fake.put(BUCKET, "uploads/alice/2/a.pdf", PDF, "application/pdf")
+        await storage.verify_upload("uploads/mallory/1/a.pdf")
+        await storage.verify_upload("uploads/alice/2/a.pdf")
+        fake.put(BUCKET, "uploads/mallory/1/a.pdf", b"injected", "application/pdf")
+
+        # alice's read joins mallory's in-flight download of the same content key
+        mallory, alice = await asyncio.gather(
+            storage.get_document_bytes("uploads/mallory/1/a.pdf"),
+            storage.get_document_bytes("uploads/alice/2/a.pdf"),
+        )
+        assert mallory == b"injected"
+        assert alice == PDF
+
+    asyncio.run(scenario())
@@ -0,0 +1,80 @@
+"""
+load_attachments against FakeGCS: objects overwritten between the
+metadata read and the download are sent, but nothing shared is keyed by
+their stale md5.
+
+Run with: python -m pytest tests/test_attachment_loader.py
+"""
+
+import asyncio
+
+from src.infrastructure.adapters.memory.in_memory_model_file_repository import InMemoryModelFileRepository
+from src.infrastructure.extraction import TextExtractor
+from src.infrastructure.model_files import LocalModelFileStore, ModelFileCache
+from src.infrastructure.storage import FakeGCS, GCSHttpDocumentStorage
+from src.infrastructure.storage.attachment_loader import ByteBudget, load_attachments
+
+BUCKET = "documents"
+HTML = b"<html><body>" + b"<p>Policy clause</p>" * 200 + b"</body></html>"
+
+
+class OverwritingStorage(GCSHttpDocumentStorage):
+    """Rewrites an object just before it is downloaded, like a re-PUT to its signed URL."""
+
+    def __init__(self, fake: FakeGCS, replacement: bytes):
+        super().__init__(BUCKET, endpoint="http://fake-gcs", transport=fake.transport())
+        self.fake = fake
+        self.replacement = replacement
+
+    async def get_document_bytes(self, blob_path: str) -> bytes:
+        self.fake.put(BUCKET, blob_path, self.replacement, "text/html")
+        return await super().get_document_bytes(blob_path)
+
+
+def test_overwritten_attachment_is_not_cached_under_its_old_md5():
+    async def scenario():
+        fake = FakeGCS()
+        fake.put(BUCKET, "uploads/mallory/1/page.html", HTML, "text/html")
+        storage = OverwritingStorage(fake, b"<p>injected</p>" * 200)
+        repository = InMemoryModelFileRepository()
+        model_files = ModelFileCache(LocalModelFileStore(), repository, min_bytes=1)
+        extractor = TextExtractor(process_workers=0)
+
+        batch = await load_attachments(
+            storage,
+            ["uploads/mallory/1/page.html"],
+            budget=ByteBudget(10 ** 7),
+            model_files=model_files,
+            text_extractor=extractor,
+        )
+        loaded = batch.results[0]
+        batch.release()
+        await asyncio.sleep(0.05)
+
+        # The caller still gets its current bytes, keyed by nothing shared
+        assert loaded.error is None and "injected" in loaded.text
+        assert loaded.content_hash is None
+        assert extractor.stats()["cache_entries"] == 0
+        assert repository._files == {}
+        await extractor.close()
+        await model_files.close()
+
+    asyncio.run(scenario())
+
+
+def test_unchanged_attachment_keeps_its_md5():
+    async def scenario():
+        fake = FakeGCS()
+        fake.put(BUCKET, "uploads/alice/1/page.html", HTML, "text/html")
+        storage = GCSHttpDocumentStorage(BUCKET, endpoint="http://fake-gcs", transport=fake.transport())
+        extractor = TextExtractor(process_workers=0)
+
+        batch = await load_attachments(
+            storage, ["uploads/alice/1/page.html"], budget=ByteBudget(10 ** 7), text_extractor=extractor
+        )
+        batch.release()
+        assert batch.results[0].content_hash
+        assert extractor.stats()["cache_entries"] == 1
+        await extractor.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,108 @@
+"""
+GCSHttpDocumentStorage against FakeGCS: metadata, downloads, missing
+objects, listing across pages and copies that take several rewriteTo
+calls.
+
+Run with: python -m pytest tests/test_gcs_http_storage.py
+"""
+
+import asyncio
+import base64
+import hashlib
+
+import pytest
+
+from src.infrastructure.storage import FakeGCS, GCSHttpDocumentStorage
+
+BUCKET = "documents"
+PDF = b"%PDF-1.4 " + b"policy " * 500
+
+
+def storage_for(fake: FakeGCS) -> GCSHttpDocumentStorage:
+    return GCSHttpDocumentStorage(BUCKET, endpoint="http://fake-gcs", transport=fake.transport())
+
+
+def test_verify_and_download():
+    async def scenario():
+        fake = FakeGCS()
+        fake.put(BUCKET, "uploads/alice/1/policy.pdf", PDF, "application/pdf")
+        storage = storage_for(fake)
+
+        info = await storage.verify_upload("uploads/alice/1/policy.pdf")
+        assert info["exists"]
+        assert info["size_bytes"] == len(PDF)
+        assert info["content_type"] == "application/pdf"
+        assert info["md5_hash"] == base64.b64encode(hashlib.md5(PDF).digest()).decode()
+        assert info["generation"] == fake.objects[(BUCKET, "uploads/alice/1/policy.pdf")].generation
+
+        assert await storage.get_document_bytes("uploads/alice/1/policy.pdf") == PDF
+        await storage.close()
+
+    asyncio.run(scenario())
+
+
+def test_missing_objects():
+    async def scenario():
+        storage = storage_for(FakeGCS())
+
+        assert await storage.verify_upload("uploads/alice/1/gone.pdf") is None
+        with pytest.raises(FileNotFoundError):
+            await storage.get_document_bytes("uploads/alice/1/gone.pdf")
+        with pytest.raises(FileNotFoundError):
+            await storage.copy_document("uploads/alice/1/gone.pdf", "uploads/alice/2/gone.pdf")
+        assert await storage.delete_document("uploads/alice/1/gone.pdf") is False
+        await storage.close()
+
+    asyncio.run(scenario())
+
+
+def test_object_names_are_escaped():
+    async def scenario():
+        fake = FakeGCS()
+        path = "uploads/alice/1/Política de vacaciones #2 (final).pdf"
+        storage = storage_for(fake)
+
+        await storage.upload_bytes(path, PDF, "application/pdf")
+        assert (BUCKET, path) in fake.objects
+        assert await storage.get_document_bytes(path) == PDF
+        assert await storage.delete_document(path) is True
+        assert (BUCKET, path) not in fake.objects
+        await storage.close()
+
+    asyncio.run(scenario())
+
+
+def test_list_user_documents_follows_pages():
+    async def scenario():
+        fake = FakeGCS(page_size=2)
+        for index in range(5):
+            fake.put(BUCKET, f"uploads/alice/{index}/policy.pdf", PDF, "application/pdf")
+        fake.put(BUCKET, "uploads/bob/0/policy.pdf", PDF, "application/pdf")
+        storage = storage_for(fake)
+
+        documents = await storage.list_user_documents("alice")
+        assert [d["blob_path"] for d in documents] == [f"uploads/alice/{i}/policy.pdf" for i in range(5)]
+        assert all(d["size_bytes"] == len(PDF) for d in documents)
+        assert fake.requests == 3
+
+        assert len(await storage.list_user_documents("alice", max_results=3)) == 3
+        await storage.close()
+
+    asyncio.run(scenario())
+
+
+def test_copy_takes_several_rewrite_calls():
+    async def scenario():
+        fake = FakeGCS(rewrite_bytes_per_call=1024)
+        fake.put(BUCKET, "uploads/alice/1/policy.pdf", PDF, "application/pdf")
+        storage = storage_for(fake)
+
+        await storage.copy_document("uploads/alice/1/policy.pdf", "uploads/bob/2/policy.pdf")
+
+        assert fake.requests == -(-len(PDF) // 1024)
+        copy = fake.objects[(BUCKET, "uploads/bob/2/policy.pdf")]
+        assert copy.data == PDF
+        assert copy.content_type == "application/pdf"
+        await storage.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,285 @@
+"""
+ResilientCaller against a fake RAG client with injected latency and
+errors: hedging, circuit breaking and the retry budget, and how an open
+circuit shows up in VertexRAGTool results.
+
+Run with: python -m pytest tests/test_rag_resilience.py
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+
+from src.domain.models import CorpusConfig
+from src.infrastructure.metrics import get_metrics
+from src.infrastructure.tools import rag_tool
+from src.infrastructure.tools.payload_shaper import shape_payload
+from src.infrastructure.tools.rag_clients import RAGClients
+from src.infrastructure.tools.rag_resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    RetryBudget,
+)
+
+
+class ServiceUnavailable(ConnectionError):
+    """Stand-in for google.api_core.exceptions.ServiceUnavailable."""
+
+
+@dataclass
+class Step:
+    """What one call to the fake client does."""
+    delay: float = 0.0
+    error: Optional[Exception] = None
+    gate: Optional[threading.Event] = None
+
+
+class FakeRagClient:
+    """Blocking retrieval stand-in playing scripted steps, then `default`."""
+
+    def __init__(self, *steps: Step, default: Step = Step(delay=0.01)):
+        self.steps = list(steps)
+        self.default = default
+        self.started: list[float] = []
+        self._lock = threading.Lock()
+
+    @property
+    def calls(self) -> int:
+        return len(self.started)
+
+    def retrieval_query(self) -> str:
+        with self._lock:
+            self.started.append(time.monotonic())
+            call = len(self.started)
+            step = self.steps.pop(0) if self.steps else self.default
+        if step.gate is not None:
+            step.gate.wait(timeout=5)
+        time.sleep(step.delay)
+        if step.error is not None:
+            raise step.error
+        return f"answer {call}"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def counter(name: str) -> int:
+    return get_metrics().counter(name).value
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+# -----------------------------------------------------------------------------
+# Hedging
+# -----------------------------------------------------------------------------
+
+def test_hedge_fires_after_the_p95_delay_and_wins(executor):
+    async def scenario():
+        caller = ResilientCaller(executor, retry_attempts=0)
+        for _ in range(20):
+            caller.latency("hr").record(0.08)
+        client = FakeRagClient(Step(delay=0.6), Step(delay=0.01))
+        wins = counter("rag_resilience.hedge_wins")
+
+        started = time.monotonic()
+        result = await caller.call("hr", client.retrieval_query, timeout=5)
+        elapsed = time.monotonic() - started
+
+        assert result == "answer 2"
+        assert client.calls == 2
+        assert client.started[1] - client.started[0] >= 0.075
+        assert elapsed < 0.4
+        assert counter("rag_resilience.hedge_wins") == wins + 1
+
+    asyncio.run(scenario())
+
+
+def test_no_hedge_without_enough_latency_samples(executor):
+    async def scenario():
+        caller = ResilientCaller(executor, retry_attempts=0)
+        client = FakeRagClient(Step(delay=0.2))
+
+        assert await caller.call("hr", client.retrieval_query, timeout=5) == "answer 1"
+        assert client.calls == 1
+
+    asyncio.run(scenario())
+
+
+# -----------------------------------------------------------------------------
+# Circuit breaker
+# -----------------------------------------------------------------------------
+
+def test_breaker_opens_probes_once_and_closes(executor):
+    async def scenario():
+        clock = FakeClock()
+        caller = ResilientCaller(
+            executor,
+            retry_attempts=0,
+            breaker_factory=lambda: CircuitBreaker(failure_threshold=2, open_seconds=30, clock=clock),
+        )
+        gate = threading.Event()
+        client = FakeRagClient(
+            Step(error=ServiceUnavailable("503")),
+            Step(error=ServiceUnavailable("503")),
+            Step(gate=gate),
+        )
+
+        for _ in range(2):
+            with pytest.raises(ServiceUnavailable):
+                await caller.call("hr", client.retrieval_query, timeout=5)
+        assert caller.breaker("hr").state == CircuitBreaker.OPEN
+
+        # Open: rejected without reaching the backend
+        with pytest.raises(CircuitOpenError) as rejected:
+            await caller.call("hr", client.retrieval_query, timeout=5)
+        assert rejected.value.retry_after == 30
+        assert client.calls == 2
+
+        # Half-open: one probe goes through, concurrent calls are still rejected
+        clock.now += 31
+        probe = asyncio.create_task(caller.call("hr", client.retrieval_query, timeout=5))
+        await asyncio.sleep(0.05)
+        assert caller.breaker("hr").state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            await caller.call("hr", client.retrieval_query, timeout=5)
+        assert client.calls == 3
+
+        gate.set()
+        assert await probe == "answer 3"
+        assert caller.breaker("hr").state == CircuitBreaker.CLOSED
+        assert await caller.call("hr", client.retrieval_query, timeout=5) == "answer 4"
+
+    asyncio.run(scenario())
+
+
+def test_failed_probe_reopens_the_circuit(executor):
+    async def scenario():
+        clock = FakeClock()
+        caller = ResilientCaller(
+            executor,
+            retry_attempts=0,
+            breaker_factory=lambda: CircuitBreaker(failure_threshold=2, open_seconds=30, clock=clock),
+        )
+        client = FakeRagClient(default=Step(error=ServiceUnavailable("503")))
+
+        for _ in range(2):
+            with pytest.raises(ServiceUnavailable):
+                await caller.call("hr", client.retrieval_query, timeout=5)
+        clock.now += 31
+
+        # A single failed probe is enough to reopen it
+        with pytest.raises(ServiceUnavailable):
+            await caller.call("hr", client.retrieval_query, timeout=5)
+        assert caller.breaker("hr").state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            await caller.call("hr", client.retrieval_query, timeout=5)
+        assert client.calls == 3
+
+        # Other corpuses are not affected
+        assert caller.breaker("finance").state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+# -----------------------------------------------------------------------------
+# Retry budget
+# -----------------------------------------------------------------------------
+
+def test_retries_stop_when_the_budget_is_exhausted(executor):
+    async def scenario():
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=1.0, clock=clock)
+        caller = ResilientCaller(executor, retry_attempts=3, budget=budget)
+        client = FakeRagClient(default=Step(error=ServiceUnavailable("503")))
+        exhausted = counter("rag_resilience.budget_exhausted")
+
+        # One retry spends the only token; the next retry is refused
+        with pytest.raises(ServiceUnavailable):
+            await caller.call("hr", client.retrieval_query, timeout=5)
+        assert client.calls == 2
+        assert counter("rag_resilience.budget_exhausted") == exhausted + 1
+
+        with pytest.raises(ServiceUnavailable):
+            await caller.call("hr", client.retrieval_query, timeout=5)
+        assert client.calls == 3
+        assert counter("rag_resilience.budget_exhausted") == exhausted + 2
+
+    asyncio.run(scenario())
+
+
+def test_non_transient_errors_are_not_retried(executor):
+    async def scenario():
+        caller = ResilientCaller(executor, retry_attempts=3)
+        client = FakeRagClient(default=Step(error=ValueError("bad filter")))
+
+        with pytest.raises(ValueError):
+            await caller.call("hr", client.retrieval_query, timeout=5)
+        assert client.calls == 1
+        assert caller.breaker("hr").failures == 0
+
+    asyncio.run(scenario())
+
+
+# -----------------------------------------------------------------------------
+# VertexRAGTool
+# -----------------------------------------------------------------------------
+
+def test_open_circuit_is_a_per_corpus_status(monkeypatch):
+    hr = CorpusConfig(corpus_id="hr", corpus_name="HR", display_name="HR",
+                      vertex_corpus_name="projects/p/locations/l/ragCorpora/hr")
+    policies = CorpusConfig(corpus_id="policies", corpus_name="Policies", display_name="Policies",
+                            vertex_corpus_name="projects/p/locations/l/ragCorpora/policies")
+    calls = {"hr": 0, "policies": 0}
+
+    def retrieval_query(rag_resources, text, rag_retrieval_config):
+        corpus_id = rag_resources[0].rag_corpus.rsplit("/", 1)[-1]
+        calls[corpus_id] += 1
+        if corpus_id == "hr":
+            raise ServiceUnavailable("503 backend unavailable")
+        return SimpleNamespace(contexts=SimpleNamespace(contexts=[
+            SimpleNamespace(text=f"Vacation policy {i}", distance=0.1 * i, source_uri=f"gs://docs/policy_{i}.pdf")
+            for i in range(2)
+        ]))
+
+    monkeypatch.setattr(rag_tool.rag, "retrieval_query", retrieval_query)
+    monkeypatch.setattr(rag_tool, "get_retrieval_cache", lambda: None)
+
+    async def scenario():
+        clients = RAGClients(project_id="test-project")
+        clients._resilience = ResilientCaller(
+            clients.executor,
+            retry_attempts=0,
+            breaker_factory=lambda: CircuitBreaker(failure_threshold=2, open_seconds=30),
+        )
+        tool = rag_tool.VertexRAGTool([hr, policies], clients=clients)
+
+        for _ in range(2):
+            await tool.search("vacation days", top_k=2, fetch_metadata=False)
+        response = await tool.search("vacation days", top_k=2, fetch_metadata=False)
+        await clients.close()
+
+        assert calls == {"hr": 2, "policies": 3}
+        assert response["status"] == "success" and response["partial"]
+        [skipped] = [r for r in response["results"] if r["corpus_id"] == "hr"]
+        assert skipped["status"] == "error"
+        assert "Circuit open for hr" in skipped["error"]
+        assert sum(1 for r in response["results"] if r["corpus_id"] == "policies") == 2
+        assert shape_payload(response)["failed_corpuses"] == ["HR"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+"""
+StreamRegistry under its byte cap: frames a subscriber has not read are
+never dropped silently, and cancelled generations end as cancelled tasks.
+
+Run with: python -m pytest tests/test_stream_registry.py
+"""
+
+import asyncio
+import json
+
+from src.application.api.stream_registry import StreamRegistry
+from src.domain.models import StreamEvent
+
+EVENTS = 60
+PADDING = "x" * 80
+
+
+async def progress_events(count: int = EVENTS):
+    for step in range(count):
+        yield StreamEvent(event_type="progress", data={"step": step, "padding": PADDING})
+        await asyncio.sleep(0)
+
+
+def frame_seq(frame: str) -> int:
+    return int(frame.split("\n", 1)[0].rsplit(":", 1)[1])
+
+
+def test_reading_subscriber_gets_every_frame_under_the_cap():
+    async def scenario():
+        registry = StreamRegistry(max_total_bytes=1500, heartbeat_seconds=1)
+        stream = registry.start("alice", progress_events())
+
+        frames = [frame async for frame in registry.subscribe(stream)]
+
+        # Frames already read were released, none were skipped
+        assert [frame_seq(f) for f in frames] == list(range(1, EVENTS + 1))
+        assert registry.stats()["buffered_bytes"] <= 1500
+        await registry.close()
+
+    asyncio.run(scenario())
+
+
+def test_stalled_subscriber_gets_an_overflow_error_instead_of_a_gap():
+    async def scenario():
+        registry = StreamRegistry(max_total_bytes=1500, heartbeat_seconds=1)
+        stream = registry.start("alice", progress_events())
+        subscriber = registry.subscribe(stream)
+
+        first = await subscriber.__anext__()
+        await asyncio.wait([stream.task], timeout=2)
+
+        rest = [frame async for frame in subscriber]
+        seqs = [frame_seq(first)] + [frame_seq(f) for f in rest if f.startswith("id:")]
+        error = json.loads(rest[-1][len("data: "):])["error"]
+
+        assert seqs == list(range(1, len(seqs) + 1))
+        assert error["code"] == "buffer_overflow"
+        assert stream.task.cancelled()
+        assert registry.stats()["buffered_bytes"] <= 1500
+        await registry.close()
+
+    asyncio.run(scenario())
+
+
+def test_orphaned_generation_is_cancelled():
+    async def scenario():
+        registry = StreamRegistry(grace_seconds=0.01, heartbeat_seconds=1)
+        stream = registry.start("alice", progress_events(10 ** 6))
+        subscriber = registry.subscribe(stream)
+        await subscriber.__anext__()
+        await subscriber.aclose()
+
+        await asyncio.wait([stream.task], timeout=2)
+        assert stream.task.cancelled()
+        assert stream.done
+        await registry.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,183 @@
+"""
+DeduplicatingDocumentStorage against FakeGCS and InMemoryUploadIndexRepository:
+aliases, sharing, deferred release, deletes and index outages.
+
+Run with: python -m pytest tests/test_upload_dedup.py
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.infrastructure.adapters.memory import InMemoryUploadIndexRepository
+from src.infrastructure.storage import DeduplicatingDocumentStorage, FakeGCS, GCSHttpDocumentStorage
+
+BUCKET = "documents"
+PDF = b"%PDF-1.4 " + b"policy " * 5000
+
+
+class Harness:
+    """One bucket and one index shared by any number of storage instances (processes)."""
+
+    def __init__(self):
+        self.fake = FakeGCS()
+        self.repository = InMemoryUploadIndexRepository()
+        self.index_down = False
+
+    async def _provider(self):
+        if self.index_down:
+            raise ConnectionError("index unreachable")
+        return self.repository
+
+    def storage(self) -> DeduplicatingDocumentStorage:
+        inner = GCSHttpDocumentStorage(BUCKET, endpoint="http://fake-gcs", transport=self.fake.transport())
+        return DeduplicatingDocumentStorage(inner, self._provider, sweep_interval_seconds=3600)
+
+    def upload(self, user: str, name: str, data: bytes = PDF) -> str:
+        path = f"uploads/{user}/{name}/policy.pdf"
+        self.fake.put(BUCKET, path, data, "application/pdf")
+        return path
+
+    def objects(self) -> list:
+        return sorted(name for _, name in self.fake.objects)
+
+    def shared_objects(self) -> list:
+        return [name for name in self.objects() if name.startswith("content/")]
+
+
+def later() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(days=2)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_confirm_does_not_reveal_other_users_uploads():
+    async def scenario():
+        harness = Harness()
+        storage = harness.storage()
+        first = await storage.confirm_upload(harness.upload("alice", "1"), "alice")
+        second = await storage.confirm_upload(harness.upload("mallory", "2"), "mallory")
+        assert "deduplicated" not in first and "deduplicated" not in second
+        assert "content_key" not in second
+        assert second["size_bytes"] == len(PDF)
+
+    run(scenario())
+
+
+def test_second_copy_is_shared_and_released_objects_survive_until_sweep():
+    async def scenario():
+        harness = Harness()
+        storage = harness.storage()
+        alice = harness.upload("alice", "1")
+        bob = harness.upload("bob", "2")
+        await storage.confirm_upload(alice, "alice")
+        alice_url = await storage.generate_presigned_download_url(alice)
+        await storage.confirm_upload(bob, "bob")
+
+        # Shared, but nothing deleted yet: issued URLs keep working
+        assert len(harness.shared_objects()) == 1
+        assert alice in harness.objects() and bob in harness.objects()
+        assert alice_url.endswith(alice)
+
+        # A third copy points to the shared object at once
+        carol = harness.upload("carol", "3")
+        await storage.confirm_upload(carol, "carol")
+        assert len(harness.shared_objects()) == 1
+
+        assert await storage.sweep_released() == 0
+        assert await storage.sweep_released(now=later()) == 3
+        assert harness.objects() == harness.shared_objects()
+
+        # A new process resolves every alias through the index
+        fresh = harness.storage()
+        for path in (alice, bob, carol):
+            assert await fresh.get_document_bytes(path) == PDF
+            assert (await fresh.verify_upload(path))["content_type"] == "application/pdf"
+        url = await fresh.generate_presigned_download_url(bob)
+        assert "/content/" in url and "alice" not in url
+        assert [doc["blob_path"] for doc in await fresh.list_user_documents("bob")] == [bob]
+
+    run(scenario())
+
+
+def test_rewritten_upload_reads_its_new_bytes_everywhere():
+    async def scenario():
+        harness = Harness()
+        storage = harness.storage()
+        alice, bob = harness.upload("alice", "1"), harness.upload("bob", "2")
+        await storage.confirm_upload(alice, "alice")
+        await storage.confirm_upload(bob, "bob")
+        other = harness.storage()
+        assert await other.get_document_bytes(bob) == PDF
+
+        # bob re-PUTs to the still-valid presigned URL
+        harness.upload("bob", "2", b"new bytes")
+        assert await storage.get_document_bytes(bob) == b"new bytes"
+        assert await other.get_document_bytes(bob) == b"new bytes"
+
+        # The sweep keeps the rewritten object and only releases alice's copy
+        assert await storage.sweep_released(now=later()) == 1
+        assert await harness.storage().get_document_bytes(bob) == b"new bytes"
+        assert await harness.storage().get_document_bytes(alice) == PDF
+
+    run(scenario())
+
+
+def test_delete_keeps_the_shared_object_until_the_last_upload():
+    async def scenario():
+        harness = Harness()
+        storage = harness.storage()
+        alice, bob = harness.upload("alice", "1"), harness.upload("bob", "2")
+        await storage.confirm_upload(alice, "alice")
+        await storage.confirm_upload(bob, "bob")
+
+        # Deleting before the sweep removes the released own object too
+        assert await storage.delete_document(alice)
+        assert alice not in harness.objects()
+        assert len(harness.shared_objects()) == 1
+        assert await harness.storage().get_document_bytes(bob) == PDF
+
+        await storage.sweep_released(now=later())
+        assert await storage.delete_document(bob)
+        assert harness.objects() == []
+        assert await harness.storage().verify_upload(bob) is None
+
+    run(scenario())
+
+
+def test_index_outage():
+    async def scenario():
+        harness = Harness()
+        storage = harness.storage()
+        alice, bob = harness.upload("alice", "1"), harness.upload("bob", "2")
+        await storage.confirm_upload(alice, "alice")
+        await storage.confirm_upload(bob, "bob")
+        harness.index_down = True
+
+        # Confirming degrades to plain verification
+        carol = harness.upload("carol", "3")
+        assert (await storage.confirm_upload(carol, "carol"))["size_bytes"] == len(PDF)
+
+        # Before the sweep, released uploads still read from their own objects
+        assert await harness.storage().get_document_bytes(alice) == PDF
+        assert await storage.sweep_released(now=later()) == 0
+
+        harness.index_down = False
+        await storage.sweep_released(now=later())
+        assert await storage.get_document_bytes(alice) == PDF
+        harness.index_down = True
+
+        # Afterwards the index is required: an error, never "not found"
+        fresh = harness.storage()
+        with pytest.raises(ConnectionError):
+            await fresh.get_document_bytes(alice)
+        with pytest.raises(ConnectionError):
+            await fresh.delete_document(alice)
+        assert fresh.stats()["index_errors"] >= 2
+        # Processes that resolved the alias before keep serving it
+        assert await storage.get_document_bytes(alice) == PDF
+
+    run(scenario())